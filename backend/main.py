@@ -7,6 +7,8 @@ import traceback
 from simulation.solver import NetworkSolver
 from simulation.graph_parser import GraphParser
 from simulation.schemas import ReactFlowGraph
+from simulation.warm_start import WarmStartCache
+from simulation.fluid_utils import fluid_options
 from simulation.equipment.linear_control_valve import LinearControlValve
 
 app = FastAPI(title="WalFlow Engine", description="Hydraulic Simulation Backend")
@@ -23,6 +25,39 @@ app.add_middleware(
 network_instance = None
 solver_instance = None
 
+# Last converged state per topology (survives re-parses and reconnects)
+warm_start_cache = WarmStartCache()
+
+def build_telemetry(network):
+    """Package telemetry for all nodes and edges"""
+    telemetry = {
+        "nodes": {},
+        "edges": {}
+    }
+    
+    for node_id, node in network.nodes.items():
+        node_telemetry = {
+            "inlets": [p.dict() for p in node.inlets],
+            "outlets": [p.dict() for p in node.outlets]
+        }
+        if hasattr(node, 'opening_pct'):
+            node_telemetry["opening_pct"] = node.opening_pct
+        if hasattr(node, 'sensed_pressure'):
+            node_telemetry["sensed_pressure"] = node.sensed_pressure
+        if hasattr(node, 'cavitation_warning'):
+            node_telemetry["cavitation_warning"] = node.cavitation_warning
+            
+        telemetry["nodes"][node_id] = node_telemetry
+    
+    for edge in network.edges:
+        edge_id = edge["id"]
+        pipe = edge["pipe"]
+        telemetry["edges"][edge_id] = {
+            "inlets": [p.dict() for p in pipe.inlets],
+            "outlets": [p.dict() for p in pipe.outlets]
+        }
+    return telemetry
+
 @app.get("/")
 async def read_root():
     return {"status": "online", "message": "WalFlow Engine is ready."}
@@ -36,6 +71,8 @@ async def websocket_endpoint(websocket: WebSocket):
     
     await websocket.accept()
     print("Frontend client connected.")
+    # Selectable fluids, including those of extra library files (WALFLOW_FLUID_LIBRARY)
+    await websocket.send_text(json.dumps({"status": "init", "fluids": fluid_options()}))
     
     try:
         while True:
@@ -59,16 +96,38 @@ async def websocket_endpoint(websocket: WebSocket):
                         await websocket.send_text(json.dumps({"status": "error", "message": str(e)}))
                         continue
 
-            elif action == "update_valve":
+            elif action in ("update_valve", "update_parameters"):
+                # Parameter-only edits (slider drags): re-solve incrementally and reply at once
                 if network_instance:
-                    valve_id = data.get("node_id")
-                    new_pct = float(data.get("value", 50.0))
-                    
+                    node_id = data.get("node_id")
+                    if action == "update_valve":
+                        updates = {"opening": float(data.get("value", 50.0))}
+                    else:
+                        updates = data.get("data") or {}
+
                     # Update specific valve if ID provided, else update all (for legacy support)
-                    for node_id, node in network_instance.nodes.items():
-                        if isinstance(node, LinearControlValve):
-                            if valve_id is None or node_id == valve_id:
-                                node.opening_pct = max(0.1, min(100.0, new_pct))
+                    if node_id is None and action == "update_valve":
+                        target_ids = [i for i, n in network_instance.nodes.items() if isinstance(n, LinearControlValve)]
+                    else:
+                        target_ids = [node_id]
+                    applied = all(GraphParser.apply_parameter_updates(network_instance, i, updates) for i in target_ids)
+                    if not applied:
+                        await websocket.send_text(json.dumps({"status": "error", "message": f"Unsupported parameter update for {node_id}: {sorted(updates)}"}))
+                        continue
+
+                    try:
+                        stats = solver_instance.resolve(warm_start=warm_start_cache.lookup(network_instance))
+                        if stats["success"]:
+                            warm_start_cache.store(network_instance, solver_instance.export_state())
+                        await websocket.send_text(json.dumps({
+                            "status": "success",
+                            "stats": stats,
+                            "telemetry": build_telemetry(network_instance)
+                        }))
+                    except Exception as e:
+                        print(f"Solver Error: {e}")
+                        traceback.print_exc()
+                        await websocket.send_text(json.dumps({"status": "error", "message": str(e)}))
 
             elif action == "run_simulation":
                 # OPTIONAL: Allow updating the graph immediately before simulation 
@@ -86,41 +145,15 @@ async def websocket_endpoint(websocket: WebSocket):
 
                 if solver_instance:
                     try:
-                        # Run the physics engine
-                        stats = solver_instance.solve()
-                        
-                        # Package telemetry for all nodes and edges
-                        telemetry = {
-                            "nodes": {},
-                            "edges": {}
-                        }
+                        # Run the physics engine, starting from the last solution of this topology
+                        stats = solver_instance.solve(warm_start=warm_start_cache.lookup(network_instance))
+                        if stats["success"]:
+                            warm_start_cache.store(network_instance, solver_instance.export_state())
                         
-                        for node_id, node in network_instance.nodes.items():
-                            node_telemetry = {
-                                "inlets": [p.dict() for p in node.inlets],
-                                "outlets": [p.dict() for p in node.outlets]
-                            }
-                            if hasattr(node, 'opening_pct'):
-                                node_telemetry["opening_pct"] = node.opening_pct
-                            if hasattr(node, 'sensed_pressure'):
-                                node_telemetry["sensed_pressure"] = node.sensed_pressure
-                            if hasattr(node, 'cavitation_warning'):
-                                node_telemetry["cavitation_warning"] = node.cavitation_warning
-                                
-                            telemetry["nodes"][node_id] = node_telemetry
-                        
-                        for edge in network_instance.edges:
-                            edge_id = edge["id"]
-                            pipe = edge["pipe"]
-                            telemetry["edges"][edge_id] = {
-                                "inlets": [p.dict() for p in pipe.inlets],
-                                "outlets": [p.dict() for p in pipe.outlets]
-                            }
-
                         await websocket.send_text(json.dumps({
                             "status": "success",
                             "stats": stats,
-                            "telemetry": telemetry
+                            "telemetry": build_telemetry(network_instance)
                         }))
                     except Exception as e:
                         print(f"Solver Error: {e}")
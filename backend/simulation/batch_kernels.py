@@ -0,0 +1,189 @@
+import numpy as np
+
+from simulation.state_arena import PortGroup, DENSITY, VISCOSITY
+
+# Equipment class (or its "module:Class" path) -> BatchKernel subclass evaluating a whole group at once
+BATCH_KERNELS = {}
+
+K_CV_SI = 1.732e9
+
+def register_batch_kernel(*equipment_classes):
+    """
+    Class decorator registering a BatchKernel for one or more equipment classes:
+
+        @register_batch_kernel(MyValve)
+        class MyValveKernel(BatchKernel): ...
+
+    Classes may also be given as "module:Class" paths (as simulation.equipment_registry
+    names them), so registering a kernel does not import the equipment module.
+    Subclasses of a registered equipment class use the same kernel unless they register their own.
+    """
+    def decorator(kernel_cls):
+        for equipment_cls in equipment_classes:
+            BATCH_KERNELS[equipment_cls] = kernel_cls
+        return kernel_cls
+    return decorator
+
+def kernel_for(equipment_cls):
+    """Registered kernel for an equipment class (walking its MRO), or the scalar fallback."""
+    for cls in equipment_cls.__mro__:
+        kernel = BATCH_KERNELS.get(cls) or BATCH_KERNELS.get(f"{cls.__module__}:{cls.__qualname__}")
+        if kernel is not None:
+            return kernel
+    return ScalarKernel
+
+def has_batch_kernel(equipment_cls):
+    return kernel_for(equipment_cls) is not ScalarKernel
+
+def dp_derivative(element, q, density, viscosity):
+    """d(Delta P)/dQ of an element; central difference for equipment without an analytic slope."""
+    if hasattr(element, 'calculate_delta_p_derivative'):
+        return element.calculate_delta_p_derivative(q, density, viscosity)
+    h = 1e-9 + 1e-6 * abs(q)
+    return (element.calculate_delta_p(q + h, density, viscosity) - element.calculate_delta_p(q - h, density, viscosity)) / (2.0 * h)
+
+class BatchKernel:
+    """
+    Evaluates calculate_delta_p (and its slope) of a group of nodes of one equipment
+    class with NumPy expressions over parameter arrays.
+
+    Parameters are copied into arrays by refresh(), which the solver calls whenever
+    they may have changed (e.g. a regulator's opening between control iterations).
+    """
+    def __init__(self, nodes):
+        self.nodes = list(nodes)
+        self.has_inlet = np.array([bool(n.inlets) for n in self.nodes], dtype=bool)
+        self.inlet_ports = PortGroup(n.inlets[0] for n in self.nodes if n.inlets)
+        self.refresh()
+
+    def refresh(self):
+        pass
+
+    def fluid_properties(self):
+        """Inlet density and viscosity of every node in the group."""
+        density = np.full(len(self.nodes), 1000.0)
+        viscosity = np.full(len(self.nodes), 0.001)
+        density[self.has_inlet] = self.inlet_ports.get(DENSITY)
+        viscosity[self.has_inlet] = self.inlet_ports.get(VISCOSITY)
+        return density, viscosity
+
+    def delta_p(self, flow_rate, density, viscosity):
+        raise NotImplementedError
+
+    def delta_p_derivative(self, flow_rate, density, viscosity):
+        raise NotImplementedError
+
+class ScalarKernel(BatchKernel):
+    """Fallback for equipment without a registered kernel: calls the scalar model per node."""
+    def delta_p(self, flow_rate, density, viscosity):
+        return np.array([n.calculate_delta_p(flow_rate[k], density[k], viscosity[k]) for k, n in enumerate(self.nodes)], dtype=float)
+
+    def delta_p_derivative(self, flow_rate, density, viscosity):
+        return np.array([dp_derivative(n, flow_rate[k], density[k], viscosity[k]) for k, n in enumerate(self.nodes)], dtype=float)
+
+@register_batch_kernel("simulation.equipment.centrifugal_pump:CentrifugalPump")
+class CentrifugalPumpKernel(BatchKernel):
+    """dP = max(0, p_shutoff + C * Q^2)"""
+    def refresh(self):
+        self.p_shutoff = np.array([n.p_shutoff for n in self.nodes], dtype=float)
+        self.c_coeff = np.array([n.C_coeff for n in self.nodes], dtype=float)
+
+    def delta_p(self, flow_rate, density, viscosity):
+        return np.maximum(0.0, self.p_shutoff + self.c_coeff * flow_rate**2)
+
+    def delta_p_derivative(self, flow_rate, density, viscosity):
+        on_curve = self.p_shutoff + self.c_coeff * flow_rate**2 > 0.0
+        return np.where(on_curve, 2.0 * self.c_coeff * flow_rate, 0.0)
+
+@register_batch_kernel("simulation.equipment.volumetric_pump:VolumetricPump")
+class VolumetricPumpKernel(BatchKernel):
+    """Stiff displacement line, capped by the motor power hyperbola and 200 bar."""
+    hard_cap = 20_000_000.0
+
+    def refresh(self):
+        self.flow_rated = np.array([n.flow_rated for n in self.nodes], dtype=float)
+        self.stiffness, self.available_power = np.array([n.coefficients for n in self.nodes], dtype=float).reshape(-1, 2).T
+
+    def _branches(self, flow_rate):
+        dp_displacement = np.maximum(0.0, self.stiffness * (self.flow_rated - flow_rate))
+        q_sq = flow_rate**2 + 1e-10
+        dp_power_limit = self.available_power / np.sqrt(q_sq)
+        power_limited = dp_displacement > dp_power_limit
+        delta_p = np.where(power_limited, dp_power_limit, dp_displacement)
+        return dp_displacement, q_sq, power_limited, delta_p
+
+    def delta_p(self, flow_rate, density, viscosity):
+        _, _, _, delta_p = self._branches(flow_rate)
+        delta_p = np.minimum(delta_p, self.hard_cap)
+        return np.where(flow_rate < 0, self.hard_cap - self.stiffness * flow_rate, delta_p)
+
+    def delta_p_derivative(self, flow_rate, density, viscosity):
+        dp_displacement, q_sq, power_limited, delta_p = self._branches(flow_rate)
+        slope = np.where(dp_displacement > 0.0, -self.stiffness, 0.0)
+        slope = np.where(power_limited, -self.available_power * flow_rate / q_sq**1.5, slope)
+        slope = np.where(delta_p > self.hard_cap, 0.0, slope)
+        return np.where(flow_rate < 0, -self.stiffness, slope)
+
+@register_batch_kernel("simulation.equipment.linear_control_valve:LinearControlValve",
+                       "simulation.equipment.linear_regulator:LinearRegulator",
+                       "simulation.equipment.remote_control_valve:RemoteControlValve")
+class ValveKernel(BatchKernel):
+    """
+    Liquid Cv law: dP = K_CV_SI * rho * Q|Q| / Cv_eff^2, with each valve's compiled
+    Cv_eff^2 (regulators clamp the controller's opening to 0.1%..100% there).
+    """
+    def refresh(self):
+        self.cv_eff_sq = np.array([n.coefficients[0] for n in self.nodes], dtype=float)
+
+    def delta_p(self, flow_rate, density, viscosity):
+        return K_CV_SI * density * flow_rate * np.abs(flow_rate) / self.cv_eff_sq
+
+    def delta_p_derivative(self, flow_rate, density, viscosity):
+        return 2.0 * K_CV_SI * density * np.abs(flow_rate) / self.cv_eff_sq
+
+@register_batch_kernel("simulation.equipment.orifice:Orifice")
+class OrificeKernel(BatchKernel):
+    """Permanent loss: dP = 0.5 * rho * Q|Q| / A^2 * Geometry Factor * (1 - beta^2)"""
+    def refresh(self):
+        # Invalid diameters fail when the kernel is evaluated, as the scalar model does
+        self.error = None
+        self.k_loss = np.full(len(self.nodes), np.nan)
+        for k, node in enumerate(self.nodes):
+            try:
+                area_pipe, geometry_factor, permanent_fraction = node.coefficients
+            except ValueError as e:
+                self.error = self.error or str(e)
+                continue
+            self.k_loss[k] = 0.5 / area_pipe**2 * geometry_factor * permanent_fraction
+
+    def delta_p(self, flow_rate, density, viscosity):
+        if self.error: raise ValueError(self.error)
+        return self.k_loss * density * flow_rate * np.abs(flow_rate)
+
+    def delta_p_derivative(self, flow_rate, density, viscosity):
+        if self.error: raise ValueError(self.error)
+        return 2.0 * self.k_loss * density * np.abs(flow_rate)
+
+@register_batch_kernel("simulation.equipment.filter:Filter")
+class FilterKernel(BatchKernel):
+    """dP = K(clogging) * rho * Q|Q|"""
+    def refresh(self):
+        self.k = np.array([n.get_resistance_k() for n in self.nodes], dtype=float)
+
+    def delta_p(self, flow_rate, density, viscosity):
+        return self.k * density * flow_rate * np.abs(flow_rate)
+
+    def delta_p_derivative(self, flow_rate, density, viscosity):
+        return 2.0 * self.k * density * np.abs(flow_rate)
+
+@register_batch_kernel("simulation.equipment.heat_exchanger:HeatExchanger")
+class HeatExchangerKernel(BatchKernel):
+    """dP = factor * Q^2 * rho / 1000"""
+    def refresh(self):
+        self.factor = np.array([n.pressure_drop_factor for n in self.nodes], dtype=float)
+
+    def delta_p(self, flow_rate, density, viscosity):
+        return self.factor * flow_rate**2 * (density / 1000.0)
+
+    def delta_p_derivative(self, flow_rate, density, viscosity):
+        return 2.0 * self.factor * flow_rate * (density / 1000.0)
@@ -0,0 +1,192 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from simulation.schemas import HydraulicNetwork
+from simulation.state_arena import PortGroup
+
+_pools = {} # worker count -> ProcessPoolExecutor, shared by all solvers of this process
+
+def _port_index(port_str):
+    try:
+        return int(port_str.split('-')[-1])
+    except (ValueError, IndexError, AttributeError):
+        return 0
+
+def split_components(network: HydraulicNetwork):
+    """
+    Splits a network into independent hydraulic components.
+
+    Tanks are fixed-pressure, fixed-temperature boundaries, so circuits meeting
+    only at a tank do not interact: they are grouped by the edges between their
+    other nodes, and a remote control valve is grouped with the node it senses.
+    Every component gets the tanks its edges touch (or it senses), so a shared
+    tank appears in several components. Tanks touching no edge join the first
+    component. In isothermal mode every component also gets the network's first
+    tank, whose state is applied everywhere.
+
+    Returns a list of HydraulicNetworks sharing the node, pipe and settings
+    objects of `network` (nodes and edges in their original order), or
+    [network] if it is a single component.
+    """
+    nodes = network.nodes
+    is_tank = {node_id: node.FIXED_PRESSURE for node_id, node in nodes.items()}
+    parent = {node_id: node_id for node_id, tank in is_tank.items() if not tank}
+
+    def find(a):
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        return a
+
+    def union(a, b):
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[rb] = ra
+
+    for j, edge in enumerate(network.edges):
+        ends = [n for n in (edge['source'], edge['target']) if not is_tank[n]]
+        if len(ends) == 2:
+            union(*ends)
+        elif not ends:
+            # Tank to tank: a component of its own
+            parent[f"edge:{j}"] = f"edge:{j}"
+    sensed = {}
+    for node_id, node in nodes.items():
+        config = getattr(node, 'remote_sensing_config', None)
+        if config and config.get("node_id") in nodes:
+            if is_tank[config["node_id"]]:
+                sensed[node_id] = config["node_id"]
+            else:
+                union(node_id, config["node_id"])
+
+    members = {} # root -> set of node ids
+    edges = {}   # root -> list of edge indices
+    for node_id, tank in is_tank.items():
+        if not tank:
+            members.setdefault(find(node_id), set()).add(node_id)
+    for j, edge in enumerate(network.edges):
+        ends = [n for n in (edge['source'], edge['target']) if not is_tank[n]]
+        root = find(ends[0]) if ends else f"edge:{j}"
+        members.setdefault(root, set()).update((edge['source'], edge['target']))
+        edges.setdefault(root, []).append(j)
+    for node_id, tank_id in sensed.items():
+        members[find(node_id)].add(tank_id)
+    if len(members) <= 1:
+        return [network]
+
+    roots = list(members)
+    attached = set().union(*members.values())
+    members[roots[0]].update(node_id for node_id, tank in is_tank.items() if tank and node_id not in attached)
+    gs = network.global_settings
+    if gs and getattr(gs, 'isothermal', False):
+        reference = next((node_id for node_id, tank in is_tank.items() if tank), None)
+        if reference is not None:
+            for ids in members.values():
+                ids.add(reference)
+
+    parts = []
+    for root in roots:
+        ids = members[root]
+        # Edges without an id keep their index in the whole network as one (export_state keys)
+        part = HydraulicNetwork(nodes={node_id: node for node_id, node in nodes.items() if node_id in ids},
+                                edges=[network.edges[j] if 'id' in network.edges[j] else {**network.edges[j], 'id': j}
+                                       for j in edges.get(root, [])])
+        part.global_settings = gs
+        parts.append(part)
+    return parts
+
+def shared_tanks(network: HydraulicNetwork, parts):
+    """Ids of the tanks that belong to more than one component."""
+    counts = {}
+    for part in parts:
+        for node_id, node in part.nodes.items():
+            if node.FIXED_PRESSURE:
+                counts[node_id] = counts.get(node_id, 0) + 1
+    return [node_id for node_id, count in counts.items() if count > 1]
+
+def sum_tank_flows(network: HydraulicNetwork, tank_ids):
+    """
+    Port flows of tanks shared by several components: each component's telemetry
+    only counts its own edges, so they are summed again over all edges.
+    """
+    for node_id in tank_ids:
+        tank = network.nodes[node_id]
+        for port in tank.inlets + tank.outlets:
+            port.flow_rate = 0.0
+    tank_ids = set(tank_ids)
+    for edge in network.edges:
+        q = edge['pipe'].inlets[0].flow_rate
+        if edge['source'] in tank_ids:
+            ports = network.nodes[edge['source']].outlets
+            idx = _port_index(edge.get('source_port', 'outlet-0'))
+            if idx < len(ports):
+                ports[idx].flow_rate += q
+        if edge['target'] in tank_ids:
+            ports = network.nodes[edge['target']].inlets
+            idx = _port_index(edge.get('target_port', 'inlet-0'))
+            if idx < len(ports):
+                ports[idx].flow_rate += q
+
+def copy_network_state(src: HydraulicNetwork, dst: HydraulicNetwork):
+    """
+    Copies a solved state from a (pickled) copy of a component back onto its
+    original objects: port states of every node and pipe, and the nodes' scalar
+    attributes (control openings, mix ratios, sensed pressures, warnings...).
+    """
+    ports, target_ports = [], []
+    for node_id, node in src.nodes.items():
+        target = dst.nodes[node_id]
+        for name, value in vars(node).items():
+            if value is None or isinstance(value, (bool, int, float, str)):
+                setattr(target, name, value)
+        ports += node.inlets + node.outlets
+        target_ports += target.inlets + target.outlets
+    for edge, target in zip(src.edges, dst.edges):
+        ports += edge['pipe'].inlets + edge['pipe'].outlets
+        target_ports += target['pipe'].inlets + target['pipe'].outlets
+    # One block copy between the two state arenas
+    PortGroup(target_ports).set_state(PortGroup(ports).get_state())
+
+def solve_component(network: HydraulicNetwork, method=None, warm_start=None, resolve=False):
+    """
+    Process-pool entry point: solves one component and returns (stats,
+    last_solution, solved network) for copy_network_state.
+    """
+    from simulation.solver import NetworkSolver
+    solver = NetworkSolver(network)
+    if resolve and warm_start is not None:
+        stats = solver.solve(method='chord', warm_start=warm_start)
+    else:
+        stats = solver.solve(method=method, warm_start=warm_start)
+    return stats, solver.last_solution, network
+
+def process_pool(workers):
+    if workers not in _pools:
+        _pools[workers] = ProcessPoolExecutor(max_workers=workers)
+    return _pools[workers]
+
+def merge_stats(component_stats, time_ms):
+    """One stats dict for the whole network, with the per-component stats under "components"."""
+    bottlenecks = [s["bottleneck"] for s in component_stats if s.get("bottleneck")]
+    errors = [s["error"] for s in component_stats if s["error"]]
+    paths = [s["continuation"] for s in component_stats if s.get("continuation")]
+    conditions = [s["jacobian_condition"] for s in component_stats if s.get("jacobian_condition") is not None]
+    return {
+        "success": all(s["success"] for s in component_stats),
+        "error": "; ".join(errors) if errors else None,
+        "time_ms": time_ms,
+        "outer_iterations": max(s["outer_iterations"] for s in component_stats),
+        "total_inner_iterations": sum(s["total_inner_iterations"] for s in component_stats),
+        "jacobian_evaluations": sum(s["jacobian_evaluations"] for s in component_stats),
+        "peak_memory_kb": max(s["peak_memory_kb"] for s in component_stats),
+        "property_iterations": max(s["property_iterations"] for s in component_stats),
+        "property_outer_iterations": max(s["property_outer_iterations"] for s in component_stats),
+        "fallback_used": any(s["fallback_used"] for s in component_stats),
+        "warm_start": all(s["warm_start"] for s in component_stats),
+        "initial_guess": "/".join(sorted({s["initial_guess"] for s in component_stats})),
+        "backend": "/".join(sorted({s["backend"] or "none" for s in component_stats})),
+        "continuation": {key: sum(p[key] for p in paths) for key in paths[0]} if paths else None,
+        "jacobian_condition": max(conditions) if conditions else None,
+        "system_size": sum(s["system_size"] for s in component_stats),
+        "bottleneck": max(bottlenecks, key=lambda b: b["magnitude"]) if bottlenecks else None,
+        "components": component_stats,
+    }
@@ -0,0 +1,127 @@
+import time
+import numpy as np
+from scipy.optimize import OptimizeResult
+from scipy.sparse import block_diag, diags, identity
+
+from simulation.initial_guess import LinearizedNetwork
+from simulation.sparse_newton import sparse_newton
+
+INITIAL_STEP = 1.0 # First homotopy step in lambda (a plain Newton solve when it succeeds)
+MIN_STEP = 1e-3 # Smallest step before the path is abandoned
+MAX_STEPS = 200 # Accepted plus rejected steps
+CORRECTOR_ITERATIONS = 8 # Newton iterations per intermediate point
+CORRECTOR_TOLERANCE = 1e-3 # max|H| at intermediate points (the end point uses the solver tolerance)
+FAST_CORRECTOR = 3 # A corrector converging within this many iterations doubles the step
+
+class Continuation:
+    """
+    Homotopy solve (solver method "continuation") for networks where Newton or
+    HYBR stall, e.g. stiff displacement pumps and several pumps on one meshed
+    header, or nearly closed valves.
+
+    The residual F is blended with the pseudo-laminar network: every element
+    linearized at the start point x0 (see LinearizedNetwork), whose scaled
+    matrix is A:
+
+        H(x, lambda) = lambda * F(x) + (1 - lambda) * A (x - x0)
+
+    At lambda = 0 the root is x0 itself; at lambda = 1 it is the operating point.
+    The first step goes straight to lambda = 1 (a plain sparse Newton solve, so
+    easy networks pay nothing); when a corrector fails the step is halved, when
+    one converges quickly it is doubled. Each point is predicted by secant
+    extrapolation along the path. Embedded control unknowns are blended with the
+    identity instead of A.
+
+    A pipe flow pinned at the laminar/turbulent friction jump (Re = 2300) has no
+    exact root: the path then stalls near lambda = 1 and the solver falls back
+    to LM from the last point.
+    """
+    def __init__(self, solver, q_nominal):
+        self.solver = solver
+        self.q_nominal = q_nominal
+
+    def _start_matrix(self, x0):
+        """Scaled matrix A of the network linearized at x0 (identity for control unknowns)."""
+        solver = self.solver
+        num_internal = len(solver.internal_node_indices)
+        num_hydraulic = num_internal + len(solver.edges_list)
+        system, _ = LinearizedNetwork(solver, self.q_nominal).assemble(x0[num_internal:num_hydraulic] * solver.q_scale)
+        # Same scaling as the residual: mass rows 5 / q_scale, pressure rows 1 / p_scale
+        row_scale = np.concatenate([np.full(num_internal, 5.0 / solver.q_scale), np.full(num_hydraulic - num_internal, 1.0 / solver.p_scale)])
+        col_scale = np.concatenate([np.full(num_internal, solver.p_scale), np.full(num_hydraulic - num_internal, solver.q_scale)])
+        start = diags(row_scale) @ system @ diags(col_scale)
+        if len(x0) > num_hydraulic:
+            start = block_diag([start, identity(len(x0) - num_hydraulic)])
+        return start.tocsr()
+
+    def solve(self, x0, tol=1e-6, max_iter=100):
+        """
+        Traces the path from x0 (scaled unknowns). Returns a scipy OptimizeResult
+        with x, success, message, fun, nfev, njev, peak_memory_bytes and the path
+        statistics steps (accepted), rejected_steps, path_length (arc length in
+        scaled (x, lambda) space) and time_ms. On failure x is the last point on
+        the path.
+        """
+        start_time = time.perf_counter()
+        solver = self.solver
+        x0 = np.array(x0, dtype=float)
+        start = self._start_matrix(x0)
+        nfev = njev = peak_bytes = 0
+        steps = rejected = 0
+        path_length = 0.0
+
+        lam, x = 0.0, x0
+        x_prev, h_prev = None, None
+        h = INITIAL_STEP
+        success = False
+        message = "Step size below minimum."
+        while steps + rejected < MAX_STEPS:
+            target = min(1.0, lam + h)
+            h = target - lam
+            final = target >= 1.0
+
+            def blend(x_new, t=target):
+                return t * solver._objective(x_new) + (1.0 - t) * (start @ (x_new - x0))
+
+            def blend_jac(x_new, t=target):
+                return t * solver._jacobian(x_new) + (1.0 - t) * start
+
+            # Secant predictor along the last accepted step
+            x_pred = x if x_prev is None else x + (h / h_prev) * (x - x_prev)
+            sol = sparse_newton(blend, blend_jac, x_pred, tol=tol if final else CORRECTOR_TOLERANCE,
+                                max_iter=max_iter if final else CORRECTOR_ITERATIONS)
+            nfev += sol.nfev
+            njev += sol.njev
+            peak_bytes = max(peak_bytes, sol.peak_memory_bytes)
+            if not sol.success and x_pred is not x:
+                # The prediction may have overshot a turn: retry from the last point
+                sol = sparse_newton(blend, blend_jac, x, tol=tol if final else CORRECTOR_TOLERANCE,
+                                    max_iter=max_iter if final else CORRECTOR_ITERATIONS)
+                nfev += sol.nfev
+                njev += sol.njev
+                peak_bytes = max(peak_bytes, sol.peak_memory_bytes)
+            if not sol.success:
+                rejected += 1
+                h *= 0.5
+                if h < MIN_STEP:
+                    message = f"Continuation stalled at lambda = {lam:.4f}: {sol.message}"
+                    break
+                continue
+
+            steps += 1
+            path_length += np.sqrt(np.sum((sol.x - x) ** 2) + h ** 2)
+            x_prev, h_prev = x, h
+            lam, x = target, sol.x
+            if final:
+                success = True
+                message = "Converged."
+                break
+            if sol.nit <= FAST_CORRECTOR:
+                h *= 2.0
+        else:
+            message = "Maximum number of continuation steps reached."
+
+        return OptimizeResult(x=x, success=success, message=message, fun=solver._objective(x) if not success else sol.fun,
+                              nfev=nfev + (0 if success else 1), njev=njev, peak_memory_bytes=peak_bytes,
+                              steps=steps, rejected_steps=rejected, path_length=float(path_length),
+                              time_ms=(time.perf_counter() - start_time) * 1000)
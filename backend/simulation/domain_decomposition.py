@@ -0,0 +1,423 @@
+import multiprocessing
+from collections import deque
+
+import numpy as np
+from scipy.optimize import OptimizeResult
+from scipy.sparse import csc_matrix
+
+from simulation.schemas import HydraulicNetwork
+from simulation.equipment.base_node import HydraulicNode
+from simulation.equipment.tank import Tank
+from simulation.sparse_newton import sparse_newton, factorize
+
+# Newton steps per subdomain solve; one that does not converge within them rejects
+# the interface step rather than grinding on from a poor guess
+SUBDOMAIN_ITERATIONS = 50
+INTERFACE_ROUNDS = 30 # Newton steps on the interface pressures
+INTERFACE_MIN_STEP = 0.0625 # Shortest interface step tried before giving up on the decomposition
+
+class InterfaceBoundary(Tank):
+    """
+    An interface junction as seen from one subdomain: a boundary held at the
+    pressure and fluid state set by the interface iteration. It is a Tank to the
+    subdomain's NetworkSolver, with the original junction's port layout.
+    """
+    def __init__(self, node: HydraulicNode, fluid_type: str = "water"):
+        HydraulicNode.__init__(self, node.name, node_type="interface")
+        self.global_settings = node.global_settings
+        self.elevation = 0.0
+        self.fluid_level = 0.0
+        self.fluid_type = fluid_type
+        self.pressure = node.inlets[0].pressure
+        self.temperature = node.inlets[0].temperature
+        self.density = node.inlets[0].density
+        self.viscosity = node.inlets[0].viscosity
+        for _ in node.inlets:
+            self.add_inlet()
+        for _ in node.outlets:
+            self.add_outlet()
+
+    def calculate(self):
+        for port in self.inlets + self.outlets:
+            port.pressure = self.pressure
+            port.temperature = self.temperature
+            port.density = self.density
+            port.viscosity = self.viscosity
+        return self.pressure
+
+def partition(solver, parts):
+    """
+    Splits the internal nodes of a NetworkSolver's network into `parts` balanced
+    subdomains: nodes are numbered in breadth-first order from a pseudo-peripheral
+    node, so contiguous blocks of that order are compact level sets, and the
+    order is cut into equal blocks. Every edge between two blocks then gets one
+    of its ends in the interface; interface nodes must be plain junctions (no dP
+    of their own), so that fixing their pressure decouples the blocks.
+
+    Returns (labels, interface): the subdomain of every node (-1 for tanks and
+    interface nodes) and the sorted interface node indices, or None if some cut
+    edge has no junction end or a subdomain is left without interior nodes.
+    """
+    num_nodes = len(solver.nodes_list)
+    adjacency = [[] for _ in range(num_nodes)]
+    for src, tgt in zip(solver.edge_src_idx, solver.edge_tgt_idx):
+        if not solver.is_tank[src] and not solver.is_tank[tgt] and src != tgt:
+            adjacency[src].append(tgt)
+            adjacency[tgt].append(src)
+
+    def bfs(start, seen):
+        order, queue = [start], deque([start])
+        seen[start] = True
+        while queue:
+            v = queue.popleft()
+            for w in adjacency[v]:
+                if not seen[w]:
+                    seen[w] = True
+                    order.append(w)
+                    queue.append(w)
+        return order
+
+    # Pseudo-peripheral start per connected piece (last node of a first sweep)
+    order = []
+    seen = np.zeros(num_nodes, dtype=bool)
+    for start in solver.internal_node_indices:
+        if seen[start]:
+            continue
+        piece = bfs(start, seen.copy())
+        order += bfs(piece[-1], seen)
+
+    labels = np.full(num_nodes, -1, dtype=int)
+    for k, block in enumerate(np.array_split(np.array(order, dtype=int), parts)):
+        labels[block] = k
+
+    junction = (solver.node_dp_sign == 0.0) & ~solver.is_tank
+    for i in list(solver.control_node_indices) + list(solver.tcv_node_indices):
+        junction[i] = False
+    in_interface = np.zeros(num_nodes, dtype=bool)
+    for src, tgt in zip(solver.edge_src_idx, solver.edge_tgt_idx):
+        if labels[src] < 0 or labels[tgt] < 0 or labels[src] == labels[tgt]:
+            continue
+        if in_interface[src] or in_interface[tgt]:
+            continue
+        if junction[tgt]:
+            in_interface[tgt] = True
+        elif junction[src]:
+            in_interface[src] = True
+        else:
+            return None
+    labels[in_interface] = -1
+    if np.bincount(labels[labels >= 0], minlength=parts).min() == 0:
+        return None
+    return labels, np.flatnonzero(in_interface)
+
+def _solve_subdomains(solvers, updates, tol):
+    """
+    Solves the given subdomains by sparse Newton with their interface pressures
+    and fluid states set, and linearizes each one's interface inflows around its
+    solution. A subdomain that does not converge (no lm fallback here: the
+    interface step is cut instead) reports None.
+
+    Returns, per subdomain: the Newton result, its solution (export_state), the
+    net inflow into each of its interface nodes, the local Schur complement
+    d(inflow)/d(interface pressure), and the mass flow, temperature, density and
+    viscosity flowing into each interface node.
+    """
+    results = {}
+    for k, (pressures, states) in updates.items():
+        entry = solvers[k]
+        solver = entry["solver"]
+        for node_id, p in pressures.items():
+            proxy = solver.network.nodes[node_id]
+            proxy.pressure = p
+            proxy.temperature, proxy.density, proxy.viscosity = states[node_id]
+        solver._apply_tank_boundaries()
+        solver._isothermal_applied = False
+
+        num_internal = len(solver.internal_node_indices)
+        num_edges = len(solver.edges_list)
+        interface_ids = entry["interface_ids"]
+        p_interface = np.array([pressures[node_id] for node_id in interface_ids])
+        if "tangent" in entry:
+            # Predictor: last solution moved along its sensitivity to the interface pressures
+            x = entry["x"] + entry["tangent"] @ (p_interface - entry["p_interface"])
+        else:
+            x = solver._generate_initial_guess()
+        x0 = np.concatenate([x[:num_internal] / solver.p_scale, x[num_internal:] / solver.q_scale])
+        sol = sparse_newton(solver._objective, solver._jacobian, x0, tol=tol, max_iter=SUBDOMAIN_ITERATIONS)
+        if not sol.success or not solver._is_physical(sol.x):
+            results[k] = (sol, None, None, None, None)
+            continue
+        x_scaled = sol.x
+        solver.last_solution = np.concatenate([x_scaled[:num_internal] * solver.p_scale, x_scaled[num_internal:] * solver.q_scale])
+        entry["state"] = solver.export_state()
+
+        x = solver.last_solution
+        q = x[num_internal:]
+        column = {solver.node_id_to_idx[node_id]: c for c, node_id in enumerate(interface_ids)}
+
+        # Interface pressures enter the pressure balance of the edges touching them
+        rows, cols, vals = [], [], []
+        incidence = np.zeros((len(interface_ids), num_edges))
+        mixed = np.zeros((len(interface_ids), 4))
+        for j in range(num_edges):
+            src, tgt = solver.edge_src_idx[j], solver.edge_tgt_idx[j]
+            pipe = solver.edges_list[j]['pipe']
+            if src in column:
+                rows.append(num_internal + j); cols.append(column[src]); vals.append(1.0 / solver.p_scale)
+                incidence[column[src], j] -= 1.0
+                if q[j] < 0:
+                    port = pipe.inlets[0]
+                    m = -q[j] * port.density
+                    mixed[column[src]] += [m, m * port.temperature, m * port.density, m * port.viscosity]
+            if tgt in column:
+                rows.append(num_internal + j); cols.append(column[tgt]); vals.append(-1.0 / solver.p_scale)
+                incidence[column[tgt], j] += 1.0
+                if q[j] > 0:
+                    port = pipe.outlets[0]
+                    m = q[j] * port.density
+                    mixed[column[tgt]] += [m, m * port.temperature, m * port.density, m * port.viscosity]
+        inflow = incidence @ q
+        size = num_internal + num_edges
+        rhs = csc_matrix((vals, (rows, cols)), shape=(size, len(interface_ids))).toarray()
+        lu, _ = factorize(solver._jacobian(x_scaled).tocsc())
+        dx = -lu.solve(rhs)
+        dx[:num_internal] *= solver.p_scale
+        dx[num_internal:] *= solver.q_scale
+        entry.update(x=x, tangent=dx, p_interface=p_interface)
+        schur = incidence @ dx[num_internal:]
+        results[k] = (sol, entry["state"], inflow, schur, mixed)
+    return results
+
+def _worker_loop(conn, solvers, tol):
+    """Worker process: keeps its subdomain solvers and answers solve requests until told to stop."""
+    while True:
+        updates = conn.recv()
+        if updates is None:
+            break
+        conn.send(_solve_subdomains(solvers, updates, tol))
+    conn.close()
+
+class DomainDecomposition:
+    """
+    Domain-decomposition solve of a NetworkSolver's network (solver method
+    "domain_decomposition") for very large networks.
+
+    The network is cut into balanced subdomains separated by interface junctions
+    (see partition). With the interface pressures fixed, every subdomain is an
+    ordinary network with the interface nodes as boundaries, so the subdomains
+    are solved independently, each by sparse Newton on its own NetworkSolver's
+    residual, in GlobalSettings.parallel_workers processes (in this process for
+    1), starting from the last solution moved along its sensitivity to the
+    interface pressures (exact while the flow is laminar). What
+    remains is mass balance at the interface, r(p_G) = sum of the subdomains'
+    inflows, whose Jacobian is the sum of the subdomains' Schur complements
+    S_k = -B_k J_k^-1 G_k. Newton on the interface pressures alone
+
+        S dp_G = -r
+
+    couples the subdomains; the fluid state at each interface node is the mix of
+    its inflows from the previous round. The assembled answer is finished by
+    sparse Newton on the whole system, so it satisfies the solver's own residual.
+    Networks with controls or TCVs, or that cannot be cut at junctions, are not supported.
+    """
+    def __init__(self, solver, parts):
+        self.solver = solver
+        self.parts = parts
+        self.decomposed = False # Whether the last solve converged on the interface (else it was solved whole)
+        cut = partition(solver, parts)
+        self.valid = cut is not None
+        if not self.valid:
+            return
+        self.labels, self.interface = cut
+        self.interface_ids = [solver.node_ids[i] for i in self.interface]
+        self.interface_pos = {node_id: c for c, node_id in enumerate(self.interface_ids)}
+
+        # Edge ownership: the subdomain of an interior end, else one next to an interface end
+        touching = {i: set() for i in self.interface}
+        for src, tgt in zip(solver.edge_src_idx, solver.edge_tgt_idx):
+            for a, b in ((src, tgt), (tgt, src)):
+                if a in touching and self.labels[b] >= 0:
+                    touching[a].add(self.labels[b])
+        self.edge_owner = np.zeros(len(solver.edges_list), dtype=int)
+        for j, (src, tgt) in enumerate(zip(solver.edge_src_idx, solver.edge_tgt_idx)):
+            if self.labels[src] >= 0:
+                self.edge_owner[j] = self.labels[src]
+            elif self.labels[tgt] >= 0:
+                self.edge_owner[j] = self.labels[tgt]
+            else:
+                near = touching.get(src) or touching.get(tgt) or {0}
+                self.edge_owner[j] = min(near)
+
+    @staticmethod
+    def supports(solver):
+        return (not solver.tcv_node_indices and not solver.control_node_indices
+                and solver.embedded_control is None and solver.reduction is None)
+
+    def _subdomain_networks(self):
+        """One HydraulicNetwork per subdomain: its nodes and edges, tanks, and interface boundaries."""
+        solver = self.solver
+        gs = solver.network.global_settings
+        sub_gs = gs.model_copy(update={"component_decomposition": False, "network_reduction": False}) if gs else None
+        fluid_type = getattr(gs, 'fluid_type', 'water') if gs else 'water'
+        reference = next((i for i in range(len(solver.nodes_list)) if solver.is_tank[i]), None)
+        isothermal = bool(gs) and getattr(gs, 'isothermal', False)
+        networks, interface_ids = {}, {}
+        for k in range(self.parts):
+            edges = np.flatnonzero(self.edge_owner == k)
+            members = set(np.flatnonzero(self.labels == k).tolist())
+            for j in edges:
+                members.update((solver.edge_src_idx[j], solver.edge_tgt_idx[j]))
+            if isothermal and reference is not None:
+                members.add(reference)
+            nodes = {}
+            for i in sorted(members):
+                node = solver.nodes_list[i]
+                if self.labels[i] < 0 and not solver.is_tank[i]:
+                    node = InterfaceBoundary(node, fluid_type)
+                    node.global_settings = sub_gs
+                nodes[solver.node_ids[i]] = node
+            # Edges without an id keep their index in the whole network as one (export_state keys)
+            sub_edges = [solver.edges_list[j] if 'id' in solver.edges_list[j] else {**solver.edges_list[j], 'id': int(j)}
+                         for j in edges]
+            network = HydraulicNetwork(nodes=nodes, edges=sub_edges)
+            network.global_settings = sub_gs
+            networks[k] = network
+            interface_ids[k] = [node_id for node_id, node in nodes.items() if isinstance(node, InterfaceBoundary)]
+        return networks, interface_ids
+
+    def solve(self, x0, tol=1e-6, max_iter=100, workers=1):
+        """
+        Newton on the interface pressures from the pressures in x0 (scaled
+        [p_internal, q_edges], as the solver's residual), then the finishing
+        sparse Newton on the whole system. The interface iteration converges
+        when every interface mass balance is below tol in the solver's scaling;
+        if it does not (a subdomain without a solution for the interface
+        pressures tried, e.g. a pipe pushed across the laminar/turbulent jump),
+        the whole system is solved from x0 instead.
+
+        Returns a scipy OptimizeResult with x, success, message, fun, nfev
+        (residual calls of the whole system plus interface rounds), njev
+        (interface Schur solves plus finishing Jacobians), nit (interface rounds),
+        peak_memory_bytes, interface_size, and decomposed (whether the interface
+        iteration converged).
+        """
+        from simulation.solver import NetworkSolver
+        solver = self.solver
+        num_internal = len(solver.internal_node_indices)
+        num_edges = len(solver.edges_list)
+        p_scale, q_scale = solver.p_scale, solver.q_scale
+        x0 = np.asarray(x0, dtype=float)
+
+        networks, interface_ids = self._subdomain_networks()
+        # Fluid states at the interface to start from: propagated through the whole network at x0
+        solver._objective(x0)
+        states = {}
+        for node_id in self.interface_ids:
+            port = solver.network.nodes[node_id].inlets[0]
+            states[node_id] = (port.temperature, port.density, port.viscosity)
+        p_gamma = x0[solver.internal_pos[self.interface]] * p_scale
+
+        # Subdomain solvers: in this process, or spread round-robin over worker processes
+        groups = [list(range(k, self.parts, workers)) for k in range(min(workers, self.parts))]
+        entries = {k: {"solver": NetworkSolver(networks[k]), "interface_ids": interface_ids[k]} for k in range(self.parts)}
+        processes = []
+        if len(groups) > 1:
+            context = multiprocessing.get_context()
+            for group in groups:
+                parent, child = context.Pipe()
+                process = context.Process(target=_worker_loop, args=(child, {k: entries[k] for k in group}, tol), daemon=True)
+                process.start()
+                processes.append((parent, process, group))
+
+        def round_trip(p_gamma):
+            updates = {}
+            for k in range(self.parts):
+                ids = interface_ids[k]
+                updates[k] = ({node_id: p_gamma[self.interface_pos[node_id]] for node_id in ids},
+                              {node_id: states[node_id] for node_id in ids})
+            if not processes:
+                return _solve_subdomains(entries, updates, tol)
+            results = {}
+            for conn, _, group in processes:
+                conn.send({k: updates[k] for k in group})
+            for conn, _, _ in processes:
+                results.update(conn.recv())
+            return results
+
+        def assemble(results):
+            r = np.zeros(len(self.interface_ids))
+            schur = np.zeros((len(self.interface_ids), len(self.interface_ids)))
+            mixed = np.zeros((len(self.interface_ids), 4))
+            for k, (_, _, inflow, local, mix) in results.items():
+                if inflow is None:
+                    return None, None, None
+                pos = [self.interface_pos[node_id] for node_id in interface_ids[k]]
+                r[pos] += inflow
+                schur[np.ix_(pos, pos)] += local
+                mixed[pos] += mix
+            return r, schur, mixed
+
+        message = "Maximum number of iterations reached."
+        converged = False
+        nit, njev = 0, 0
+        peak_bytes = 0
+        try:
+            results = round_trip(p_gamma)
+            r, schur, mixed = assemble(results)
+            while r is not None:
+                nit += 1
+                for node_id, c in self.interface_pos.items():
+                    m = mixed[c, 0]
+                    if m > 0:
+                        states[node_id] = (mixed[c, 1] / m, mixed[c, 2] / m, mixed[c, 3] / m)
+                if np.max(np.abs(5.0 * r / q_scale), initial=0.0) < tol:
+                    converged = True
+                    message = "Converged."
+                    break
+                if nit >= INTERFACE_ROUNDS:
+                    break
+                step = np.linalg.solve(schur, -r)
+                njev += 1
+                peak_bytes = max(peak_bytes, schur.nbytes + 4 * r.nbytes)
+                norm = np.linalg.norm(r)
+                t = 1.0
+                while t >= INTERFACE_MIN_STEP:
+                    trial = round_trip(p_gamma + t * step)
+                    r_new, schur_new, mixed_new = assemble(trial)
+                    if r_new is not None and np.linalg.norm(r_new) < norm:
+                        break
+                    t *= 0.5
+                else:
+                    message = "Interface line search failed to reduce the imbalance."
+                    break
+                p_gamma = p_gamma + t * step
+                results, r, schur, mixed = trial, r_new, schur_new, mixed_new
+            else:
+                message = "Subdomain solve failed."
+        except np.linalg.LinAlgError:
+            message = "Singular interface Schur complement."
+        finally:
+            for conn, process, _ in processes:
+                conn.send(None)
+                process.join()
+
+        x = x0.copy()
+        if converged:
+            x[solver.internal_pos[self.interface]] = p_gamma / p_scale
+            edge_pos = {str(edge.get('id', j)): j for j, edge in enumerate(solver.edges_list)}
+            for k, (_, state, _, _, _) in results.items():
+                for node_id, p in state["pressures"].items():
+                    i = solver.node_id_to_idx[node_id]
+                    x[solver.internal_pos[i]] = p / p_scale
+                for edge_id, q in state["flows"].items():
+                    x[num_internal + edge_pos[edge_id]] = q / q_scale
+
+        # Finish on the whole system (lagged interface fluid states, inner tolerances);
+        # if the interface iteration failed this is a plain sparse Newton solve from x0
+        sol = sparse_newton(solver._objective, solver._jacobian, x, tol=tol, max_iter=max_iter)
+        self.decomposed = converged
+        return OptimizeResult(x=sol.x, success=sol.success, decomposed=converged,
+                              message=sol.message if converged else f"{message} Solved whole: {sol.message}", fun=sol.fun,
+                              nfev=1 + nit + sol.nfev, njev=njev + sol.njev, nit=nit,
+                              peak_memory_bytes=max(peak_bytes, sol.peak_memory_bytes),
+                              interface_size=len(self.interface_ids))
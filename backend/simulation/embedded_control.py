@@ -0,0 +1,205 @@
+import numpy as np
+from scipy.sparse import csr_matrix, bmat
+
+from simulation.batch_kernels import K_CV_SI, dp_derivative
+
+def smooth_max0(y, eps):
+    """Smoothed max(0, y) = (y + sqrt(y^2 + eps^2)) / 2."""
+    return 0.5 * (y + np.sqrt(y * y + eps * eps))
+
+def smooth_step(y, eps):
+    """Derivative of smooth_max0."""
+    return 0.5 * (1.0 + y / np.sqrt(y * y + eps * eps))
+
+def smooth_mid(lo, y, hi, eps):
+    """Smoothed median(lo, y, hi) and its slope in y."""
+    value = y - smooth_max0(y - hi, eps) + smooth_max0(lo - y, eps)
+    slope = 1.0 - smooth_step(y - hi, eps) - smooth_step(lo - y, eps)
+    return value, slope
+
+class EmbeddedControl:
+    """
+    Regulator openings and TCV mix ratios as extra Newton unknowns (control_mode "embedded").
+
+    Each control unknown u has bounds [lo, hi] and a set-point error e, oriented so
+    that e > 0 asks u to decrease (sensed pressure above set for a PRV, outlet too hot
+    for a TCV). Its residual is the complementarity condition
+
+        u - mid(lo, u - e, hi) = 0
+
+    which holds either with e = 0 inside the bounds, or at a bound with e pushing
+    further out (a saturated valve). The median is smoothed with eps so the system
+    stays differentiable, and everything is solved in one Newton system.
+
+    Unknowns: opening / 100 for regulators (0.1%..100%), mix_ratio for TCVs (0.001..0.999).
+    Errors are in bar for pressures and in units of temp_scale K for temperatures.
+    """
+    eps = 1e-4
+    temp_scale = 10.0
+
+    def __init__(self, solver):
+        self.solver = solver
+        num_nodes = len(solver.nodes_list)
+        self.regulators = list(solver.control_node_indices)
+        self.tcvs = list(solver.tcv_node_indices)
+        self.size = len(self.regulators) + len(self.tcvs)
+        self.column = np.full(num_nodes, -1, dtype=int) # node index -> control unknown
+        self.column[self.regulators + self.tcvs] = np.arange(self.size)
+        self.lower = np.array([0.001] * len(self.regulators) + [0.001] * len(self.tcvs))
+        self.upper = np.array([1.0] * len(self.regulators) + [0.999] * len(self.tcvs))
+
+        # Where each regulator senses, and the sign that turns (sensed - set) into e
+        self.sensing = []
+        for i in self.regulators:
+            node = solver.nodes_list[i]
+            sense_idx, at_outlet = i, not node.backpressure
+            if not node.REMOTE_SENSING:
+                sign = -1.0 if node.backpressure else 1.0
+            else:
+                config = node.remote_sensing_config
+                sign = 1.0 if not node.backpressure else -1.0
+                at_outlet = True
+                if config and config["node_id"] in solver.node_id_to_idx:
+                    remote = solver.nodes_list[solver.node_id_to_idx[config["node_id"]]]
+                    if config["port_type"] == "inlet" and config["port_idx"] < len(remote.inlets):
+                        sense_idx, at_outlet = solver.node_id_to_idx[config["node_id"]], False
+                    elif config["port_type"] == "outlet" and config["port_idx"] < len(remote.outlets):
+                        sense_idx = solver.node_id_to_idx[config["node_id"]]
+            self.sensing.append((sense_idx, at_outlet, sign))
+
+        # Kernels holding regulators must be refreshed when their openings move
+        control_set = set(self.regulators)
+        self.control_kernels = [kernel for idx, kernel in solver.node_kernels if control_set.intersection(idx.tolist())]
+
+        # TCV inlet edges: (edge, port, hot path?) per TCV
+        self.tcv_edges = {i: [] for i in self.tcvs}
+        for j, tgt_node, port_idx in solver.tcv_target_edges:
+            i = solver.edge_tgt_idx[j]
+            self.tcv_edges[i].append((j, port_idx, port_idx == tgt_node.hot_port_idx))
+
+    def initial(self):
+        """Current control positions as unknowns."""
+        nodes = self.solver.nodes_list
+        return np.array([nodes[i].opening_pct / 100.0 for i in self.regulators] + [nodes[i].mix_ratio for i in self.tcvs], dtype=float)
+
+    def apply(self, u):
+        """Writes trial control positions into the equipment (the residual reads them from there)."""
+        nodes = self.solver.nodes_list
+        for k, i in enumerate(self.regulators):
+            nodes[i].opening_pct = 100.0 * u[k]
+        for k, i in enumerate(self.tcvs):
+            nodes[i].mix_ratio = u[len(self.regulators) + k]
+        for kernel in self.control_kernels:
+            kernel.refresh()
+
+    def finalize(self, u):
+        """Stores the converged positions, clipped to the physical range."""
+        self.apply(np.clip(u, self.lower, self.upper))
+
+    def _errors(self, p_in_all, p_out_all, q_edges):
+        nodes = self.solver.nodes_list
+        errors = np.zeros(self.size)
+        for k, i in enumerate(self.regulators):
+            sense_idx, at_outlet, sign = self.sensing[k]
+            sensed = p_out_all[sense_idx] if at_outlet else p_in_all[sense_idx]
+            errors[k] = sign * (sensed - nodes[i].set_pressure) / self.solver.p_scale
+        for k, i in enumerate(self.tcvs):
+            t_out, _ = self._tcv_mixing(i, q_edges)
+            errors[len(self.regulators) + k] = (t_out - nodes[i].set_temperature) / self.temp_scale
+        return errors
+
+    def _tcv_mixing(self, i, q_edges):
+        """Outlet temperature of a TCV (mass-weighted inlet mix, as ThreeWayTCV.calculate) and its slope per inlet edge."""
+        node = self.solver.nodes_list[i]
+        port_q = np.zeros(len(node.inlets))
+        for j, port_idx, _ in self.tcv_edges[i]:
+            port_q[port_idx] += q_edges[j]
+        rho = np.array([p.density for p in node.inlets])
+        temps = np.array([p.temperature for p in node.inlets])
+        w = np.abs(port_q * rho)
+        total = w.sum()
+        if total <= 1e-10:
+            return temps[0], {}
+        t_out = (w * temps).sum() / total
+        slopes = {j: np.sign(port_q[port_idx]) * rho[port_idx] * (temps[port_idx] - t_out) / total for j, port_idx, _ in self.tcv_edges[i]}
+        return t_out, slopes
+
+    def residual(self, u, p_in_all, p_out_all, q_edges):
+        mid, _ = smooth_mid(self.lower, u - self._errors(p_in_all, p_out_all, q_edges), self.upper, self.eps)
+        return u - mid
+
+    def augment(self, jac, u, p_in_all, p_out_all, q_edges):
+        """
+        Extends the hydraulic Jacobian [[J]] to [[J, B], [C, D]] with the control
+        columns (B: how openings and mix ratios move the pressure balances) and the
+        complementarity rows (C, D).
+        """
+        solver = self.solver
+        nodes = solver.nodes_list
+        num_internal = len(solver.internal_node_indices)
+        p_scale, q_scale = solver.p_scale, solver.q_scale
+        q_in_nodes = solver.inflow_matrix @ q_edges
+        num_reg = len(self.regulators)
+
+        # B: d(edge pressure balance)/du
+        b_rows, b_cols, b_vals = [], [], []
+        dpout_du = np.zeros(len(nodes)) # d p_out / du of each regulator, Pa per unit opening
+        for k, i in enumerate(self.regulators):
+            node = nodes[i]
+            if 0.001 < u[k] <= 1.0:
+                q = q_in_nodes[i]
+                dp = K_CV_SI * node.inlets[0].density * q * abs(q) / (node.max_cv * u[k])**2
+                dpout_du[i] = 2.0 * dp / u[k]
+        for j, i in enumerate(solver.edge_src_idx):
+            if dpout_du[i] != 0.0:
+                b_rows.append(num_internal + j)
+                b_cols.append(self.column[i])
+                b_vals.append(dpout_du[i] / p_scale)
+        for k, i in enumerate(self.tcvs):
+            node = nodes[i]
+            for j, port_idx, is_hot in self.tcv_edges[i]:
+                opening = u[num_reg + k] if is_hot else 1.0 - u[num_reg + k]
+                if opening <= 0.0001:
+                    continue
+                path_dp = node.calculate_path_dp(q_edges[j], node.inlets[port_idx].density, port_idx)
+                d_open = 1.0 if is_hot else -1.0
+                # The edge subtracts path_dp; d(path_dp)/d(opening) = -2 path_dp / opening
+                b_rows.append(num_internal + j)
+                b_cols.append(self.column[i])
+                b_vals.append(2.0 * path_dp / opening * d_open / p_scale)
+
+        # C, D: complementarity rows, r = u - mid(lo, u - e, hi)
+        c_rows, c_cols, c_vals = [], [], []
+        de_du = np.zeros((self.size, self.size))
+        for k, i in enumerate(self.regulators):
+            sense_idx, at_outlet, sign = self.sensing[k]
+            pos = solver.internal_pos[sense_idx]
+            if at_outlet and solver.is_tcv[sense_idx]:
+                continue # lagged TCV outlet
+            if pos >= 0:
+                c_rows.append(k); c_cols.append(pos); c_vals.append(sign)
+            if at_outlet and solver.node_dp_sign[sense_idx] != 0.0:
+                sensed_node = nodes[sense_idx]
+                inlet = sensed_node.inlets[0] if sensed_node.inlets else None
+                slope = dp_derivative(sensed_node, q_in_nodes[sense_idx], inlet.density if inlet else 1000.0, inlet.viscosity if inlet else 0.001)
+                for jj in solver.inflow_matrix.getrow(sense_idx).indices:
+                    c_rows.append(k); c_cols.append(num_internal + jj)
+                    c_vals.append(sign * solver.node_dp_sign[sense_idx] * slope * q_scale / p_scale)
+                if self.column[sense_idx] >= 0 and self.column[sense_idx] < num_reg:
+                    de_du[k, self.column[sense_idx]] += sign * dpout_du[sense_idx] / p_scale
+        for k, i in enumerate(self.tcvs):
+            _, slopes = self._tcv_mixing(i, q_edges)
+            for j, slope in slopes.items():
+                c_rows.append(num_reg + k); c_cols.append(num_internal + j)
+                c_vals.append(slope * q_scale / self.temp_scale)
+
+        y = u - self._errors(p_in_all, p_out_all, q_edges)
+        _, s = smooth_mid(self.lower, y, self.upper, self.eps)
+        # dr/dz = s * de/dz for hydraulic z; dr/du = I - s * (I - de/du)
+        c_vals = np.array(c_vals, dtype=float) * (s[np.array(c_rows, dtype=int)] if c_rows else 1.0)
+        d_block = np.eye(self.size) - s[:, None] * (np.eye(self.size) - de_du)
+
+        n = jac.shape[0]
+        b_block = csr_matrix((b_vals, (b_rows, b_cols)), shape=(n, self.size))
+        c_block = csr_matrix((c_vals, (c_rows, c_cols)), shape=(self.size, n))
+        return bmat([[jac, b_block], [c_block, csr_matrix(d_block)]], format='csr')
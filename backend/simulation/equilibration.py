@@ -0,0 +1,80 @@
+import numpy as np
+from scipy.sparse import csc_matrix, diags
+from scipy.sparse.linalg import LinearOperator, onenormest, splu
+
+EQUILIBRATION_PASSES = 4 # Ruiz passes; each halves the spread of the row/column maxima (in log scale)
+SCALE_LIMIT = 2.0 ** 30 # Scale factors are clipped to [1 / SCALE_LIMIT, SCALE_LIMIT]
+
+class Equilibration:
+    """
+    Row and column equilibration (GlobalSettings.scaling "adaptive") of the
+    scaled residual F(x) at a start point x0:
+
+        G(y) = R F(C y),   dG/dy = R J C
+
+    R and C are diagonal, from Ruiz iterations on |J(x0)|: every row and column
+    is divided by the square root of its largest entry until all are close to
+    1. The entries of J are the element slopes dP/dQ at the start flows (times
+    1 L/s / 1 bar), so a stiff displacement pump or a nearly closed valve gets
+    a small flow scale and its pressure row a small weight, and a mass balance
+    at a junction of instrument lines weighs as much as one on the main.
+    Factors are powers of two (exact scaling). Rows and columns are each
+    normalized so their median factor is 1: unknowns stay of order bar and
+    L/s, and the solver tolerance keeps its meaning for typical rows. Rows
+    weighted down can still hide a residual, so the solver checks every
+    equilibrated solution in the fixed scaling (see EQUILIBRATED_ACCEPT).
+    """
+    def __init__(self, jac, passes=EQUILIBRATION_PASSES):
+        magnitude = abs(csc_matrix(jac))
+        row = np.ones(magnitude.shape[0])
+        col = np.ones(magnitude.shape[1])
+        for _ in range(passes):
+            scaled = diags(row) @ magnitude @ diags(col)
+            row_max = scaled.max(axis=1).toarray().ravel()
+            col_max = scaled.max(axis=0).toarray().ravel()
+            row /= np.sqrt(np.where(row_max > 0, row_max, 1.0))
+            col /= np.sqrt(np.where(col_max > 0, col_max, 1.0))
+        self.row = self._power_of_two(row / np.median(row) if len(row) else row)
+        self.col = self._power_of_two(col / np.median(col) if len(col) else col)
+
+    @staticmethod
+    def _power_of_two(scale):
+        return np.exp2(np.round(np.log2(np.clip(scale, 1.0 / SCALE_LIMIT, SCALE_LIMIT))))
+
+    def scale_jacobian(self, jac):
+        """R J C of a sparse Jacobian J."""
+        return (diags(self.row) @ jac @ diags(self.col)).tocsr()
+
+    def wrap(self, fun, jac):
+        """Equilibrated residual y -> G(y) and sparse Jacobian y -> R J C of fun and jac."""
+        row, col = self.row, self.col
+
+        def equilibrated(y):
+            return row * fun(col * y)
+
+        def equilibrated_jac(y):
+            return self.scale_jacobian(jac(col * y))
+        return equilibrated, equilibrated_jac
+
+    def to_equilibrated(self, x):
+        return x / self.col
+
+    def from_equilibrated(self, y):
+        return y * self.col
+
+def condition_estimate(jac):
+    """
+    1-norm condition number estimate ||J|| ||J^-1|| of a sparse Jacobian
+    (Hager/Higham, scipy onenormest on the LU solves). None if J is singular or
+    the estimate is not finite, so the stats stay valid JSON.
+    """
+    jac = csc_matrix(jac)
+    if jac.shape[0] == 0:
+        return 1.0
+    try:
+        lu = splu(jac)
+    except RuntimeError:
+        return None
+    inverse = LinearOperator(jac.shape, matvec=lu.solve, rmatvec=lambda v: lu.solve(v, trans='T'), dtype=float)
+    estimate = onenormest(jac) * onenormest(inverse)
+    return float(estimate) if np.isfinite(estimate) else None
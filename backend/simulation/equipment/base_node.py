@@ -9,7 +9,21 @@ class HydraulicNode:
     This is the parent class for ALL equipment in WalFlow. 
     Pumps, Valves, Tanks, and Pipes will all inherit from this.
     It ensures every piece of equipment has standard inlets, outlets, and a calculate method.
+
+    The capability flags below are static, per class: the solver reads them once
+    per network to build its index sets (boundaries, control loops, pumps...)
+    instead of dispatching on the class in its loops.
     """
+    FIXED_PRESSURE = False         # Boundary setting its own pressure and fluid state (tanks)
+    CONTROLLED = False             # Opening moved by the pressure control loop (regulators)
+    REMOTE_SENSING = False         # Senses the pressure at another node (target of signal edges)
+    TEMPERATURE_CONTROLLED = False # Mix ratio moved by the temperature loop; outlet pressure lagged
+    PUMP = False                   # Adds pressure: +dP from inlet to outlet
+    MULTI_PORT = False             # Several inlets or outlets, so no single dP across it
+
+    # React Flow data key -> (attribute, conversion) editable in place (GraphParser.apply_parameter_updates)
+    PARAMETER_UPDATES = {}
+
     def __init__(self, name: str, node_type: str):
         self.id = str(uuid.uuid4())  # Unique ID for the React Flow canvas to track
         self.name = name
@@ -20,6 +34,14 @@ class HydraulicNode:
         self.inlets: List[Port] = []
         self.outlets: List[Port] = []
 
+    @classmethod
+    def from_data(cls, name: str, data: dict, global_settings=None) -> "HydraulicNode":
+        """
+        Builds the node from its React Flow data (the editor's keys and units).
+        Registered equipment types (simulation.equipment_registry) override this.
+        """
+        raise NotImplementedError("This method must be overridden by registered equipment classes.")
+
     def add_inlet(self) -> Port:
         new_port = Port()
         self.inlets.append(new_port)
@@ -82,4 +104,41 @@ class HydraulicNode:
         This is just a placeholder. When we create the specific Pump or Valve classes,
         we will override this method with the actual mathematical logic (like the pump curve).
         """
-        raise NotImplementedError("This method must be overridden by the specific equipment class.")
\ No newline at end of file
+        raise NotImplementedError("This method must be overridden by the specific equipment class.")
+
+class CompiledCoefficients:
+    """
+    Mixin for equipment whose models use constants derived only from its
+    parameters (areas, K factors, curve coefficients). A class names those
+    parameters in COEFFICIENT_PARAMETERS and derives the constants in
+    compile_coefficients(), as a tuple its own methods unpack. They are
+    compiled on first use and dropped whenever one of the parameters is
+    assigned, so the models read `self._coefficients or self.compile()`
+    instead of redoing the arithmetic on every call. Inputs that live outside
+    the object (e.g. the global roughness) need invalidate_coefficients().
+
+    Listed before HydraulicNode in the bases, so its __setattr__ applies.
+    """
+    COEFFICIENT_PARAMETERS = frozenset()
+    _coefficients = None
+
+    def __setattr__(self, name, value):
+        if name in self.COEFFICIENT_PARAMETERS:
+            object.__setattr__(self, '_coefficients', None)
+        object.__setattr__(self, name, value)
+
+    def compile_coefficients(self) -> tuple:
+        raise NotImplementedError("Equipment with compiled coefficients must derive them.")
+
+    def compile(self) -> tuple:
+        """Derives the constants from the current parameters and keeps them until one changes."""
+        coefficients = self.compile_coefficients()
+        self._coefficients = coefficients
+        return coefficients
+
+    @property
+    def coefficients(self) -> tuple:
+        return self._coefficients or self.compile()
+
+    def invalidate_coefficients(self):
+        self._coefficients = None
@@ -1,7 +1,7 @@
-from simulation.equipment.base_node import HydraulicNode
+from simulation.equipment.base_node import HydraulicNode, CompiledCoefficients
 from simulation.fluid_utils import FluidProperties
 
-class CentrifugalPump(HydraulicNode):
+class CentrifugalPump(CompiledCoefficients, HydraulicNode):
     """
     A Centrifugal Pump that adds pressure to the network.
     Uses the "Duty Point" methodology for engineering intuition.
@@ -17,24 +17,70 @@ class CentrifugalPump(HydraulicNode):
         self.efficiency = efficiency         # 0.0 to 1.0
         self.cavitation_warning = False
 
-        # Internal Coefficients calculation
-        self.p_shutoff = self.pressure_rated * (1.0 + self.rise_pct / 100.0)
+        self.update_curve()
+
+        self.add_inlet()
+        self.add_outlet()
+
+    PUMP = True
+    PARAMETER_UPDATES = {
+        'flow_rated_lmin': ('flow_rated', lambda v: v / 60000.0),
+        'pressure_rated_bar': ('pressure_rated', lambda v: v * 100000.0),
+        'rise_to_shutoff_pct': ('rise_pct', float),
+    }
+
+    @classmethod
+    def from_data(cls, name, data, global_settings=None):
+        flow_rated_lmin = float(data.get('flow_rated_lmin', 100.0))
+        pressure_rated_bar = float(data.get('pressure_rated_bar', 5.0))
+        rise_pct = float(data.get('rise_to_shutoff_pct', 20.0))
+
+        return cls(
+            name=name,
+            flow_rated=flow_rated_lmin / 60000.0,
+            pressure_rated=pressure_rated_bar * 100000.0,
+            rise_to_shutoff_pct=rise_pct
+        )
+
+    COEFFICIENT_PARAMETERS = frozenset(('flow_rated', 'pressure_rated', 'rise_pct'))
+
+    def update_curve(self):
+        """Internal Coefficients calculation (edits of the rating are also picked up on their own)."""
+        self.compile()
+
+    def compile_coefficients(self):
+        """(p_shutoff, C_coeff)"""
+        p_shutoff = self.pressure_rated * (1.0 + self.rise_pct / 100.0)
         
         if self.flow_rated > 0:
-            self.C_coeff = (self.pressure_rated - self.p_shutoff) / (self.flow_rated**2)
+            c_coeff = (self.pressure_rated - p_shutoff) / (self.flow_rated**2)
         else:
-            self.C_coeff = 0.0
+            c_coeff = 0.0
+        return (p_shutoff, c_coeff)
 
-        self.add_inlet()
-        self.add_outlet()
+    @property
+    def p_shutoff(self):
+        return (self._coefficients or self.compile())[0]
+
+    @property
+    def C_coeff(self):
+        return (self._coefficients or self.compile())[1]
 
     def calculate_delta_p(self, flow_rate: float, density: float, viscosity: float = 0.001) -> float:
         """
         Calculates the pressure generated by the pump using the auto-calculated curve.
         """
-        delta_p = self.p_shutoff + (self.C_coeff * (flow_rate**2))
+        p_shutoff, c_coeff = self._coefficients or self.compile()
+        delta_p = p_shutoff + (c_coeff * (flow_rate**2))
         return max(0.0, delta_p)
 
+    def calculate_delta_p_derivative(self, flow_rate: float, density: float, viscosity: float = 0.001) -> float:
+        """Analytic slope d(Delta P)/dQ of the pump curve."""
+        p_shutoff, c_coeff = self._coefficients or self.compile()
+        if p_shutoff + (c_coeff * (flow_rate**2)) <= 0.0:
+            return 0.0
+        return 2.0 * c_coeff * flow_rate
+
     def calculate(self):
         """
         Updates the outlet port's state.
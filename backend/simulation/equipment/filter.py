@@ -1,6 +1,6 @@
-from simulation.equipment.base_node import HydraulicNode
+from simulation.equipment.base_node import HydraulicNode, CompiledCoefficients
 
-class Filter(HydraulicNode):
+class Filter(CompiledCoefficients, HydraulicNode):
     """
     A Filter/Strainer with clogging logic.
     User defines pressure drop at a reference flow for clean and dirty states.
@@ -21,8 +21,26 @@ class Filter(HydraulicNode):
         self.add_inlet()
         self.add_outlet()
 
+    PARAMETER_UPDATES = {'clogging': ('clogging_pct', float)}
+
+    @classmethod
+    def from_data(cls, name, data, global_settings=None):
+        return cls(
+            name=name,
+            dp_clean_bar=float(data.get('dp_clean', 0.2)),
+            dp_terminal_bar=float(data.get('dp_terminal', 1.0)),
+            flow_ref_lmin=float(data.get('flow_ref', 100.0)),
+            clogging_pct=float(data.get('clogging', 0.0))
+        )
+
+    COEFFICIENT_PARAMETERS = frozenset(('dp_clean', 'dp_terminal', 'flow_ref', 'clogging_pct'))
+
     def get_resistance_k(self):
-        """Calculates current K factor based on clogging level."""
+        """Current K factor (compiled, recomputed when the clogging level or rating changes)."""
+        return (self._coefficients or self.compile())[0]
+
+    def compile_coefficients(self):
+        """(K at the current clogging level,)"""
         # Density reference (assume water-like for K derivation if not provided, 
         # but we use the actual density in calculation)
         rho_ref = 1000.0 
@@ -35,12 +53,16 @@ class Filter(HydraulicNode):
         
         # Linear interpolation of resistance
         clog_factor = self.clogging_pct / 100.0
-        return k_clean + clog_factor * (k_terminal - k_clean)
+        return (k_clean + clog_factor * (k_terminal - k_clean),)
 
     def calculate_delta_p(self, flow_rate: float, density: float, viscosity: float = 0.001) -> float:
         k_curr = self.get_resistance_k()
         return k_curr * density * flow_rate * abs(flow_rate)
 
+    def calculate_delta_p_derivative(self, flow_rate: float, density: float, viscosity: float = 0.001) -> float:
+        """Analytic slope d(Delta P)/dQ at the current clogging level."""
+        return 2.0 * self.get_resistance_k() * density * abs(flow_rate)
+
     def calculate(self):
         inlet = self.inlets[0]
         outlet = self.outlets[0]
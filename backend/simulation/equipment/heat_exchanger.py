@@ -1,8 +1,8 @@
-from simulation.equipment.base_node import HydraulicNode
+from simulation.equipment.base_node import HydraulicNode, CompiledCoefficients
 from simulation.fluid_utils import FluidProperties
 import math
 
-class HeatExchanger(HydraulicNode):
+class HeatExchanger(CompiledCoefficients, HydraulicNode):
     """
     Improved Heat Exchanger using a Design Duty Point.
     Calculates dynamic heat transfer based on flow and temperature difference.
@@ -35,7 +35,34 @@ class HeatExchanger(HydraulicNode):
         self.add_inlet()
         self.add_outlet()
 
+    @classmethod
+    def from_data(cls, name, data, global_settings=None):
+        return cls(
+            name=name,
+            rated_cooling_kw=float(data.get('rated_cooling_kw', 300.0)),
+            rated_flow_lmin=float(data.get('rated_flow_lmin', 500.0)),
+            design_inlet_temp_c=float(data.get('design_inlet_temp_c', 50.0)),
+            medium_temp_c=float(data.get('medium_temp_c', 10.0)),
+            pressure_drop_factor=float(data.get('k_factor', 10.0))
+        )
+
+    COEFFICIENT_PARAMETERS = frozenset(('rated_cooling_kw', 'rated_flow_lmin', 'design_inlet_temp_c', 'medium_temp_c'))
+
+    def compile_coefficients(self):
+        """(rated flow in m3/s, medium temperature in K, [cp, UA rated] of the last design-point balance)"""
+        return (self.rated_flow_lmin / 60000.0, self.medium_temp_c + 273.15, [None, None])
+
     def _calculate_ua_rated(self, cp: float):
+        """
+        UA of the design point for specific heat cp, re-derived only when cp or
+        the design parameters change.
+        """
+        memo = (self._coefficients or self.compile())[2]
+        if memo[0] != cp:
+            memo[0], memo[1] = cp, self._design_point_ua(cp)
+        return memo[1]
+
+    def _design_point_ua(self, cp: float):
         """
         Estimates the UA (Heat Transfer Coefficient * Area) from design point.
         """
@@ -61,6 +88,10 @@ class HeatExchanger(HydraulicNode):
         # Simplified pressure drop: dP = k * Q^2
         return self.pressure_drop_factor * (flow**2) * (density / 1000.0)
 
+    def calculate_delta_p_derivative(self, flow: float, density: float, viscosity: float) -> float:
+        """Analytic slope d(Delta P)/dQ of the simplified k * Q^2 drop."""
+        return 2.0 * self.pressure_drop_factor * flow * (density / 1000.0)
+
     def calculate_temperature(self):
         """
         Calculates the actual cooling duty and resulting outlet temperature.
@@ -81,7 +112,8 @@ class HeatExchanger(HydraulicNode):
         ua_rated = self._calculate_ua_rated(cp)
         
         # 2. Scale UA with flow (Reynolds dependency, approx ^0.8 for turbulent)
-        flow_ratio = abs(inlet.flow_rate) / (self.rated_flow_lmin / 60000.0)
+        flow_rated, tm, _ = self._coefficients or self.compile()
+        flow_ratio = abs(inlet.flow_rate) / flow_rated
         ua_actual = ua_rated * (flow_ratio ** 0.8)
         
         # 3. Solve for Outlet Temperature using NTU-like effectiveness or energy balance
@@ -91,7 +123,6 @@ class HeatExchanger(HydraulicNode):
         # m*cp*Ti - m*cp*To = UA*Ti/2 + UA*To/2 - UA*Tm
         # To * (UA/2 + m*cp) = m*cp*Ti - UA*Ti/2 + UA*Tm
         
-        tm = self.medium_temp_c + 273.15
         ti = inlet.temperature
         
         num = (m_dot * cp * ti) - (ua_actual * ti / 2.0) + (ua_actual * tm)
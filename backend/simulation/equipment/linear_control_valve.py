@@ -1,7 +1,7 @@
-from simulation.equipment.base_node import HydraulicNode
+from simulation.equipment.base_node import HydraulicNode, CompiledCoefficients
 from simulation.fluid_utils import FluidProperties
 
-class LinearControlValve(HydraulicNode):
+class LinearControlValve(CompiledCoefficients, HydraulicNode):
     """
     A control valve with a linear trim characteristic.
     Effective Cv = Max Cv * (Opening / 100)
@@ -14,26 +14,48 @@ class LinearControlValve(HydraulicNode):
         self.add_inlet()
         self.add_outlet()
 
-    def calculate_delta_p(self, flow_rate: float, density: float, viscosity: float = 0.001) -> float:
-        """
-        Calculates pressure drop across the valve based on its current position.
-        Uses the standard liquid Cv formula: Q [GPM] = Cv * sqrt(dP [PSI] / SG)
-        Converted to SI: dP [Pa] = (1.732e9 * rho * Q^2) / Cv^2
-        """
+    PARAMETER_UPDATES = {'opening': ('opening_pct', lambda v: max(0.1, min(100.0, v)))}
+
+    @classmethod
+    def from_data(cls, name, data, global_settings=None):
+        return cls(
+            name=name,
+            max_cv=float(data.get('max_cv', 0.05)),
+            opening_pct=float(data.get('opening', 50.0))
+        )
+
+    COEFFICIENT_PARAMETERS = frozenset(('max_cv', 'opening_pct'))
+
+    def compile_coefficients(self):
+        """(Cv_eff^2 at the current position,)"""
         # Prevent division by zero mathematically. 
         # A "closed" valve is just simulated as having an incredibly small opening.
         effective_opening = max(0.001, self.opening_pct / 100.0)
         
         # Calculate the effective Cv (assuming a linear trim)
         cv_eff = self.max_cv * effective_opening
+        return (cv_eff**2,)
+
+    def calculate_delta_p(self, flow_rate: float, density: float, viscosity: float = 0.001) -> float:
+        """
+        Calculates pressure drop across the valve based on its current position.
+        Uses the standard liquid Cv formula: Q [GPM] = Cv * sqrt(dP [PSI] / SG)
+        Converted to SI: dP [Pa] = (1.732e9 * rho * Q^2) / Cv^2
+        """
+        cv_eff_sq = (self._coefficients or self.compile())[0]
         
         # Conversion constant: (15850.32^2 * 6894.76 / 1000) approx 1.732e9
         K_CV_SI = 1.732e9
         
-        dp = (K_CV_SI * density * flow_rate * abs(flow_rate)) / (cv_eff**2)
+        dp = (K_CV_SI * density * flow_rate * abs(flow_rate)) / cv_eff_sq
         
         return dp
 
+    def calculate_delta_p_derivative(self, flow_rate: float, density: float, viscosity: float = 0.001) -> float:
+        """Analytic slope d(Delta P)/dQ at the current position."""
+        K_CV_SI = 1.732e9
+        return (2.0 * K_CV_SI * density * abs(flow_rate)) / (self._coefficients or self.compile())[0]
+
     def calculate(self):
         """
         Updates the outlet port's state based on the friction loss.
@@ -13,6 +13,13 @@ class Mixer(HydraulicNode):
             self.add_inlet()
         self.add_outlet()
 
+    MULTI_PORT = True
+
+    @classmethod
+    def from_data(cls, name, data, global_settings=None):
+        # 2 inlets, 1 outlet
+        return cls(name=name, num_inlets=2)
+
     def calculate(self):
         """
         Updates outlet based on inlets.
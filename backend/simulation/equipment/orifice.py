@@ -1,8 +1,8 @@
-from simulation.equipment.base_node import HydraulicNode
+from simulation.equipment.base_node import HydraulicNode, CompiledCoefficients
 from simulation.fluid_utils import FluidProperties
 import math
 
-class Orifice(HydraulicNode):
+class Orifice(CompiledCoefficients, HydraulicNode):
     """
     A Orifice acts as a restriction in the hydraulic network. It calculates the pressure drop caused by the restriction in area.
     """
@@ -17,42 +17,65 @@ class Orifice(HydraulicNode):
         self.add_inlet()
         self.add_outlet()
 
-    def calculate_delta_p(self, flow_rate: float, density: float, viscosity: float = 0.001) -> float:
-        """
-        Calculates pressure drop using the Bernoulli's equation.
-        """
+    @classmethod
+    def from_data(cls, name, data, global_settings=None):
+        return cls(
+            name=name,
+            pipe_diameter=float(data.get('pipe_diameter', 0.1)),
+            orifice_diameter=float(data.get('orifice_diameter', 0.07))
+        )
+
+    COEFFICIENT_PARAMETERS = frozenset(('pipe_diameter', 'orifice_diameter'))
+
+    def compile_coefficients(self):
+        """(pipe area, Geometry Factor, 1 - beta^2)"""
         if self.pipe_diameter <= 0:
             raise ValueError("Pipe diameter must be strictly positive.")
         
         if self.orifice_diameter <= 0:
             raise ValueError("Orifice diameter must be strictly positive.")
-            
-        # 1. Calculate beta ration (b = d / D)
+
+        # Beta ratio (b = d / D) and pipe area upstream of the orifice
         beta_ratio = self.orifice_diameter / self.pipe_diameter
+        area_pipe = math.pi * (self.pipe_diameter / 2)**2
+
+        # Geometry/Flow Factor (1 - beta^4) / (C_d^2 * beta^4)
+        # For simplicity, we will assume a discharge coefficient (C_d) of 0.6 for sharp-edged orifices
+        discharge_coefficient = 0.6
+        geometry_factor = (1 - beta_ratio**4) / (discharge_coefficient**2 * beta_ratio**4)
+        return (area_pipe, geometry_factor, 1 - beta_ratio**2)
+
+    def calculate_delta_p(self, flow_rate: float, density: float, viscosity: float = 0.001) -> float:
+        """
+        Calculates pressure drop using the Bernoulli's equation.
+        """
+        # 1. Beta ratio, pipe area and Geometry Factor, compiled from the diameters
+        area_pipe, geometry_factor, permanent_fraction = self._coefficients or self.compile()
 
         # 2. Calulate velocity of the pipe upstream of the orifice (v1 = Q / A1)
-        area_pipe = math.pi * (self.pipe_diameter / 2)**2
         velocity = flow_rate / area_pipe
 
         
         # 3. Calculate Dynamic Pressure term (0.5 * rho * v^2)
         dynamic_pressure = 0.5 * density * velocity * abs(velocity)  # abs to preserve direction of flow for pressure drop sign
 
-        # 4. Calculate the Geometry/Flow Factor (1 - beta^4) / (C_d^2 * beta^4)
-
-        # For simplicity, we will assume a discharge coefficient (C_d) of 0.6 for sharp-edged orifices
-        discharge_coefficient = 0.6
-        geometry_factor = (1 - beta_ratio**4) / (discharge_coefficient**2 * beta_ratio**4)
-        
-        # 5. Calculate recoverable pressure drop at taps (Delta P = Dynamic Pressure * Geometry Factor) 
+        # 4. Calculate recoverable pressure drop at taps (Delta P = Dynamic Pressure * Geometry Factor) 
         rec_delta_p = dynamic_pressure * geometry_factor
 
-        # 6. Calculate Permanent Pressure Loss (unrecoverable loss)
+        # 5. Calculate Permanent Pressure Loss (unrecoverable loss)
 
-        perm_delta_p = rec_delta_p * (1 - beta_ratio**2)
+        perm_delta_p = rec_delta_p * permanent_fraction
 
         return  perm_delta_p
 
+    def calculate_delta_p_derivative(self, flow_rate: float, density: float, viscosity: float = 0.001) -> float:
+        """
+        Analytic slope d(Delta P)/dQ. The permanent loss is quadratic in Q:
+        Delta P = 0.5 * rho * Q|Q| / A^2 * Geometry Factor * (1 - beta^2)
+        """
+        area_pipe, geometry_factor, permanent_fraction = self._coefficients or self.compile()
+        return density * abs(flow_rate) / area_pipe**2 * geometry_factor * permanent_fraction
+
 
     def calculate(self):
         """
@@ -1,8 +1,8 @@
-from simulation.equipment.base_node import HydraulicNode
+from simulation.equipment.base_node import HydraulicNode, CompiledCoefficients
 from simulation.fluid_utils import FluidProperties
 import math
 
-class Pipe(HydraulicNode):
+class Pipe(CompiledCoefficients, HydraulicNode):
     """
     A Pipe connects two nodes and calculates the pressure drop caused by fluid friction.
     It also calculates temperature rise due to viscous dissipation.
@@ -19,16 +19,26 @@ class Pipe(HydraulicNode):
         self.add_inlet()
         self.add_outlet()
 
+    # Roughness comes from global_settings: editing it there needs invalidate_coefficients()
+    COEFFICIENT_PARAMETERS = frozenset(('length', 'diameter', 'global_settings'))
+
+    def compile_coefficients(self):
+        """(area, L/D, roughness / 3.7D, 2A^2, D^2 A)"""
+        if self.diameter <= 0:
+            raise ValueError("Pipe diameter must be strictly positive.")
+        roughness = 0.000045 # Default
+        if self.global_settings:
+            roughness = getattr(self.global_settings, 'global_roughness', 0.000045)
+        area = math.pi * (self.diameter / 2)**2
+        return (area, self.length / self.diameter, roughness / (3.7 * self.diameter), 2 * area**2, self.diameter**2 * area)
+
     def calculate_delta_p(self, flow_rate: float, density: float, viscosity: float) -> float:
         """
         Calculates pressure drop using the Darcy-Weisbach equation.
         Friction factor is calculated based on Reynolds number and roughness.
         """
-        if self.diameter <= 0:
-            raise ValueError("Pipe diameter must be strictly positive.")
-            
-        # 1. Calculate cross-sectional area (A = pi * r^2)
-        area = math.pi * (self.diameter / 2)**2
+        # 1. Cross-sectional area (A = pi * r^2) and the other geometry terms, compiled
+        area, l_over_d, rough_term, _, _ = self._coefficients or self.compile()
         
         # 2. Calculate fluid velocity (v = Q / A)
         velocity = flow_rate / area
@@ -43,20 +53,41 @@ class Pipe(HydraulicNode):
                 # Laminar flow
                 f = 64 / re
             else:
-                # Turbulent flow
-                roughness = 0.000045 # Default
-                if self.global_settings:
-                    roughness = getattr(self.global_settings, 'global_roughness', 0.000045)
-                
-                # Swamee-Jain equation (Approximate Colebrook-White)
-                f = 0.25 / (math.log10(roughness / (3.7 * self.diameter) + 5.74 / re**0.9))**2
+                # Turbulent flow: Swamee-Jain equation (Approximate Colebrook-White)
+                f = 0.25 / (math.log10(rough_term + 5.74 / re**0.9))**2
         else:
             f = 0
         
         # 5. Calculate pressure drop (Delta P = f * (L/D) * (rho * v^2 / 2))
-        delta_p = f * (self.length / self.diameter) * (density * velocity * abs_v / 2)
+        delta_p = f * l_over_d * (density * velocity * abs_v / 2)
         
         return delta_p
+
+    def calculate_delta_p_derivative(self, flow_rate: float, density: float, viscosity: float) -> float:
+        """
+        Analytic slope d(Delta P)/dQ of calculate_delta_p, used by the solver Jacobian.
+        At zero flow the laminar slope is returned (the curve is linear there).
+        """
+        area, l_over_d, rough_term, two_area_sq, d_sq_area = self._coefficients or self.compile()
+        if viscosity <= 0:
+            return 0.0
+
+        abs_q = abs(flow_rate)
+        re = (density * (abs_q / area) * self.diameter) / viscosity
+
+        if re < 2300:
+            # Laminar: Delta P = 32 * mu * L * v / D^2 (linear in Q)
+            return 32.0 * viscosity * self.length / d_sq_area
+
+        # Delta P = f(Re) * k * Q|Q|  with  k = (L/D) * rho / (2 * A^2)
+        k_geom = l_over_d * density / two_area_sq
+        x = rough_term + 5.74 / re**0.9
+        log_x = math.log10(x)
+        f = 0.25 / log_x**2
+        # Chain rule through Swamee-Jain: df/dRe = df/dx * dx/dRe
+        df_dre = (-0.5 / log_x**3) / (x * math.log(10)) * (-0.9 * 5.74 * re**-1.9)
+        # Re is proportional to |Q|, so Q|Q| * df/dQ = |Q| * Re * df/dRe
+        return k_geom * (2 * f * abs_q + abs_q * re * df_dre)
         
     def calculate(self):
         """
@@ -81,15 +112,13 @@ class Pipe(HydraulicNode):
             # Forward Flow: Inlet -> Outlet
             cp = FluidProperties.get_specific_heat(fluid_type, inlet.temperature)
             dt = abs(dp) / (inlet.density * cp)
-            outlet.temperature = inlet.temperature + dt
-            outlet.density = inlet.density
-            outlet.viscosity = inlet.viscosity
+            outlet.take_fluid(inlet)
+            outlet.temperature += dt
         else:
             # Reverse Flow: Outlet -> Inlet
             cp = FluidProperties.get_specific_heat(fluid_type, outlet.temperature)
             dt = abs(dp) / (outlet.density * cp)
-            inlet.temperature = outlet.temperature + dt
-            inlet.density = outlet.density
-            inlet.viscosity = outlet.viscosity
+            inlet.take_fluid(outlet)
+            inlet.temperature += dt
         
         return dp
@@ -1,7 +1,7 @@
-from simulation.equipment.base_node import HydraulicNode
+from simulation.equipment.base_node import HydraulicNode, CompiledCoefficients
 from simulation.fluid_utils import FluidProperties
 
-class RemoteControlValve(HydraulicNode):
+class RemoteControlValve(CompiledCoefficients, HydraulicNode):
     """
     A Control Valve that maintains a set point at a REMOTE location.
     Its opening_pct is adjusted by the solver to reach the target pressure
@@ -23,17 +23,39 @@ class RemoteControlValve(HydraulicNode):
         self.add_inlet()
         self.add_outlet()
 
-    def calculate_delta_p(self, flow_rate: float, density: float, viscosity: float = 0.001) -> float:
-        """Standard Cv-based dP using current opening_pct."""
+    CONTROLLED = True
+    REMOTE_SENSING = True
+
+    @classmethod
+    def from_data(cls, name, data, global_settings=None):
+        return cls(
+            name=name,
+            max_cv=float(data.get('max_cv', 0.05)),
+            set_pressure=float(data.get('set_pressure', 500000.0)),
+            backpressure=bool(data.get('backpressure', False))
+        )
+
+    COEFFICIENT_PARAMETERS = frozenset(('max_cv', 'opening_pct'))
+
+    def compile_coefficients(self):
+        """(Cv_eff^2 at the current opening_pct,)"""
         # Clamp opening to physical limits
         eff_opening = max(0.001, min(100.0, self.opening_pct)) / 100.0
         cv_eff = self.max_cv * eff_opening
-        
+        return (cv_eff**2,)
+
+    def calculate_delta_p(self, flow_rate: float, density: float, viscosity: float = 0.001) -> float:
+        """Standard Cv-based dP using current opening_pct."""
         K_CV_SI = 1.732e9
-        dp = (K_CV_SI * density * flow_rate * abs(flow_rate)) / (cv_eff**2)
+        dp = (K_CV_SI * density * flow_rate * abs(flow_rate)) / (self._coefficients or self.compile())[0]
         
         return dp
 
+    def calculate_delta_p_derivative(self, flow_rate: float, density: float, viscosity: float = 0.001) -> float:
+        """Analytic slope d(Delta P)/dQ at the current opening_pct."""
+        K_CV_SI = 1.732e9
+        return (2.0 * K_CV_SI * density * abs(flow_rate)) / (self._coefficients or self.compile())[0]
+
     def calculate(self):
         inlet = self.inlets[0]
         outlet = self.outlets[0]
@@ -13,6 +13,13 @@ class Splitter(HydraulicNode):
         for _ in range(num_outlets):
             self.add_outlet()
 
+    MULTI_PORT = True
+
+    @classmethod
+    def from_data(cls, name, data, global_settings=None):
+        # 1 inlet, 2 outlets
+        return cls(name=name, num_outlets=2)
+
     def calculate(self):
         """
         Updates outlet states based on inlet state.
@@ -21,9 +28,7 @@ class Splitter(HydraulicNode):
         inlet = self.inlets[0]
         for outlet in self.outlets:
             outlet.pressure = inlet.pressure
-            outlet.density = inlet.density
-            outlet.viscosity = inlet.viscosity
-            outlet.temperature = inlet.temperature
+            outlet.take_fluid(inlet)
             # Flow distribution is determined by the downstream resistance, 
             # not by the splitter itself.
         return 0.0
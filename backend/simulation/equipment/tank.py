@@ -1,5 +1,7 @@
+import numpy as np
 from simulation.equipment.base_node import HydraulicNode
-from simulation.fluid_utils import FluidProperties
+from simulation.fluid_utils import FluidProperties, fluid_table
+from simulation.state_arena import PortGroup, PRESSURE, TEMPERATURE, DENSITY, VISCOSITY
 
 class Tank(HydraulicNode):
     """
@@ -19,6 +21,26 @@ class Tank(HydraulicNode):
         self.add_inlet()
         self.add_outlet()
 
+    FIXED_PRESSURE = True
+    PARAMETER_UPDATES = {'level': ('fluid_level', float)}
+
+    @classmethod
+    def from_data(cls, name, data, global_settings=None):
+        # Priority: Node data > Global settings > Default
+        fluid_type = data.get('fluid_type')
+        if not fluid_type and global_settings:
+            fluid_type = getattr(global_settings, 'fluid_type', 'water')
+        if not fluid_type:
+            fluid_type = 'water'
+
+        return cls(
+            name=name,
+            elevation=float(data.get('elevation', 0.0)),
+            fluid_level=float(data.get('level', 1.0)),
+            temperature=float(data.get('temperature', 293.15)),
+            fluid_type=fluid_type
+        )
+
     def calculate(self):
         """
         Calculates the absolute static pressure at the bottom of the tank.
@@ -44,4 +66,41 @@ class Tank(HydraulicNode):
             total_head = self.elevation + self.fluid_level
             port.pressure = atm_p + (density * gravity * total_head)
 
-        return self.outlets[0].pressure
\ No newline at end of file
+        return self.outlets[0].pressure
+
+    @staticmethod
+    def calculate_all(tanks):
+        """
+        Tank.calculate for many tanks at once (the solver's boundaries): the
+        properties of all tanks holding one fluid come from its FluidTable in a
+        single lookup and the port states are written as columns.
+        Returns the bottom pressures in the order of `tanks` and the
+        (PortGroup, {column: values}) boundary state, for restoring it later.
+        """
+        gravity = 9.81
+        pressures = np.empty(len(tanks))
+        ports, columns = [], {PRESSURE: [], TEMPERATURE: [], DENSITY: [], VISCOSITY: []}
+        by_fluid = {}
+        for k, tank in enumerate(tanks):
+            by_fluid.setdefault(tank.fluid_type, []).append(k)
+        for fluid_type, index in by_fluid.items():
+            members = [tanks[k] for k in index]
+            table = fluid_table(fluid_type)
+            temperature = np.array([tank.temperature for tank in members], dtype=float)
+            density = table.density(temperature)
+            viscosity = table.viscosity(temperature)
+            atm_p = np.array([getattr(tank.global_settings, 'atmospheric_pressure', 101325.0) if tank.global_settings else 101325.0
+                              for tank in members], dtype=float)
+            head = np.array([tank.elevation + tank.fluid_level for tank in members], dtype=float)
+            pressure = atm_p + density * gravity * head
+            pressures[index] = pressure
+
+            counts = [len(tank.inlets) + len(tank.outlets) for tank in members]
+            ports += [port for tank in members for port in tank.inlets + tank.outlets]
+            for col, values in ((PRESSURE, pressure), (TEMPERATURE, temperature), (DENSITY, density), (VISCOSITY, viscosity)):
+                columns[col].append(np.repeat(values, counts))
+        group = PortGroup(ports)
+        columns = {col: np.concatenate(values) if values else np.empty(0) for col, values in columns.items()}
+        for col, values in columns.items():
+            group.set(col, values)
+        return pressures, (group, columns)
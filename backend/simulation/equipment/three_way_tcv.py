@@ -22,6 +22,18 @@ class ThreeWayTCV(HydraulicNode):
         self.add_inlet() # Port 1
         self.add_outlet() # Port 0 (Mixed Outlet)
 
+    MULTI_PORT = True
+    TEMPERATURE_CONTROLLED = True
+
+    @classmethod
+    def from_data(cls, name, data, global_settings=None):
+        return cls(
+            name=name,
+            max_cv=float(data.get('max_cv', 0.1)),
+            set_temperature=float(data.get('set_temperature_c', 40.0)) + 273.15,
+            hot_port_idx=int(data.get('hot_port_idx', 0))
+        )
+
     def calculate_path_dp(self, flow: float, density: float, port_idx: int) -> float:
         """
         Calculates pressure drop based on the PHYSICAL role of the port.
@@ -39,6 +51,18 @@ class ThreeWayTCV(HydraulicNode):
         dp = (K_CV_SI * density * (flow**2)) / (eff_cv**2)
         return dp
 
+    def calculate_path_dp_derivative(self, flow: float, density: float, port_idx: int) -> float:
+        """Analytic slope d(Delta P)/dQ of calculate_path_dp for one inlet path."""
+        is_hot_path = (port_idx == self.hot_port_idx)
+        opening = self.mix_ratio if is_hot_path else (1.0 - self.mix_ratio)
+        eff_cv = self.max_cv * max(0.0001, opening)
+
+        if abs(flow) < 1e-10:
+            return 0.0
+
+        K_CV_SI = 1.732e9
+        return (2.0 * K_CV_SI * density * flow) / (eff_cv**2)
+
     def calculate(self):
         inlet_0 = self.inlets[0]
         inlet_1 = self.inlets[1]
@@ -1,8 +1,8 @@
-from simulation.equipment.base_node import HydraulicNode
+from simulation.equipment.base_node import HydraulicNode, CompiledCoefficients
 from simulation.fluid_utils import FluidProperties
 import math
 
-class VolumetricPump(HydraulicNode):
+class VolumetricPump(CompiledCoefficients, HydraulicNode):
     """
     A Volumetric (Positive Displacement) Pump.
     Maintains flow near its target, limited by power and mechanical strength.
@@ -18,14 +18,38 @@ class VolumetricPump(HydraulicNode):
         self.add_inlet()
         self.add_outlet()
 
-    def calculate_delta_p(self, flow_rate: float, density: float, viscosity: float = 0.001) -> float:
-        """
-        Calculates pressure generated by the pump.
-        Uses a steep but continuous sigmoid-like curve.
-        """
-        # 1. Constants for smoothness
-        hard_cap = 20_000_000.0  # 200 bar
-        
+    PUMP = True
+    PARAMETER_UPDATES = {
+        'flow_rated': ('flow_rated', lambda v: v / 60000.0),
+        'motor_power': ('motor_power', lambda v: v * 1000.0),
+        'efficiency': ('efficiency', lambda v: v / 100.0),
+    }
+
+    @classmethod
+    def from_data(cls, name, data, global_settings=None):
+        # flow_rated in L/min -> convert to m3/s
+        flow_lmin = float(data.get('flow_rated', 100.0))
+        flow_m3s = flow_lmin / 60000.0
+
+        # motor_power in kW -> convert to W
+        power_kw = float(data.get('motor_power', 5.0))
+        power_w = power_kw * 1000.0
+
+        # efficiency in % -> convert to decimal
+        eff_pct = float(data.get('efficiency', 85.0))
+        eff_dec = eff_pct / 100.0
+
+        return cls(
+            name=name,
+            flow_rated=flow_m3s,
+            motor_power=power_w,
+            efficiency=eff_dec
+        )
+
+    COEFFICIENT_PARAMETERS = frozenset(('flow_rated', 'motor_power', 'efficiency'))
+
+    def compile_coefficients(self):
+        """(stiffness, available power)"""
         # 'Stiffness' of the pump curve. A very high value makes it act like 
         # a true PD pump. We pick a value that gives 100 bar per 1% flow error.
         # stiffness = 1e7 Pa / (0.01 * flow_rated)
@@ -33,6 +57,16 @@ class VolumetricPump(HydraulicNode):
             stiffness = 10_000_000.0 / (0.01 * self.flow_rated)
         else:
             stiffness = 1e12
+        return (stiffness, self.motor_power * self.efficiency)
+
+    def calculate_delta_p(self, flow_rate: float, density: float, viscosity: float = 0.001) -> float:
+        """
+        Calculates pressure generated by the pump.
+        Uses a steep but continuous sigmoid-like curve.
+        """
+        # 1. Constants for smoothness
+        hard_cap = 20_000_000.0  # 200 bar
+        stiffness, available_power = self._coefficients or self.compile()
 
         # 2. Base Displacement Pressure (The "Spring" that pushes fluid)
         # dP = stiffness * (Target_Flow - Actual_Flow)
@@ -40,7 +74,6 @@ class VolumetricPump(HydraulicNode):
 
         # 3. Motor Power Limit (Smooth Hyperbola)
         # P = dP * Q => dP_max = P_avail / Q
-        available_power = self.motor_power * self.efficiency
         # Use a safe denominator to avoid division by zero
         safe_q = math.sqrt(flow_rate**2 + 1e-10)
         dp_power_limit = available_power / safe_q
@@ -68,6 +101,29 @@ class VolumetricPump(HydraulicNode):
         
         return delta_p
 
+    def calculate_delta_p_derivative(self, flow_rate: float, density: float, viscosity: float = 0.001) -> float:
+        """
+        Analytic slope d(Delta P)/dQ, following the same branches as calculate_delta_p.
+        """
+        hard_cap = 20_000_000.0
+        stiffness, available_power = self._coefficients or self.compile()
+
+        if flow_rate < 0:
+            return -stiffness
+
+        delta_p = max(0.0, stiffness * (self.flow_rated - flow_rate))
+        slope = -stiffness if delta_p > 0.0 else 0.0
+
+        q_sq = flow_rate**2 + 1e-10
+        dp_power_limit = available_power / math.sqrt(q_sq)
+        if delta_p > dp_power_limit:
+            delta_p = dp_power_limit
+            slope = -available_power * flow_rate / q_sq**1.5
+
+        if delta_p > hard_cap:
+            slope = 0.0
+        return slope
+
     def calculate(self):
         inlet = self.inlets[0]
         outlet = self.outlets[0]
@@ -0,0 +1,83 @@
+import importlib
+
+from simulation.equipment.base_node import HydraulicNode
+
+# React Flow node type -> EquipmentType
+EQUIPMENT_TYPES = {}
+
+# Capability flags every equipment class carries (see HydraulicNode)
+CAPABILITY_FLAGS = ('FIXED_PRESSURE', 'CONTROLLED', 'REMOTE_SENSING', 'TEMPERATURE_CONTROLLED', 'PUMP', 'MULTI_PORT')
+
+class EquipmentType:
+    """
+    A registered equipment type: where its class lives ("module:Class"), imported
+    on first use, so a graph only loads the equipment modules it contains. The
+    class builds its nodes from React Flow data (from_data) and declares its
+    capabilities as static flags.
+    """
+    def __init__(self, key, target):
+        self.key = key
+        if isinstance(target, str):
+            self.path, self._cls = target, None
+        else:
+            self.path, self._cls = f"{target.__module__}:{target.__qualname__}", target
+
+    @property
+    def cls(self):
+        if self._cls is None:
+            module, class_name = self.path.split(':')
+            self._cls = getattr(importlib.import_module(module), class_name)
+        return self._cls
+
+    @property
+    def loaded(self):
+        return self._cls is not None
+
+    def create(self, name, data, global_settings=None):
+        return self.cls.from_data(name, data, global_settings)
+
+    def capabilities(self):
+        """Flag name -> value for the class, plus has_batch_kernel (a kernel registered in simulation.batch_kernels)."""
+        from simulation.batch_kernels import has_batch_kernel
+        flags = {flag: bool(getattr(self.cls, flag)) for flag in CAPABILITY_FLAGS}
+        flags['has_batch_kernel'] = has_batch_kernel(self.cls)
+        return flags
+
+def register_equipment(target, *keys):
+    """
+    Registers an equipment class, given as the class or as a "module:Class" path
+    (imported when first needed), under one or more React Flow node types:
+
+        register_equipment("my_plugin.nozzle:Nozzle", "nozzle")
+
+    The class must implement HydraulicNode.from_data. Registering a key again replaces it.
+    """
+    for key in keys:
+        EQUIPMENT_TYPES[key] = EquipmentType(key, target)
+
+def equipment_type(key):
+    """Registered EquipmentType of a node type, or None."""
+    return EQUIPMENT_TYPES.get(key)
+
+def create_node(key, name, data, global_settings=None):
+    """
+    Node of a registered type built from its data; unknown types become plain
+    HydraulicNodes (no equipment model). The global settings are injected either way.
+    """
+    spec = EQUIPMENT_TYPES.get(key)
+    node = spec.create(name, data, global_settings) if spec else HydraulicNode(name=name, node_type=key)
+    node.global_settings = global_settings
+    return node
+
+register_equipment("simulation.equipment.tank:Tank", "tank")
+register_equipment("simulation.equipment.centrifugal_pump:CentrifugalPump", "centrifugal_pump", "pump")
+register_equipment("simulation.equipment.volumetric_pump:VolumetricPump", "volumetric_pump")
+register_equipment("simulation.equipment.linear_control_valve:LinearControlValve", "linear_control_valve")
+register_equipment("simulation.equipment.remote_control_valve:RemoteControlValve", "remote_control_valve")
+register_equipment("simulation.equipment.linear_regulator:LinearRegulator", "linear_regulator")
+register_equipment("simulation.equipment.orifice:Orifice", "orifice")
+register_equipment("simulation.equipment.heat_exchanger:HeatExchanger", "heat_exchanger")
+register_equipment("simulation.equipment.filter:Filter", "filter")
+register_equipment("simulation.equipment.splitter:Splitter", "splitter")
+register_equipment("simulation.equipment.mixer:Mixer", "mixer")
+register_equipment("simulation.equipment.three_way_tcv:ThreeWayTCV", "three_way_tcv")
@@ -0,0 +1,81 @@
+import math
+import os
+import numpy as np
+from simulation.fluid_utils import FluidProperties, FluidTable, LIBRARY_DIR, write_library
+
+# Grid of the shipped library: -20°C to 200°C in 0.5 K steps
+LIBRARY_T_MIN = 253.15
+LIBRARY_T_STEP = 0.5
+LIBRARY_POINTS = 441
+
+def walther_oil(nu_40, nu_100, rho_15, alpha=0.00065):
+    """
+    Mineral oil from its viscosity grade: ASTM D341 (Walther) through the
+    kinematic viscosities at 40°C and 100°C (cSt), density linear in T.
+    """
+    t1, t2 = math.log10(313.15), math.log10(373.15)
+    w1, w2 = math.log10(math.log10(nu_40 + 0.7)), math.log10(math.log10(nu_100 + 0.7))
+    b = (w1 - w2) / (t2 - t1)
+    a = w1 + b * t1
+
+    def density(temp_k):
+        return rho_15 * (1 - alpha * (temp_k - 288.15))
+
+    def viscosity(temp_k):
+        nu_cst = 10 ** (10 ** (a - b * math.log10(temp_k))) - 0.7
+        return nu_cst * 1e-6 * density(temp_k)
+
+    return {
+        'density': density,
+        'viscosity': viscosity,
+        'vapor_pressure': lambda temp_k: 1.0, # ~0 for this simulation, as the built-in oils
+        'specific_heat': lambda temp_k: 1860.0 + 4.0 * (temp_k - 273.15),
+    }
+
+def aqueous(rho_20, alpha, mu_20, mu_80, cp_20, dcp, water_fraction):
+    """
+    Water-based mixture (glycol coolants, HFC fluids): density linear in T,
+    Andrade viscosity ln(mu) = A + B/T through mu at 20°C and 80°C (Pa*s),
+    linear specific heat, and Raoult's law on the water vapour pressure
+    (water_fraction = mole fraction of water).
+    """
+    b = math.log(mu_20 / mu_80) / (1 / 293.15 - 1 / 353.15)
+    a = math.log(mu_20) - b / 293.15
+    return {
+        'density': lambda temp_k: rho_20 * (1 - alpha * (temp_k - 293.15)),
+        'viscosity': lambda temp_k: math.exp(a + b / temp_k),
+        'vapor_pressure': lambda temp_k: water_fraction * FluidProperties.get_vapor_pressure("water", temp_k),
+        'specific_heat': lambda temp_k: cp_20 + dcp * (temp_k - 293.15),
+    }
+
+# Approximate handbook values; site-specific fluids go into a library file of
+# their own (WALFLOW_FLUID_LIBRARY) rather than into this list
+LIBRARY_FLUIDS = {
+    "iso_vg_22": ("ISO VG 22 Oil", walther_oil(22.0, 4.3, 860.0)),
+    "iso_vg_68": ("ISO VG 68 Oil", walther_oil(68.0, 8.7, 880.0)),
+    "iso_vg_100": ("ISO VG 100 Oil", walther_oil(100.0, 11.2, 885.0)),
+    "hfc_46": ("HFC 46 Water-Glycol Hydraulic Fluid", aqueous(1070.0, 0.0006, 0.060, 0.012, 3300.0, 2.0, 0.60)),
+    "ethylene_glycol_30": ("Ethylene Glycol 30%", aqueous(1045.0, 0.00040, 0.0022, 0.00075, 3600.0, 3.0, 0.88)),
+    "ethylene_glycol_50": ("Ethylene Glycol 50%", aqueous(1070.0, 0.00055, 0.0040, 0.0012, 3300.0, 3.5, 0.77)),
+    "propylene_glycol_30": ("Propylene Glycol 30%", aqueous(1030.0, 0.00045, 0.0030, 0.00085, 3800.0, 2.5, 0.91)),
+    "propylene_glycol_50": ("Propylene Glycol 50%", aqueous(1045.0, 0.00060, 0.0065, 0.0015, 3500.0, 3.5, 0.83)),
+}
+
+def sample(models, t_min=LIBRARY_T_MIN, t_step=LIBRARY_T_STEP, points=LIBRARY_POINTS):
+    """Library entry of a fluid given as one model function per property."""
+    temperatures = (t_min + t_step * np.arange(points)).tolist()
+    entry = {"t_min": t_min, "t_step": t_step}
+    for name in FluidTable.PROPERTIES:
+        entry[name] = [models[name](t) for t in temperatures]
+    return entry
+
+def build_library(path=os.path.join(LIBRARY_DIR, 'library.json')):
+    """Regenerates the shipped library file from LIBRARY_FLUIDS."""
+    fluids = {}
+    for name, (label, models) in LIBRARY_FLUIDS.items():
+        fluids[name] = dict(sample(models), label=label)
+    write_library(path, fluids)
+    return path
+
+if __name__ == "__main__":
+    print(f"Wrote {build_library()}")
@@ -1,4 +1,7 @@
+import json
 import math
+import os
+import numpy as np
 
 class FluidProperties:
     """
@@ -6,6 +9,7 @@ class FluidProperties:
     Currently supports:
     - "water": Simple linear model
     - "iso_vg_46": Standard lube oil model
+    - every fluid of the fluid library (tabulated, see FluidLibrary)
     """
     
     @staticmethod
@@ -23,6 +27,9 @@ class FluidProperties:
         elif fluid_type == "iso_vg_32":
             # Typical lube oil density: 870 kg/m³ @ 15°C, alpha ~ 0.0007 /°C
             return 870.0 * (1 - 0.0007 * (t_c - 15))
+
+        elif fluid_type in fluid_library():
+            return fluid_table(fluid_type).value('density', temp_k)
         
         return 1000.0
 
@@ -55,6 +62,9 @@ class FluidProperties:
             # Convert to Pa*s: (cSt * 1e-6) * density
             density = FluidProperties.get_density(fluid_type, temp_k)
             return (nu_cst * 1e-6) * density
+
+        elif fluid_type in fluid_library():
+            return fluid_table(fluid_type).value('viscosity', temp_k)
             
         return 0.001 # Default to water @ 20°C
 
@@ -63,6 +73,9 @@ class FluidProperties:
         """
         Calculates vapor pressure in Pascals (Pa) using Antoine equation.
         """
+        if fluid_type != "water" and fluid_type in fluid_library():
+            return fluid_table(fluid_type).value('vapor_pressure', temp_k)
+
         t_c = temp_k - 273.15
         
         if fluid_type == "water" or fluid_type not in ["iso_vg_46", "iso_vg_32"]:
@@ -102,5 +115,220 @@ class FluidProperties:
             # Linear approximation: Cp = 1800 + 4.0 * (T_c - 20)
             t_c = temp_k - 273.15
             return 1860.0 + 4.0 * t_c
+
+        elif fluid_type in fluid_library():
+            return fluid_table(fluid_type).value('specific_heat', temp_k)
             
         return 2000.0 # Generic default
+
+BUILTIN_FLUIDS = ("water", "iso_vg_46", "iso_vg_32") # modelled by FluidProperties itself
+BUILTIN_LABELS = {"water": "Water (Standard)", "iso_vg_46": "ISO VG 46 Oil", "iso_vg_32": "ISO VG 32 Oil"}
+
+# Property tables: uniform temperature grid with a node exactly at the water Antoine switch (100°C)
+TABLE_T_MIN = 253.15 # K (-20°C)
+TABLE_T_MAX = 473.15 # K (200°C)
+TABLE_STEP = 0.1     # K
+
+_TABLES = {} # fluid type -> FluidTable, built on first use
+
+class FluidTable:
+    """
+    Properties of one fluid on a uniform temperature grid, for evaluating many
+    temperatures at once: each method takes an array of temperatures and
+    interpolates linearly (np.interp, ~30x cheaper per value than the scalar
+    models). `values` maps each of PROPERTIES to its column; for library
+    fluids these are read-only views of the memory-mapped library file.
+
+    The built-in fluids are sampled over TABLE_T_MIN..TABLE_T_MAX from the
+    FluidProperties models (from_models), which also serve temperatures off
+    the grid; library tables have no model and hold their end values there.
+
+    Error bounds of the sampled tables: within a cell linear interpolation is
+    off by at most h^2/8 * max|f''|, relative 4e-6 for water and 2e-5 for oil
+    viscosity at h = 0.1 K; the linear densities and specific heats are exact
+    up to rounding. Water vapour pressure switches Antoine constants at 100°C, a
+    0.55% jump the model itself has; the table puts a node on it, so only the
+    one cell below is blended (up to that jump) and the rest is within 1e-5.
+    max_error holds the relative error measured at every cell midpoint.
+
+    Scalar callers of the built-in fluids (equipment, one port at a time) keep
+    the FluidProperties models: a single Python-level lookup is no faster.
+    """
+    PROPERTIES = ('density', 'viscosity', 'vapor_pressure', 'specific_heat')
+
+    def __init__(self, fluid_type: str, t_min: float, t_step: float, values, models=None, label=None):
+        self.fluid_type = fluid_type
+        self.label = label or fluid_type
+        self.t_min = t_min
+        self.t_step = t_step
+        self.values = values
+        self.temperatures = t_min + t_step * np.arange(len(values['density']))
+        self.t_max = float(self.temperatures[-1])
+        self.models = models
+        self.max_error = {}
+
+    @classmethod
+    def from_models(cls, fluid_type: str):
+        """Table of a fluid sampled from the FluidProperties models."""
+        models = {
+            'density': FluidProperties.get_density,
+            'viscosity': FluidProperties.get_viscosity,
+            'vapor_pressure': FluidProperties.get_vapor_pressure,
+            'specific_heat': FluidProperties.get_specific_heat,
+        }
+        cells = int(round((TABLE_T_MAX - TABLE_T_MIN) / TABLE_STEP))
+        temperatures = TABLE_T_MIN + TABLE_STEP * np.arange(cells + 1)
+        midpoints = (temperatures[:-1] + 0.5 * TABLE_STEP).tolist()
+        values, max_error = {}, {}
+        for name, model in models.items():
+            values[name] = np.array([model(fluid_type, t) for t in temperatures.tolist()])
+            exact = np.array([model(fluid_type, t) for t in midpoints])
+            approx = 0.5 * (values[name][:-1] + values[name][1:])
+            max_error[name] = float(np.max(np.abs(approx - exact) / np.maximum(np.abs(exact), 1e-300)))
+        table = cls(fluid_type, TABLE_T_MIN, TABLE_STEP, values, models)
+        table.max_error = max_error
+        return table
+
+    def evaluate(self, name, temp_k):
+        """Property `name` (one of PROPERTIES) at an array of temperatures."""
+        temp_k = np.asarray(temp_k, dtype=float)
+        result = np.asarray(np.interp(temp_k, self.temperatures, self.values[name]))
+        if self.models is not None:
+            outside = (temp_k < self.t_min) | (temp_k > self.t_max)
+            if np.any(outside):
+                model = self.models[name]
+                result[outside] = [model(self.fluid_type, t) for t in temp_k[outside].tolist()]
+        return result
+
+    def value(self, name, temp_k):
+        """Property `name` at one temperature, as a float."""
+        values = self.values[name]
+        x = (temp_k - self.t_min) / self.t_step
+        if not 0.0 <= x < len(values) - 1:
+            if self.models is not None:
+                return self.models[name](self.fluid_type, temp_k)
+            return float(values[0] if x < 0.0 else values[-1])
+        i = int(x)
+        lo = float(values[i])
+        return lo + (x - i) * (float(values[i + 1]) - lo)
+
+    def density(self, temp_k):
+        return self.evaluate('density', temp_k)
+
+    def viscosity(self, temp_k):
+        return self.evaluate('viscosity', temp_k)
+
+    def vapor_pressure(self, temp_k):
+        return self.evaluate('vapor_pressure', temp_k)
+
+    def specific_heat(self, temp_k):
+        return self.evaluate('specific_heat', temp_k)
+
+# Fluid library files: <name>.json (index) next to <name>.npy (float64 array,
+# one row per property of FluidTable.PROPERTIES, fluids side by side along the columns)
+LIBRARY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fluids')
+LIBRARY_ENV = 'WALFLOW_FLUID_LIBRARY' # extra library files (os.pathsep-separated .json paths)
+
+class FluidLibrary:
+    """
+    Registry of tabulated fluids read from library files. The indexes are
+    read on the first lookup; each data file is memory-mapped read-only when
+    its first fluid is used, so solver worker processes share the pages of
+    one copy instead of each holding its own. Later files override earlier
+    entries of the same name.
+    """
+    def __init__(self, paths):
+        self.paths = list(paths)
+        self._entries = None # name -> (path, index entry)
+        self._data = {}      # path -> memory-mapped array
+
+    @classmethod
+    def default(cls):
+        """The shipped library plus the files listed in WALFLOW_FLUID_LIBRARY."""
+        paths = [os.path.join(LIBRARY_DIR, 'library.json')]
+        paths += [p for p in os.environ.get(LIBRARY_ENV, '').split(os.pathsep) if p]
+        return cls(paths)
+
+    @property
+    def entries(self):
+        if self._entries is None:
+            entries = {}
+            for path in self.paths:
+                if not os.path.exists(path):
+                    continue
+                with open(path) as f:
+                    index = json.load(f)
+                for name, entry in index["fluids"].items():
+                    entries[name] = (path, entry)
+            self._entries = entries
+        return self._entries
+
+    def __contains__(self, fluid_type):
+        return isinstance(fluid_type, str) and fluid_type in self.entries
+
+    def names(self):
+        return list(self.entries)
+
+    def label(self, fluid_type: str) -> str:
+        return self.entries[fluid_type][1].get("label", fluid_type)
+
+    def table(self, fluid_type: str) -> FluidTable:
+        path, entry = self.entries[fluid_type]
+        data = self._data.get(path)
+        if data is None:
+            data = self._data[path] = np.load(os.path.splitext(path)[0] + '.npy', mmap_mode='r')
+        start, stop = entry["columns"]
+        values = {name: data[k, start:stop] for k, name in enumerate(FluidTable.PROPERTIES)}
+        return FluidTable(fluid_type, entry["t_min"], entry["t_step"], values, label=entry.get("label"))
+
+def write_library(path, fluids):
+    """
+    Writes a library file pair (path .json and .npy). `fluids` maps a fluid
+    name to a dict with 'label', 't_min' and 't_step' (K) and one array per
+    FluidTable.PROPERTIES, all sampled on that grid.
+    """
+    index, blocks, column = {}, [], 0
+    for name, fluid in fluids.items():
+        block = np.array([fluid[prop] for prop in FluidTable.PROPERTIES], dtype=float)
+        index[name] = {"label": fluid.get("label", name), "t_min": float(fluid["t_min"]), "t_step": float(fluid["t_step"]),
+                       "columns": [column, column + block.shape[1]]}
+        blocks.append(block)
+        column += block.shape[1]
+    data = np.concatenate(blocks, axis=1) if blocks else np.empty((len(FluidTable.PROPERTIES), 0))
+    np.save(os.path.splitext(path)[0] + '.npy', data)
+    with open(path, 'w') as f:
+        json.dump({"properties": list(FluidTable.PROPERTIES), "fluids": index}, f, indent=1)
+
+_LIBRARY = None
+
+def fluid_library() -> FluidLibrary:
+    """The default FluidLibrary, created on first use."""
+    global _LIBRARY
+    if _LIBRARY is None:
+        _LIBRARY = FluidLibrary.default()
+    return _LIBRARY
+
+def fluid_table(fluid_type: str) -> FluidTable:
+    """
+    The FluidTable of a fluid type, built (or mapped from the library) once and
+    shared by every solve. Unknown names get a table of the generic defaults.
+    """
+    table = _TABLES.get(fluid_type)
+    if table is None:
+        if fluid_type not in BUILTIN_FLUIDS and fluid_type in fluid_library():
+            table = fluid_library().table(fluid_type)
+        else:
+            table = FluidTable.from_models(fluid_type)
+        _TABLES[fluid_type] = table
+    return table
+
+def fluid_names(library=None):
+    """Every selectable fluid type: the built-in models, then the library entries."""
+    library = library or fluid_library()
+    return list(BUILTIN_FLUIDS) + [name for name in library.names() if name not in BUILTIN_FLUIDS]
+
+def fluid_options(library=None):
+    """fluid_names() as {"value", "label"} pairs, for the frontend's fluid selects."""
+    library = library or fluid_library()
+    return [{"value": name, "label": BUILTIN_LABELS[name] if name in BUILTIN_FLUIDS else library.label(name)}
+            for name in fluid_names(library)]
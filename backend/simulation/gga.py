@@ -0,0 +1,163 @@
+import numpy as np
+from scipy.optimize import OptimizeResult
+from scipy.sparse import csr_matrix, diags
+
+from simulation.sparse_newton import factorize, sparse_matrix_bytes
+
+class GlobalGradient:
+    """
+    Global Gradient Algorithm (Todini & Pilati, as in EPANET) on a NetworkSolver's
+    network (solver method "gga").
+
+    The network is recast as links between junctions with known head-loss laws:
+    every edge is a link from its source's outlet to its target's inlet (pipe dP),
+    and every node with its own dP (pump, valve, orifice, filter...) is a link from
+    its inlet to its outlet. Tanks are fixed-pressure junctions; splitters and
+    mixers are plain junctions. With A the link-junction incidence and D the
+    diagonal of head-loss slopes, each iteration solves the symmetric positive
+    definite system in junction pressures
+
+        (A^T D^-1 A) h = -A^T q - A^T D^-1 (A0 h0 - f(q))
+
+    and then updates every link flow explicitly from its own head-loss law, so only
+    a node-sized matrix is ever factorized. Networks with TCVs (lagged outlet
+    pressures, inlet path losses) or embedded controls are not supported.
+    """
+    min_gradient = 1e3 # Pa per m^3/s, floor on a link's dP slope (zero at zero flow for quadratic laws)
+
+    def __init__(self, solver):
+        self.solver = solver
+        num_internal = len(solver.internal_node_indices)
+        num_edges = len(solver.edges_list)
+
+        # Junctions: internal inlets first (same order as the solver's pressure unknowns),
+        # then the outlets of nodes with their own dP. Tanks are fixed junctions.
+        self.element_nodes = np.concatenate([idx for idx, _ in solver.node_kernels]) if solver.node_kernels else np.array([], dtype=int)
+        inlet_junction = np.full(len(solver.nodes_list), -1, dtype=int)
+        inlet_junction[solver.internal_idx] = np.arange(num_internal)
+        outlet_junction = inlet_junction.copy()
+        outlet_junction[self.element_nodes] = num_internal + np.arange(len(self.element_nodes))
+        self.num_junctions = num_internal + len(self.element_nodes)
+
+        # Links: edges, then element nodes. Endpoint -1 means a fixed-pressure node.
+        up = np.concatenate([outlet_junction[solver.edge_src_idx], inlet_junction[self.element_nodes]])
+        down = np.concatenate([inlet_junction[solver.edge_tgt_idx], outlet_junction[self.element_nodes]])
+        self.num_links = num_edges + len(self.element_nodes)
+        self.link_up, self.link_down = up, down
+        links = np.arange(self.num_links)
+        has_up, has_down = up >= 0, down >= 0
+        self.incidence = csr_matrix(
+            (np.concatenate([np.ones(has_up.sum()), -np.ones(has_down.sum())]),
+             (np.concatenate([links[has_up], links[has_down]]), np.concatenate([up[has_up], down[has_down]]))),
+            shape=(self.num_links, self.num_junctions))
+        self.incidence_t = self.incidence.T.tocsr()
+
+        # Known pressures at fixed link ends (A0 h0)
+        self.fixed_up = np.where(has_up, -1, np.concatenate([solver.edge_src_idx, self.element_nodes]))
+        self.fixed_down = np.where(has_down, -1, np.concatenate([solver.edge_tgt_idx, self.element_nodes]))
+
+    @staticmethod
+    def supports(solver):
+        return not solver.tcv_node_indices and solver.embedded_control is None
+
+    def _fixed_heads(self):
+        fixed = self.solver.fixed_pressure_nodes
+        h0 = np.zeros(self.num_links)
+        for k in np.flatnonzero(self.fixed_up >= 0):
+            h0[k] += fixed[self.fixed_up[k]]
+        for k in np.flatnonzero(self.fixed_down >= 0):
+            h0[k] -= fixed[self.fixed_down[k]]
+        return h0
+
+    def _head_loss(self, q_links):
+        """Head loss f (upstream minus downstream pressure) of every link and its slope."""
+        solver = self.solver
+        num_edges = len(solver.edges_list)
+        q_edges = q_links[:num_edges]
+        density, viscosity = solver.pipe_bank.fluid_properties()
+        f = np.empty(self.num_links)
+        g = np.empty(self.num_links)
+        f[:num_edges] = solver.pipe_bank.delta_p(q_edges, density, viscosity)
+        g[:num_edges] = solver.pipe_bank.delta_p_derivative(q_edges, density, viscosity)
+        start = num_edges
+        for idx, kernel in solver.node_kernels:
+            q = q_links[start:start + len(idx)]
+            density, viscosity = kernel.fluid_properties()
+            # Pumps raise the outlet pressure (sign +1): their head loss is -dP
+            sign = solver.node_dp_sign[idx]
+            f[start:start + len(idx)] = -sign * kernel.delta_p(q, density, viscosity)
+            g[start:start + len(idx)] = -sign * kernel.delta_p_derivative(q, density, viscosity)
+            start += len(idx)
+        return f, np.maximum(g, self.min_gradient)
+
+    def solve(self, x0, tol=1e-6, max_iter=100, min_step=1e-4):
+        """
+        GGA iterations from the flows in x0 (scaled [p_internal, q_edges], as the
+        solver's residual). Convergence is judged on the solver's own residual
+        (max|F| < tol) and each update is backtracked on ||F|| like sparse_newton.
+
+        Returns a scipy OptimizeResult with x, success, message, fun, nfev, njev
+        (linear systems factorized), nit and peak_memory_bytes.
+        """
+        solver = self.solver
+        fun = solver._objective
+        num_internal = len(solver.internal_node_indices)
+        num_edges = len(solver.edges_list)
+        p_scale, q_scale = solver.p_scale, solver.q_scale
+
+        x = np.array(x0, dtype=float)
+        q_edges = x[num_internal:] * q_scale
+        q_links = np.concatenate([q_edges, (solver.inflow_matrix @ q_edges)[self.element_nodes]])
+        h0 = self._fixed_heads()
+        f_res = fun(x)
+        nfev, njev = 1, 0
+        norm = np.linalg.norm(f_res)
+        peak_bytes = 0
+        message = "Maximum number of iterations reached."
+        success = False
+
+        for it in range(max_iter):
+            if np.max(np.abs(f_res), initial=0.0) < tol:
+                success = True
+                message = "Converged."
+                break
+
+            head_loss, slope = self._head_loss(q_links)
+            inv_d = 1.0 / slope
+            c = h0 - head_loss
+            schur = (self.incidence_t @ diags(inv_d) @ self.incidence).tocsc()
+            rhs = -(self.incidence_t @ q_links) - self.incidence_t @ (inv_d * c)
+            lu, factor_bytes = factorize(schur)
+            njev += 1
+            h = lu.solve(rhs)
+            if not np.all(np.isfinite(h)):
+                message = "Singular head matrix."
+                break
+            peak_bytes = max(peak_bytes, sparse_matrix_bytes(schur) + factor_bytes + 6 * q_links.nbytes)
+            q_target = q_links + inv_d * (self.incidence @ h + c)
+            x_target = np.concatenate([h[:num_internal] / p_scale, q_target[:num_edges] / q_scale])
+
+            # Backtracking on the solver's residual
+            t = 1.0
+            accepted = False
+            while t >= min_step:
+                x_new = x + t * (x_target - x)
+                f_new = fun(x_new)
+                nfev += 1
+                norm_new = np.linalg.norm(f_new)
+                if np.isfinite(norm_new) and norm_new <= (1.0 - 1e-4 * t) * norm:
+                    accepted = True
+                    break
+                t *= 0.5
+            if not accepted:
+                message = "Line search failed to reduce the residual."
+                break
+            q_links = q_links + t * (q_target - q_links)
+            x, f_res, norm = x_new, f_new, norm_new
+        else:
+            if np.max(np.abs(f_res), initial=0.0) < tol:
+                success = True
+                message = "Converged."
+
+        return OptimizeResult(x=x, success=success, message=message, fun=f_res,
+                              nfev=nfev, njev=njev, nit=njev, peak_memory_bytes=peak_bytes)
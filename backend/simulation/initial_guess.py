@@ -0,0 +1,116 @@
+import numpy as np
+from scipy.sparse import csr_matrix, bmat
+from scipy.sparse.linalg import splu
+
+LINEAR_PASSES = 3 # Linear solves; later passes re-linearize at the flows found so far
+PUMP_DUTY_FRACTION = 0.9 # Pumps are linearized at this fraction of their rated flow
+
+class LinearizedNetwork:
+    """
+    A NetworkSolver's network with every element linearized:
+
+    - pipes and resistive equipment by their secant through the origin,
+      dP = R * Q with R = dP(Q_lin) / Q_lin (exact for laminar pipes, a fair
+      average for quadratic losses);
+    - pumps by their tangent just inside their rating, Q0 = 0.9 * flow_rated,
+      dP = dP(Q0) + dP'(Q0) * (Q - Q0) (at flow_rated itself a displacement
+      pump sits on its kink, with neither pressure nor slope).
+
+    Regulators and valves sit at their current openings, TCV inlet paths at the
+    current mix ratio, and TCV outlets pass their inlet pressure. Fluid
+    properties are those last propagated. The unknowns and equations are those
+    of the residual (internal mass balances, edge pressure balances), unscaled.
+    """
+    def __init__(self, solver, q_nominal):
+        self.solver = solver
+        self.num_internal = len(solver.internal_node_indices)
+        num_edges = len(solver.edges_list)
+        self.rows = np.arange(num_edges)
+        src, tgt = solver.edge_src_idx, solver.edge_tgt_idx
+
+        # Constant parts: pressure incidence, fixed pressures, which nodes are pumps
+        self.p_fixed = np.zeros(len(solver.nodes_list))
+        for i, p in solver.fixed_pressure_nodes.items():
+            self.p_fixed[i] = p
+        src_pos, tgt_pos = solver.internal_pos[src], solver.internal_pos[tgt]
+        has_src, has_tgt = src_pos >= 0, tgt_pos >= 0
+        rows = self.rows
+        self.pressure_block = csr_matrix((np.concatenate([np.ones(has_src.sum()), -np.ones(has_tgt.sum())]),
+                                          (np.concatenate([rows[has_src], rows[has_tgt]]),
+                                           np.concatenate([src_pos[has_src], tgt_pos[has_tgt]]))),
+                                         shape=(num_edges, self.num_internal))
+        # Every batch kernel of the solver, with which of its nodes are pumps
+        self.kernels = [(idx, kernel, solver.is_pump[idx]) for idx, kernel in solver.node_kernels]
+        self.q_nominal = q_nominal
+        self.floor = 1e-6 * q_nominal # keeps secants of idle branches finite
+
+    def assemble(self, q_lin):
+        """Sparse system matrix (CSC) and right-hand side of the network linearized at edge flows q_lin."""
+        solver = self.solver
+        num_edges = len(self.rows)
+        num_nodes = len(solver.nodes_list)
+        sign = solver.node_dp_sign
+        src, tgt = solver.edge_src_idx, solver.edge_tgt_idx
+        rows = self.rows
+
+        # Pressure balance of edge j:  p_in(src) + sign * (a + b * Q_in(src)) - p_in(tgt) - R_j * q_j = 0
+        q_abs = np.maximum(np.abs(q_lin), self.floor)
+        density, viscosity = solver.pipe_bank.fluid_properties()
+        edge_r = solver.pipe_bank.delta_p(q_abs, density, viscosity) / q_abs
+        for j, tgt_node, port_idx in solver.tcv_target_edges:
+            edge_r[j] += tgt_node.calculate_path_dp(q_abs[j], tgt_node.inlets[port_idx].density, port_idx) / q_abs[j]
+        node_q = np.maximum(np.abs(solver.inflow_matrix @ q_lin), self.floor)
+        node_a = np.zeros(num_nodes)
+        node_b = np.zeros(num_nodes)
+        for idx, kernel, is_pump in self.kernels:
+            density, viscosity = kernel.fluid_properties()
+            duty = np.array([getattr(n, 'flow_rated', 0.0) for n in kernel.nodes], dtype=float)
+            q0 = np.where(is_pump, PUMP_DUTY_FRACTION * np.where(duty > 0, duty, self.q_nominal), node_q[idx])
+            dp = kernel.delta_p(q0, density, viscosity)
+            slope = kernel.delta_p_derivative(q0, density, viscosity)
+            node_a[idx] = np.where(is_pump, dp - slope * q0, 0.0)
+            node_b[idx] = np.where(is_pump, slope, dp / q0)
+
+        # Source node's own dP responds to every flow entering it
+        coupling = csr_matrix((sign[src] * node_b[src], (rows, src)), shape=(num_edges, num_nodes)) @ solver.inflow_matrix
+        flow_block = (coupling - csr_matrix((edge_r, (rows, rows)), shape=(num_edges, num_edges))).tocsr()
+        system = bmat([[None, solver.internal_incidence], [self.pressure_block, flow_block]], format='csc')
+        rhs = np.concatenate([np.zeros(self.num_internal), -(self.p_fixed[src] + sign[src] * node_a[src] - self.p_fixed[tgt])])
+        return system, rhs
+
+def linearized_guess(solver, q_nominal, passes=LINEAR_PASSES):
+    """
+    Initial guess (initial_guess "linearized") from sparse linear solves of the
+    LinearizedNetwork.
+
+    The first pass linearizes every resistance at q_nominal. Each further pass
+    re-linearizes at the geometric mean of the last linearization flow and the
+    new solution (a variant of the linear theory method of Wood and Charles),
+    which corrects branches whose flow is far from nominal. Fluid properties are
+    propagated from the tanks once, at the nominal flow.
+
+    Returns unscaled [p_internal, q_edges], or None if the linear network is singular.
+    """
+    num_internal = len(solver.internal_node_indices)
+    network = LinearizedNetwork(solver, q_nominal)
+    floor = network.floor
+
+    q_lin = np.full(len(solver.edges_list), q_nominal)
+    solver._propagate_properties(q_lin)
+    x = None
+    for _ in range(passes):
+        system, rhs = network.assemble(q_lin)
+        try:
+            x_new = splu(system).solve(rhs)
+        except RuntimeError:
+            return x
+        if not np.all(np.isfinite(x_new)):
+            return x
+        # A quadratic loss linearized at Q_lin gives Q_new = Q*^2 / Q_lin: the geometric mean is exact
+        q_new = x_new[num_internal:]
+        q_lin = np.sign(q_new) * np.sqrt(np.maximum(np.abs(q_lin), floor) * np.abs(q_new))
+        x = x_new
+    if x is not None and len(solver.tcv_node_indices):
+        # TCV outlet pressures are lagged: start them from the guess
+        solver._update_telemetry(x[:num_internal], x[num_internal:])
+    return x
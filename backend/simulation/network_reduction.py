@@ -0,0 +1,446 @@
+import numpy as np
+
+from simulation.schemas import HydraulicNetwork
+from simulation.equipment.base_node import HydraulicNode
+from simulation.pipe_bank import PipeBank
+from simulation.batch_kernels import dp_derivative
+
+# Capability flags of the nodes that always stay in the solved system: boundary pressures,
+# controlled or lagged equipment, and pumps (their edges carry the solver's physicality check)
+KEPT_NODE_FLAGS = ('FIXED_PRESSURE', 'CONTROLLED', 'TEMPERATURE_CONTROLLED', 'PUMP')
+MIN_GRADIENT = 1e3 # Pa per m^3/s, floor on a branch slope (zero at zero flow for quadratic laws)
+
+def _port_index(port_str):
+    try:
+        return int(port_str.split('-')[-1])
+    except (ValueError, IndexError, AttributeError):
+        return 0
+
+def _copy_state(src, dst):
+    dst.take_fluid(src)
+
+def _link_ports(link):
+    """(hydraulic, thermal) property ports of a pipe or composite link."""
+    if getattr(link, 'composite', False):
+        return link.property_ports()
+    return [link.inlets[0]], link.inlets + link.outlets
+
+def _link_delta_p(link, q):
+    inlet = link.inlets[0]
+    return link.calculate_delta_p(q, inlet.density, inlet.viscosity)
+
+def _link_slope(link, q):
+    inlet = link.inlets[0]
+    return dp_derivative(link, q, inlet.density, inlet.viscosity)
+
+class CompositeLink(HydraulicNode):
+    """
+    An edge of the reduced network standing for several elements of the original
+    one. It behaves like a Pipe towards the solver (one inlet, one outlet, a dP law
+    in the edge flow and a calculate() that pushes fluid properties through), and
+    expand() writes the solved pressures and flows back onto its members.
+    """
+    composite = True
+
+    def __init__(self, name, node_type, global_settings=None):
+        super().__init__(name, node_type=node_type)
+        self.global_settings = global_settings
+        self.add_inlet()
+        self.add_outlet()
+
+    def _upstream_port(self):
+        inlet = self.inlets[0]
+        return inlet if inlet.flow_rate >= 0 else self.outlets[0]
+
+class SeriesChain(CompositeLink):
+    """
+    Links (pipes or composites) in series through pass-through nodes (one inflow,
+    one outflow: valves, orifices, filters, heat exchangers, splitters and mixers
+    left with a single branch). The chain dP is the sum of the members' dPs at the
+    common flow.
+    """
+    def __init__(self, name, links, nodes, global_settings=None):
+        super().__init__(name, "series_chain", global_settings)
+        self.links = list(links)
+        self.nodes = list(nodes) # (node, inlet index, outlet index), one between each pair of links
+        self._plain = [link for link in self.links if not getattr(link, 'composite', False)]
+        self._bank = PipeBank(self._plain) if self._plain else None
+        # All-pipe parallel sections are split together; other composites evaluate themselves
+        groups = [link for link in self.links if isinstance(link, ParallelGroup) and link.plain]
+        self._splitter = ParallelSplit(groups) if groups else None
+        self._composites = [link for link in self.links if getattr(link, 'composite', False) and link not in groups]
+        self._resistances = [node for node, _, _ in self.nodes if hasattr(node, 'calculate_delta_p')]
+        # Visit order: link, node, link, ..., link
+        self._steps = [(self.links[0], None)]
+        for node_step, link in zip(self.nodes, self.links[1:]):
+            self._steps += [(None, node_step), (link, None)]
+
+    def refresh(self):
+        if self._bank is not None:
+            self._bank.refresh()
+        if self._splitter is not None:
+            self._splitter.refresh()
+        for link in self._composites:
+            link.refresh()
+
+    def calculate_delta_p(self, flow_rate, density=None, viscosity=None):
+        """Sum of member dPs; each member uses the fluid state at its own inlet."""
+        dp = 0.0
+        if self._bank is not None:
+            rho, mu = self._bank.fluid_properties()
+            dp += float(np.sum(self._bank.delta_p(np.full(len(self._bank), flow_rate), rho, mu)))
+        if self._splitter is not None:
+            dp += float(np.sum(self._splitter.solve(np.full(len(self._splitter.groups), flow_rate))[1]))
+        for link in self._composites:
+            dp += link.calculate_delta_p(flow_rate)
+        for node in self._resistances:
+            dp += _link_delta_p(node, flow_rate)
+        return dp
+
+    def calculate_delta_p_derivative(self, flow_rate, density=None, viscosity=None):
+        slope = 0.0
+        if self._bank is not None:
+            rho, mu = self._bank.fluid_properties()
+            slope += float(np.sum(self._bank.delta_p_derivative(np.full(len(self._bank), flow_rate), rho, mu)))
+        if self._splitter is not None:
+            slope += float(np.sum(1.0 / self._splitter.solve(np.full(len(self._splitter.groups), flow_rate))[2]))
+        for link in self._composites:
+            slope += link.calculate_delta_p_derivative(flow_rate)
+        for node in self._resistances:
+            slope += _link_slope(node, flow_rate)
+        return slope
+
+    def calculate(self):
+        """Pushes temperature, density and viscosity through the members in flow order (as the solver's propagation)."""
+        q = self.inlets[0].flow_rate
+        self.outlets[0].flow_rate = q
+        forward = q >= 0
+        state = self._upstream_port()
+        for link, node_step in (self._steps if forward else reversed(self._steps)):
+            if link is not None:
+                link.inlets[0].flow_rate = q
+                link.outlets[0].flow_rate = q
+                port = link.inlets[0] if forward else link.outlets[0]
+                _copy_state(state, port)
+                link.calculate()
+                state = link.outlets[0] if forward else link.inlets[0]
+                continue
+            node, in_idx, out_idx = node_step
+            for p in node.inlets + node.outlets:
+                p.flow_rate = 0.0
+            node.inlets[in_idx].flow_rate = q
+            node.outlets[out_idx].flow_rate = q
+            # Seed the far port too: a junction left with a single inflow passes the state through
+            _copy_state(state, node.inlets[in_idx])
+            _copy_state(state, node.outlets[out_idx])
+            if hasattr(node, 'calculate_temperature'):
+                node.calculate_temperature()
+            node.calculate()
+            state = node.outlets[out_idx] if forward else node.inlets[in_idx]
+        _copy_state(state, self.outlets[0] if forward else self.inlets[0])
+
+    def expand(self):
+        """Walks the solved inlet pressure down the chain at the solved flow."""
+        q = self.inlets[0].flow_rate
+        p = self.inlets[0].pressure
+        for k, link in enumerate(self.links):
+            link.inlets[0].pressure = p
+            link.inlets[0].flow_rate = q
+            link.outlets[0].flow_rate = q
+            if getattr(link, 'composite', False):
+                link.expand()
+                p = link.outlets[0].pressure
+            else:
+                p -= _link_delta_p(link, q)
+                link.outlets[0].pressure = p
+            if k < len(self.nodes):
+                node = self.nodes[k][0]
+                for port in node.inlets: port.pressure = p
+                if hasattr(node, 'calculate_delta_p'):
+                    p -= _link_delta_p(node, q)
+                for port in node.outlets: port.pressure = p
+        self.outlets[0].pressure = p
+
+    def property_ports(self):
+        hydraulic, thermal = [], self.inlets + self.outlets
+        for link in self.links:
+            h, t = _link_ports(link)
+            hydraulic += h
+            thermal += t
+        for node, _, _ in self.nodes:
+            if hasattr(node, 'calculate_delta_p'):
+                hydraulic.append(node.inlets[0])
+            thermal += node.inlets + node.outlets
+        return hydraulic, thermal
+
+def _newton_split(flows, q, branch_dp, starts, owner, max_iter=50):
+    """
+    Newton on the common dP of parallel branches: with branch dPs dp_i and slopes
+    g_i at the current flows,  dP = (Q - sum(q_i - dp_i / g_i)) / sum(1 / g_i)  and
+    q_i += (dP - dp_i) / g_i. Several groups (branches starts[k]..) are solved at
+    once. Returns branch flows, the common dP of each group and sum(1 / g_i).
+    """
+    for _ in range(max_iter):
+        dp, slope = branch_dp(q)
+        inv = 1.0 / np.maximum(slope, MIN_GRADIENT)
+        sum_inv = np.add.reduceat(inv, starts)
+        dp_common = (flows - np.add.reduceat(q - dp * inv, starts)) / sum_inv
+        gap = dp_common[owner] - dp
+        if np.all(np.abs(gap) <= 1e-6 + 1e-10 * np.abs(dp)):
+            break
+        q = q + gap * inv
+    return q, dp_common, sum_inv
+
+class ParallelSplit:
+    """
+    Joint flow split of several all-pipe ParallelGroups, evaluated over one PipeBank
+    of their branches (a SeriesChain through many parallel sections splits them all
+    in one vectorized Newton). The last result is reused while flows and fluid
+    properties are unchanged (dP and slope are asked for at the same point).
+    """
+    def __init__(self, groups):
+        self.groups = list(groups)
+        sizes = [len(g.branches) for g in self.groups]
+        self.starts = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(int)
+        self.ends = self.starts + np.array(sizes, dtype=int)
+        self.owner = np.repeat(np.arange(len(self.groups)), sizes)
+        self.bank = PipeBank([b for g in self.groups for b in g.branches])
+        self._last = None
+
+    def refresh(self):
+        self.bank.refresh()
+        self._last = None
+
+    def solve(self, flows):
+        flows = np.asarray(flows, dtype=float)
+        rho, mu = self.bank.fluid_properties()
+        key = (flows.tobytes(), rho.tobytes(), mu.tobytes())
+        if self._last is not None and self._last[0] == key:
+            return self._last[1]
+        fractions = np.concatenate([g.split for g in self.groups])
+        branch_dp = lambda q: (self.bank.delta_p(q, rho, mu), self.bank.delta_p_derivative(q, rho, mu))
+        result = _newton_split(flows, fractions * flows[self.owner], branch_dp, self.starts, self.owner)
+        q = result[0]
+        for k, g in enumerate(self.groups):
+            if abs(flows[k]) > 1e-12:
+                g.split = q[self.starts[k]:self.ends[k]] / flows[k]
+        self._last = (key, result)
+        return result
+
+class ParallelGroup(CompositeLink):
+    """
+    Links joining the same pair of nodes. The total flow is split so that every
+    branch has the same dP (Newton on the common dP, warm-started from the last
+    split). The group slope is that of conductances in parallel, 1 / sum(1 / g_i).
+    """
+    def __init__(self, name, branches, global_settings=None):
+        super().__init__(name, "parallel_group", global_settings)
+        self.branches = list(branches)
+        self.split = np.full(len(self.branches), 1.0 / len(self.branches)) # last flow fractions
+        self.plain = not any(getattr(b, 'composite', False) for b in self.branches)
+        self._splitter = None # ParallelSplit of a standalone all-pipe group, built on first use
+
+    def refresh(self):
+        if self._splitter is not None:
+            self._splitter.refresh()
+        for link in self.branches:
+            if getattr(link, 'composite', False):
+                link.refresh()
+
+    def _branch_dp(self, q):
+        dp = np.array([_link_delta_p(b, qb) for b, qb in zip(self.branches, q)])
+        slope = np.array([_link_slope(b, qb) for b, qb in zip(self.branches, q)])
+        return dp, slope
+
+    def _solve_split(self, flow_rate):
+        """Branch flows, common dP and sum of inverse branch slopes at the total flow."""
+        if self.plain:
+            if self._splitter is None:
+                self._splitter = ParallelSplit([self])
+            q, dp, sum_inv = self._splitter.solve([flow_rate])
+            return q, dp[0], sum_inv[0]
+        starts = np.array([0])
+        owner = np.zeros(len(self.branches), dtype=int)
+        q, dp, sum_inv = _newton_split(np.array([flow_rate]), self.split * flow_rate, self._branch_dp, starts, owner)
+        if abs(flow_rate) > 1e-12:
+            self.split = q / flow_rate
+        return q, dp[0], sum_inv[0]
+
+    def calculate_delta_p(self, flow_rate, density=None, viscosity=None):
+        _, dp, _ = self._solve_split(flow_rate)
+        return dp
+
+    def calculate_delta_p_derivative(self, flow_rate, density=None, viscosity=None):
+        _, _, sum_inv = self._solve_split(flow_rate)
+        return 1.0 / sum_inv
+
+    def calculate(self):
+        """
+        Pushes the fluid state through every branch at the last solved split and
+        mixes the branch outputs by mass flow.
+        """
+        q_total = self.inlets[0].flow_rate
+        self.outlets[0].flow_rate = q_total
+        forward = q_total >= 0
+        state = self._upstream_port()
+        outputs = []
+        for link, qb in zip(self.branches, self.split * q_total):
+            link.inlets[0].flow_rate = qb
+            link.outlets[0].flow_rate = qb
+            _copy_state(state, link.inlets[0] if forward else link.outlets[0])
+            link.calculate()
+            outputs.append((abs(qb), link.outlets[0] if forward else link.inlets[0]))
+        target = self.outlets[0] if forward else self.inlets[0]
+        weights = [qb * port.density for qb, port in outputs]
+        total = sum(weights)
+        if total <= 1e-12:
+            _copy_state(outputs[0][1], target)
+            return
+        target.temperature = sum(w * port.temperature for w, (_, port) in zip(weights, outputs)) / total
+        target.density = sum(w * port.density for w, (_, port) in zip(weights, outputs)) / total
+        target.viscosity = sum(w * port.viscosity for w, (_, port) in zip(weights, outputs)) / total
+
+    def expand(self):
+        """Branch pressures and flows at the last solved split (the solver's final residual call)."""
+        q_total = self.inlets[0].flow_rate
+        p = self.inlets[0].pressure
+        drops = []
+        for link, qb in zip(self.branches, self.split * q_total):
+            link.inlets[0].pressure = p
+            link.inlets[0].flow_rate = qb
+            link.outlets[0].flow_rate = qb
+            if getattr(link, 'composite', False):
+                link.expand()
+            else:
+                link.outlets[0].pressure = p - _link_delta_p(link, qb)
+            drops.append(p - link.outlets[0].pressure)
+        self.outlets[0].pressure = p - sum(drops) / len(drops)
+
+    def property_ports(self):
+        hydraulic, thermal = [], self.inlets + self.outlets
+        for link in self.branches:
+            h, t = _link_ports(link)
+            hydraulic += h
+            thermal += t
+        return hydraulic, thermal
+
+class NetworkReduction:
+    """
+    Series/parallel reduction of a HydraulicNetwork (GlobalSettings.network_reduction).
+
+    Edges joining the same two nodes are folded into a ParallelGroup, and chains
+    through pass-through nodes are merged into a SeriesChain, repeatedly until
+    nothing changes; each eliminated node removes a pressure and a flow unknown.
+    `reduced` is a network over the same node objects (minus the eliminated ones)
+    whose composite edges the solver treats as pipes. After a solve, expand()
+    writes pressures, flows and port states back onto every original element, so
+    telemetry built from the original network is complete.
+    """
+    def __init__(self, network: HydraulicNetwork):
+        self.network = network
+        gs = network.global_settings
+        sensed = {getattr(node, 'remote_sensing_config', None)['node_id'] for node in network.nodes.values()
+                  if getattr(node, 'remote_sensing_config', None)}
+        self._candidates = {node_id for node_id, node in network.nodes.items()
+                            if not any(getattr(node, flag) for flag in KEPT_NODE_FLAGS) and node_id not in sensed}
+        self.eliminated = set()
+        self.composites = []
+
+        edges = list(network.edges)
+        while True:
+            folded = self._fold_parallel(edges, gs)
+            merged = self._merge_series(edges, gs)
+            if not (folded or merged):
+                break
+
+        nodes = {node_id: node for node_id, node in network.nodes.items() if node_id not in self.eliminated}
+        self.reduced = HydraulicNetwork(nodes=nodes, edges=edges, global_settings=gs, pipe_bank=PipeBank.from_edges(edges))
+
+    @staticmethod
+    def _edge_id(edge):
+        return str(edge.get('id', edge['pipe'].name))
+
+    def _fold_parallel(self, edges, gs):
+        groups = {}
+        for edge in edges:
+            target = self.network.nodes[edge['target']]
+            port = edge.get('target_port', 'inlet-0') if target.TEMPERATURE_CONTROLLED else None
+            groups.setdefault((edge['source'], edge['target'], port), []).append(edge)
+        folded = False
+        result = []
+        for (source, target, _), group in groups.items():
+            if len(group) == 1 or source == target:
+                result += group
+                continue
+            edge_id = "|".join(self._edge_id(e) for e in group)
+            link = ParallelGroup(edge_id, [e['pipe'] for e in group], gs)
+            self.composites.append(link)
+            result.append({**{k: v for k, v in group[0].items() if k not in ('id', 'pipe', 'label')}, 'id': edge_id, 'pipe': link})
+            folded = True
+        edges[:] = result
+        return folded
+
+    def _merge_series(self, edges, gs):
+        incoming, outgoing = {}, {}
+        for edge in edges:
+            outgoing.setdefault(edge['source'], []).append(edge)
+            incoming.setdefault(edge['target'], []).append(edge)
+        passing = {node_id for node_id in self._candidates - self.eliminated
+                   if len(incoming.get(node_id, [])) == 1 and len(outgoing.get(node_id, [])) == 1
+                   and incoming[node_id][0] is not outgoing[node_id][0]}
+
+        merged = False
+        for start in list(edges):
+            if start['target'] not in passing or start['source'] in passing:
+                continue
+            chain, node_ids = [start], []
+            while chain[-1]['target'] in passing:
+                node_ids.append(chain[-1]['target'])
+                chain.append(outgoing[node_ids[-1]][0])
+            if chain[-1]['target'] == start['source']:
+                continue # a loop back to its own start node
+            nodes = [(self.network.nodes[node_id], _port_index(chain[k].get('target_port', 'inlet-0')),
+                      _port_index(chain[k + 1].get('source_port', 'outlet-0')))
+                     for k, node_id in enumerate(node_ids)]
+            edge_id = "+".join(self._edge_id(e) for e in chain)
+            link = SeriesChain(edge_id, [e['pipe'] for e in chain], nodes, gs)
+            self.composites.append(link)
+            merged_edge = {'id': edge_id, 'source': start['source'], 'target': chain[-1]['target'], 'pipe': link,
+                           'source_port': start.get('source_port', 'outlet-0'),
+                           'target_port': chain[-1].get('target_port', 'inlet-0')}
+            drop = {id(e) for e in chain}
+            edges[:] = [merged_edge if e is start else e for e in edges if e is start or id(e) not in drop]
+            self.eliminated.update(node_ids)
+            merged = True
+        return merged
+
+    def expand(self):
+        """Writes the solution of the reduced network back onto every original element."""
+        for edge in self.reduced.edges:
+            if getattr(edge['pipe'], 'composite', False):
+                edge['pipe'].expand()
+
+        # Port flows of every node from the original edges; an eliminated node's
+        # port fed by a single pipe also takes that pipe's fluid state.
+        nodes = self.network.nodes
+        for node in nodes.values():
+            for port in node.inlets + node.outlets:
+                port.flow_rate = 0.0
+        feeds = {}
+        for edge in self.network.edges:
+            pipe = edge['pipe']
+            q = pipe.inlets[0].flow_rate
+            src, tgt = nodes[edge['source']], nodes[edge['target']]
+            src_idx = _port_index(edge.get('source_port', 'outlet-0'))
+            tgt_idx = _port_index(edge.get('target_port', 'inlet-0'))
+            if src_idx < len(src.outlets):
+                src.outlets[src_idx].flow_rate += q
+                if edge['source'] in self.eliminated and q < 0:
+                    feeds.setdefault(id(src.outlets[src_idx]), []).append((pipe.inlets[0], src.outlets[src_idx]))
+            if tgt_idx < len(tgt.inlets):
+                tgt.inlets[tgt_idx].flow_rate += q
+                if edge['target'] in self.eliminated and q >= 0:
+                    feeds.setdefault(id(tgt.inlets[tgt_idx]), []).append((pipe.outlets[0], tgt.inlets[tgt_idx]))
+        for pairs in feeds.values():
+            if len(pairs) == 1:
+                _copy_state(*pairs[0])
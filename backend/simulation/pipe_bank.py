@@ -0,0 +1,112 @@
+import numpy as np
+
+from simulation.state_arena import PortGroup, DENSITY, VISCOSITY
+
+DEFAULT_ROUGHNESS = 0.000045 # 0.045mm (Standard Steel)
+
+class PipeBank:
+    """
+    Struct-of-arrays view of every hydraulic edge's Pipe, so Darcy-Weisbach
+    friction, Reynolds number and pressure drop are evaluated for all edges in one
+    NumPy pass instead of one Python call per pipe.
+
+    Entry j corresponds to network.edges[j]. The formulas are exactly those of
+    Pipe.calculate_delta_p / calculate_delta_p_derivative (laminar 64/Re below
+    Re = 2300, Swamee-Jain above). Composite links of a reduced network (see
+    simulation.network_reduction) are evaluated by their own methods.
+    """
+    def __init__(self, pipes):
+        self.pipes = list(pipes)
+        self.inlet_ports = PortGroup(p.inlets[0] for p in self.pipes)
+        self.refresh()
+
+    @classmethod
+    def from_edges(cls, edges):
+        return cls(edge['pipe'] for edge in edges)
+
+    def refresh(self):
+        """Re-reads geometry and roughness from the Pipe objects and rebuilds the derived arrays."""
+        # Composite entries get a zero-length placeholder; their dP is added per object
+        self.composites = [j for j, p in enumerate(self.pipes) if getattr(p, 'composite', False)]
+        for j in self.composites:
+            self.pipes[j].refresh()
+        plain = [not getattr(p, 'composite', False) for p in self.pipes]
+        for p, is_pipe in zip(self.pipes, plain):
+            if is_pipe:
+                p.invalidate_coefficients() # the scalar model's compiled roughness term, too
+        self.length = np.array([p.length if is_pipe else 0.0 for p, is_pipe in zip(self.pipes, plain)], dtype=float)
+        self.diameter = np.array([p.diameter if is_pipe else 1.0 for p, is_pipe in zip(self.pipes, plain)], dtype=float)
+        self.roughness = np.array([
+            getattr(p.global_settings, 'global_roughness', DEFAULT_ROUGHNESS) if p.global_settings else DEFAULT_ROUGHNESS
+            for p in self.pipes
+        ], dtype=float)
+        self.valid = bool(np.all(self.diameter > 0))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.area = np.pi * (self.diameter / 2)**2
+            self.rel_roughness = self.roughness / self.diameter
+            # Delta P = f * k_geom * rho * Q|Q|  with  k_geom = (L/D) / (2 * A^2)
+            self.k_geom = (self.length / self.diameter) / (2 * self.area**2)
+            # Laminar: Delta P = k_lam * mu * Q  with  k_lam = 32 * L / (D^2 * A)
+            self.k_lam = 32.0 * self.length / (self.diameter**2 * self.area)
+            # Re = re_coeff * rho * |Q| / mu  with  re_coeff = D / A
+            self.re_coeff = self.diameter / self.area
+
+    def __len__(self):
+        return len(self.pipes)
+
+    def fluid_properties(self):
+        """Inlet density and viscosity of every pipe (as set by property propagation)."""
+        return self.inlet_ports.get(DENSITY), self.inlet_ports.get(VISCOSITY)
+
+    def property_ports(self):
+        """Ports whose density/viscosity enter delta_p, and every port carrying a temperature."""
+        hydraulic, thermal = [], []
+        for p in self.pipes:
+            if getattr(p, 'composite', False):
+                h, t = p.property_ports()
+            else:
+                h, t = [p.inlets[0]], p.inlets + p.outlets
+            hydraulic += h
+            thermal += t
+        return hydraulic, thermal
+
+    def _regimes(self, flow_rate, density, viscosity):
+        if not self.valid:
+            raise ValueError("Pipe diameter must be strictly positive.")
+        abs_q = np.abs(flow_rate)
+        has_mu = viscosity > 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            re = np.where(has_mu, self.re_coeff * density * abs_q / viscosity, 0.0)
+        turbulent = has_mu & (re >= 2300)
+        return abs_q, re, has_mu, turbulent
+
+    def _swamee_jain(self, re, turbulent):
+        """Friction factor and log10 term on the turbulent entries (re elsewhere is ignored)."""
+        re_t = np.where(turbulent, re, 2300.0)
+        x = self.rel_roughness / 3.7 + 5.74 / re_t**0.9
+        log_x = np.log10(x)
+        return 0.25 / log_x**2, x, log_x, re_t
+
+    def delta_p(self, flow_rate, density, viscosity):
+        """Vectorized Pipe.calculate_delta_p for every edge."""
+        abs_q, re, has_mu, turbulent = self._regimes(flow_rate, density, viscosity)
+        f, _, _, _ = self._swamee_jain(re, turbulent)
+        dp_turb = f * self.k_geom * density * flow_rate * abs_q
+        dp_lam = self.k_lam * viscosity * flow_rate
+        dp = np.where(turbulent, dp_turb, np.where(has_mu, dp_lam, 0.0))
+        for j in self.composites:
+            dp[j] = self.pipes[j].calculate_delta_p(flow_rate[j], density[j], viscosity[j])
+        return dp
+
+    def delta_p_derivative(self, flow_rate, density, viscosity):
+        """Vectorized Pipe.calculate_delta_p_derivative for every edge."""
+        abs_q, re, has_mu, turbulent = self._regimes(flow_rate, density, viscosity)
+        f, x, log_x, re_t = self._swamee_jain(re, turbulent)
+        df_dre = (-0.5 / log_x**3) / (x * np.log(10)) * (-0.9 * 5.74 * re_t**-1.9)
+        d_turb = self.k_geom * density * (2 * f * abs_q + abs_q * re_t * df_dre)
+        d_lam = self.k_lam * viscosity
+        slope = np.where(turbulent, d_turb, np.where(has_mu, d_lam, 0.0))
+        for j in self.composites:
+            slope[j] = self.pipes[j].calculate_delta_p_derivative(flow_rate[j], density[j], viscosity[j])
+        return slope
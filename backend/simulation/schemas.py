@@ -1,30 +1,84 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 import uuid
+from array import array
 
-class Port(BaseModel):
+from simulation.state_arena import PORT_FIELDS, PORT_DEFAULTS, PRESSURE, FLOW_RATE, TEMPERATURE, DENSITY, VISCOSITY
+
+def _state_field(col, doc):
+    def get(self, col=col):
+        return self._state[col]
+    def set(self, value, col=col):
+        self._state[col] = value
+    return property(get, set, doc=doc)
+
+class Port:
     """
     A Port represents a physical connection point on a piece of equipment.
-    We use Pydantic (BaseModel) here because it automatically validates data types,
-    which will prevent crashes when the React frontend sends us text instead of numbers.
+    Its state lives in one row of a StateArena (see simulation.state_arena): the
+    attributes below read and write that row, so a whole network's port state
+    is one contiguous array the solver can gather and scatter in one go. A new
+    port is detached (_arena is None, its row a small buffer of its own) until
+    StateArena.attach() gathers the ports of its network.
     """
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    __slots__ = ('_id', 'connected_to_port_id', '_arena', '_row', '_state')
 
     # State Variables (Using SI Units as standard: Pascals, m^3/s, kg/m^3)
-    pressure: float = 101325.0  # Default to 1 atm (atmospheric pressure)
-    flow_rate: float = 0.0      # Volumetric flow rate (Q)
-    temperature: float = 293.15 # Kelvin (Default to 20°C)
+    pressure = _state_field(PRESSURE, "Pa, default 1 atm")
+    flow_rate = _state_field(FLOW_RATE, "Volumetric flow rate (Q), m^3/s")
+    temperature = _state_field(TEMPERATURE, "Kelvin (Default to 20°C)")
 
     # Fluid Properties (Defaulting to water at standard conditions)
-    density: float = 1000.0     
-    viscosity: float = 0.001    
+    density = _state_field(DENSITY, "kg/m^3")
+    viscosity = _state_field(VISCOSITY, "Pa.s")
+
+    def __init__(self, id: Optional[str] = None, connected_to_port_id: Optional[str] = None, **state: float):
+        unknown = set(state) - set(PORT_FIELDS)
+        if unknown:
+            raise TypeError(f"Port got unexpected state fields {sorted(unknown)}")
+        self._id = id
+        # Network Tracking: Which port on another piece of equipment is this connected to?
+        self.connected_to_port_id = connected_to_port_id
+        self._arena = self._row = None
+        self._state = memoryview(array('d', [float(state.get(name, default)) for name, default in zip(PORT_FIELDS, PORT_DEFAULTS)]))
+
+    @property
+    def id(self) -> str:
+        # Drawn on first use: most ports are never addressed by id
+        if self._id is None:
+            self._id = str(uuid.uuid4())
+        return self._id
+
+    def take_fluid(self, other: "Port"):
+        """Takes temperature, density and viscosity of another port (one slice copy of the state row)."""
+        self._state[TEMPERATURE:] = other._state[TEMPERATURE:]
+
+    def dict(self) -> Dict[str, Any]:
+        """Same keys as the former pydantic model (telemetry)."""
+        return {"id": self.id, **dict(zip(PORT_FIELDS, self._state.tolist())), "connected_to_port_id": self.connected_to_port_id}
+
+    model_dump = dict
+
+    def __getstate__(self):
+        # A detached port carries its own row
+        values = self._state.tolist() if self._arena is None else None
+        return (self._id, self.connected_to_port_id, self._arena, self._row, values)
+
+    def __setstate__(self, state):
+        self._id, self.connected_to_port_id, self._arena, self._row, values = state
+        if self._arena is None:
+            self._state = memoryview(array('d', values))
+        # The arena rebinds its ports when it is restored; it may come after this port
+        elif hasattr(self._arena, '_flat'):
+            self._state = self._arena.view(self._row)
 
-    # Network Tracking: Which port on another piece of equipment is this connected to?
-    connected_to_port_id: Optional[str] = None
+    def __repr__(self):
+        fields = ", ".join(f"{name}={value!r}" for name, value in zip(PORT_FIELDS, self._state.tolist()))
+        return f"Port({fields})"
 
 class GlobalSettings(BaseModel):
     """Global simulation parameters."""
-    fluid_type: str = "water"
+    fluid_type: str = "water" # built-in model or fluid library entry (fluid_utils.fluid_names)
     ambient_temperature: float = 293.15 # 20°C
     atmospheric_pressure: float = 101325.0
     global_roughness: float = 0.000045 # 0.045mm (Standard Steel)
@@ -32,7 +86,17 @@ class GlobalSettings(BaseModel):
     tolerance: float = 1e-6
     inner_iterations: int = 1000 # Max steps for the hydraulic solver (HYBR/LM)
     control_iterations: int = 100 # Max steps for the regulator control loop
-    solver_method: str = "hybr" # "hybr" or "lm"
+    control_mode: str = "outer_loop" # "outer_loop": regulators/TCVs adjusted between hydraulic solves; "embedded": openings and mix ratios solved as Newton unknowns
+    initial_guess: str = "linearized" # "linearized": linear solves with every element linearized at its nominal/duty flow; "flat": mean tank pressure and one flow everywhere
+    solver_method: str = "hybr" # "hybr", "lm", "sparse_newton" (large networks), "gga" (Global Gradient, looped networks), "domain_decomposition" (very large networks, see parallel_workers) "continuation" (homotopy from the linearized network, hard-to-converge networks) or "trf" (bounded trust region: pressures >= -1 bar, pump flows >= 0 throughout)
+    property_coupling: str = "coupled" # "coupled": properties propagated in every residual; "picard": frozen per hydraulic solve, updated in an outer loop
+    property_tolerance: float = 0.01 # K, outer-loop temperature convergence (Picard)
+    isothermal: bool = False # Skip the thermal pass: every port takes the first tank's fluid state
+    scaling: str = "adaptive" # "adaptive": rows and unknowns equilibrated from the element slopes at the start point (see simulation.equilibration); "fixed": bar and L/s throughout
+    tree_solver: bool = True # Loop-free networks are solved exactly by the tree path solver instead of solver_method (not when solve() is given a method)
+    component_decomposition: bool = True # Solve independent circuits (meeting only at tanks) as separate systems
+    parallel_workers: int = 1 # Processes for solving independent circuits (and domain_decomposition subdomains); 1 solves them one after another in this process
+    network_reduction: bool = False # Merge series chains and parallel edges before solving; results are expanded back to every element
 
 class ReactFlowNode(BaseModel):
     """Represents a node from React Flow."""
@@ -67,3 +131,5 @@ class HydraulicNetwork(BaseModel):
     nodes: Dict[str, Any]  # ID -> HydraulicNode
     edges: List[Dict[str, Any]]  # List of: {'source': id, 'target': id, 'pipe': Pipe, 'source_port': str, 'target_port': str}
     global_settings: Optional[GlobalSettings] = None
+    pipe_bank: Optional[Any] = None  # PipeBank over edges[*]['pipe'] (vectorized friction)
+    state: Optional[Any] = None  # StateArena holding every node and pipe port (attached by NetworkSolver)
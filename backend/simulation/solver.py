@@ -2,28 +2,60 @@ import numpy as np
 import math
 import time
 from scipy.optimize import root
+from scipy.sparse import csr_matrix, identity
+from scipy.sparse.linalg import splu
+from scipy.sparse.csgraph import connected_components
 from typing import List, Dict, Any, Tuple
 
 from simulation.schemas import HydraulicNetwork
 from simulation.equipment.base_node import HydraulicNode
 from simulation.equipment.tank import Tank
 from simulation.equipment.pipe import Pipe
-from simulation.equipment.centrifugal_pump import CentrifugalPump
-from simulation.equipment.volumetric_pump import VolumetricPump
-from simulation.equipment.linear_control_valve import LinearControlValve
-from simulation.equipment.linear_regulator import LinearRegulator
-from simulation.equipment.remote_control_valve import RemoteControlValve
-from simulation.equipment.orifice import Orifice
-from simulation.equipment.heat_exchanger import HeatExchanger
-from simulation.equipment.filter import Filter
-from simulation.equipment.three_way_tcv import ThreeWayTCV
 from simulation.fluid_utils import FluidProperties
+from simulation.sparse_newton import sparse_newton, chord_newton, bounded_trust_region
+from simulation.equilibration import Equilibration, condition_estimate
+from simulation.pipe_bank import PipeBank
+from simulation.state_arena import StateArena, PortGroup, network_ports, PRESSURE, FLOW_RATE, TEMPERATURE, DENSITY, VISCOSITY
+from simulation.batch_kernels import kernel_for
+from simulation.embedded_control import EmbeddedControl
+from simulation.gga import GlobalGradient
+from simulation.tree_solver import TreeSolver
+from simulation.domain_decomposition import DomainDecomposition
+from simulation.initial_guess import linearized_guess
+from simulation.continuation import Continuation
+from simulation.network_reduction import NetworkReduction
+from simulation.components import (split_components, shared_tanks, sum_tank_flows, copy_network_state,
+                                   solve_component, process_pool, merge_stats)
+
+MIN_PRESSURE = -100000.0 # Pa, lowest pressure accepted at an internal node
+EQUILIBRATED_ACCEPT = 100.0 # An equilibrated solve must reach max|F| < EQUILIBRATED_ACCEPT * tolerance in the fixed scaling
 
 class NetworkSolver:
     """
     Final Network Solver with Live Diagnostics and 3-Way TCV Support.
     """
     def __init__(self, network: HydraulicNetwork):
+        gs = getattr(network, 'global_settings', None)
+        # Every port in one state arena; components and reduced networks share its rows
+        network.state = StateArena.attach(network_ports(network))
+        # Independent circuits: one solver per hydraulic component (see simulation.components)
+        self.components = None
+        if gs and getattr(gs, 'component_decomposition', True):
+            parts = split_components(network)
+            if len(parts) > 1:
+                self.network = network
+                self.components = [NetworkSolver(part) for part in parts]
+                self._shared_tanks = shared_tanks(network, parts)
+                return
+
+        # Series/parallel reduction: solve a smaller network, expand onto this one afterwards
+        self.reduction = None
+        if gs and getattr(gs, 'network_reduction', False):
+            reduction = NetworkReduction(network)
+            if reduction.composites:
+                self.reduction = reduction
+                network = reduction.reduced
+                network.state = StateArena.attach(network_ports(network))
         self.network = network
         self.nodes_list = list(network.nodes.values())
         self.node_ids = list(network.nodes.keys())
@@ -36,18 +68,177 @@ class NetworkSolver:
         self.tcv_node_indices = []     # Thermal mixing valves
         
         self.last_prop_iters = 0
+        self.property_outer_iterations = 0
+        self.properties_frozen = False # Picard mode: the residual does not re-propagate properties
+        self._isothermal_applied = False
+        self.initial_guess_used = None # "linearized", "flat" or "warm_start" (last solve)
+        self.backend = None # Hydraulic backend of the last core solve ("tree", "hybr", ...; before any lm fallback)
+        self.last_solution = None # [p_internal, q_edges] of the last successful solve
+        self.jacobian_evaluations = 0
+        self.peak_memory_bytes = 0
+        self.continuation_stats = None # Homotopy path of the last solve (solver method "continuation")
+        self._chord_lu = None # LU of the Jacobian reused by the chord (resolve) path
+        self._chord_equilibration = None # Equilibration the chord LU was factorized under
+        self.jacobian_condition = None # Condition estimate of the Jacobian at the last solution
+        self._final_x_scaled = None # Scaled unknowns of the last core solution
+        self._gga = None # GlobalGradient link/junction structure, built on first use
+        self._tree = None # TreeSolver path structure (False if the network has loops), built on first use
+        self._domains = None # DomainDecomposition partition (False if it cannot be cut), built on first use
+
+        # Unknown scaling: pressures in bar, flows in L/s
+        self.p_scale = 100000.0
+        self.q_scale = 0.001
         
+        # Index sets from the nodes' static capability flags (see HydraulicNode)
         for i, node in enumerate(self.nodes_list):
-            if isinstance(node, Tank):
-                self.fixed_pressure_nodes[i] = node.calculate()
+            if node.FIXED_PRESSURE:
+                self.fixed_pressure_nodes[i] = None
             else:
                 self.internal_node_indices.append(i)
-                if isinstance(node, (LinearRegulator, RemoteControlValve)):
+                if node.CONTROLLED:
                     self.control_node_indices.append(i)
-                if isinstance(node, ThreeWayTCV):
+                if node.TEMPERATURE_CONTROLLED:
                     self.tcv_node_indices.append(i)
 
-    def solve(self, method=None):
+        self._apply_tank_boundaries()
+        self._build_incidence()
+
+        # All edge pipes evaluated in one vectorized pass (built here for hand-assembled networks)
+        self.pipe_bank = getattr(network, 'pipe_bank', None)
+        if self.pipe_bank is None or len(self.pipe_bank) != len(self.edges_list):
+            self.pipe_bank = PipeBank.from_edges(self.edges_list)
+        self._build_node_kernels()
+        self._embed_controls = False # control_mode "embedded" for the current solve
+        self.embedded_control = None # EmbeddedControl of the current core solve
+        self.control_residual = 0.0  # largest residual of the last embedded core solve
+
+    def _build_incidence(self):
+        """
+        Builds the sparse node-edge incidence once, so the residual never has to
+        scan the edge list to find which flows enter or leave a node.
+        inflow[i, j] = 1 if edge j ends at node i, outflow[i, j] = 1 if it starts there.
+        """
+        num_nodes = len(self.nodes_list)
+        num_edges = len(self.edges_list)
+        self.edge_src_idx = np.array([self.node_id_to_idx[e['source']] for e in self.edges_list], dtype=int)
+        self.edge_tgt_idx = np.array([self.node_id_to_idx[e['target']] for e in self.edges_list], dtype=int)
+        self.internal_idx = np.array(self.internal_node_indices, dtype=int)
+
+        edge_cols = np.arange(num_edges)
+        ones = np.ones(num_edges)
+        self.inflow_matrix = csr_matrix((ones, (self.edge_tgt_idx, edge_cols)), shape=(num_nodes, num_edges))
+        self.outflow_matrix = csr_matrix((ones, (self.edge_src_idx, edge_cols)), shape=(num_nodes, num_edges))
+        # Net inflow per internal node (mass balance rows)
+        self.internal_incidence = (self.inflow_matrix - self.outflow_matrix).tocsr()[self.internal_idx]
+
+        # Node masks from the capability flags, used by the residual, Jacobian and propagation
+        self.is_tank = np.array([n.FIXED_PRESSURE for n in self.nodes_list], dtype=bool)
+        self.is_pump = np.array([n.PUMP for n in self.nodes_list], dtype=bool)
+        self.is_tcv = np.array([n.TEMPERATURE_CONTROLLED for n in self.nodes_list], dtype=bool)
+
+        # Only nodes that feed an edge need an outlet pressure in the residual
+        self.source_node_indices = np.unique(self.edge_src_idx)
+        self.pump_edge_mask = self.is_pump[self.edge_src_idx]
+        self.tcv_target_edges = []
+        for j in np.flatnonzero(self.is_tcv[self.edge_tgt_idx]).tolist():
+            port_idx = self._parse_port_idx(self.edges_list[j].get('target_port', 'inlet-0'))
+            self.tcv_target_edges.append((j, self.nodes_list[self.edge_tgt_idx[j]], port_idx))
+
+        # Port handles used by property propagation
+        self.edge_src_port = [self._parse_port_idx(e.get('source_port', 'outlet-0')) for e in self.edges_list]
+        self.edge_tgt_port = [self._parse_port_idx(e.get('target_port', 'inlet-0')) for e in self.edges_list]
+        self._order_cache = {}
+
+        # Edges touching each node, in edge-list order (used by property propagation)
+        self.node_incident_edges = [[] for _ in range(num_nodes)]
+        for j in range(num_edges):
+            src, tgt = self.edge_src_idx[j], self.edge_tgt_idx[j]
+            self.node_incident_edges[src].append(j)
+            if tgt != src:
+                self.node_incident_edges[tgt].append(j)
+
+        self._build_jacobian_structure()
+
+    def _build_jacobian_structure(self):
+        """
+        Precomputes the sparsity pattern of the residual Jacobian.
+        Unknowns are [internal inlet pressures, edge flows]; rows are
+        [internal mass balances, edge pressure balances]. Only the values of the
+        flow-dependent entries change between evaluations.
+        """
+        num_internal = len(self.internal_node_indices)
+        num_edges = len(self.edges_list)
+        self.internal_pos = np.full(len(self.nodes_list), -1, dtype=int)
+        self.internal_pos[self.internal_idx] = np.arange(num_internal)
+
+        # Sign of the node's own dP in its outlet pressure: +1 pumps, -1 resistances, 0 none
+        self.node_dp_sign = np.zeros(len(self.nodes_list))
+        for i, node in enumerate(self.nodes_list):
+            if node.FIXED_PRESSURE or node.MULTI_PORT:
+                continue
+            if node.PUMP:
+                self.node_dp_sign[i] = 1.0
+            elif hasattr(node, 'calculate_delta_p'):
+                self.node_dp_sign[i] = -1.0
+
+        # 1. Mass balance rows (constant)
+        mass = self.internal_incidence.tocoo()
+        rows = [mass.row]
+        cols = [num_internal + mass.col]
+        vals = [5.0 * mass.data]
+
+        # 2. Pressure balance rows: +1 on the source inlet pressure (its outlet follows it),
+        # -1 on the target inlet pressure. A TCV outlet is lagged, so it has no entry.
+        edge_rows = num_internal + np.arange(num_edges)
+        src_pos = self.internal_pos[self.edge_src_idx]
+        has_src = (src_pos >= 0) & ~self.is_tcv[self.edge_src_idx]
+        tgt_pos = self.internal_pos[self.edge_tgt_idx]
+        has_tgt = tgt_pos >= 0
+        rows += [edge_rows[has_src], edge_rows[has_tgt]]
+        cols += [src_pos[has_src], tgt_pos[has_tgt]]
+        vals += [np.ones(has_src.sum()), -np.ones(has_tgt.sum())]
+        self._jac_const = (np.concatenate(rows), np.concatenate(cols), np.concatenate(vals))
+
+        # Variable entries: the edge's own dP slope, then the source node's dP slope
+        # with respect to every flow entering that node.
+        coupling_rows, coupling_cols, coupling_nodes = [], [], []
+        inflow_csr = self.inflow_matrix.tocsr()
+        for j in range(num_edges):
+            src = self.edge_src_idx[j]
+            if self.node_dp_sign[src] == 0.0:
+                continue
+            for k in inflow_csr.indices[inflow_csr.indptr[src]:inflow_csr.indptr[src + 1]]:
+                coupling_rows.append(num_internal + j)
+                coupling_cols.append(num_internal + k)
+                coupling_nodes.append(src)
+        self._jac_coupling = (np.array(coupling_rows, dtype=int), np.array(coupling_cols, dtype=int), np.array(coupling_nodes, dtype=int))
+
+    def _build_node_kernels(self):
+        """
+        Groups the nodes whose own dP enters the residual by equipment class, so each
+        group is evaluated by one batch kernel (see simulation.batch_kernels).
+        """
+        groups = {}
+        for i in self.source_node_indices:
+            if self.node_dp_sign[i] != 0.0:
+                groups.setdefault(type(self.nodes_list[i]), []).append(i)
+        self.node_kernels = []
+        for cls, indices in groups.items():
+            kernel = kernel_for(cls)([self.nodes_list[i] for i in indices])
+            self.node_kernels.append((np.array(indices, dtype=int), kernel))
+        self.tcv_source_indices = self.source_node_indices[self.is_tcv[self.source_node_indices]]
+
+    def solve(self, method=None, warm_start=None):
+        """
+        Solves the network. warm_start is a state from export_state() (e.g. the last
+        converged solve of the same topology, see simulation.warm_start); when given,
+        pressures, flows and control positions start from it instead of the flat guess.
+        Without a method (or with "auto"), loop-free networks take the tree path solver
+        when GlobalSettings.tree_solver is on, others GlobalSettings.solver_method; an
+        explicit method is always used. stats["backend"] reports which one ran.
+        """
+        if self.components:
+            return self._solve_components(method=method, warm_start=warm_start)
         start_time = time.perf_counter()
         max_outer_iterations = 100
         tolerance_bar = 0.001 
@@ -58,7 +249,7 @@ class NetworkSolver:
             max_outer_iterations = getattr(gs, 'control_iterations', 100)
         
         if method is None:
-            method = getattr(gs, 'solver_method', 'hybr') if gs else 'hybr'
+            method = 'auto'
 
         final_sol_x = None
         num_int = 0
@@ -66,17 +257,42 @@ class NetworkSolver:
         outer_iterations = 0
         fallback_triggered = False
         
-        x_start = self._generate_initial_guess()
+        # Tank levels may have been edited since the solver was built
+        self._apply_tank_boundaries()
+        # Pipe geometry or roughness may have been edited since the bank was built
+        self.pipe_bank.refresh()
 
-        # Reset control positions
-        for idx in self.control_node_indices:
-            self.nodes_list[idx].opening_pct = 50.0
-        for idx in self.tcv_node_indices:
-            self.nodes_list[idx].mix_ratio = 0.5
+        self._reset_controls()
+        self._embed_controls = bool(gs) and getattr(gs, 'control_mode', 'outer_loop') == 'embedded'
+
+        warm_started = False
+        x_start = None
+        if warm_start:
+            x_start = self._apply_warm_start(warm_start)
+            warm_started = x_start is not None
+        if warm_started:
+            self.initial_guess_used = 'warm_start'
+        else:
+            # Openings, clogging etc. may have changed since the kernels were built
+            for _, kernel in self.node_kernels:
+                kernel.refresh()
+            x_start = self._generate_initial_guess()
 
         solve_error = None
         last_residuals = None
+        self.jacobian_evaluations = 0
+        self.peak_memory_bytes = 0
+        self.continuation_stats = None
+        self.jacobian_condition = None
+        self._final_x_scaled = None
+        self.property_outer_iterations = 0
+        self._isothermal_applied = False
 
+        prev_tcv_p_out = None
+        # From the flat guess, settle the hydraulics at the initial positions before embedding
+        embed_pending = self._embed_controls and not warm_started
+        if embed_pending:
+            self._embed_controls = False
         for it in range(max_outer_iterations):
             outer_iterations += 1
             try:
@@ -86,79 +302,46 @@ class NetworkSolver:
                 if fallback: fallback_triggered = True
                 x_start = final_sol_x
             except ValueError as e:
+                if self.embedded_control:
+                    # Embedded set points did not converge: continue with the outer control loop
+                    self._embed_controls = False
+                    self.embedded_control = None
+                    fallback_triggered = True
+                    self._reset_controls()
+                    continue
                 solve_error = str(e)
                 break
             
-            max_err_bar = 0.0
-            max_err_temp = 0.0
-
-            # 1. Pressure Regulators
-            for idx in self.control_node_indices:
-                node = self.nodes_list[idx]
-                if isinstance(node, LinearRegulator):
-                    sensed = node.inlets[0].pressure if node.backpressure else node.outlets[0].pressure
-                    sensed_at_outlet = not node.backpressure
-                elif isinstance(node, RemoteControlValve):
-                    sensed = 0.0
-                    config = node.remote_sensing_config
-                    if config and config["node_id"] in self.network.nodes:
-                        remote_node = self.network.nodes[config["node_id"]]
-                        port_type = config["port_type"]
-                        port_idx = config["port_idx"]
-                        if port_type == "inlet" and port_idx < len(remote_node.inlets):
-                            sensed = remote_node.inlets[port_idx].pressure
-                        elif port_type == "outlet" and port_idx < len(remote_node.outlets):
-                            sensed = remote_node.outlets[port_idx].pressure
-                        else:
-                            sensed = node.outlets[0].pressure
-                    else:
-                        sensed = node.outlets[0].pressure
-                    node.sensed_pressure = sensed
-                    sensed_at_outlet = not node.backpressure
-                
-                error_bar = abs(sensed - node.set_pressure) / 100000.0
-                max_err_bar = max(max_err_bar, error_bar)
-                
-                current_dp = (node.inlets[0].pressure - node.outlets[0].pressure)
-                target_dp = current_dp + (sensed - node.set_pressure) if sensed_at_outlet else current_dp + (node.set_pressure - sensed)
-                
-                rho = node.inlets[0].density
-                q = node.inlets[0].flow_rate
-                abs_q = abs(q)
-                K_CV_SI = 1.732e9
-                min_dp = (K_CV_SI * rho * q * abs_q) / (node.max_cv**2) if abs_q > 0 else 0
-                
-                if target_dp <= min_dp or abs_q < 1e-8:
-                    target_opening = 100.0
-                else:
-                    cv_req = math.sqrt((K_CV_SI * rho * q**2) / max(1.0, target_dp))
-                    target_opening = (cv_req / node.max_cv) * 100.0
-                
-                node.opening_pct = node.opening_pct + 0.6 * (target_opening - node.opening_pct)
-                node.opening_pct = max(0.1, min(100.0, node.opening_pct))
-
-            # 2. 3-Way Thermal Control Valves
-            # Physical Direction: The mix_ratio is tied STRICTLY to the user-selected HOT port.
-            # If Too Hot (t_err > 0) -> we MUST close the HOT port (decrease mix_ratio).
-            for idx in self.tcv_node_indices:
-                node = self.nodes_list[idx]
-                t_out = node.outlets[0].temperature
-                t_err = t_out - node.set_temperature
-                max_err_temp = max(max_err_temp, abs(t_err))
-                
-                # Fixed Direction: 
-                # mix_ratio = 1.0 means Hot Port is wide open.
-                # Too Hot (t_err > 0) -> decrease mix_ratio.
-                # Too Cold (t_err < 0) -> increase mix_ratio.
-                direction = -1.0
-                
-                # Use a small damping factor (0.01) for thermal stability
-                adjustment = direction * 0.01 * t_err
-                node.mix_ratio = max(0.001, min(0.999, node.mix_ratio + adjustment))
+            if embed_pending:
+                self._embed_controls = True
+                embed_pending = False
+                continue
+            if self.embedded_control:
+                # Set points were solved with the hydraulics; only report what the valves sense.
+                # TCV outlet pressures are lagged, so repeat until they settle.
+                self._update_controls(adjust=False)
+                tcv_p_out = np.array([self.nodes_list[i].outlets[0].pressure for i in self.tcv_node_indices])
+                settled = prev_tcv_p_out is not None and np.max(np.abs(tcv_p_out - prev_tcv_p_out), initial=0.0) < tolerance_bar * 100000.0
+                prev_tcv_p_out = tcv_p_out
+                if not settled and self.tcv_node_indices:
+                    continue
+                if self.control_residual < 1e-3:
+                    break
+                # Set points missed: continue with the outer control loop from here
+                self._embed_controls = False
+                self.embedded_control = None
+                fallback_triggered = True
+                continue
+            max_err_bar, max_err_temp = self._update_controls()
 
             if max_err_bar < tolerance_bar and max_err_temp < tolerance_temp:
                 break
 
+        self.last_solution = final_sol_x if solve_error is None else None
+        if solve_error is None and self._final_x_scaled is not None:
+            self.jacobian_condition = self._condition_estimate()
+        if self.reduction and solve_error is None:
+            self.reduction.expand()
         bottleneck = self._identify_bottleneck(last_residuals) if last_residuals is not None else None
         stats = {
             "success": solve_error is None,
@@ -166,13 +349,187 @@ class NetworkSolver:
             "time_ms": (time.perf_counter() - start_time) * 1000,
             "outer_iterations": outer_iterations,
             "total_inner_iterations": total_inner_iterations,
+            "jacobian_evaluations": self.jacobian_evaluations,
+            "peak_memory_kb": self.peak_memory_bytes / 1024.0,
             "property_iterations": self.last_prop_iters,
+            "property_outer_iterations": self.property_outer_iterations,
             "fallback_used": fallback_triggered,
+            "warm_start": warm_started,
+            "initial_guess": self.initial_guess_used,
+            "backend": self.backend,
+            "continuation": self.continuation_stats,
+            "jacobian_condition": self.jacobian_condition,
             "system_size": len(self.internal_node_indices) + len(self.edges_list),
             "bottleneck": bottleneck
         }
         return stats
 
+    def _reset_controls(self):
+        for idx in self.control_node_indices:
+            self.nodes_list[idx].opening_pct = 50.0
+        for idx in self.tcv_node_indices:
+            self.nodes_list[idx].mix_ratio = 0.5
+
+    def _update_controls(self, adjust=True):
+        """
+        Outer-loop control step: moves regulator openings (0.6 relaxation towards the
+        opening that meets the set point at the current flow) and TCV mix ratios
+        (0.01 gain on the temperature error). Returns the largest pressure (bar) and
+        temperature (K) set-point errors; with adjust=False only the errors (and the
+        remote valves' sensed pressures) are updated.
+        """
+        max_err_bar = 0.0
+        max_err_temp = 0.0
+
+        # 1. Pressure Regulators
+        for idx in self.control_node_indices:
+            node = self.nodes_list[idx]
+            if not node.REMOTE_SENSING:
+                sensed = node.inlets[0].pressure if node.backpressure else node.outlets[0].pressure
+                sensed_at_outlet = not node.backpressure
+            else:
+                sensed = 0.0
+                config = node.remote_sensing_config
+                if config and config["node_id"] in self.network.nodes:
+                    remote_node = self.network.nodes[config["node_id"]]
+                    port_type = config["port_type"]
+                    port_idx = config["port_idx"]
+                    if port_type == "inlet" and port_idx < len(remote_node.inlets):
+                        sensed = remote_node.inlets[port_idx].pressure
+                    elif port_type == "outlet" and port_idx < len(remote_node.outlets):
+                        sensed = remote_node.outlets[port_idx].pressure
+                    else:
+                        sensed = node.outlets[0].pressure
+                else:
+                    sensed = node.outlets[0].pressure
+                node.sensed_pressure = sensed
+                sensed_at_outlet = not node.backpressure
+            
+            error_bar = abs(sensed - node.set_pressure) / 100000.0
+            max_err_bar = max(max_err_bar, error_bar)
+            if not adjust:
+                continue
+            
+            current_dp = (node.inlets[0].pressure - node.outlets[0].pressure)
+            target_dp = current_dp + (sensed - node.set_pressure) if sensed_at_outlet else current_dp + (node.set_pressure - sensed)
+            
+            rho = node.inlets[0].density
+            q = node.inlets[0].flow_rate
+            abs_q = abs(q)
+            K_CV_SI = 1.732e9
+            min_dp = (K_CV_SI * rho * q * abs_q) / (node.max_cv**2) if abs_q > 0 else 0
+            
+            if target_dp <= min_dp or abs_q < 1e-8:
+                target_opening = 100.0
+            else:
+                cv_req = math.sqrt((K_CV_SI * rho * q**2) / max(1.0, target_dp))
+                target_opening = (cv_req / node.max_cv) * 100.0
+            
+            node.opening_pct = node.opening_pct + 0.6 * (target_opening - node.opening_pct)
+            node.opening_pct = max(0.1, min(100.0, node.opening_pct))
+
+        # 2. 3-Way Thermal Control Valves
+        # Physical Direction: The mix_ratio is tied STRICTLY to the user-selected HOT port.
+        # If Too Hot (t_err > 0) -> we MUST close the HOT port (decrease mix_ratio).
+        for idx in self.tcv_node_indices:
+            node = self.nodes_list[idx]
+            t_out = node.outlets[0].temperature
+            t_err = t_out - node.set_temperature
+            max_err_temp = max(max_err_temp, abs(t_err))
+            if not adjust:
+                continue
+            
+            # Fixed Direction: 
+            # mix_ratio = 1.0 means Hot Port is wide open.
+            # Too Hot (t_err > 0) -> decrease mix_ratio.
+            # Too Cold (t_err < 0) -> increase mix_ratio.
+            direction = -1.0
+            
+            # Use a small damping factor (0.01) for thermal stability
+            adjustment = direction * 0.01 * t_err
+            node.mix_ratio = max(0.001, min(0.999, node.mix_ratio + adjustment))
+        return max_err_bar, max_err_temp
+
+    def resolve(self, warm_start=None):
+        """
+        Fast re-solve after parameter-only edits (valve openings, filter clogging, tank
+        levels, pump ratings; see GraphParser.apply_parameter_updates). Starts from the
+        last solution and control positions and takes chord Newton steps with the last
+        Jacobian factorization, refactorizing only when convergence slows (on radial
+        networks, the tree solver's path Jacobian). Without a previous solution this is solve(warm_start=warm_start).
+        """
+        if self.components:
+            return self._solve_components(warm_start=warm_start, resolve=True)
+        state = self.export_state()
+        if state is None:
+            return self.solve(warm_start=warm_start)
+        return self.solve(method='chord', warm_start=state)
+
+    def _solve_components(self, method=None, warm_start=None, resolve=False):
+        """
+        Solves (or re-solves) every independent component, in a process pool when
+        GlobalSettings.parallel_workers > 1, and merges their stats (per-component
+        stats under "components"). Telemetry lands on this network's own objects.
+        """
+        start_time = time.perf_counter()
+        gs = self.network.global_settings
+        workers = min(getattr(gs, 'parallel_workers', 1), len(self.components))
+        if workers > 1:
+            pool = process_pool(workers)
+            futures = []
+            for component in self.components:
+                state = component.export_state() if resolve else None
+                futures.append(pool.submit(solve_component, component.network, method,
+                                           state if state is not None else warm_start, state is not None))
+            component_stats = []
+            for component, future in zip(self.components, futures):
+                stats, last_solution, solved = future.result()
+                copy_network_state(solved, component.network)
+                component.last_solution = last_solution
+                component_stats.append(stats)
+        elif resolve:
+            component_stats = [component.resolve(warm_start=warm_start) for component in self.components]
+        else:
+            component_stats = [component.solve(method=method, warm_start=warm_start) for component in self.components]
+        sum_tank_flows(self.network, self._shared_tanks)
+        return merge_stats(component_stats, (time.perf_counter() - start_time) * 1000)
+
+    def export_state(self) -> Dict[str, Any]:
+        """
+        Converged state of the last successful solve, keyed by node/edge id so it can
+        seed a solver built from a fresh parse of the same topology. None if no solve succeeded.
+        """
+        if self.components:
+            states = [component.export_state() for component in self.components]
+            if any(state is None for state in states):
+                return None
+            return {key: {k: v for state in states for k, v in state[key].items()} for key in states[0]}
+        if self.last_solution is None:
+            return None
+        num_internal = len(self.internal_node_indices)
+        x = self.last_solution
+        return {
+            "pressures": {self.node_ids[i]: float(x[k]) for k, i in enumerate(self.internal_node_indices)},
+            "flows": {str(edge.get('id', j)): float(x[num_internal + j]) for j, edge in enumerate(self.edges_list)},
+            "openings": {self.node_ids[i]: float(self.nodes_list[i].opening_pct) for i in self.control_node_indices},
+            "mix_ratios": {self.node_ids[i]: float(self.nodes_list[i].mix_ratio) for i in self.tcv_node_indices},
+        }
+
+    def _apply_warm_start(self, state):
+        """Restores control positions from a warm-start state and returns its x, or None if it does not match this network."""
+        try:
+            p = [state["pressures"][self.node_ids[i]] for i in self.internal_node_indices]
+            q = [state["flows"][str(edge.get('id', j))] for j, edge in enumerate(self.edges_list)]
+        except KeyError:
+            return None
+        for i in self.control_node_indices:
+            if self.node_ids[i] in state.get("openings", {}):
+                self.nodes_list[i].opening_pct = state["openings"][self.node_ids[i]]
+        for i in self.tcv_node_indices:
+            if self.node_ids[i] in state.get("mix_ratios", {}):
+                self.nodes_list[i].mix_ratio = state["mix_ratios"][self.node_ids[i]]
+        return np.array(p + q, dtype=float)
+
     def _identify_bottleneck(self, residuals) -> Dict[str, Any]:
         if residuals is None or len(residuals) == 0: return None
         abs_res = np.abs(residuals)
@@ -183,11 +540,22 @@ class NetworkSolver:
             node_idx = self.internal_node_indices[max_idx]
             node = self.nodes_list[node_idx]
             return {"type": "Node", "name": node.name, "error_type": "Mass Balance", "magnitude": max_val}
+        elif max_idx >= num_internal + len(self.edges_list):
+            control_nodes = self.control_node_indices + self.tcv_node_indices
+            node = self.nodes_list[control_nodes[max_idx - num_internal - len(self.edges_list)]]
+            return {"type": "Node", "name": node.name, "error_type": "Set Point", "magnitude": max_val}
         else:
             edge_idx = max_idx - num_internal
             edge = self.edges_list[edge_idx]
             return {"type": "Connection", "name": edge.get('label') or edge.get('id'), "error_type": "Pressure Balance", "magnitude": max_val}
 
+    def _nominal_flow(self):
+        """Flow scale of the network: the first pump's rated flow, else 5 L/s."""
+        for node in self.nodes_list:
+            if hasattr(node, 'flow_rated') and node.flow_rated > 0:
+                return node.flow_rated
+        return 0.005
+
     def _generate_initial_guess(self):
         num_internal = len(self.internal_node_indices)
         num_edges = len(self.edges_list)
@@ -195,140 +563,464 @@ class NetworkSolver:
         if self.nodes_list and self.nodes_list[0].global_settings:
             atm_p = getattr(self.nodes_list[0].global_settings, 'atmospheric_pressure', 101325.0)
         avg_p = np.mean(list(self.fixed_pressure_nodes.values())) if self.fixed_pressure_nodes else atm_p
-        q_guess_base = 0.005
-        for node in self.nodes_list:
-            if hasattr(node, 'flow_rated') and node.flow_rated > 0:
-                q_guess_base = node.flow_rated
-                break
+        q_guess_base = self._nominal_flow()
+        # Linearized network solve (see simulation.initial_guess); the flat guess if it is singular
+        gs = getattr(self.network, 'global_settings', None)
+        if num_edges and (getattr(gs, 'initial_guess', 'linearized') if gs else 'linearized') == 'linearized':
+            x = linearized_guess(self, q_guess_base)
+            if x is not None:
+                self.initial_guess_used = 'linearized'
+                return x
+        self.initial_guess_used = 'flat'
         return np.concatenate([np.full(num_internal, avg_p), np.full(num_edges, q_guess_base)])
 
     def _solve_hydraulics_core(self, method='hybr', x0_custom=None) -> Tuple[np.ndarray, int, int, bool, np.ndarray]:
+        gs = getattr(self.network, 'global_settings', None)
+        if gs and getattr(gs, 'property_coupling', 'coupled') == 'picard' and not self.properties_frozen:
+            return self._solve_hydraulics_picard(method, x0_custom)
         num_internal = len(self.internal_node_indices)
         num_edges = len(self.edges_list)
         if (num_internal + num_edges) == 0: return np.array([]), 0, 0, False, np.array([])
 
-        p_scale = 100000.0
-        q_scale = 0.001
+        p_scale = self.p_scale
+        q_scale = self.q_scale
+        num_hydraulic = num_internal + num_edges
         
         if x0_custom is not None:
-            x0 = np.concatenate([x0_custom[:num_internal] / p_scale, x0_custom[num_internal:] / q_scale])
+            x0 = np.concatenate([x0_custom[:num_internal] / p_scale, x0_custom[num_internal:num_hydraulic] / q_scale])
         else:
             x0_raw = self._generate_initial_guess()
             x0 = np.concatenate([x0_raw[:num_internal] / p_scale, x0_raw[num_internal:] / q_scale])
 
-        def objective(x_scaled):
-            p_in_internal = x_scaled[:num_internal] * p_scale
-            q_edges = x_scaled[num_internal:] * q_scale
-            self._propagate_properties(q_edges)
-            p_in_all = np.zeros(len(self.nodes_list))
-            for i, p in self.fixed_pressure_nodes.items(): p_in_all[i] = p
-            for i, idx in enumerate(self.internal_node_indices): p_in_all[idx] = p_in_internal[i]
-            
-            residuals = []
-            # 1. Mass Balance
-            for i, node_idx in enumerate(self.internal_node_indices):
-                node_id = self.node_ids[node_idx]
-                q_in = sum(q_edges[j] for j, e in enumerate(self.edges_list) if e['target'] == node_id)
-                q_out = sum(q_edges[j] for j, e in enumerate(self.edges_list) if e['source'] == node_id)
-                residuals.append(5.0 * (q_in - q_out) / q_scale)
-            
-            # 2. Pressure Balance
-            for j, edge in enumerate(self.edges_list):
-                src_id = edge['source']
-                tgt_id = edge['target']
-                src_idx = self.node_id_to_idx[src_id]
-                tgt_idx = self.node_id_to_idx[tgt_id]
-                src_node = self.nodes_list[src_idx]
-                
-                if isinstance(src_node, ThreeWayTCV):
-                    p_src_out = src_node.outlets[0].pressure
-                else:
-                    q_in_node = sum(q_edges[k] for k, e in enumerate(self.edges_list) if e['target'] == src_id)
-                    q_out_node = sum(q_edges[k] for k, e in enumerate(self.edges_list) if e['source'] == src_id)
-                    p_src_out = self._get_node_p_out(src_node, p_in_all[src_idx], q_in_node, q_out_node)
-                
-                if isinstance(self.network.nodes[tgt_id], ThreeWayTCV):
-                    tgt_node = self.network.nodes[tgt_id]
-                    port_idx = self._parse_port_idx(edge.get('target_port', 'inlet-0'))
-                    dp_tcv = tgt_node.calculate_path_dp(q_edges[j], tgt_node.inlets[port_idx].density, port_idx)
-                    dp_pipe = edge['pipe'].calculate_delta_p(q_edges[j], edge['pipe'].inlets[0].density, edge['pipe'].inlets[0].viscosity)
-                    residuals.append(((p_src_out - p_in_all[tgt_idx]) - (dp_pipe + dp_tcv)) / p_scale)
-                else:
-                    dp_pipe = edge['pipe'].calculate_delta_p(q_edges[j], edge['pipe'].inlets[0].density, edge['pipe'].inlets[0].viscosity)
-                    residuals.append(((p_src_out - p_in_all[tgt_idx]) - dp_pipe) / p_scale)
-            return np.array(residuals)
-
-        def is_physical(x_scaled):
-            q_edges = x_scaled[num_internal:] * q_scale
-            p_nodes = x_scaled[:num_internal] * p_scale
-            if np.any(p_nodes < -100000.0): return False
-            for j, edge in enumerate(self.edges_list):
-                src_node = self.network.nodes[edge['source']]
-                if isinstance(src_node, (CentrifugalPump, VolumetricPump)):
-                    if q_edges[j] < -1e-6: return False
-            return True
+        # Openings, clogging etc. may have changed since the last core solve
+        for _, kernel in self.node_kernels:
+            kernel.refresh()
+
+        # Embedded control: openings and mix ratios join the unknowns
+        self.embedded_control = None
+        if self._embed_controls and (self.control_node_indices or self.tcv_node_indices):
+            self.embedded_control = EmbeddedControl(self)
+            x0 = np.concatenate([x0, self.embedded_control.initial()])
+        if self._chord_lu is not None and self._chord_lu.shape[0] != len(x0):
+            self._chord_lu = None
 
+        is_physical = self._is_physical
         gs = getattr(self.network, 'global_settings', None)
         inner_max_steps = getattr(gs, 'inner_iterations', 1000) if gs else 1000
+        tolerance = getattr(gs, 'tolerance', 1e-6) if gs else 1e-6
         fallback_used = False
-        sol = root(objective, x0, method=method, options={'maxfev': inner_max_steps})
-        if method == 'hybr' and (not sol.success or not is_physical(sol.x)):
+        # Loop-free networks: exact path solve unless a method was requested (a chord
+        # re-solve after a tree solve reuses the path Jacobian)
+        warm_tree = method == 'chord' and self.backend == 'tree'
+        if method == 'auto' or warm_tree:
+            if (getattr(gs, 'tree_solver', True) if gs else True) and self._radial_solver() is not None:
+                method = 'tree'
+            elif method == 'auto':
+                method = getattr(gs, 'solver_method', 'hybr') if gs else 'hybr'
+        if method == 'gga' and not GlobalGradient.supports(self):
+            method = 'sparse_newton'
+        if method == 'domain_decomposition' and self._domain_solver() is None:
+            method = 'sparse_newton'
+        self.backend = method
+
+        # Adaptive scaling: the generic backends iterate on y = x / C with residual R F(x)
+        equilibration = None
+        if method == 'chord' and self._chord_lu is not None:
+            equilibration = self._chord_equilibration
+        elif (getattr(gs, 'scaling', 'adaptive') if gs else 'adaptive') == 'adaptive' and method not in ('tree', 'gga', 'domain_decomposition', 'continuation'):
+            equilibration = Equilibration(self._jacobian(x0))
+            self.jacobian_evaluations += 1
+        objective, sparse_jacobian = self._objective, self._jacobian
+        if equilibration is not None:
+            objective, sparse_jacobian = equilibration.wrap(self._objective, self._jacobian)
+            x0 = equilibration.to_equilibrated(x0)
+        to_x = equilibration.from_equilibrated if equilibration is not None else (lambda y: y)
+
+        def jacobian(x_scaled):
+            # MINPACK works on dense matrices; the sparse form is kept for the other backends
+            return sparse_jacobian(x_scaled).toarray()
+
+        if method == 'tree':
+            sol = self._tree.solve(x0, tol=tolerance, max_iter=inner_max_steps, warm=warm_tree)
+            self.peak_memory_bytes = max(self.peak_memory_bytes, sol.peak_memory_bytes)
+        elif method == 'gga':
+            if self._gga is None:
+                self._gga = GlobalGradient(self)
+            sol = self._gga.solve(x0, tol=tolerance, max_iter=inner_max_steps)
+            self.peak_memory_bytes = max(self.peak_memory_bytes, sol.peak_memory_bytes)
+        elif method == 'domain_decomposition':
+            workers = getattr(gs, 'parallel_workers', 1) if gs else 1
+            sol = self._domains.solve(x0, tol=tolerance, max_iter=inner_max_steps, workers=workers)
+            self.peak_memory_bytes = max(self.peak_memory_bytes, sol.peak_memory_bytes)
+        elif method == 'continuation':
+            sol = Continuation(self, self._nominal_flow()).solve(x0, tol=tolerance, max_iter=inner_max_steps)
+            self.peak_memory_bytes = max(self.peak_memory_bytes, sol.peak_memory_bytes)
+            path = self.continuation_stats or {"steps": 0, "rejected_steps": 0, "path_length": 0.0, "time_ms": 0.0}
+            for key in path:
+                path[key] += sol[key]
+            self.continuation_stats = path
+        elif method == 'trf':
+            lower, upper = self._physical_bounds(len(x0))
+            if equilibration is not None:
+                lower, upper = equilibration.to_equilibrated(lower), equilibration.to_equilibrated(upper)
+            sol = bounded_trust_region(objective, sparse_jacobian, x0, lower, upper, tol=tolerance, max_iter=inner_max_steps)
+            self.peak_memory_bytes = max(self.peak_memory_bytes, sol.peak_memory_bytes)
+        elif method == 'sparse_newton':
+            sol = sparse_newton(objective, sparse_jacobian, x0, tol=tolerance, max_iter=inner_max_steps)
+            self.peak_memory_bytes = max(self.peak_memory_bytes, sol.peak_memory_bytes)
+        elif method == 'chord':
+            sol = chord_newton(objective, sparse_jacobian, x0, lu=self._chord_lu, tol=tolerance, max_iter=inner_max_steps)
+            self._chord_lu = sol.lu if sol.success else None
+            self._chord_equilibration = equilibration
+            self.peak_memory_bytes = max(self.peak_memory_bytes, sol.peak_memory_bytes)
+        else:
+            sol = root(objective, x0, jac=jacobian, method=method, options={'maxfev': inner_max_steps} if method == 'hybr' else {'maxiter': inner_max_steps})
+            self.peak_memory_bytes = max(self.peak_memory_bytes, self._dense_solver_bytes(len(x0), method))
+        self.jacobian_evaluations += getattr(sol, 'njev', 0)
+        x = to_x(sol.x)
+        needs_fallback = method in ('hybr', 'sparse_newton', 'chord', 'gga', 'tree', 'domain_decomposition', 'continuation') and (not sol.success or not is_physical(x))
+        if method == 'trf':
+            # Iterates are physical by construction; only a stall inside the bounds goes to lm
+            needs_fallback = not sol.success and not sol.active_bounds
+        if equilibration is not None and sol.success and not needs_fallback:
+            # Rows weighted down may hide a residual: judge the root in the fixed scaling
+            needs_fallback = np.max(np.abs(self._objective(x)), initial=0.0) > EQUILIBRATED_ACCEPT * tolerance
+        if needs_fallback:
+            # lm in the fixed scaling, from where the primary method stopped
             fallback_used = True
-            sol = root(objective, sol.x, method='lm', options={'maxiter': inner_max_steps})
-        final_residuals = objective(sol.x)
+            sol = root(self._objective, x, jac=lambda x_scaled: self._jacobian(x_scaled).toarray(), method='lm', options={'maxiter': inner_max_steps})
+            self.jacobian_evaluations += getattr(sol, 'njev', 0)
+            self.peak_memory_bytes = max(self.peak_memory_bytes, self._dense_solver_bytes(len(x0), 'lm'))
+            x = sol.x
+        final_residuals = self._objective(x)
+        # lm may stop at a least-squares minimum that misses a set point (or the balances)
+        self.control_residual = np.max(np.abs(final_residuals), initial=0.0) if self.embedded_control else 0.0
         if sol.success:
-            final_p = sol.x[:num_internal] * p_scale
-            final_q = sol.x[num_internal:] * q_scale
+            final_p = x[:num_internal] * p_scale
+            final_q = x[num_internal:num_hydraulic] * q_scale
+            if self.embedded_control:
+                self.embedded_control.finalize(x[num_hydraulic:])
+            self._final_x_scaled = x
             self._update_telemetry(final_p, final_q)
             return np.concatenate([final_p, final_q]), num_internal, getattr(sol, 'nfev', 0), fallback_used, final_residuals
         else:
             raise ValueError(f"Solver failed: {sol.message}")
 
-    def _get_node_p_out(self, node, p_in, q_in, q_out):
+    def _radial_solver(self):
+        """The TreeSolver of this network if it is loop-free and supported in the current solve, else None."""
+        if not TreeSolver.supports(self):
+            return None
+        if self._tree is None:
+            tree = TreeSolver(self)
+            self._tree = tree if tree.is_tree else False
+        return self._tree or None
+
+    def _domain_solver(self):
+        """The DomainDecomposition of this network if it can be cut into subdomains in the current solve, else None."""
+        if not DomainDecomposition.supports(self):
+            return None
+        gs = getattr(self.network, 'global_settings', None)
+        parts = max(2, getattr(gs, 'parallel_workers', 1) if gs else 1)
+        if self._domains is None or (self._domains and self._domains.parts != parts):
+            domains = DomainDecomposition(self, parts)
+            self._domains = domains if domains.valid else False
+        return self._domains or None
+
+    def _objective(self, x_scaled):
+        """Scaled residual vector: [mass balances, pressure balances(, control set points)]."""
+        num_internal = len(self.internal_node_indices)
+        num_edges = len(self.edges_list)
+        p_scale = self.p_scale
+        q_scale = self.q_scale
+        q_edges = x_scaled[num_internal:num_internal + num_edges] * q_scale
+        if self.embedded_control:
+            self.embedded_control.apply(x_scaled[num_internal + num_edges:])
+        if not self.properties_frozen:
+            self._propagate_properties(q_edges)
+        
+        # 1. Mass Balance
+        mass_res = 5.0 * (self.internal_incidence @ q_edges) / q_scale
+        
+        # 2. Pressure Balance
+        p_in_all, p_out_all = self._node_pressures(x_scaled[:num_internal] * p_scale, q_edges)
+        
+        density, viscosity = self.pipe_bank.fluid_properties()
+        dp_edges = self.pipe_bank.delta_p(q_edges, density, viscosity)
+        for j, tgt_node, port_idx in self.tcv_target_edges:
+            dp_edges[j] += tgt_node.calculate_path_dp(q_edges[j], tgt_node.inlets[port_idx].density, port_idx)
+        
+        press_res = ((p_out_all[self.edge_src_idx] - p_in_all[self.edge_tgt_idx]) - dp_edges) / p_scale
+        if self.embedded_control:
+            control_res = self.embedded_control.residual(x_scaled[num_internal + num_edges:], p_in_all, p_out_all, q_edges)
+            return np.concatenate([mass_res, press_res, control_res])
+        return np.concatenate([mass_res, press_res])
+
+    def _node_pressures(self, p_in_internal, q_edges):
+        """Inlet and outlet pressure of every node for given internal inlet pressures and edge flows."""
+        p_in_all = np.zeros(len(self.nodes_list))
+        for i, p in self.fixed_pressure_nodes.items(): p_in_all[i] = p
+        p_in_all[self.internal_idx] = p_in_internal
+        q_in_nodes = self.inflow_matrix @ q_edges
+        # Outlet = inlet +/- the node's own dP (junctions pass pressure through, TCV outlets are lagged)
+        p_out_all = p_in_all.copy()
+        for idx, kernel in self.node_kernels:
+            density, viscosity = kernel.fluid_properties()
+            p_out_all[idx] += self.node_dp_sign[idx] * kernel.delta_p(q_in_nodes[idx], density, viscosity)
+        for i in self.tcv_source_indices:
+            p_out_all[i] = self.nodes_list[i].outlets[0].pressure
+        return p_in_all, p_out_all
+
+    def _solve_hydraulics_picard(self, method, x0_custom):
+        """
+        Property coupling by fixed point: the hydraulic system is solved with density and
+        viscosity frozen, then properties are re-propagated at the new flows, until
+        temperatures move less than property_tolerance and density/viscosity less than
+        the solver tolerance (relative). Aitken (Irons-Tuck) relaxation on the
+        density/viscosity vector accelerates the loop.
+        """
+        gs = self.network.global_settings
+        max_picard = max(1, getattr(gs, 'control_iterations', 100))
+        temp_tol = getattr(gs, 'property_tolerance', 0.01)
+        prop_tol = getattr(gs, 'tolerance', 1e-6)
+        num_internal = len(self.internal_node_indices)
+
+        x = x0_custom if x0_custom is not None else self._generate_initial_guess()
+        self._propagate_properties_converged(x[num_internal:])
+
+        total_nfev = 0
+        fallback_used = False
+        omega = 1.0
+        prev_r = None
+        self.properties_frozen = True
+        try:
+            for _ in range(max_picard):
+                self.property_outer_iterations += 1
+                x, num_internal, nfev, fallback, residuals = self._solve_hydraulics_core(method, x)
+                total_nfev += nfev
+                fallback_used = fallback_used or fallback
+
+                props_old, temps_old = self._property_state()
+                self._propagate_properties_converged(x[num_internal:])
+                props_new, temps_new = self._property_state()
+
+                r = props_new - props_old
+                rel_change = np.max(np.abs(r) / np.maximum(np.abs(props_new), 1e-12), initial=0.0)
+                temp_change = np.max(np.abs(temps_new - temps_old), initial=0.0)
+                if rel_change < prop_tol and temp_change < temp_tol:
+                    break
+
+                # Irons-Tuck update of the Aitken relaxation factor
+                if prev_r is not None:
+                    dr = r - prev_r
+                    denom = dr @ dr
+                    if denom > 0:
+                        omega = min(2.0, max(0.1, -omega * (prev_r @ dr) / denom))
+                if omega != 1.0:
+                    self._set_property_state(props_old + omega * r)
+                prev_r = r
+        finally:
+            self.properties_frozen = False
+        return x, num_internal, total_nfev, fallback_used, residuals
+
+    def _propagate_properties_converged(self, q_edges):
+        """
+        Repeats the property sweep at fixed flows until no port property changes.
+        Outside the Newton solve this is cheap, and it removes the dependence on the
+        sweep cap (a sweep may stop early when temperatures settle before viscosity).
+        """
+        props, temps = self._property_state()
+        for _ in range(len(self.nodes_list) + 1):
+            self._propagate_properties(q_edges)
+            new_props, new_temps = self._property_state()
+            if np.allclose(new_props, props, rtol=1e-12, atol=0.0) and np.allclose(new_temps, temps, rtol=0.0, atol=1e-9):
+                break
+            props, temps = new_props, new_temps
+
+    def _property_ports(self):
+        """Ports whose density/viscosity enter the residual, and every port carrying a temperature."""
+        if not hasattr(self, '_cached_property_ports'):
+            hydraulic, pipe_thermal = self.pipe_bank.property_ports()
+            for _, kernel in self.node_kernels:
+                hydraulic += [n.inlets[0] for n in kernel.nodes if n.inlets]
+            for _, tgt_node, port_idx in self.tcv_target_edges:
+                hydraulic.append(tgt_node.inlets[port_idx])
+            thermal = []
+            for element in self.nodes_list:
+                thermal += element.inlets + element.outlets
+            thermal += pipe_thermal
+            self._cached_property_ports = (PortGroup(hydraulic), PortGroup(thermal))
+        return self._cached_property_ports
+
+    def _property_state(self):
+        hydraulic, thermal = self._property_ports()
+        props = np.concatenate([hydraulic.get(DENSITY), hydraulic.get(VISCOSITY)])
+        return props, thermal.get(TEMPERATURE)
+
+    def _set_property_state(self, props):
+        hydraulic, _ = self._property_ports()
+        n = len(hydraulic)
+        hydraulic.set(DENSITY, props[:n])
+        hydraulic.set(VISCOSITY, props[n:])
+
+    def _is_physical(self, x_scaled):
+        num_internal = len(self.internal_node_indices)
+        q_edges = x_scaled[num_internal:num_internal + len(self.edges_list)] * self.q_scale
+        p_nodes = x_scaled[:num_internal] * self.p_scale
+        if np.any(p_nodes < MIN_PRESSURE): return False
+        if np.any(q_edges[self.pump_edge_mask] < -1e-6): return False
+        return True
+
+    def _condition_estimate(self):
+        """
+        1-norm condition estimate of the Jacobian at the last core solution, as
+        the generic backends see it: equilibrated (scaling "adaptive") or in bar
+        and L/s (scaling "fixed"). Large values flag an ill-posed model.
+        """
+        x = self._final_x_scaled
+        if not self.embedded_control:
+            x = x[:len(self.internal_node_indices) + len(self.edges_list)]
+        jac = self._jacobian(x)
+        gs = getattr(self.network, 'global_settings', None)
+        if (getattr(gs, 'scaling', 'adaptive') if gs else 'adaptive') == 'adaptive':
+            jac = Equilibration(jac).scale_jacobian(jac)
+        return condition_estimate(jac)
+
+    def _physical_bounds(self, n):
+        """
+        Bounds on n scaled unknowns for the "trf" method, the limits _is_physical
+        checks: internal pressures >= -1 bar, pump outlet flows >= 0. Control
+        unknowns (embedded set points) are free.
+        """
+        num_internal = len(self.internal_node_indices)
+        lower = np.full(n, -np.inf)
+        lower[:num_internal] = MIN_PRESSURE / self.p_scale
+        lower[num_internal + np.flatnonzero(self.pump_edge_mask)] = 0.0
+        return lower, np.full(n, np.inf)
+
+    def _jacobian(self, x_scaled):
+        """Sparse Jacobian of _objective at x_scaled."""
+        num_internal = len(self.internal_node_indices)
+        num_hydraulic = num_internal + len(self.edges_list)
+        q_edges = x_scaled[num_internal:num_hydraulic] * self.q_scale
+        if not self.embedded_control:
+            return self._assemble_jacobian(q_edges, self.p_scale, self.q_scale)
+        u = x_scaled[num_hydraulic:]
+        self.embedded_control.apply(u)
+        jac = self._assemble_jacobian(q_edges, self.p_scale, self.q_scale)
+        p_in_all, p_out_all = self._node_pressures(x_scaled[:num_internal] * self.p_scale, q_edges)
+        return self.embedded_control.augment(jac, u, p_in_all, p_out_all, q_edges)
+
+    def _assemble_jacobian(self, q_edges, p_scale, q_scale):
+        """
+        Exact sparse Jacobian of the scaled residual with respect to the scaled unknowns.
+        Fluid properties are taken as frozen at their last propagated values.
+        """
+        num_internal = len(self.internal_node_indices)
+        num_edges = len(self.edges_list)
+        n = num_internal + num_edges
+
+        # Edge slopes: pipe (+ TCV inlet path)
+        density, viscosity = self.pipe_bank.fluid_properties()
+        d_edges = self.pipe_bank.delta_p_derivative(q_edges, density, viscosity)
+        for j, tgt_node, port_idx in self.tcv_target_edges:
+            d_edges[j] += tgt_node.calculate_path_dp_derivative(q_edges[j], tgt_node.inlets[port_idx].density, port_idx)
+
+        # Node slopes at their total inflow
+        coupling_rows, coupling_cols, coupling_nodes = self._jac_coupling
+        d_nodes = np.zeros(len(self.nodes_list))
+        if len(coupling_nodes):
+            q_in_nodes = self.inflow_matrix @ q_edges
+            for idx, kernel in self.node_kernels:
+                density, viscosity = kernel.fluid_properties()
+                d_nodes[idx] = self.node_dp_sign[idx] * kernel.delta_p_derivative(q_in_nodes[idx], density, viscosity)
+
+        rows_c, cols_c, vals_c = self._jac_const
+        ratio = q_scale / p_scale
+        edge_rows = num_internal + np.arange(num_edges)
+        rows = np.concatenate([rows_c, edge_rows, coupling_rows])
+        cols = np.concatenate([cols_c, edge_rows, coupling_cols])
+        vals = np.concatenate([vals_c, -d_edges * ratio, d_nodes[coupling_nodes] * ratio])
+        return csr_matrix((vals, (rows, cols)), shape=(n, n))
+
+    @staticmethod
+    def _dense_solver_bytes(n, method):
+        """
+        Working storage of the dense MINPACK backends for n unknowns:
+        our dense Jacobian copy plus fjac (n*n), and for hybr the packed R factor.
+        """
+        words = 2 * n * n + 6 * n
+        if method == 'hybr':
+            words += n * (n + 1) // 2
+        return words * 8
+
+    def _get_node_p_out(self, i, p_in, q_in, q_out):
+        sign = self.node_dp_sign[i]
+        if sign == 0.0:
+            return p_in
+        node = self.nodes_list[i]
         inlet = node.inlets[0] if node.inlets else None
         density = inlet.density if inlet else 1000.0
         viscosity = inlet.viscosity if inlet else 0.001
-        if isinstance(node, (CentrifugalPump, VolumetricPump)):
-            return p_in + node.calculate_delta_p(q_in, density, viscosity)
-        elif hasattr(node, 'calculate_delta_p'):
-            return p_in - node.calculate_delta_p(q_in, density, viscosity)
-        else:
-            return p_in
+        return p_in + sign * node.calculate_delta_p(q_in, density, viscosity)
 
     def _update_telemetry(self, p_in_internal, q_edges):
         self._propagate_properties(q_edges)
         p_in_all = np.zeros(len(self.nodes_list))
         for i, p in self.fixed_pressure_nodes.items(): p_in_all[i] = p
-        for i, idx in enumerate(self.internal_node_indices): p_in_all[idx] = p_in_internal[i]
-        for node in self.nodes_list:
-            for port in node.inlets: port.flow_rate = 0.0
-            for port in node.outlets: port.flow_rate = 0.0
-        for j, edge in enumerate(self.edges_list):
-            q = q_edges[j]
-            src_node = self.network.nodes[edge['source']]
-            tgt_node = self.network.nodes[edge['target']]
-            src_port_idx = self._parse_port_idx(edge.get('source_port', 'outlet-0'))
-            if src_port_idx < len(src_node.outlets):
-                src_node.outlets[src_port_idx].flow_rate += q
-            tgt_port_idx = self._parse_port_idx(edge.get('target_port', 'inlet-0'))
-            if tgt_port_idx < len(tgt_node.inlets):
-                tgt_node.inlets[tgt_port_idx].flow_rate += q
-        for i, node in enumerate(self.nodes_list):
-            p_in = p_in_all[i]
-            for port in node.inlets: port.pressure = p_in
-            q_in_total = sum(p.flow_rate for p in node.inlets)
-            q_out_total = sum(p.flow_rate for p in node.outlets)
-            p_out = self._get_node_p_out(node, p_in, q_in_total, q_out_total)
-            for port in node.outlets: port.pressure = p_out
-        for j, edge in enumerate(self.edges_list):
-            pipe = edge['pipe']
-            q = q_edges[j]
-            src_node = self.nodes_list[self.node_id_to_idx[edge['source']]]
-            tgt_node = self.nodes_list[self.node_id_to_idx[edge['target']]]
-            pipe.inlets[0].pressure = src_node.outlets[0].pressure
-            pipe.inlets[0].flow_rate = q
-            pipe.outlets[0].pressure = tgt_node.inlets[0].pressure
-            pipe.outlets[0].flow_rate = q
+        p_in_all[self.internal_idx] = p_in_internal
+        t = self._telemetry_index()
+        # Port flows: each edge adds its flow to the ports it connects
+        q_in_ports = np.zeros(len(t["inlets"]))
+        q_out_ports = np.zeros(len(t["outlets"]))
+        np.add.at(q_in_ports, t["edge_inlet"][t["has_inlet"]], q_edges[t["has_inlet"]])
+        np.add.at(q_out_ports, t["edge_outlet"][t["has_outlet"]], q_edges[t["has_outlet"]])
+        t["inlets"].set(FLOW_RATE, q_in_ports)
+        t["outlets"].set(FLOW_RATE, q_out_ports)
+        t["inlets"].set(PRESSURE, p_in_all[t["inlet_owner"]])
+        num_nodes = len(self.nodes_list)
+        q_in_total = np.bincount(t["inlet_owner"], q_in_ports, minlength=num_nodes)
+        q_out_total = np.bincount(t["outlet_owner"], q_out_ports, minlength=num_nodes)
+        p_out_all = p_in_all.copy()
+        for i in t["outlet_nodes"]:
+            p_out_all[i] = self._get_node_p_out(i, p_in_all[i], q_in_total[i], q_out_total[i])
+        t["outlets"].set(PRESSURE, p_out_all[t["outlet_owner"]])
+        # Pipes carry their edge flow between the source's outlet and the target's inlet pressure
+        t["pipe_inlets"].set(PRESSURE, p_out_all[self.edge_src_idx])
+        t["pipe_inlets"].set(FLOW_RATE, q_edges)
+        t["pipe_outlets"].set(PRESSURE, p_in_all[self.edge_tgt_idx])
+        t["pipe_outlets"].set(FLOW_RATE, q_edges)
+
+    def _telemetry_index(self):
+        """
+        Port groups written by _update_telemetry and, per edge, the position of
+        the node ports it connects within them (-1 for a missing port).
+        """
+        if not hasattr(self, '_cached_telemetry_index'):
+            inlets, outlets, inlet_owner, outlet_owner = [], [], [], []
+            inlet_pos, outlet_pos = {}, {}
+            for i, node in enumerate(self.nodes_list):
+                for k, port in enumerate(node.inlets):
+                    inlet_pos[(i, k)] = len(inlets)
+                    inlets.append(port)
+                    inlet_owner.append(i)
+                for k, port in enumerate(node.outlets):
+                    outlet_pos[(i, k)] = len(outlets)
+                    outlets.append(port)
+                    outlet_owner.append(i)
+            edge_inlet = np.array([inlet_pos.get((self.edge_tgt_idx[j], self._parse_port_idx(e.get('target_port', 'inlet-0'))), -1)
+                                   for j, e in enumerate(self.edges_list)], dtype=int)
+            edge_outlet = np.array([outlet_pos.get((self.edge_src_idx[j], self._parse_port_idx(e.get('source_port', 'outlet-0'))), -1)
+                                    for j, e in enumerate(self.edges_list)], dtype=int)
+            self._cached_telemetry_index = {
+                "inlets": PortGroup(inlets), "outlets": PortGroup(outlets),
+                "inlet_owner": np.array(inlet_owner, dtype=int), "outlet_owner": np.array(outlet_owner, dtype=int),
+                "outlet_nodes": sorted(set(outlet_owner)),
+                "edge_inlet": edge_inlet, "has_inlet": edge_inlet >= 0,
+                "edge_outlet": edge_outlet, "has_outlet": edge_outlet >= 0,
+                "pipe_inlets": PortGroup(e['pipe'].inlets[0] for e in self.edges_list),
+                "pipe_outlets": PortGroup(e['pipe'].outlets[0] for e in self.edges_list),
+            }
+        return self._cached_telemetry_index
 
     def _parse_port_idx(self, port_str: str) -> int:
         try:
@@ -336,60 +1028,308 @@ class NetworkSolver:
         except (ValueError, IndexError, AttributeError):
             return 0
 
+    def _apply_isothermal_state(self):
+        """Isothermal mode: every port takes the first tank's temperature, density and viscosity."""
+        tanks = [self.nodes_list[i] for i in self.fixed_pressure_nodes]
+        if not tanks:
+            return
+        self._apply_tank_boundaries()
+        ref = tanks[0].outlets[0]
+        _, thermal = self._property_ports()
+        thermal.set(TEMPERATURE, ref.temperature)
+        thermal.set(DENSITY, ref.density)
+        thermal.set(VISCOSITY, ref.viscosity)
+        self._restore_tank_boundaries() # each tank keeps its own boundary state
+        self._isothermal_applied = True
+
+    def _apply_tank_boundaries(self):
+        """
+        Boundary state and fixed pressure of every tank, fixed for the whole
+        solve: plain tanks are evaluated together from the fluid tables (and
+        their port state kept for _restore_tank_boundaries), other boundaries
+        (subdomain interfaces) by their own calculate().
+        """
+        plain = [i for i in self.fixed_pressure_nodes if type(self.nodes_list[i]) is Tank]
+        pressures, self._tank_boundary = Tank.calculate_all([self.nodes_list[i] for i in plain])
+        for i, p in zip(plain, pressures):
+            self.fixed_pressure_nodes[i] = float(p)
+        for i in self.fixed_pressure_nodes:
+            if type(self.nodes_list[i]) is not Tank:
+                self.fixed_pressure_nodes[i] = self.nodes_list[i].calculate()
+
+    def _restore_tank_boundaries(self):
+        group, columns = self._tank_boundary
+        for col, values in columns.items():
+            group.set(col, values)
+
     def _propagate_properties(self, q_edges):
+        gs = self.nodes_list[0].global_settings if self.nodes_list else None
+        if gs and getattr(gs, 'isothermal', False):
+            # No thermal pass: properties are uniform and independent of the flows
+            if not self._isothermal_applied:
+                self._apply_isothermal_state()
+            # TCV outlets still need their (lagged) hydraulic update
+            for j, tgt_node, port_idx in self.tcv_target_edges:
+                tgt_node.inlets[port_idx].flow_rate = q_edges[j]
+            for i in self.tcv_node_indices:
+                self.nodes_list[i].calculate()
+            self.last_prop_iters = 0
+            return
         max_iterations = 5
         if self.nodes_list and self.nodes_list[0].global_settings:
             max_iterations = getattr(self.nodes_list[0].global_settings, 'property_iterations', 5)
-        actual_iters = 0
-        for _ in range(max_iterations):
-            actual_iters += 1
-            max_temp_change = 0.0
-            for j, edge in enumerate(self.edges_list):
-                src_node = self.network.nodes[edge['source']]
-                tgt_node = self.network.nodes[edge['target']]
-                pipe = edge['pipe']
-                q = q_edges[j]
-                pipe.inlets[0].flow_rate = q
-                pipe.outlets[0].flow_rate = q
-                if q >= 0:
-                    pipe.inlets[0].temperature = src_node.outlets[0].temperature
-                    pipe.inlets[0].density = src_node.outlets[0].density
-                    pipe.inlets[0].viscosity = src_node.outlets[0].viscosity
-                else:
-                    pipe.outlets[0].temperature = tgt_node.inlets[0].temperature
-                    pipe.outlets[0].density = tgt_node.inlets[0].density
-                    pipe.outlets[0].viscosity = tgt_node.inlets[0].viscosity
-                pipe.calculate() 
-            for node_id, node in self.network.nodes.items():
-                if isinstance(node, Tank):
-                    node.calculate()
-                    continue
-                old_temps = [p.temperature for p in node.outlets] + [p.temperature for p in node.inlets]
-                for j, edge in enumerate(self.edges_list):
-                    q = q_edges[j]
-                    pipe = edge['pipe']
-                    if edge['target'] == node_id:
-                        port_idx = self._parse_port_idx(edge.get('target_port', 'inlet-0'))
-                        if port_idx < len(node.inlets):
-                            node.inlets[port_idx].flow_rate = q
-                            if q >= 0:
-                                node.inlets[port_idx].temperature = pipe.outlets[0].temperature
-                                node.inlets[port_idx].density = pipe.outlets[0].density
-                                node.inlets[port_idx].viscosity = pipe.outlets[0].viscosity
-                    if edge['source'] == node_id:
-                        port_idx = self._parse_port_idx(edge.get('source_port', 'outlet-0'))
-                        if port_idx < len(node.outlets):
-                            node.outlets[port_idx].flow_rate = q
-                            if q < 0:
-                                node.outlets[port_idx].temperature = pipe.inlets[0].temperature
-                                node.outlets[port_idx].density = pipe.inlets[0].density
-                                node.outlets[port_idx].viscosity = pipe.inlets[0].viscosity
-                if hasattr(node, 'calculate_temperature'):
-                    node.calculate_temperature()
-                node.calculate()
-                new_temps = [p.temperature for p in node.outlets] + [p.temperature for p in node.inlets]
-                for old_t, new_t in zip(old_temps, new_temps):
-                    max_temp_change = max(max_temp_change, abs(new_t - old_t))
-            if max_temp_change < 0.01:
-                break
+
+        # Acyclic parts are exact after one visit in flow order; recirculation
+        # loops (strongly connected components) get a direct energy-balance solve.
+        # Tanks are sources: their boundary state is written back in one go.
+        self._restore_tank_boundaries()
+        actual_iters = 1
+        for members, cyclic in self._propagation_order(q_edges):
+            if not cyclic:
+                self._propagate_element(members[0], q_edges)
+                continue
+            ports = self._component_ports(members)
+            old_temps = [p.temperature for p in ports]
+            for v in members:
+                self._propagate_element(v, q_edges)
+            if max((abs(p.temperature - t) for p, t in zip(ports, old_temps)), default=0.0) < 0.01:
+                continue # Already settled (warm start from the previous residual call)
+            passes = self._solve_loop_temperatures(members, q_edges)
+            if passes is None:
+                # Linearization did not verify (strongly nonlinear element): plain sweeps
+                passes = 1
+                for it in range(max(1, max_iterations)):
+                    old_temps = [p.temperature for p in ports]
+                    for v in members:
+                        self._propagate_element(v, q_edges)
+                    passes += 1
+                    if max((abs(p.temperature - t) for p, t in zip(ports, old_temps)), default=0.0) < 0.01:
+                        break
+            actual_iters = max(actual_iters, passes + 1)
         self.last_prop_iters = actual_iters
+
+    def _solve_loop_temperatures(self, members, q_edges, max_linearizations=5, probe=1.0):
+        """
+        Solves the energy balance of a recirculation loop directly.
+
+        Unknowns are the temperatures entering each loop pipe (x_j, read from the
+        upstream node's port). Given the flows, every element maps its input
+        temperatures to its outputs affinely (throttling and pump heat, mixing and
+        TCV balances); the HeatExchanger duty is linearized. The coefficients are
+        obtained by probing each element's own calculate step with a +probe K
+        perturbation, assembled into the sparse system (I - D A) x = rhs and solved
+        by sparse LU. A verification sweep closes the loop; non-affine elements
+        re-linearize. Returns the number of linear solves, or None if it did not verify.
+        """
+        num_nodes = len(self.nodes_list)
+        loop_pipes = [v - num_nodes for v in members if v >= num_nodes]
+        loop_nodes = [v for v in members if v < num_nodes]
+        pos = {j: k for k, j in enumerate(loop_pipes)}
+        n = len(loop_pipes)
+        forward = {j: q_edges[j] >= 0 for j in loop_pipes}
+        upstream_node = {j: self.edge_src_idx[j] if forward[j] else self.edge_tgt_idx[j] for j in loop_pipes}
+        downstream_node = {j: self.edge_tgt_idx[j] if forward[j] else self.edge_src_idx[j] for j in loop_pipes}
+
+        def out_port(j):
+            # The port a pipe copies its upstream temperature from (see _propagate_element)
+            node = self.nodes_list[upstream_node[j]]
+            return node.outlets[0] if forward[j] else node.inlets[0]
+
+        def pipe_ports(j):
+            pipe = self.edges_list[j]['pipe']
+            return (pipe.inlets[0], pipe.outlets[0]) if forward[j] else (pipe.outlets[0], pipe.inlets[0])
+
+        feeds = {u: [j for j in loop_pipes if downstream_node[j] == u] for u in loop_nodes}
+        drains = {u: [j for j in loop_pipes if upstream_node[j] == u] for u in loop_nodes}
+
+        for it in range(max_linearizations):
+            x0 = np.array([out_port(j).temperature for j in loop_pipes])
+
+            # 1. Pipes: T_down = a_j * T_up + b_j
+            slope = np.empty(n)
+            for j in loop_pipes:
+                port = out_port(j)
+                self._propagate_element(num_nodes + j, q_edges)
+                t_down = pipe_ports(j)[1].temperature
+                port.temperature += probe
+                self._propagate_element(num_nodes + j, q_edges)
+                slope[pos[j]] = (pipe_ports(j)[1].temperature - t_down) / probe
+                port.temperature -= probe
+                self._propagate_element(num_nodes + j, q_edges)
+
+            # 2. Nodes: outputs as affine functions of the temperatures delivered by loop pipes
+            rows, cols, vals = [], [], []
+            y0 = x0.copy()
+            for u in loop_nodes:
+                self._propagate_element(u, q_edges)
+                base = {j: out_port(j).temperature for j in drains[u]}
+                for j in drains[u]:
+                    y0[pos[j]] = base[j]
+                for k in feeds[u]:
+                    delivered = pipe_ports(k)[1]
+                    delivered.temperature += probe
+                    self._propagate_element(u, q_edges)
+                    for j in drains[u]:
+                        d = (out_port(j).temperature - base[j]) / probe
+                        if d != 0.0:
+                            rows.append(pos[j])
+                            cols.append(pos[k])
+                            vals.append(d)
+                    delivered.temperature -= probe
+                self._propagate_element(u, q_edges)
+
+            # 3. x = y0 + D * diag(a) * (x - x0)  ->  (I - D A) x = y0 - D A x0
+            da = csr_matrix((np.array(vals) * slope[np.array(cols, dtype=int)], (rows, cols)), shape=(n, n))
+            system = identity(n, format='csc') - da.tocsc()
+            try:
+                x = splu(system).solve(y0 - da @ x0)
+            except RuntimeError: # singular: left to the fixed-point sweeps
+                return None
+            if not np.all(np.isfinite(x)):
+                return None
+
+            # 4. Write the solution, push it through the pipes and let the nodes verify it
+            for j in loop_pipes:
+                out_port(j).temperature = x[pos[j]]
+            for j in loop_pipes:
+                self._propagate_element(num_nodes + j, q_edges)
+            for u in loop_nodes:
+                self._propagate_element(u, q_edges)
+            for j in loop_pipes:
+                self._propagate_element(num_nodes + j, q_edges)
+            x_check = np.array([out_port(j).temperature for j in loop_pipes])
+            if np.max(np.abs(x_check - x), initial=0.0) < 0.01:
+                return it + 1
+        return None
+
+    def _propagate_element(self, v, q_edges):
+        """
+        Pushes temperature, density and viscosity through one element of the
+        propagation graph: vertex v < num_nodes is a node, otherwise pipe v - num_nodes.
+        """
+        num_nodes = len(self.nodes_list)
+        if v >= num_nodes:
+            j = v - num_nodes
+            pipe = self.edges_list[j]['pipe']
+            q = q_edges[j]
+            pipe.inlets[0].flow_rate = q
+            pipe.outlets[0].flow_rate = q
+            if q >= 0:
+                upstream, port = self.nodes_list[self.edge_src_idx[j]].outlets[0], pipe.inlets[0]
+            else:
+                upstream, port = self.nodes_list[self.edge_tgt_idx[j]].inlets[0], pipe.outlets[0]
+            port.take_fluid(upstream)
+            pipe.calculate()
+            return
+
+        node = self.nodes_list[v]
+        if self.is_tank[v]:
+            if type(node) is not Tank:
+                node.calculate() # plain tanks were restored by _restore_tank_boundaries
+            return
+        for j in self.node_incident_edges[v]:
+            q = q_edges[j]
+            pipe = self.edges_list[j]['pipe']
+            if self.edge_tgt_idx[j] == v:
+                port_idx = self.edge_tgt_port[j]
+                if port_idx < len(node.inlets):
+                    node.inlets[port_idx].flow_rate = q
+                    if q >= 0:
+                        node.inlets[port_idx].take_fluid(pipe.outlets[0])
+            if self.edge_src_idx[j] == v:
+                port_idx = self.edge_src_port[j]
+                if port_idx < len(node.outlets):
+                    node.outlets[port_idx].flow_rate = q
+                    if q < 0:
+                        node.outlets[port_idx].take_fluid(pipe.inlets[0])
+        if hasattr(node, 'calculate_temperature'):
+            node.calculate_temperature()
+        node.calculate()
+
+    def _component_ports(self, members):
+        num_nodes = len(self.nodes_list)
+        ports = []
+        for v in members:
+            element = self.nodes_list[v] if v < num_nodes else self.edges_list[v - num_nodes]['pipe']
+            ports += element.inlets + element.outlets
+        return ports
+
+    def _propagation_order(self, q_edges):
+        """
+        Visit order for property propagation under the current flow directions,
+        cached per flow-sign pattern (the pattern rarely changes between residual calls).
+        """
+        forward = q_edges >= 0
+        key = forward.tobytes()
+        order = self._order_cache.get(key)
+        if order is None:
+            if len(self._order_cache) >= 64:
+                self._order_cache.clear()
+            order = self._build_propagation_order(forward)
+            self._order_cache[key] = order
+        return order
+
+    def _build_propagation_order(self, forward):
+        """
+        Topological order of the property flow graph. Vertices are nodes and pipes;
+        each pipe is fed by its upstream node and feeds its downstream node. Tanks
+        impose their own state, so arcs into a tank are dropped (they break cycles).
+        Returns a list of (members, cyclic) in upstream-to-downstream order, one
+        entry per strongly connected component.
+        """
+        num_nodes = len(self.nodes_list)
+        num_edges = len(self.edges_list)
+        num_v = num_nodes + num_edges
+        pipe_v = num_nodes + np.arange(num_edges)
+        upstream = np.where(forward, self.edge_src_idx, self.edge_tgt_idx)
+        downstream = np.where(forward, self.edge_tgt_idx, self.edge_src_idx)
+        rows = np.concatenate([upstream, pipe_v])
+        cols = np.concatenate([pipe_v, downstream])
+        keep = np.ones(len(rows), dtype=bool)
+        keep[num_edges:] = ~self.is_tank[downstream]
+        rows, cols = rows[keep], cols[keep]
+        graph = csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(num_v, num_v))
+
+        num_comp, labels = connected_components(graph, directed=True, connection='strong')
+        members = [[] for _ in range(num_comp)]
+        for v in range(num_v):
+            members[labels[v]].append(v)
+
+        # Kahn's algorithm on the condensation
+        comp_rows, comp_cols = labels[rows], labels[cols]
+        external = comp_rows != comp_cols
+        comp_graph = csr_matrix((np.ones(external.sum()), (comp_rows[external], comp_cols[external])), shape=(num_comp, num_comp))
+        comp_graph.sum_duplicates()
+        indegree = np.diff(comp_graph.tocsc().indptr)
+        ready = [c for c in range(num_comp) if indegree[c] == 0]
+        order = []
+        while ready:
+            c = ready.pop()
+            if len(members[c]) == 1:
+                order.append((members[c], False))
+            else:
+                order.append((self._loop_visit_order(members[c], graph, labels, c), True))
+            for d in comp_graph.indices[comp_graph.indptr[c]:comp_graph.indptr[c + 1]]:
+                indegree[d] -= 1
+                if indegree[d] == 0:
+                    ready.append(d)
+        return order
+
+    @staticmethod
+    def _loop_visit_order(members, graph, labels, comp):
+        """Breadth-first order through a loop, starting where flow enters it from outside."""
+        member_set = set(members)
+        preds = graph.tocsc()
+        entries = [v for v in members if any(labels[u] != comp for u in preds.indices[preds.indptr[v]:preds.indptr[v + 1]])]
+        queue = list(dict.fromkeys(entries or members[:1]))
+        seen = set(queue)
+        visit = []
+        while queue:
+            v = queue.pop(0)
+            visit.append(v)
+            for w in graph.indices[graph.indptr[v]:graph.indptr[v + 1]]:
+                if w in member_set and w not in seen:
+                    seen.add(w)
+                    queue.append(w)
+        visit += [v for v in members if v not in seen]
+        return visit
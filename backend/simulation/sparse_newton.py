@@ -0,0 +1,235 @@
+import numpy as np
+from scipy.optimize import OptimizeResult, least_squares
+from scipy.sparse import csc_matrix, identity
+from scipy.sparse.linalg import splu
+
+DENSE_TRUST_REGION_LIMIT = 400 # Unknowns up to which the trust-region subproblem is solved exactly (dense SVD)
+
+def sparse_matrix_bytes(mat) -> int:
+    """Storage of a CSR/CSC matrix (values + index arrays) in bytes."""
+    return mat.data.nbytes + mat.indices.nbytes + mat.indptr.nbytes
+
+def factorize(jac):
+    """
+    Sparse LU of the Jacobian. A structurally or numerically singular matrix
+    (e.g. a dead-end node with zero flow) gets a tiny diagonal shift so Newton can still move.
+    Returns (lu, bytes used by the factors).
+    """
+    jac = csc_matrix(jac)
+    try:
+        lu = splu(jac)
+    except RuntimeError:
+        shift = 1e-10 * max(1.0, abs(jac).max())
+        lu = splu(csc_matrix(jac + shift * identity(jac.shape[0], format='csc')))
+    factor_bytes = sparse_matrix_bytes(lu.L) + sparse_matrix_bytes(lu.U) + lu.perm_r.nbytes + lu.perm_c.nbytes
+    return lu, factor_bytes
+
+def sparse_newton(fun, jac, x0, tol=1e-6, max_iter=100, min_step=1e-4):
+    """
+    Damped Newton iteration with a sparse Jacobian and a sparse direct (SuperLU) factorization.
+
+    - fun(x) -> residual vector, jac(x) -> scipy.sparse matrix
+    - Converges when max|F| < tol.
+    - Each step is backtracked (halving) until the residual norm decreases (Armijo).
+    - fun may carry state (lagged fluid properties), so when no step reduces the
+      residual it is re-evaluated at the current x once before giving up.
+
+    Returns a scipy OptimizeResult with x, success, message, fun, nfev, njev, nit
+    and peak_memory_bytes (Jacobian + LU factors + work vectors at the worst iteration).
+    """
+    x = np.array(x0, dtype=float)
+    f = fun(x)
+    nfev, njev = 1, 0
+    norm = np.linalg.norm(f)
+    peak_bytes = 0
+    message = "Maximum number of iterations reached."
+    success = False
+    refreshed = False
+
+    for it in range(max_iter):
+        if np.max(np.abs(f), initial=0.0) < tol:
+            success = True
+            message = "Converged."
+            break
+
+        J = jac(x)
+        njev += 1
+        lu, factor_bytes = factorize(J)
+        dx = -lu.solve(f)
+        if not np.all(np.isfinite(dx)):
+            message = "Singular Jacobian."
+            break
+        peak_bytes = max(peak_bytes, sparse_matrix_bytes(J.tocsr()) + factor_bytes + 4 * x.nbytes)
+
+        # Backtracking line search on ||F||
+        t = 1.0
+        accepted = False
+        while t >= min_step:
+            x_new = x + t * dx
+            f_new = fun(x_new)
+            nfev += 1
+            norm_new = np.linalg.norm(f_new)
+            if np.isfinite(norm_new) and norm_new <= (1.0 - 1e-4 * t) * norm:
+                accepted = True
+                break
+            t *= 0.5
+
+        if not accepted:
+            # Take the smallest step if it still helps, otherwise we are stuck
+            if np.isfinite(norm_new) and norm_new < norm:
+                accepted = True
+            elif not refreshed:
+                f = fun(x)
+                nfev += 1
+                norm = np.linalg.norm(f)
+                refreshed = True
+                continue
+            else:
+                message = "Line search failed to reduce the residual."
+                break
+
+        x, f, norm = x_new, f_new, norm_new
+        refreshed = False
+    else:
+        if np.max(np.abs(f), initial=0.0) < tol:
+            success = True
+            message = "Converged."
+
+    return OptimizeResult(x=x, success=success, message=message, fun=f,
+                          nfev=nfev, njev=njev, nit=njev, peak_memory_bytes=peak_bytes)
+
+def chord_newton(fun, jac, x0, lu=None, tol=1e-6, max_iter=100, min_step=1e-4, contraction=0.5, max_factorizations=3):
+    """
+    Chord Newton: every step reuses one LU factorization of the Jacobian.
+
+    - lu is a factorization from an earlier call (e.g. at the previous converged
+      point before a parameter edit); without one the Jacobian is factorized at x0.
+    - A chord step is accepted when it reduces ||F||. When it does not, or when the
+      residual contracts by less than `contraction` per step, the Jacobian is
+      refactorized at the current x (at most max_factorizations times), and steps
+      with a fresh factorization are backtracked like sparse_newton.
+
+    Returns a scipy OptimizeResult like sparse_newton, plus lu (the factorization
+    in use at exit, to pass to the next call).
+    """
+    x = np.array(x0, dtype=float)
+    f = fun(x)
+    nfev, njev = 1, 0
+    norm = np.linalg.norm(f)
+    peak_bytes = 0
+    message = "Maximum number of iterations reached."
+    success = False
+    fresh = refreshed = False
+    refactor = lu is None
+    nit = 0
+
+    for nit in range(1, max_iter + 1):
+        if np.max(np.abs(f), initial=0.0) < tol:
+            success = True
+            message = "Converged."
+            break
+
+        if refactor:
+            if njev >= max_factorizations:
+                message = "Chord iteration stalled."
+                break
+            J = jac(x)
+            njev += 1
+            lu, factor_bytes = factorize(J)
+            peak_bytes = max(peak_bytes, sparse_matrix_bytes(J.tocsr()) + factor_bytes + 4 * x.nbytes)
+            fresh, refactor = True, False
+
+        dx = -lu.solve(f)
+        if not np.all(np.isfinite(dx)):
+            if fresh:
+                message = "Singular Jacobian."
+                break
+            refactor = True
+            continue
+
+        # A stale factorization gets one full step; a fresh one is backtracked on ||F||
+        t = 1.0
+        accepted = False
+        while t >= min_step:
+            x_new = x + t * dx
+            f_new = fun(x_new)
+            nfev += 1
+            norm_new = np.linalg.norm(f_new)
+            if np.isfinite(norm_new) and norm_new <= (1.0 - 1e-4 * t) * norm:
+                accepted = True
+                break
+            if not fresh:
+                break
+            t *= 0.5
+
+        if not accepted:
+            if not fresh:
+                refactor = True
+            elif not refreshed:
+                # fun may carry lagged state, as in sparse_newton
+                f = fun(x)
+                nfev += 1
+                norm = np.linalg.norm(f)
+                refreshed = True
+            else:
+                message = "Line search failed to reduce the residual."
+                break
+            continue
+
+        # Slow contraction means the chord Jacobian is too far from the current one
+        refactor = not fresh and norm_new > contraction * norm
+        x, f, norm = x_new, f_new, norm_new
+        fresh = refreshed = False
+    else:
+        if np.max(np.abs(f), initial=0.0) < tol:
+            success = True
+            message = "Converged."
+
+    return OptimizeResult(x=x, success=success, message=message, fun=f, lu=lu,
+                          nfev=nfev, njev=njev, nit=nit, peak_memory_bytes=peak_bytes)
+
+def bounded_trust_region(fun, jac, x0, lower, upper, tol=1e-6, max_iter=100):
+    """
+    Reflective trust-region least squares (scipy least_squares, method "trf")
+    with every iterate kept strictly inside [lower, upper].
+
+    - fun(x) -> residual vector, jac(x) -> scipy.sparse matrix
+    - Converges when max|F| < tol; a least-squares minimum that is not a root is
+      a failure, with active_bounds > 0 when it lies against a bound (no root
+      inside the bounds) and 0 when the iteration stalled inside them.
+    - Up to DENSE_TRUST_REGION_LIMIT unknowns the subproblem is solved exactly on
+      the dense Jacobian, above that by LSMR on the sparse one.
+
+    Returns a scipy OptimizeResult with x, success, message, fun, nfev, njev,
+    active_bounds and peak_memory_bytes (Jacobian + solver work arrays).
+    """
+    x0 = np.clip(np.array(x0, dtype=float), lower, upper)
+    n = len(x0)
+    dense = n <= DENSE_TRUST_REGION_LIMIT
+    jac_bytes = [0]
+
+    def jacobian(x):
+        J = jac(x)
+        jac_bytes[0] = max(jac_bytes[0], 8 * J.shape[0] * n if dense else sparse_matrix_bytes(J.tocsr()))
+        return J.toarray() if dense else J
+
+    def converged(intermediate_result):
+        if np.max(np.abs(intermediate_result.fun), initial=0.0) < tol:
+            raise StopIteration
+
+    sol = least_squares(fun, x0, jac=jacobian, bounds=(lower, upper), method='trf',
+                        tr_solver='exact' if dense else 'lsmr', ftol=1e-15, xtol=1e-15, gtol=1e-15,
+                        max_nfev=max_iter, callback=converged, x_scale='jac')
+    success = bool(np.max(np.abs(sol.fun), initial=0.0) < tol)
+    active_bounds = int(np.count_nonzero(sol.active_mask))
+    if success:
+        message = "Converged."
+    elif active_bounds:
+        message = f"No root inside the bounds ({active_bounds} unknowns held at a bound)."
+    else:
+        message = f"Stalled inside the bounds: {sol.message}"
+    # Dense: Jacobian, its SVD factors and scaled copies; sparse: Jacobian plus LSMR vectors
+    work_bytes = (3 if dense else 1) * jac_bytes[0] + 10 * x0.nbytes
+    return OptimizeResult(x=sol.x, success=success, message=message, fun=sol.fun,
+                          nfev=sol.nfev, njev=sol.njev or 0, nit=sol.njev or 0, active_bounds=active_bounds,
+                          peak_memory_bytes=work_bytes)
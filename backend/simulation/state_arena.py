@@ -0,0 +1,173 @@
+import numpy as np
+
+# Port state variables: one column of the arena each; the fluid state (temperature,
+# density, viscosity) is the trailing slice, copied in one go by Port.take_fluid
+PORT_FIELDS = ('pressure', 'flow_rate', 'temperature', 'density', 'viscosity')
+PORT_DEFAULTS = (101325.0, 0.0, 293.15, 1000.0, 0.001) # 1 atm, no flow, 20°C, water
+PRESSURE, FLOW_RATE, TEMPERATURE, DENSITY, VISCOSITY = range(len(PORT_FIELDS))
+WIDTH = len(PORT_FIELDS)
+
+class StateArena:
+    """
+    Contiguous state of a set of ports: data[row] is one port, data[:, col] one
+    state variable (PORT_FIELDS). Ports (simulation.schemas.Port) are views on
+    their row, so equipment code keeps reading port.pressure etc., while the
+    solver gathers and scatters whole columns through PortGroup, and a network
+    state is copied, snapshotted or pickled as one array.
+
+    A port lives in at most one arena. A new Port is detached (its row is a
+    buffer of its own) and gets a row only when attach() gathers the ports of a
+    network into one arena (the largest one they already share), so networks
+    built from the nodes of another (split components, reduced networks,
+    subdomains) share its rows.
+    """
+    def __init__(self, capacity=1):
+        self.data = np.empty((max(1, capacity), WIDTH))
+        self.ports = [] # row -> Port (None once the port moved to another arena)
+        self.generation = 0 # bumped whenever a port leaves, invalidating PortGroup rows
+        self._flat = memoryview(self.data.reshape(-1))
+
+    def __len__(self):
+        return len(self.ports)
+
+    @classmethod
+    def attach(cls, ports):
+        """The arena holding every port of `ports`, moving the others into the largest arena among them."""
+        ports = list(ports)
+        if not ports:
+            return cls()
+        arenas = {id(p._arena): p._arena for p in ports if p._arena is not None}
+        home = max(arenas.values(), key=len) if arenas else cls(len(ports))
+        moving = [p for p in ports if p._arena is not home]
+        if moving:
+            home._reserve(len(home) + len(moving))
+            for port in moving:
+                home.adopt(port)
+        return home
+
+    def adopt(self, port, values=None):
+        """Appends a row for `port` (its current state, or `values`) and rebinds it to this arena."""
+        old = port._arena
+        if values is None:
+            values = port._state
+        row = len(self.ports)
+        if row == self.data.shape[0]:
+            self._reserve(2 * row)
+        self.data[row] = values
+        self.ports.append(port)
+        if old is not None:
+            old.ports[port._row] = None
+            old.generation += 1
+        port._arena, port._row, port._state = self, row, self.view(row)
+
+    def _reserve(self, capacity):
+        if capacity <= self.data.shape[0]:
+            return
+        data = np.empty((capacity, WIDTH))
+        data[:len(self.ports)] = self.data[:len(self.ports)]
+        self.data = data
+        self._flat = memoryview(data.reshape(-1))
+        for row, port in enumerate(self.ports):
+            if port is not None:
+                port._state = self.view(row)
+
+    def view(self, row):
+        """Memoryview of one row: indexing it yields Python floats."""
+        return self._flat[WIDTH * row:WIDTH * (row + 1)]
+
+    def rows(self, ports):
+        return np.array([p._row for p in ports], dtype=int)
+
+    def column(self, col):
+        """Live NumPy view of one state variable over all rows."""
+        return self.data[:len(self.ports), col]
+
+    def snapshot(self):
+        """Copy of every row's state, for restore()."""
+        return self.data[:len(self.ports)].copy()
+
+    def restore(self, snapshot):
+        self.data[:len(snapshot)] = snapshot
+
+    @property
+    def nbytes(self):
+        return self.data[:len(self.ports)].nbytes
+
+    def __getstate__(self):
+        # Only the used rows travel (e.g. to a worker process)
+        return {"data": self.data[:len(self.ports)].copy(), "ports": self.ports, "generation": self.generation}
+
+    def __setstate__(self, state):
+        self.data = state["data"] if len(state["data"]) else np.empty((1, WIDTH))
+        self.ports = state["ports"]
+        self.generation = state["generation"]
+        self._flat = memoryview(self.data.reshape(-1))
+        for row, port in enumerate(self.ports):
+            if port is not None:
+                port._arena, port._row, port._state = self, row, self.view(row)
+
+class PortGroup:
+    """
+    A fixed list of ports whose state columns are read and written as arrays.
+    Rows are looked up once and reused until a port leaves the arena; ports
+    spread over several arenas fall back to one row access per port.
+    """
+    def __init__(self, ports):
+        self.ports = list(ports)
+        self._arena = None
+        self._generation = -1
+        self._rows = None
+
+    def __len__(self):
+        return len(self.ports)
+
+    def _resolve(self):
+        arena = self._arena
+        if arena is not None and arena.generation == self._generation:
+            return arena, self._rows
+        arena = self.ports[0]._arena if self.ports else StateArena()
+        if arena is None or not all(p._arena is arena for p in self.ports):
+            # Checked again next time: the ports may be attached to one arena by then
+            self._arena = None
+            return None, None
+        self._arena, self._generation, self._rows = arena, arena.generation, arena.rows(self.ports)
+        return arena, self._rows
+
+    def get(self, col):
+        """Array of one state variable (PRESSURE, FLOW_RATE, ...) over the group."""
+        arena, rows = self._resolve()
+        if arena is None:
+            return np.array([p._state[col] for p in self.ports], dtype=float)
+        return arena.data[rows, col]
+
+    def set(self, col, values):
+        arena, rows = self._resolve()
+        if arena is None:
+            for port, value in zip(self.ports, np.broadcast_to(values, len(self.ports))):
+                port._state[col] = value
+            return
+        arena.data[rows, col] = values
+
+    def get_state(self):
+        """(ports x PORT_FIELDS) block of the whole group."""
+        arena, rows = self._resolve()
+        if arena is None:
+            return np.array([p._state.tolist() for p in self.ports], dtype=float).reshape(-1, WIDTH)
+        return arena.data[rows]
+
+    def set_state(self, block):
+        arena, rows = self._resolve()
+        if arena is None:
+            for port, values in zip(self.ports, block):
+                port._state[:] = memoryview(np.ascontiguousarray(values, dtype=float))
+            return
+        arena.data[rows] = block
+
+def network_ports(network):
+    """Every port of a network: node inlets and outlets, then edge pipe inlets and outlets."""
+    ports = []
+    for node in network.nodes.values():
+        ports += node.inlets + node.outlets
+    for edge in network.edges:
+        ports += edge['pipe'].inlets + edge['pipe'].outlets
+    return ports
@@ -0,0 +1,247 @@
+import numpy as np
+from scipy.optimize import OptimizeResult
+from scipy.sparse import csr_matrix, diags
+from scipy.sparse.csgraph import connected_components
+
+from simulation.gga import GlobalGradient
+from simulation.sparse_newton import sparse_matrix_bytes
+
+class TreeSolver(GlobalGradient):
+    """
+    Exact solver for loop-free (radial) networks, used automatically when the
+    topology allows it (GlobalSettings.tree_solver).
+
+    On the junction/link graph of GlobalGradient, a network is radial when the
+    links between junctions form a forest; every link ending at a tank is then a
+    boundary of its tree. Choosing one reference boundary per tree, the flow out
+    of each other boundary (s_b) fixes every link flow by mass balance alone,
+    q = T s, where column b of T is the tree path from the reference tank to tank
+    b. What remains is one pressure balance per path,
+
+        R_b(s) = sum_k T[k, b] f_k(q_k) - (h_ref - h_b) = 0
+
+    i.e. a scalar system curve for a line with one source and one sink, and a
+    system of (boundaries - 1) equations otherwise. It is solved by Newton with
+    J = T^T diag(g) T, and junction pressures follow from one sweep down each tree.
+    """
+    dense_paths_limit = 250000 # links x paths entries up to which T is kept as a dense array
+
+    def __init__(self, solver):
+        super().__init__(solver)
+        up, down = self.link_up, self.link_down
+        # Pump flows must stay non-negative: the curves are symmetric in Q and also balance in reverse
+        num_edges = len(solver.edges_list)
+        self.pump_links = np.concatenate([np.flatnonzero(solver.pump_edge_mask),
+                                          num_edges + np.flatnonzero(solver.node_dp_sign[self.element_nodes] > 0)])
+        inner = np.flatnonzero((up >= 0) & (down >= 0))
+        graph = csr_matrix((np.ones(len(inner)), (up[inner], down[inner])), shape=(self.num_junctions, self.num_junctions))
+        num_trees, labels = connected_components(graph, directed=False)
+        boundary = np.flatnonzero((up >= 0) != (down >= 0))
+        self.path_jacobian = None # kept between solves for warm (chord) re-solves
+        self.is_tree = (len(inner) == self.num_junctions - num_trees
+                        and not np.any((up < 0) & (down < 0))
+                        and set(labels[np.where(up[boundary] >= 0, up[boundary], down[boundary])].tolist()) == set(range(num_trees)))
+        if not self.is_tree:
+            return
+
+        adjacency = [[] for _ in range(self.num_junctions)]
+        for k in inner:
+            adjacency[up[k]].append((down[k], k, 1.0))
+            adjacency[down[k]].append((up[k], k, -1.0))
+
+        # Boundary links per tree: (link, junction, +1 if the tank is at the link's downstream end)
+        trees = {}
+        for k in boundary:
+            junction = up[k] if up[k] >= 0 else down[k]
+            trees.setdefault(labels[junction], []).append((k, junction, 1.0 if down[k] < 0 else -1.0))
+
+        # Sweep order from each reference junction: (junction, parent, link, +1 if traversed along the link)
+        self.sweep = []
+        self.roots = []
+        rows, cols, vals = [], [], []
+        ref_heads, tank_heads = [], []
+        for tree in trees.values():
+            ref_link, root, ref_sign = tree[0]
+            self.roots.append((root, ref_link, -ref_sign))
+            parent = {root: (None, None, 0.0)}
+            queue = [root]
+            while queue:
+                v = queue.pop(0)
+                for w, k, along in adjacency[v]:
+                    if w not in parent:
+                        parent[w] = (v, k, along)
+                        self.sweep.append((w, v, k, along))
+                        queue.append(w)
+            for k, junction, sign in tree[1:]:
+                col = len(ref_heads)
+                path = [(ref_link, -ref_sign), (k, sign)]
+                v = junction
+                while v != root:
+                    p, link, along = parent[v]
+                    path.append((link, along))
+                    v = p
+                for link, t in path:
+                    rows.append(link); cols.append(col); vals.append(t)
+                ref_heads.append(self._boundary_node(ref_link))
+                tank_heads.append(self._boundary_node(k))
+        self.num_paths = len(ref_heads)
+        self.paths = csr_matrix((vals, (rows, cols)), shape=(self.num_links, self.num_paths))
+        if self.num_links * self.num_paths <= self.dense_paths_limit:
+            # Small path matrices: dense products avoid the per-call overhead of scipy.sparse
+            self.paths = self.paths.toarray()
+        self.paths_t = self.paths.T.copy() if isinstance(self.paths, np.ndarray) else self.paths.T.tocsr()
+        self.ref_nodes = np.array(ref_heads, dtype=int)
+        self.tank_nodes = np.array(tank_heads, dtype=int)
+        self.boundary_links = np.array([k for tree in trees.values() for k, _, _ in tree[1:]], dtype=int)
+        self.boundary_signs = np.array([sign for tree in trees.values() for _, _, sign in tree[1:]])
+
+    def _boundary_node(self, k):
+        return self.fixed_up[k] if self.fixed_up[k] >= 0 else self.fixed_down[k]
+
+    @staticmethod
+    def supports(solver):
+        return GlobalGradient.supports(solver)
+
+    def _junction_heads(self, head_loss):
+        """Junction pressures by one sweep from each reference tank."""
+        fixed = self.solver.fixed_pressure_nodes
+        h = np.empty(self.num_junctions)
+        for root, ref_link, along in self.roots:
+            h[root] = fixed[self._boundary_node(ref_link)] - along * head_loss[ref_link]
+        for w, v, k, along in self.sweep:
+            h[w] = h[v] - along * head_loss[k]
+        return h
+
+    def _path_jacobian(self, slope):
+        if isinstance(self.paths, np.ndarray):
+            return self.paths_t @ (slope[:, None] * self.paths)
+        return (self.paths_t @ diags(slope) @ self.paths).toarray()
+
+    def _path_drops(self):
+        """Pressure difference between the reference tank and the far tank of every path."""
+        fixed = self.solver.fixed_pressure_nodes
+        return np.array([fixed[r] - fixed[t] for r, t in zip(self.ref_nodes, self.tank_nodes)], dtype=float)
+
+    def _path_residual(self, head_loss, drops):
+        return self.paths_t @ head_loss - drops
+
+    def solve(self, x0, tol=1e-6, max_iter=100, min_step=1e-4, warm=False, contraction=0.5):
+        """
+        Newton on the boundary flows s from the flows in x0 (scaled [p_internal,
+        q_edges], as the solver's residual). The path balances are solved with the
+        fluid properties held; the resulting x (mass balances exact, pressures
+        swept) is then checked with the solver's own residual, which re-propagates
+        the properties, and the path solve repeats until that residual is met.
+        Steps are backtracked on ||R|| and kept on the physical side (no reverse pump flow).
+
+        warm=True is the re-solve after a parameter edit: x0 is the last converged
+        state, so its propagated properties are used as they are, and the path
+        Jacobian of the last solve is reused (chord steps) until the residual
+        contracts by less than `contraction` per step.
+
+        Returns a scipy OptimizeResult with x, success, message, fun, nfev, njev
+        (path Jacobians evaluated), nit and peak_memory_bytes.
+        """
+        solver = self.solver
+        fun = solver._objective
+        num_internal = len(solver.internal_node_indices)
+        num_edges = len(solver.edges_list)
+        p_scale, q_scale = solver.p_scale, solver.q_scale
+        path_tol = 0.1 * tol * p_scale
+
+        q_edges0 = np.asarray(x0, dtype=float)[num_internal:num_internal + num_edges] * q_scale
+        s = self.boundary_signs * q_edges0[self.boundary_links]
+        nfev, njev, nit = 0, 0, 0
+        peak_bytes = 2 * (self.paths.nbytes if isinstance(self.paths, np.ndarray) else sparse_matrix_bytes(self.paths))
+        message = "Maximum number of iterations reached."
+        success = False
+        drops = self._path_drops()
+        check = not warm
+        if not warm:
+            self.path_jacobian = None
+
+        def state(s):
+            q_links = self.paths @ s
+            head_loss, slope = self._head_loss(q_links)
+            return q_links, head_loss, slope
+
+        def unknowns(q_links, head_loss):
+            h = self._junction_heads(head_loss)
+            return np.concatenate([h[:num_internal] / p_scale, q_links[:num_edges] / q_scale])
+
+        f_res = None
+        while True:
+            q_links, head_loss, slope = state(s)
+            if check:
+                x = unknowns(q_links, head_loss)
+                f_res = fun(x)
+                nfev += 1
+                if np.max(np.abs(f_res), initial=0.0) < tol:
+                    success = True
+                    message = "Converged."
+                    break
+                if nit >= max_iter or self.num_paths == 0:
+                    break
+                # Properties were re-propagated at this state: solve the path balances with them held
+                q_links, head_loss, slope = state(s)
+            check = True
+
+            r = self._path_residual(head_loss, drops)
+            norm = np.linalg.norm(r)
+            if nfev and np.max(np.abs(r), initial=0.0) < path_tol:
+                message = "Path balances met but the residual is not."
+                break
+            failed = None
+            refactor = self.path_jacobian is None
+            while nit < max_iter and np.max(np.abs(r), initial=0.0) >= path_tol:
+                if refactor:
+                    self.path_jacobian = self._path_jacobian(slope)
+                    njev += 1
+                    peak_bytes = max(peak_bytes, self.path_jacobian.nbytes + 4 * q_links.nbytes)
+                fresh, refactor = refactor, not warm
+                nit += 1
+                try:
+                    step = np.linalg.solve(self.path_jacobian, -r)
+                except np.linalg.LinAlgError:
+                    if fresh:
+                        failed = "Singular path system."
+                        break
+                    refactor = True
+                    continue
+
+                # A reused Jacobian gets one full step; a fresh one is backtracked on ||R||
+                t = 1.0
+                accepted = False
+                while t >= min_step:
+                    q_new, head_loss_new, slope_new = state(s + t * step)
+                    r_new = self._path_residual(head_loss_new, drops)
+                    norm_new = np.linalg.norm(r_new)
+                    physical = np.all(q_new[self.pump_links] >= -1e-6)
+                    if physical and np.isfinite(norm_new) and norm_new <= (1.0 - 1e-4 * t) * norm:
+                        accepted = True
+                        break
+                    if not fresh:
+                        break
+                    t *= 0.5
+                if not accepted:
+                    if fresh:
+                        failed = "Line search failed to reduce the residual."
+                        break
+                    refactor = True
+                    continue
+                if norm_new > contraction * norm:
+                    refactor = True
+                s = s + t * step
+                r, slope, norm = r_new, slope_new, norm_new
+            if failed:
+                message = failed
+                break
+
+        if f_res is None:
+            # A warm start failed before its first check: report where the path Newton stopped
+            q_links, head_loss, _ = state(s)
+            x = unknowns(q_links, head_loss)
+            f_res = fun(x)
+            nfev += 1
+        return OptimizeResult(x=x, success=success, message=message, fun=f_res,
+                              nfev=nfev, njev=njev, nit=nit, peak_memory_bytes=peak_bytes)
@@ -0,0 +1,53 @@
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from simulation.schemas import HydraulicNetwork
+
+def topology_key(network: HydraulicNetwork) -> str:
+    """
+    Canonical hash of a network's topology: node ids and equipment classes, and
+    edge ids with their endpoints and handles. Parameters (openings, lengths,
+    levels...) are deliberately excluded, so editing them keeps the same key.
+    The key does not depend on the order the frontend lists nodes or edges.
+    """
+    nodes = sorted((node_id, type(node).__name__) for node_id, node in network.nodes.items())
+    edges = sorted(
+        (str(edge.get('id', j)), edge['source'], edge['target'], str(edge.get('source_port')), str(edge.get('target_port')))
+        for j, edge in enumerate(network.edges)
+    )
+    payload = json.dumps({"nodes": nodes, "edges": edges}, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class WarmStartCache:
+    """
+    Last converged state (pressures, flows, regulator openings, TCV mix ratios)
+    per topology, so a re-solve of an unchanged topology starts from it instead
+    of the flat initial guess. Least recently used topologies are evicted.
+    """
+    def __init__(self, max_entries: int = 16):
+        self.max_entries = max_entries
+        self._states: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._states)
+
+    def lookup(self, network: HydraulicNetwork) -> Optional[Dict[str, Any]]:
+        key = topology_key(network)
+        state = self._states.get(key)
+        if state is not None:
+            self._states.move_to_end(key)
+        return state
+
+    def store(self, network: HydraulicNetwork, state: Optional[Dict[str, Any]]):
+        if state is None:
+            return
+        key = topology_key(network)
+        self._states[key] = state
+        self._states.move_to_end(key)
+        while len(self._states) > self.max_entries:
+            self._states.popitem(last=False)
+
+    def clear(self):
+        self._states.clear()
@@ -0,0 +1,91 @@
+import sys
+import os
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from simulation.schemas import ReactFlowGraph, HydraulicNetwork, GlobalSettings
+from simulation.graph_parser import GraphParser
+from simulation.solver import NetworkSolver, MIN_PRESSURE
+from simulation.equipment.tank import Tank
+from simulation.equipment.pipe import Pipe
+from simulation.equipment.centrifugal_pump import CentrifugalPump
+from test_performance_bench import generate_pump_header_network
+
+def edge_flows(network):
+    return np.array([e['pipe'].inlets[0].flow_rate for e in network.edges])
+
+def build_starved_pump(method):
+    """A 10 bar pump drawing through 50 m of 10 mm suction line: its only root needs -10 bar at the suction."""
+    gs = GlobalSettings(tree_solver=False, solver_method=method)
+    nodes = {
+        "t1": Tank("Source", fluid_level=1.0),
+        "pump": CentrifugalPump("Pump", flow_rated=100.0/60000.0, pressure_rated=10e5),
+        "t2": Tank("Sink", fluid_level=1.0),
+    }
+    edges = [
+        {"source": "t1", "target": "pump", "pipe": Pipe("suction", 50.0, 0.01)},
+        {"source": "pump", "target": "t2", "pipe": Pipe("discharge", 2.0, 0.05)},
+    ]
+    network = HydraulicNetwork(nodes=nodes, edges=edges, global_settings=gs)
+    for n in nodes.values(): n.global_settings = gs
+    for e in edges: e['pipe'].global_settings = gs
+    return network
+
+def test_pump_header_without_fallback():
+    """
+    The two-pump header, where HYBR needs the LM fallback: the bounded trust
+    region converges on its own to the same operating point.
+    """
+    print("\n--- Bounded Trust Region (Pump Header) ---")
+    reference = GraphParser.parse_graph(ReactFlowGraph(**generate_pump_header_network()))
+    hybr = NetworkSolver(reference).solve(method='hybr')
+    network = GraphParser.parse_graph(ReactFlowGraph(**generate_pump_header_network()))
+    solver = NetworkSolver(network)
+    stats = solver.solve(method='trf')
+    assert hybr["success"] and hybr["fallback_used"]
+    assert stats["success"] and not stats["fallback_used"]
+    assert np.allclose(edge_flows(network), edge_flows(reference), rtol=1e-5, atol=1e-8)
+    assert all(n.inlets[0].pressure >= MIN_PRESSURE for n in network.nodes.values() if n.inlets)
+    print(f"  HYBR + LM {hybr['time_ms']:.1f} ms, TRF {stats['time_ms']:.1f} ms ({stats['total_inner_iterations']} calls)")
+    print("  RESULT: SUCCESS")
+
+def test_no_physical_root_is_reported():
+    """
+    A suction-starved pump has no root above -1 bar: HYBR lands on the
+    unphysical one via LM, the bounded solve fails and says why.
+    """
+    print("\n--- Bounded Trust Region (No Physical Root) ---")
+    network = build_starved_pump('hybr')
+    hybr = NetworkSolver(network).solve(method='hybr')
+    assert hybr["fallback_used"]
+    assert network.nodes["pump"].inlets[0].pressure < MIN_PRESSURE
+
+    stats = NetworkSolver(build_starved_pump('trf')).solve(method='trf')
+    assert not stats["success"] and not stats["fallback_used"]
+    assert "No root inside the bounds" in stats["error"]
+    print(f"  HYBR suction {network.nodes['pump'].inlets[0].pressure/1e5:.1f} bar; TRF: {stats['error']}")
+    print("  RESULT: SUCCESS")
+
+def test_bounds_match_physical_check():
+    """Points on the bounds pass _is_physical, points just outside them do not."""
+    print("\n--- Bounded Trust Region (Bounds) ---")
+    solver = NetworkSolver(GraphParser.parse_graph(ReactFlowGraph(**generate_pump_header_network())))
+    solver.solve(method='hybr')
+    n = len(solver.internal_node_indices) + len(solver.edges_list)
+    lower, upper = solver._physical_bounds(n)
+    assert np.all(np.isinf(upper))
+    x = np.where(np.isfinite(lower), lower, 0.0)
+    assert solver._is_physical(x)
+    for i in np.flatnonzero(np.isfinite(lower)):
+        outside = x.copy()
+        outside[i] -= 1e-2
+        assert not solver._is_physical(outside)
+    print(f"  {np.isfinite(lower).sum()} of {n} unknowns bounded")
+    print("  RESULT: SUCCESS")
+
+if __name__ == "__main__":
+    test_pump_header_without_fallback()
+    test_no_physical_root_is_reported()
+    test_bounds_match_physical_check()
@@ -0,0 +1,101 @@
+import sys
+import os
+import pickle
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from simulation.schemas import GlobalSettings
+from simulation.equipment.pipe import Pipe
+from simulation.equipment.orifice import Orifice
+from simulation.equipment.filter import Filter
+from simulation.equipment.heat_exchanger import HeatExchanger
+from simulation.equipment.linear_control_valve import LinearControlValve
+from simulation.equipment.linear_regulator import LinearRegulator
+from simulation.equipment.remote_control_valve import RemoteControlValve
+from simulation.equipment.centrifugal_pump import CentrifugalPump
+from simulation.equipment.volumetric_pump import VolumetricPump
+from simulation.pipe_bank import PipeBank
+from simulation.batch_kernels import has_batch_kernel, kernel_for
+
+def fresh(element, **parameters):
+    """The same equipment built from scratch: its coefficients were never compiled."""
+    copy = pickle.loads(pickle.dumps(element))
+    copy.invalidate_coefficients()
+    for name, value in parameters.items():
+        setattr(copy, name, value)
+    return copy
+
+def test_setters_recompile():
+    """
+    Assigning a listed parameter drops the compiled constants; the next call
+    matches equipment that never compiled them, bit for bit, and the batch
+    kernels built from the same constants follow.
+    """
+    print("\n--- Compiled Coefficients (Setters) ---")
+    edits = [
+        (Filter("F", clogging_pct=10.0), "clogging_pct", 80.0),
+        (LinearControlValve("V", max_cv=0.05, opening_pct=60.0), "opening_pct", 20.0),
+        (LinearRegulator("R", max_cv=0.05), "opening_pct", 35.0),
+        (RemoteControlValve("RC", max_cv=0.05), "max_cv", 0.02),
+        (Orifice("O", pipe_diameter=0.1, orifice_diameter=0.07), "orifice_diameter", 0.05),
+        (Pipe("P", 10.0, 0.05), "diameter", 0.08),
+        (CentrifugalPump("C", flow_rated=0.002, pressure_rated=5e5), "pressure_rated", 3e5),
+        (VolumetricPump("VP", flow_rated=0.002, motor_power=5000.0, efficiency=0.85), "motor_power", 2000.0),
+        (HeatExchanger("HX"), "pressure_drop_factor", 20.0),
+    ]
+    for element, name, value in edits:
+        before = element.calculate_delta_p(0.0015, 870.0, 0.03)
+        setattr(element, name, value)
+        after = element.calculate_delta_p(0.0015, 870.0, 0.03)
+        reference = fresh(element)
+        assert after == reference.calculate_delta_p(0.0015, 870.0, 0.03), type(element).__name__
+        assert element.calculate_delta_p_derivative(0.0015, 870.0, 0.03) == reference.calculate_delta_p_derivative(0.0015, 870.0, 0.03)
+        assert after != before, type(element).__name__
+        if has_batch_kernel(type(element)):
+            kernel = kernel_for(type(element))([element])
+            assert np.isclose(kernel.delta_p(np.array([0.0015]), np.array([870.0]), np.array([0.03]))[0], after, rtol=1e-12)
+    assert CentrifugalPump("C", flow_rated=0.002, pressure_rated=3e5).C_coeff == edits[6][0].C_coeff
+    print("  RESULT: SUCCESS")
+
+def test_outside_inputs_and_design_point():
+    """
+    The global roughness lives outside the pipe: PipeBank.refresh (run at every
+    solve) recompiles it. The heat exchanger re-derives its design-point UA only
+    when cp or a design parameter changes.
+    """
+    print("\n--- Compiled Coefficients (Roughness / UA) ---")
+    gs = GlobalSettings()
+    pipe = Pipe("P", 50.0, 0.05)
+    pipe.global_settings = gs
+    smooth = pipe.calculate_delta_p(0.004, 1000.0, 0.001)
+    gs.global_roughness = 0.001
+    PipeBank([pipe]).refresh()
+    rough = pipe.calculate_delta_p(0.004, 1000.0, 0.001)
+    assert rough > smooth and rough == fresh(pipe).calculate_delta_p(0.004, 1000.0, 0.001)
+
+    hx = HeatExchanger("HX")
+    ua = hx._calculate_ua_rated(2000.0)
+    assert ua == hx._design_point_ua(2000.0) and hx._calculate_ua_rated(2000.0) == ua
+    assert hx._calculate_ua_rated(4184.0) == hx._design_point_ua(4184.0) != ua
+    hx.medium_temp_c = 30.0
+    assert hx._calculate_ua_rated(4184.0) == hx._design_point_ua(4184.0)
+    print("  RESULT: SUCCESS")
+
+def test_invalid_geometry_still_raises():
+    """A geometry error is raised on every call, not compiled away."""
+    print("\n--- Compiled Coefficients (Invalid Geometry) ---")
+    for element in (Pipe("P", 10.0, 0.0), Orifice("O", pipe_diameter=0.1, orifice_diameter=0.0)):
+        for _ in range(2):
+            try:
+                element.calculate_delta_p(0.001, 1000.0, 0.001)
+                assert False, "expected ValueError"
+            except ValueError:
+                pass
+    print("  RESULT: SUCCESS")
+
+if __name__ == "__main__":
+    test_setters_recompile()
+    test_outside_inputs_and_design_point()
+    test_invalid_geometry_still_raises()
@@ -0,0 +1,138 @@
+import sys
+import os
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from simulation.schemas import HydraulicNetwork, GlobalSettings
+from simulation.solver import NetworkSolver
+from simulation.components import split_components
+from simulation.equipment.tank import Tank
+from simulation.equipment.pipe import Pipe
+from simulation.equipment.centrifugal_pump import CentrifugalPump
+from simulation.equipment.linear_control_valve import LinearControlValve
+from simulation.equipment.remote_control_valve import RemoteControlValve
+from simulation.equipment.filter import Filter
+from simulation.equipment.orifice import Orifice
+from simulation.equipment.splitter import Splitter
+from simulation.equipment.mixer import Mixer
+
+ATM = 101325.0
+
+def build_skid_and_cooling(remote_sensing=False, **settings):
+    """
+    Lube-oil skid (pump, filter, valve) and a looped cooling-water circuit on one
+    canvas, both draining to the same tank. With remote_sensing the cooling
+    circuit's valve senses the skid's filter outlet (a signal edge).
+    """
+    gs = GlobalSettings(**settings)
+    nodes = {
+        "oil": Tank("Oil Reservoir", fluid_level=2.0, fluid_type="iso_vg_46", temperature=323.15),
+        "oil_pump": CentrifugalPump("Oil Pump", flow_rated=150.0/60000.0, pressure_rated=5e5),
+        "filt": Filter("Oil Filter", clogging_pct=25.0),
+        "oil_valve": LinearControlValve("Oil Valve", max_cv=0.04, opening_pct=60.0),
+        "water": Tank("Cooling Basin", fluid_level=3.0, temperature=298.15),
+        "cw_pump": CentrifugalPump("CW Pump", flow_rated=400.0/60000.0, pressure_rated=4e5),
+        "split": Splitter("CW Header"),
+        "ori": Orifice("Cooler A", pipe_diameter=0.06, orifice_diameter=0.04),
+        "mix": Mixer("CW Return"),
+        "drain": Tank("Drain", fluid_level=0.5),
+    }
+    if remote_sensing:
+        nodes["cw_valve"] = RemoteControlValve("CW Valve", max_cv=0.08, set_pressure=3e5 + ATM)
+        nodes["cw_valve"].remote_sensing_config = {"node_id": "filt", "port_type": "outlet", "port_idx": 0}
+    else:
+        nodes["cw_valve"] = LinearControlValve("CW Valve", max_cv=0.08, opening_pct=50.0)
+    edges = [
+        {"id": "o1", "source": "oil", "target": "oil_pump", "pipe": Pipe("o1", 2.0, 0.06)},
+        {"id": "o2", "source": "oil_pump", "target": "filt", "pipe": Pipe("o2", 5.0, 0.04)},
+        {"id": "o3", "source": "filt", "target": "oil_valve", "pipe": Pipe("o3", 5.0, 0.04)},
+        {"id": "o4", "source": "oil_valve", "target": "drain", "pipe": Pipe("o4", 10.0, 0.04)},
+        {"id": "w1", "source": "water", "target": "cw_pump", "pipe": Pipe("w1", 2.0, 0.1)},
+        {"id": "w2", "source": "cw_pump", "target": "split", "pipe": Pipe("w2", 10.0, 0.08)},
+        {"id": "w3", "source": "split", "target": "ori", "source_port": "outlet-0", "pipe": Pipe("w3", 20.0, 0.06)},
+        {"id": "w4", "source": "ori", "target": "mix", "target_port": "inlet-0", "pipe": Pipe("w4", 5.0, 0.06)},
+        {"id": "w5", "source": "split", "target": "cw_valve", "source_port": "outlet-1", "pipe": Pipe("w5", 30.0, 0.05)},
+        {"id": "w6", "source": "cw_valve", "target": "mix", "target_port": "inlet-1", "pipe": Pipe("w6", 5.0, 0.05)},
+        {"id": "w7", "source": "mix", "target": "drain", "pipe": Pipe("w7", 10.0, 0.08)},
+    ]
+    network = HydraulicNetwork(nodes=nodes, edges=edges, global_settings=gs)
+    for n in nodes.values(): n.global_settings = gs
+    for e in edges: e['pipe'].global_settings = gs
+    return network
+
+def port_states(network, field):
+    """One value per port of every node and edge, as packaged by build_telemetry."""
+    values = []
+    for node in network.nodes.values():
+        values += [getattr(p, field) for p in node.inlets + node.outlets]
+    for edge in network.edges:
+        values += [getattr(p, field) for p in edge['pipe'].inlets + edge['pipe'].outlets]
+    return np.array(values)
+
+def assert_same_state(network, reference):
+    for field, atol in (("flow_rate", 1e-9), ("pressure", 1.0), ("temperature", 1e-6)):
+        assert np.max(np.abs(port_states(network, field) - port_states(reference, field))) < atol, field
+
+def test_independent_circuits_solved_separately():
+    """
+    Two circuits meeting only at a drain tank are solved as two systems; the
+    merged telemetry equals the coupled solve, including the shared tank's inflow.
+    """
+    print("\n--- Component Decomposition (Skid + Cooling Water) ---")
+    reference = build_skid_and_cooling(component_decomposition=False)
+    coupled = NetworkSolver(reference).solve()
+    network = build_skid_and_cooling()
+    solver = NetworkSolver(network)
+    stats = solver.solve()
+    assert coupled["success"] and stats["success"]
+    assert len(solver.components) == 2 and len(stats["components"]) == 2
+    assert stats["system_size"] == coupled["system_size"]
+    print(f"  Coupled: {coupled['time_ms']:.1f} ms, split: {stats['time_ms']:.1f} ms "
+          f"(sizes {[c['system_size'] for c in stats['components']]})")
+
+    assert_same_state(network, reference)
+    drain = network.nodes["drain"].inlets[0].flow_rate
+    assert np.isclose(drain, network.edges[3]['pipe'].inlets[0].flow_rate + network.edges[10]['pipe'].inlets[0].flow_rate)
+    print(f"  Drain inflow {drain*60000:.1f} L/min")
+    print("  RESULT: SUCCESS")
+
+def test_process_pool_matches_sequential():
+    """
+    With parallel_workers the components are solved in worker processes: cold
+    solves and valve re-solves land on the same state as in-process solving.
+    """
+    print("\n--- Component Decomposition (Process Pool) ---")
+    reference = build_skid_and_cooling()
+    ref_solver = NetworkSolver(reference)
+    network = build_skid_and_cooling(parallel_workers=2)
+    solver = NetworkSolver(network)
+    assert ref_solver.solve()["success"] and solver.solve()["success"]
+    assert_same_state(network, reference)
+
+    for net in (network, reference):
+        net.nodes["cw_valve"].opening_pct = 30.0
+    stats = solver.resolve()
+    assert ref_solver.resolve()["success"] and stats["success"] and stats["warm_start"]
+    assert_same_state(network, reference)
+    print(f"  Re-solve in {stats['time_ms']:.1f} ms, CW valve flow {network.nodes['cw_valve'].inlets[0].flow_rate*60000:.1f} L/min")
+    print("  RESULT: SUCCESS")
+
+def test_signal_edge_couples_circuits():
+    """A remote control valve sensing the other circuit keeps both in one system."""
+    print("\n--- Component Decomposition (Signal Edge) ---")
+    network = build_skid_and_cooling(remote_sensing=True)
+    assert len(split_components(network)) == 1
+    solver = NetworkSolver(network)
+    stats = solver.solve()
+    assert stats["success"] and solver.components is None
+    sensed = network.nodes["cw_valve"].sensed_pressure
+    assert abs(sensed - network.nodes["filt"].outlets[0].pressure) < 1.0
+    print(f"  CW valve senses {(sensed - ATM)/1e5:.2f} barg at the oil filter")
+    print("  RESULT: SUCCESS")
+
+if __name__ == "__main__":
+    test_independent_circuits_solved_separately()
+    test_process_pool_matches_sequential()
+    test_signal_edge_couples_circuits()
@@ -0,0 +1,61 @@
+import sys
+import os
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from simulation.schemas import ReactFlowGraph
+from simulation.graph_parser import GraphParser
+from simulation.solver import NetworkSolver
+from test_embedded_control import build_regulated_network
+from test_performance_bench import generate_pump_header_network
+
+def build_two_pump_network(solver_method):
+    network = GraphParser.parse_graph(ReactFlowGraph(**generate_pump_header_network()))
+    network.global_settings.solver_method = solver_method
+    return network
+
+def flows(network):
+    return np.array([e['pipe'].inlets[0].flow_rate for e in network.edges])
+
+def test_two_pump_network_without_fallback():
+    """
+    Sparse Newton stalls on the two-pump header and needs the LM fallback; the
+    continuation path reaches the same operating point on its own and reports
+    its steps, path length and time.
+    """
+    print("\n--- Continuation (Two Pumps, Meshed Header) ---")
+    newton_net = build_two_pump_network('sparse_newton')
+    newton = NetworkSolver(newton_net).solve()
+    network = build_two_pump_network('continuation')
+    stats = NetworkSolver(network).solve()
+    assert newton["success"] and newton["fallback_used"] and newton["continuation"] is None
+    assert stats["success"] and not stats["fallback_used"]
+    path = stats["continuation"]
+    assert path["steps"] > 1 and path["path_length"] > 0.0 and 0.0 < path["time_ms"] <= stats["time_ms"]
+    assert np.allclose(flows(network), flows(newton_net), rtol=1e-5, atol=1e-9)
+    print(f"  {path['steps']} steps ({path['rejected_steps']} rejected), path length {path['path_length']:.1f}, "
+          f"{path['time_ms']:.1f} ms")
+    print("  RESULT: SUCCESS")
+
+def test_easy_network_single_step():
+    """
+    Where Newton converges the first step goes straight to lambda = 1; the
+    embedded regulator openings ride along as extra unknowns.
+    """
+    print("\n--- Continuation (Embedded Regulators, One Step) ---")
+    reference, _ = build_regulated_network("embedded")
+    assert NetworkSolver(reference).solve(method='sparse_newton')["success"]
+    network, _ = build_regulated_network("embedded")
+    stats = NetworkSolver(network).solve(method='continuation')
+    assert stats["success"] and not stats["fallback_used"]
+    assert stats["continuation"]["steps"] >= 1 and stats["continuation"]["rejected_steps"] == 0
+    for node_id, node in network.nodes.items():
+        assert abs(node.inlets[0].pressure - reference.nodes[node_id].inlets[0].pressure) < 10.0
+    print(f"  {stats['continuation']['steps']} steps, path length {stats['continuation']['path_length']:.2f}")
+    print("  RESULT: SUCCESS")
+
+if __name__ == "__main__":
+    test_two_pump_network_without_fallback()
+    test_easy_network_single_step()
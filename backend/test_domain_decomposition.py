@@ -0,0 +1,88 @@
+import sys
+import os
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from simulation.schemas import ReactFlowGraph, HydraulicNetwork, GlobalSettings
+from simulation.graph_parser import GraphParser
+from simulation.solver import NetworkSolver
+from simulation.equipment.tank import Tank
+from simulation.equipment.pipe import Pipe
+from simulation.equipment.centrifugal_pump import CentrifugalPump
+from simulation.equipment.filter import Filter
+from test_performance_bench import generate_grid_network
+
+def edge_flows(network):
+    return np.array([e['pipe'].inlets[0].flow_rate for e in network.edges])
+
+def parse_grid(size, workers=1):
+    network = GraphParser.parse_graph(ReactFlowGraph(**generate_grid_network(size, size)))
+    network.global_settings.parallel_workers = workers
+    return network
+
+def test_grid_matches_sparse_newton():
+    """
+    A 12x12 oil grid cut into two subdomains: the interface Newton converges and
+    the result is the whole-system sparse Newton operating point.
+    """
+    print("\n--- Domain Decomposition (12x12 Grid) ---")
+    reference = parse_grid(12)
+    newton = NetworkSolver(reference).solve(method='sparse_newton')
+    network = parse_grid(12)
+    solver = NetworkSolver(network)
+    stats = solver.solve(method='domain_decomposition')
+    assert newton["success"] and stats["success"] and not stats["fallback_used"]
+    domains = solver._domains
+    assert domains and domains.decomposed and len(domains.interface) > 0
+    assert len(domains.interface) < len(solver.internal_node_indices) // 4
+    print(f"  {len(domains.interface)} interface nodes of {len(solver.internal_node_indices)}, "
+          f"Newton {newton['time_ms']:.1f} ms, decomposed {stats['time_ms']:.1f} ms")
+
+    assert np.allclose(edge_flows(network), edge_flows(reference), rtol=1e-6, atol=1e-9)
+    for node_id in ("j_0_0", "j_6_6", "j_11_11"):
+        assert abs(network.nodes[node_id].inlets[0].pressure - reference.nodes[node_id].inlets[0].pressure) < 1.0
+    print("  RESULT: SUCCESS")
+
+def test_worker_processes_match():
+    """Subdomains solved in two worker processes give the in-process answer."""
+    print("\n--- Domain Decomposition (Worker Processes) ---")
+    reference = parse_grid(10)
+    assert NetworkSolver(reference).solve(method='domain_decomposition')["success"]
+    network = parse_grid(10, workers=2)
+    solver = NetworkSolver(network)
+    stats = solver.solve(method='domain_decomposition')
+    assert stats["success"] and solver._domains.parts == 2 and solver._domains.decomposed
+    assert np.allclose(edge_flows(network), edge_flows(reference), rtol=1e-6, atol=1e-9)
+    print(f"  Solved in {stats['time_ms']:.1f} ms")
+    print("  RESULT: SUCCESS")
+
+def test_unsupported_network_uses_sparse_newton():
+    """A pump and filter line has no junction to cut at: it is solved whole, as sparse_newton."""
+    print("\n--- Domain Decomposition (No Interface Junction) ---")
+    gs = GlobalSettings(tree_solver=False)
+    nodes = {
+        "t1": Tank("Source", fluid_level=2.0),
+        "pump": CentrifugalPump("Pump", flow_rated=100.0/60000.0, pressure_rated=3e5),
+        "filt": Filter("Filter", clogging_pct=10.0),
+        "t2": Tank("Sink", fluid_level=1.0),
+    }
+    edges = [
+        {"source": "t1", "target": "pump", "pipe": Pipe("p1", 2.0, 0.05)},
+        {"source": "pump", "target": "filt", "pipe": Pipe("p2", 10.0, 0.04)},
+        {"source": "filt", "target": "t2", "pipe": Pipe("p3", 10.0, 0.04)},
+    ]
+    network = HydraulicNetwork(nodes=nodes, edges=edges, global_settings=gs)
+    for n in nodes.values(): n.global_settings = gs
+    for e in edges: e['pipe'].global_settings = gs
+    solver = NetworkSolver(network)
+    stats = solver.solve(method='domain_decomposition')
+    assert stats["success"] and not stats["fallback_used"] and solver._domains is False
+    print(f"  Pump flow {network.nodes['pump'].inlets[0].flow_rate*60000:.1f} L/min")
+    print("  RESULT: SUCCESS")
+
+if __name__ == "__main__":
+    test_grid_matches_sparse_newton()
+    test_worker_processes_match()
+    test_unsupported_network_uses_sparse_newton()
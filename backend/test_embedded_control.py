@@ -0,0 +1,154 @@
+import sys
+import os
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from simulation.schemas import HydraulicNetwork, GlobalSettings
+from simulation.solver import NetworkSolver
+from simulation.embedded_control import EmbeddedControl
+from simulation.equipment.tank import Tank
+from simulation.equipment.pipe import Pipe
+from simulation.equipment.centrifugal_pump import CentrifugalPump
+from simulation.equipment.splitter import Splitter
+from simulation.equipment.orifice import Orifice
+from simulation.equipment.linear_control_valve import LinearControlValve
+from simulation.equipment.linear_regulator import LinearRegulator
+from simulation.equipment.remote_control_valve import RemoteControlValve
+from test_physics_tcv import build_tcv_network
+
+ATM = 101325.0
+
+def build_regulated_network(control_mode, branch_set_bar=3.0):
+    """
+    Pump -> header PRV (6 barg) -> splitter feeding a branch PRV and a remote-sensing
+    valve, with a backpressure regulator spilling the pump discharge. The two PRVs
+    in series interact: the branch one moves the header flow the first one sees.
+    """
+    gs = GlobalSettings(control_mode=control_mode)
+    nodes = {
+        "src": Tank("Source", fluid_level=2.0),
+        "pump": CentrifugalPump("Pump", flow_rated=300.0/60000.0, pressure_rated=10e5),
+        "prv1": LinearRegulator("Header PRV", max_cv=0.1, set_pressure=6e5 + ATM),
+        "split": Splitter("Header"),
+        "prv2": LinearRegulator("Branch PRV", max_cv=0.05, set_pressure=branch_set_bar * 1e5 + ATM),
+        "load_a": LinearControlValve("Load A", max_cv=0.03, opening_pct=70.0),
+        "rcv": RemoteControlValve("Branch B RCV", max_cv=0.05, set_pressure=2e5 + ATM),
+        "ori": Orifice("Load B", pipe_diameter=0.05, orifice_diameter=0.02),
+        "bpr": LinearRegulator("Spill BPR", max_cv=0.05, set_pressure=7e5 + ATM, backpressure=True),
+        "sink_a": Tank("Sink A", fluid_level=1.0),
+        "sink_b": Tank("Sink B", fluid_level=1.0),
+        "sink_c": Tank("Sink C", fluid_level=1.0),
+    }
+    nodes["rcv"].remote_sensing_config = {"node_id": "ori", "port_type": "inlet", "port_idx": 0}
+    edges = [
+        {"id": "e1", "source": "src", "target": "pump", "pipe": Pipe("p1", 2.0, 0.08)},
+        {"id": "e2", "source": "pump", "target": "prv1", "pipe": Pipe("p2", 5.0, 0.06)},
+        {"id": "e3", "source": "prv1", "target": "split", "pipe": Pipe("p3", 5.0, 0.06)},
+        {"id": "e4", "source": "split", "target": "prv2", "source_port": "outlet-0", "pipe": Pipe("p4", 10.0, 0.05)},
+        {"id": "e5", "source": "prv2", "target": "load_a", "pipe": Pipe("p5", 10.0, 0.05)},
+        {"id": "e6", "source": "load_a", "target": "sink_a", "pipe": Pipe("p6", 5.0, 0.05)},
+        {"id": "e7", "source": "split", "target": "rcv", "source_port": "outlet-1", "pipe": Pipe("p7", 10.0, 0.05)},
+        {"id": "e8", "source": "rcv", "target": "ori", "pipe": Pipe("p8", 20.0, 0.05)},
+        {"id": "e9", "source": "ori", "target": "sink_b", "pipe": Pipe("p9", 5.0, 0.05)},
+        {"id": "e10", "source": "pump", "target": "bpr", "pipe": Pipe("p10", 5.0, 0.04)},
+        {"id": "e11", "source": "bpr", "target": "sink_c", "pipe": Pipe("p11", 5.0, 0.04)},
+    ]
+    network = HydraulicNetwork(nodes=nodes, edges=edges, global_settings=gs)
+    for n in nodes.values(): n.global_settings = gs
+    for e in edges: e['pipe'].global_settings = gs
+    return network, nodes
+
+def test_interacting_regulators():
+    """
+    With control_mode "embedded" the openings are solved together with the
+    hydraulics: same operating point as the outer loop, without its control iterations.
+    """
+    print("\n--- Embedded Control (Interacting Regulators) ---")
+    outer_net, outer_nodes = build_regulated_network("outer_loop")
+    outer = NetworkSolver(outer_net).solve(method='sparse_newton')
+    embedded_net, nodes = build_regulated_network("embedded")
+    embedded = NetworkSolver(embedded_net).solve(method='sparse_newton')
+    assert outer["success"] and embedded["success"] and not embedded["fallback_used"]
+    print(f"  Outer loop: {outer['outer_iterations']} control / {outer['total_inner_iterations']} residual calls")
+    print(f"  Embedded:   {embedded['outer_iterations']} control / {embedded['total_inner_iterations']} residual calls")
+    assert embedded["outer_iterations"] <= 2
+    assert embedded["total_inner_iterations"] < outer["total_inner_iterations"]
+
+    # Set points met exactly, saturated valves wide open
+    assert abs(nodes["prv1"].outlets[0].pressure - nodes["prv1"].set_pressure) < 1.0
+    assert abs(nodes["prv2"].outlets[0].pressure - nodes["prv2"].set_pressure) < 1.0
+    assert nodes["rcv"].opening_pct > 99.99 and nodes["rcv"].sensed_pressure < nodes["rcv"].set_pressure
+    assert nodes["bpr"].opening_pct > 99.99 and nodes["bpr"].inlets[0].pressure > nodes["bpr"].set_pressure
+    for key in ("prv1", "prv2"):
+        print(f"  {nodes[key].name}: {nodes[key].opening_pct:.2f}% (outer loop {outer_nodes[key].opening_pct:.2f}%)")
+        assert abs(nodes[key].opening_pct - outer_nodes[key].opening_pct) < 0.5
+    print("  RESULT: SUCCESS")
+
+def test_saturated_regulator():
+    """
+    An unreachable set point leaves the regulator at its bound (fully open) instead
+    of failing the Newton solve.
+    """
+    print("\n--- Embedded Control (Saturated Regulator) ---")
+    network, nodes = build_regulated_network("embedded", branch_set_bar=9.0)
+    stats = NetworkSolver(network).solve(method='sparse_newton')
+    prv = nodes["prv2"]
+    print(f"  Branch PRV: {prv.opening_pct:.2f}%, outlet {(prv.outlets[0].pressure - ATM)/1e5:.3f} barg (set 9.000)")
+    assert stats["success"] and stats["outer_iterations"] <= 2
+    assert prv.opening_pct > 99.99 and prv.outlets[0].pressure < prv.set_pressure
+    assert abs(nodes["prv1"].outlets[0].pressure - nodes["prv1"].set_pressure) < 1.0
+    print("  RESULT: SUCCESS")
+
+def test_embedded_jacobian():
+    """
+    The augmented Jacobian (control columns and set-point rows) must match a
+    finite-difference Jacobian of the extended residual.
+    """
+    print("\n--- Embedded Control Jacobian vs Finite Difference ---")
+    network, _ = build_regulated_network("outer_loop")
+    solver = NetworkSolver(network)
+    assert solver.solve()["success"]
+    solver.embedded_control = EmbeddedControl(solver)
+    num_internal = len(solver.internal_node_indices)
+    x = np.concatenate([solver.last_solution[:num_internal] / solver.p_scale,
+                        solver.last_solution[num_internal:] / solver.q_scale,
+                        [0.6, 0.5, 0.7, 0.8]])
+    # Settle property propagation so the residual is a pure function of x
+    for _ in range(3): solver._objective(x)
+    solver.properties_frozen = True
+
+    jac = solver._jacobian(x).toarray()
+    jac_fd = np.zeros_like(jac)
+    for k in range(len(x)):
+        h = 1e-6 * max(1.0, abs(x[k]))
+        xp, xm = x.copy(), x.copy()
+        xp[k] += h
+        xm[k] -= h
+        jac_fd[:, k] = (solver._objective(xp) - solver._objective(xm)) / (2 * h)
+
+    err = np.max(np.abs(jac - jac_fd) / (1.0 + np.abs(jac_fd)))
+    print(f"  Max relative error: {err:.2e}")
+    assert err < 1e-4
+    print("  RESULT: SUCCESS")
+
+def test_embedded_tcv():
+    """
+    A TCV mix ratio solved as an unknown reaches its outlet set point.
+    """
+    print("\n--- Embedded Control (TCV Mixing) ---")
+    network, tcv = build_tcv_network()
+    network.global_settings = GlobalSettings(fluid_type="iso_vg_46", control_mode="embedded")
+    stats = NetworkSolver(network).solve(method='hybr')
+    t_out = tcv.outlets[0].temperature
+    print(f"  Outlet {t_out - 273.15:.3f} C at {tcv.mix_ratio*100:.1f}% hot, {stats['outer_iterations']} control iterations")
+    assert stats["success"]
+    assert abs(t_out - tcv.set_temperature) < 0.1
+    print("  RESULT: SUCCESS")
+
+if __name__ == "__main__":
+    test_interacting_regulators()
+    test_saturated_regulator()
+    test_embedded_jacobian()
+    test_embedded_tcv()
@@ -0,0 +1,116 @@
+import sys
+import os
+import subprocess
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from simulation.schemas import ReactFlowNode, GlobalSettings
+from simulation.graph_parser import GraphParser
+from simulation.equipment_registry import EQUIPMENT_TYPES, register_equipment, equipment_type
+from simulation.equipment.centrifugal_pump import CentrifugalPump
+from simulation.equipment.heat_exchanger import HeatExchanger
+from simulation.solver import NetworkSolver
+from test_incremental_resolve import line_graph, parse
+
+def test_registered_types_parse_node_data():
+    """
+    Every registered type builds its node from React Flow data with the
+    editor's keys and units; unknown types stay plain nodes.
+    """
+    print("\n--- Equipment Registry (Parsers) ---")
+    settings = GlobalSettings(fluid_type="iso_vg_46")
+    def create(node_type, data):
+        return GraphParser.create_node(ReactFlowNode(id="n1", type=node_type, position={"x": 0, "y": 0}, data=data), settings)
+
+    tank = create("tank", {"level": 3.0})
+    assert tank.fluid_type == "iso_vg_46" and tank.fluid_level == 3.0 and tank.global_settings is settings
+    assert create("tank", {"fluid_type": "water"}).fluid_type == "water"
+    pump = create("pump", {"flow_rated_lmin": 300, "pressure_rated_bar": 7})
+    assert isinstance(pump, CentrifugalPump) and np.isclose(pump.flow_rated, 0.005) and pump.pressure_rated == 7e5
+    volumetric = create("volumetric_pump", {"motor_power": 2, "efficiency": 90})
+    assert volumetric.motor_power == 2000.0 and volumetric.efficiency == 0.9
+    cooler = create("heat_exchanger", {"k_factor": 4.0})
+    assert isinstance(cooler, HeatExchanger) and cooler.pressure_drop_factor == 4.0
+    tcv = create("three_way_tcv", {"set_temperature_c": 45.0})
+    assert np.isclose(tcv.set_temperature, 318.15) and len(tcv.inlets) == 2
+    assert create("linear_control_valve", {}).opening_pct == 50.0
+    assert len(create("splitter", {}).outlets) == 2 and len(create("mixer", {}).inlets) == 2
+    sketch = create("annotation", {"label": "Note"})
+    assert type(sketch).__name__ == "HydraulicNode" and sketch.name == "Note" and sketch.node_type == "annotation"
+    print(f"  {len(EQUIPMENT_TYPES)} registered types")
+    print("  RESULT: SUCCESS")
+
+def test_modules_load_lazily_and_flags():
+    """
+    Parsing imports only the equipment modules a graph uses, and each type
+    reports its capability flags, including whether a batch kernel is registered.
+    """
+    print("\n--- Equipment Registry (Lazy Imports) ---")
+    script = (
+        "import sys\n"
+        "from simulation.schemas import ReactFlowGraph\n"
+        "from simulation.graph_parser import GraphParser\n"
+        "node = lambda i, t: {'id': i, 'type': t, 'position': {'x': 0, 'y': 0}, 'data': {}}\n"
+        "GraphParser.parse_graph(ReactFlowGraph(nodes=[node('t1', 'tank'), node('o1', 'orifice')], edges=[]))\n"
+        "print(' '.join(sorted(m.split('.')[-1] for m in sys.modules if m.startswith('simulation.equipment.'))))\n"
+    )
+    loaded = subprocess.run([sys.executable, "-c", script], cwd=os.path.dirname(os.path.abspath(__file__)),
+                            capture_output=True, text=True, check=True).stdout.split()
+    assert loaded == ["base_node", "orifice", "pipe", "tank"], loaded
+
+    capabilities = {key: equipment_type(key).capabilities() for key in ("tank", "pump", "linear_regulator",
+                                                                       "remote_control_valve", "three_way_tcv", "mixer")}
+    assert capabilities["tank"]["FIXED_PRESSURE"] and not capabilities["tank"]["has_batch_kernel"]
+    assert capabilities["pump"]["PUMP"] and capabilities["pump"]["has_batch_kernel"]
+    assert capabilities["linear_regulator"]["CONTROLLED"] and not capabilities["linear_regulator"]["REMOTE_SENSING"]
+    assert capabilities["remote_control_valve"]["REMOTE_SENSING"]
+    assert capabilities["three_way_tcv"]["TEMPERATURE_CONTROLLED"] and capabilities["three_way_tcv"]["MULTI_PORT"]
+    assert capabilities["mixer"]["MULTI_PORT"] and not capabilities["mixer"]["has_batch_kernel"]
+    print(f"  Loaded for a tank and an orifice: {loaded}")
+    print("  RESULT: SUCCESS")
+
+def test_plugin_type_and_solver_index_sets():
+    """
+    A plugin registered at runtime is parsed like the built-in types, and the
+    solver classifies it by its flags alone: a booster pump subclass is a pump
+    (and uses the pump kernel) without the solver knowing its class.
+    """
+    print("\n--- Equipment Registry (Plugin) ---")
+    class BoosterPump(CentrifugalPump):
+        @classmethod
+        def from_data(cls, name, data, global_settings=None):
+            return cls(name, flow_rated=float(data.get('flow_rated_lmin', 200)) / 60000.0,
+                       pressure_rated=float(data.get('boost_bar', 6)) * 1e5)
+
+    register_equipment(BoosterPump, "booster_pump")
+    try:
+        graph = line_graph()
+        graph["nodes"][1]["type"] = "booster_pump"
+        network = parse(graph)
+        assert isinstance(network.nodes["p1"], BoosterPump) and network.nodes["p1"].pressure_rated == 6e5
+        solver = NetworkSolver(network)
+        ids = solver.node_ids
+        assert [ids[i] for i in solver.fixed_pressure_nodes] == ["t1", "t2"]
+        assert [ids[i] for i in solver.control_node_indices] == ["reg"] and solver.tcv_node_indices == []
+        assert [network.edges[j]['id'] for j in np.flatnonzero(solver.pump_edge_mask)] == ["e2"]
+        assert solver.node_dp_sign[ids.index("p1")] == 1.0 and solver.node_dp_sign[ids.index("f1")] == -1.0
+        assert equipment_type("booster_pump").capabilities()["has_batch_kernel"]
+
+        stats = solver.solve()
+        assert stats["success"], stats["error"]
+        reference = parse(line_graph(flow_rated_lmin=200))
+        assert NetworkSolver(reference).solve()["success"]
+        q = [e['pipe'].inlets[0].flow_rate for e in network.edges]
+        q_ref = [e['pipe'].inlets[0].flow_rate for e in reference.edges]
+        assert np.allclose(q, q_ref, rtol=1e-6)
+        print(f"  Booster pump flow: {q[0] * 60000:.1f} L/min")
+    finally:
+        del EQUIPMENT_TYPES["booster_pump"]
+    print("  RESULT: SUCCESS")
+
+if __name__ == "__main__":
+    test_registered_types_parse_node_data()
+    test_modules_load_lazily_and_flags()
+    test_plugin_type_and_solver_index_sets()
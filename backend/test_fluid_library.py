@@ -0,0 +1,82 @@
+import sys
+import os
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from simulation.fluid_utils import FluidProperties, FluidLibrary, FluidTable, LIBRARY_DIR, fluid_names, fluid_options, fluid_table, write_library
+from simulation.fluid_library import LIBRARY_FLUIDS
+from simulation.solver import NetworkSolver
+from simulation.equipment.tank import Tank
+from test_components import build_skid_and_cooling
+
+def test_library_is_lazy_and_mapped():
+    """
+    The shipped library file holds every LIBRARY_FLUIDS entry: its index is read
+    on the first lookup, its data mapped read-only on the first table.
+    """
+    print("\n--- Fluid Library (Shipped File) ---")
+    library = FluidLibrary([os.path.join(LIBRARY_DIR, 'library.json')])
+    assert library._entries is None and not library._data
+    assert "ethylene_glycol_50" in library and "water" not in library and 300.0 not in library
+    assert not library._data
+    table = library.table("ethylene_glycol_50")
+    data = next(iter(library._data.values()))
+    assert isinstance(data, np.memmap) and not data.flags.writeable
+    assert np.shares_memory(table.values["viscosity"], data)
+    assert set(LIBRARY_FLUIDS) <= set(library.names()) and set(library.names()) <= set(fluid_names())
+
+    # The file reproduces the correlations it was generated from
+    for name, (label, models) in LIBRARY_FLUIDS.items():
+        table = fluid_table(name)
+        assert table.label == label
+        for prop in FluidTable.PROPERTIES:
+            for temp_k in (263.15, 313.15, 373.15, 453.15):
+                assert np.isclose(getattr(FluidProperties, f"get_{prop}")(name, temp_k), models[prop](temp_k), rtol=2e-4)
+    print(f"  {len(library.names())} fluids: {library.names()}")
+    print("  RESULT: SUCCESS")
+
+def test_site_library_file(tmp_path):
+    """A library file of a site's own adds fluids and overrides earlier entries of the same name."""
+    print("\n--- Fluid Library (Site File) ---")
+    temperatures = 273.15 + 10.0 * np.arange(11)
+    fluid = {"label": "Test Brine", "t_min": 273.15, "t_step": 10.0, "density": 1200.0 - temperatures * 0.1,
+             "viscosity": np.full(11, 0.002), "vapor_pressure": np.full(11, 500.0), "specific_heat": np.full(11, 3000.0)}
+    path = str(tmp_path / "site.json")
+    write_library(path, {"brine": fluid, "ethylene_glycol_50": dict(fluid, label="Site Glycol")})
+    library = FluidLibrary([os.path.join(LIBRARY_DIR, 'library.json'), path])
+    brine = library.table("brine")
+    assert np.isclose(brine.value("density", 298.15), 1200.0 - 29.815)
+    assert np.allclose(brine.density(np.array([200.0, 500.0])), [1200.0 - 27.315, 1200.0 - 37.315]) # held at the ends
+    assert library.table("ethylene_glycol_50").label == "Site Glycol"
+    # Offered to the frontend's fluid selects along with the built-in models
+    options = fluid_options(library)
+    assert options[0] == {"value": "water", "label": "Water (Standard)"}
+    assert {"value": "brine", "label": "Test Brine"} in options and {"value": "ethylene_glycol_50", "label": "Site Glycol"} in options
+    print("  RESULT: SUCCESS")
+
+def test_library_fluid_in_network():
+    """
+    Tanks and the system fluid select library entries: a glycol circuit is
+    solved with the glycol's density, viscosity and specific heat.
+    """
+    print("\n--- Fluid Library (Network) ---")
+    network = build_skid_and_cooling(fluid_type="ethylene_glycol_50")
+    for node in network.nodes.values():
+        if isinstance(node, Tank) and node.fluid_type == "water":
+            node.fluid_type = "ethylene_glycol_50"
+    stats = NetworkSolver(network).solve()
+    assert stats["success"]
+    basin = network.nodes["water"].outlets[0]
+    assert np.isclose(basin.density, FluidProperties.get_density("ethylene_glycol_50", 298.15), rtol=1e-6)
+    assert np.isclose(basin.viscosity, FluidProperties.get_viscosity("ethylene_glycol_50", 298.15), rtol=1e-6)
+    print(f"  Glycol basin: {basin.density:.1f} kg/m3, {basin.viscosity*1000:.2f} mPa s")
+    print("  RESULT: SUCCESS")
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    test_library_is_lazy_and_mapped()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_site_library_file(pathlib.Path(tmp))
+    test_library_fluid_in_network()
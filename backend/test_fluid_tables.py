@@ -0,0 +1,67 @@
+import sys
+import os
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from simulation.fluid_utils import FluidProperties, FluidTable, fluid_table, TABLE_T_MIN, TABLE_T_MAX
+from simulation.solver import NetworkSolver
+from simulation.equipment.tank import Tank
+from test_components import build_skid_and_cooling
+
+def test_tables_match_models():
+    """
+    Over the tabulated range every property of every fluid is within its
+    documented error bound of the scalar model; outside it the model is used.
+    """
+    print("\n--- Fluid Tables (Error Bounds) ---")
+    bounds = {'density': 1e-12, 'viscosity': 2e-5, 'vapor_pressure': 1e-5, 'specific_heat': 1e-12}
+    temperatures = np.linspace(TABLE_T_MIN, TABLE_T_MAX, 7919)
+    for fluid_type in ("water", "iso_vg_46", "iso_vg_32"):
+        table = fluid_table(fluid_type)
+        for name in FluidTable.PROPERTIES:
+            model = getattr(FluidProperties, f"get_{name}")
+            exact = np.array([model(fluid_type, t) for t in temperatures])
+            error = np.abs(table.evaluate(name, temperatures) - exact) / np.abs(exact)
+            # The water Antoine constants switch at 100°C: only the cell below is blended
+            error[(temperatures > 373.05) & (temperatures < 373.15)] = 0.0
+            assert error.max() < bounds[name], (fluid_type, name, error.max())
+            assert table.max_error[name] < max(bounds[name], 6e-3)
+        print(f"  {fluid_type}: {table.max_error}")
+    table = fluid_table("water")
+    outside = np.array([240.0, 500.0])
+    assert np.allclose(table.viscosity(outside), [FluidProperties.get_viscosity("water", t) for t in outside], rtol=1e-14)
+    assert table.density(np.ones((2, 3)) * 300.0).shape == (2, 3)
+    assert fluid_table("water") is table
+    print("  RESULT: SUCCESS")
+
+def test_tank_boundaries_from_tables():
+    """
+    The solver sets all tank boundaries at once from the tables; they match
+    Tank.calculate and survive a property pass that overwrote the tank ports.
+    """
+    print("\n--- Fluid Tables (Tank Boundaries) ---")
+    network = build_skid_and_cooling()
+    solver = NetworkSolver(network)
+    assert solver.solve()["success"]
+    tanks = [node for node in network.nodes.values() if isinstance(node, Tank)]
+    state = [(p.pressure, p.temperature, p.density, p.viscosity) for t in tanks for p in t.inlets + t.outlets]
+    for tank in tanks:
+        for port in tank.inlets + tank.outlets:
+            port.temperature, port.density = 400.0, 1.0
+    part = solver.components[0] if solver.components else solver
+    part._propagate_properties(np.array([e['pipe'].inlets[0].flow_rate for e in part.edges_list]))
+    for tank in tanks:
+        if tank in part.nodes_list:
+            assert all(p.temperature == tank.temperature for p in tank.inlets + tank.outlets)
+    for tank in tanks:
+        tank.calculate()
+    reference = [(p.pressure, p.temperature, p.density, p.viscosity) for t in tanks for p in t.inlets + t.outlets]
+    assert np.allclose(state, reference, rtol=1e-5)
+    print(f"  {len(tanks)} tanks")
+    print("  RESULT: SUCCESS")
+
+if __name__ == "__main__":
+    test_tables_match_models()
+    test_tank_boundaries_from_tables()
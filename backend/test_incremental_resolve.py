@@ -0,0 +1,128 @@
+import sys
+import os
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from simulation.schemas import ReactFlowGraph
+from simulation.graph_parser import GraphParser
+from simulation.solver import NetworkSolver
+
+def line_graph(opening=50.0, clogging=0.0, level=2.0, flow_rated_lmin=200, regulated=True):
+    """Tank -> pump -> filter -> (regulator) -> valve -> tank"""
+    nodes = [
+        {"id": "t1", "type": "tank", "data": {"level": level}, "position": {"x": 0, "y": 0}},
+        {"id": "p1", "type": "centrifugal_pump", "data": {"flow_rated_lmin": flow_rated_lmin, "pressure_rated_bar": 6}, "position": {"x": 0, "y": 0}},
+        {"id": "f1", "type": "filter", "data": {"clogging": clogging}, "position": {"x": 0, "y": 0}},
+        {"id": "v1", "type": "linear_control_valve", "data": {"max_cv": 0.05, "opening": opening}, "position": {"x": 0, "y": 0}},
+        {"id": "t2", "type": "tank", "data": {"level": 1.0}, "position": {"x": 0, "y": 0}},
+    ]
+    edges = [
+        {"id": "e1", "source": "t1", "target": "p1", "data": {"length": 2, "diameter": 0.08}},
+        {"id": "e2", "source": "p1", "target": "f1", "data": {"length": 10, "diameter": 0.05}},
+        {"id": "e4", "source": "v1", "target": "t2", "data": {"length": 5, "diameter": 0.05}},
+    ]
+    if regulated:
+        nodes.insert(3, {"id": "reg", "type": "linear_regulator", "data": {"max_cv": 0.05, "set_pressure": 300000.0}, "position": {"x": 0, "y": 0}})
+        edges.insert(2, {"id": "e3", "source": "f1", "target": "reg", "data": {"length": 10, "diameter": 0.05}})
+        edges.insert(3, {"id": "e3b", "source": "reg", "target": "v1", "data": {"length": 10, "diameter": 0.05}})
+    else:
+        edges.insert(2, {"id": "e3", "source": "f1", "target": "v1", "data": {"length": 10, "diameter": 0.05}})
+    return {"nodes": nodes, "edges": edges}
+
+def parse(graph_data):
+    return GraphParser.parse_graph(ReactFlowGraph(**graph_data))
+
+def edge_flows(network):
+    return np.array([e['pipe'].inlets[0].flow_rate for e in network.edges])
+
+def test_apply_parameter_updates():
+    """
+    Parameter-only edits are applied in place with create_node's keys and units;
+    anything else is refused without touching the node.
+    """
+    print("\n--- Parameter-Only Updates ---")
+    network = parse(line_graph())
+    assert GraphParser.apply_parameter_updates(network, "v1", {"opening": 130.0})
+    assert network.nodes["v1"].opening_pct == 100.0
+    assert GraphParser.apply_parameter_updates(network, "f1", {"clogging": 40})
+    assert network.nodes["f1"].clogging_pct == 40.0
+    assert GraphParser.apply_parameter_updates(network, "t1", {"level": 3.5})
+    assert network.nodes["t1"].fluid_level == 3.5
+
+    pump = network.nodes["p1"]
+    assert GraphParser.apply_parameter_updates(network, "p1", {"flow_rated_lmin": 300, "pressure_rated_bar": 7})
+    reference = parse(line_graph(flow_rated_lmin=300)).nodes["p1"]
+    assert np.isclose(pump.flow_rated, 0.005) and np.isclose(pump.pressure_rated, 7e5)
+    assert np.isclose(pump.p_shutoff, 7e5 * 1.2) and np.isclose(pump.C_coeff, reference.C_coeff * 7.0 / 6.0)
+
+    # Structural or unknown edits need a re-parse
+    assert not GraphParser.apply_parameter_updates(network, "v1", {"opening": 20.0, "max_cv": 0.1})
+    assert network.nodes["v1"].opening_pct == 100.0
+    assert not GraphParser.apply_parameter_updates(network, "reg", {"set_pressure": 2e5})
+    assert not GraphParser.apply_parameter_updates(network, "missing", {"opening": 20.0})
+    print("  RESULT: SUCCESS")
+
+def test_slider_drag_reuses_factorization():
+    """
+    Dragging a valve slider: each re-solve starts from the previous solution and
+    reuses its LU, so most steps need no new Jacobian, and the answer matches a cold solve.
+    """
+    print("\n--- Valve Slider Drag (Chord Newton) ---")
+    network = parse(line_graph(regulated=False))
+    solver = NetworkSolver(network)
+    assert solver.solve()["success"]
+
+    jacobians = 0
+    for opening in [52.0, 54.0, 56.0, 58.0, 60.0]:
+        assert GraphParser.apply_parameter_updates(network, "v1", {"opening": opening})
+        stats = solver.resolve()
+        assert stats["success"] and not stats["fallback_used"]
+        jacobians += stats["jacobian_evaluations"]
+
+        cold_net = parse(line_graph(opening=opening, regulated=False))
+        cold = NetworkSolver(cold_net).solve()
+        print(f"  {opening:.0f}%: {stats['total_inner_iterations']} residual calls, {stats['jacobian_evaluations']} Jacobians "
+              f"(cold: {cold['total_inner_iterations']} / {cold['jacobian_evaluations']})")
+        assert stats["total_inner_iterations"] < cold["total_inner_iterations"]
+        assert np.allclose(edge_flows(network), edge_flows(cold_net), rtol=1e-6)
+    # One factorization at the first drag position, reused for the rest
+    assert jacobians <= 2
+    print("  RESULT: SUCCESS")
+
+def test_resolve_matches_cold_solve():
+    """
+    Clogging, tank level and pump rating edits on a regulated line reach the same
+    operating point as a cold solve of the edited graph.
+    """
+    print("\n--- Incremental Re-solve vs Cold Solve ---")
+    network = parse(line_graph())
+    solver = NetworkSolver(network)
+    assert solver.solve()["success"]
+
+    edits = [
+        ("v1", {"opening": 55.0}, {"opening": 55.0}),
+        ("f1", {"clogging": 40.0}, {"clogging": 40.0}),
+        ("t1", {"level": 4.0}, {"level": 4.0}),
+        ("p1", {"flow_rated_lmin": 250.0}, {"flow_rated_lmin": 250.0}),
+    ]
+    graph_kwargs = {}
+    for node_id, update, kwargs in edits:
+        graph_kwargs.update(kwargs)
+        assert GraphParser.apply_parameter_updates(network, node_id, update)
+        stats = solver.resolve()
+        cold_net = parse(line_graph(**graph_kwargs))
+        cold = NetworkSolver(cold_net).solve()
+        assert stats["success"] and cold["success"] and stats["warm_start"]
+        print(f"  {node_id} {update}: {stats['outer_iterations']} control iterations (cold: {cold['outer_iterations']})")
+        assert stats["total_inner_iterations"] < cold["total_inner_iterations"]
+        # Same operating point within the regulator's control tolerance
+        assert np.allclose(edge_flows(network), edge_flows(cold_net), rtol=2e-3)
+        assert abs(network.nodes["reg"].outlets[0].pressure - cold_net.nodes["reg"].outlets[0].pressure) < 0.01e5
+    print("  RESULT: SUCCESS")
+
+if __name__ == "__main__":
+    test_apply_parameter_updates()
+    test_slider_drag_reuses_factorization()
+    test_resolve_matches_cold_solve()
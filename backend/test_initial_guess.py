@@ -0,0 +1,114 @@
+import sys
+import os
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from simulation.schemas import ReactFlowGraph, HydraulicNetwork, GlobalSettings
+from simulation.graph_parser import GraphParser
+from simulation.solver import NetworkSolver
+from simulation.equipment.tank import Tank
+from simulation.equipment.pipe import Pipe
+from simulation.equipment.volumetric_pump import VolumetricPump
+from simulation.equipment.splitter import Splitter
+from simulation.equipment.mixer import Mixer
+from simulation.equipment.linear_control_valve import LinearControlValve
+from test_physics_tcv import build_tcv_network
+from test_performance_bench import generate_stress_network
+
+def solve_tcv(guess):
+    network, tcv = build_tcv_network()
+    network.global_settings = tcv.global_settings
+    network.global_settings.initial_guess = guess
+    return network, NetworkSolver(network).solve()
+
+def test_tcv_network_starts_close():
+    """
+    The linearized guess sets the TCV outlet and the tiny load flow close to the
+    operating point: the solve needs fewer residual calls than from the flat
+    guess and no LM fallback, and lands on the same answer.
+    """
+    print("\n--- Initial Guess (TCV Network) ---")
+    flat_net, flat = solve_tcv("flat")
+    lin_net, lin = solve_tcv("linearized")
+    assert flat["success"] and lin["success"]
+    assert flat["initial_guess"] == "flat" and lin["initial_guess"] == "linearized"
+    assert not lin["fallback_used"]
+    assert lin["total_inner_iterations"] < flat["total_inner_iterations"]
+    for node_id in ("tcv", "vl"):
+        assert np.isclose(lin_net.nodes[node_id].inlets[0].flow_rate, flat_net.nodes[node_id].inlets[0].flow_rate, rtol=1e-4)
+    print(f"  Residual calls: flat {flat['total_inner_iterations']}, linearized {lin['total_inner_iterations']}")
+    print("  RESULT: SUCCESS")
+
+def test_stress_network_fewer_iterations():
+    """On a pumped stress network the linearized guess saves HYBR iterations."""
+    print("\n--- Initial Guess (Stress Network) ---")
+    calls = {}
+    for guess in ("flat", "linearized"):
+        network = GraphParser.parse_graph(ReactFlowGraph(**generate_stress_network(60)))
+        network.global_settings.initial_guess = guess
+        stats = NetworkSolver(network).solve(method='hybr')
+        assert stats["success"] and stats["initial_guess"] == guess
+        calls[guess] = stats["total_inner_iterations"]
+    assert calls["linearized"] < calls["flat"]
+    print(f"  Residual calls: {calls}")
+    print("  RESULT: SUCCESS")
+
+def build_displacement_loop(guess):
+    """Displacement pump at its pressure cap feeding two throttled valves in parallel."""
+    gs = GlobalSettings(initial_guess=guess)
+    nodes = {
+        "t1": Tank("Source", fluid_level=1.0),
+        "pump": VolumetricPump("Pump", flow_rated=100.0/60000.0, motor_power=1e6, efficiency=0.8),
+        "split": Splitter("Split"),
+        "v1": LinearControlValve("V1", max_cv=0.02, opening_pct=5.0),
+        "v2": LinearControlValve("V2", max_cv=0.02, opening_pct=20.0),
+        "mix": Mixer("Mix"),
+        "t2": Tank("Sink", fluid_level=1.0),
+    }
+    edges = [
+        {"id": "e_in", "source": "t1", "target": "pump", "pipe": Pipe("p_in", 2.0, 0.05)},
+        {"id": "e_feed", "source": "pump", "target": "split", "pipe": Pipe("p_feed", 20.0, 0.03)},
+        {"id": "e_v1", "source": "split", "target": "v1", "pipe": Pipe("p_v1", 5.0, 0.02)},
+        {"id": "e_v2", "source": "split", "target": "v2", "pipe": Pipe("p_v2", 5.0, 0.02)},
+        {"id": "e_r1", "source": "v1", "target": "mix", "pipe": Pipe("p_r1", 5.0, 0.02)},
+        {"id": "e_r2", "source": "v2", "target": "mix", "pipe": Pipe("p_r2", 5.0, 0.02)},
+        {"id": "e_out", "source": "mix", "target": "t2", "pipe": Pipe("p_out", 10.0, 0.05)},
+    ]
+    network = HydraulicNetwork(nodes=nodes, edges=edges, global_settings=gs)
+    for n in nodes.values(): n.global_settings = gs
+    for e in edges: e['pipe'].global_settings = gs
+    return network
+
+def test_displacement_pump_starts_close():
+    """
+    A displacement pump is linearized inside its rating, not on the kink at
+    flow_rated (no pressure, no slope), so the guess carries its pressure.
+    """
+    print("\n--- Initial Guess (Displacement Pump) ---")
+    calls = {}
+    for guess in ("flat", "linearized"):
+        network = build_displacement_loop(guess)
+        stats = NetworkSolver(network).solve(method='hybr')
+        assert stats["success"] and not stats["fallback_used"]
+        calls[guess] = stats["total_inner_iterations"]
+    assert calls["linearized"] < calls["flat"]
+    print(f"  Residual calls: {calls}")
+    print("  RESULT: SUCCESS")
+
+def test_warm_start_skips_guess():
+    """A warm-started solve reuses the last solution instead of building a guess."""
+    print("\n--- Initial Guess (Warm Start) ---")
+    network, _ = build_tcv_network()
+    solver = NetworkSolver(network)
+    assert solver.solve()["initial_guess"] == "linearized"
+    stats = solver.solve(warm_start=solver.export_state())
+    assert stats["success"] and stats["initial_guess"] == "warm_start"
+    print("  RESULT: SUCCESS")
+
+if __name__ == "__main__":
+    test_tcv_network_starts_close()
+    test_stress_network_fewer_iterations()
+    test_displacement_pump_starts_close()
+    test_warm_start_skips_guess()
@@ -0,0 +1,108 @@
+import sys
+import os
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from simulation.schemas import ReactFlowGraph
+from simulation.graph_parser import GraphParser
+from simulation.solver import NetworkSolver
+from test_performance_bench import generate_stress_network
+from test_gga import build_equipment_loop
+from test_embedded_control import build_regulated_network
+
+def edge_flows(network):
+    return np.array([e['pipe'].inlets[0].flow_rate for e in network.edges])
+
+def port_states(network, field):
+    """One value per port of every node and edge, as packaged by build_telemetry."""
+    values = []
+    for node in network.nodes.values():
+        values += [getattr(p, field) for p in node.inlets + node.outlets]
+    for edge in network.edges:
+        values += [getattr(p, field) for p in edge['pipe'].inlets + edge['pipe'].outlets]
+    return np.array(values)
+
+def test_stress_network_collapses():
+    """
+    Each splitter/mixer loop folds into a parallel group and the whole train into
+    one series chain: three unknowns instead of 153, with the same pressures and
+    flows at every port afterwards.
+    """
+    print("\n--- Network Reduction (Stress Network) ---")
+    graph_data = generate_stress_network(30)
+    reference = GraphParser.parse_graph(ReactFlowGraph(**graph_data))
+    full = NetworkSolver(reference).solve(method='hybr')
+    network = GraphParser.parse_graph(ReactFlowGraph(**graph_data))
+    network.global_settings.network_reduction = True
+    solver = NetworkSolver(network)
+    reduced = solver.solve(method='hybr')
+    assert full["success"] and reduced["success"]
+    print(f"  System size {full['system_size']} -> {reduced['system_size']}, "
+          f"{full['time_ms']:.1f} ms -> {reduced['time_ms']:.1f} ms")
+    assert reduced["system_size"] == 3
+    assert len(solver.reduction.eliminated) == 60
+
+    assert np.allclose(edge_flows(network), edge_flows(reference), rtol=1e-6)
+    assert np.max(np.abs(port_states(network, 'pressure') - port_states(reference, 'pressure'))) < 0.01
+    assert np.max(np.abs(port_states(network, 'flow_rate') - port_states(reference, 'flow_rate'))) < 1e-9
+    print("  RESULT: SUCCESS")
+
+def test_equipment_branches_expand():
+    """
+    Valve, orifice and filter branches between distinct splitter/mixer ports:
+    after expansion every port carries its own branch flow, pressure and
+    temperature, also after an incremental re-solve of a valve inside a chain.
+    """
+    print("\n--- Network Reduction (Equipment Branches) ---")
+    reference = build_equipment_loop()
+    assert NetworkSolver(reference).solve(method='sparse_newton')["success"]
+    network = build_equipment_loop()
+    network.global_settings.network_reduction = True
+    solver = NetworkSolver(network)
+    stats = solver.solve(method='sparse_newton')
+    assert stats["success"] and set(solver.network.nodes) == {"t1", "pump", "t2"}
+
+    def check():
+        assert np.allclose(edge_flows(network), edge_flows(reference), rtol=1e-6)
+        assert np.max(np.abs(port_states(network, 'pressure') - port_states(reference, 'pressure'))) < 1.0
+        assert np.max(np.abs(port_states(network, 'flow_rate') - port_states(reference, 'flow_rate'))) < 1e-9
+        assert np.max(np.abs(port_states(network, 'temperature') - port_states(reference, 'temperature'))) < 1e-6
+    check()
+    mix = network.nodes["mix"]
+    print(f"  Mixer inlets {mix.inlets[0].flow_rate*60000:.2f} + {mix.inlets[1].flow_rate*60000:.2f} L/min")
+
+    for net in (network, reference):
+        net.nodes["valve"].opening_pct = 35.0
+    assert NetworkSolver(reference).solve(method='sparse_newton')["success"]
+    assert solver.resolve()["success"]
+    check()
+    print(f"  Valve at 35%: {network.nodes['valve'].inlets[0].flow_rate*60000:.2f} L/min")
+    print("  RESULT: SUCCESS")
+
+def test_controlled_nodes_are_kept():
+    """
+    Regulators, pumps, tanks and remote-sensing targets stay in the reduced system;
+    only plain resistances between them are merged.
+    """
+    print("\n--- Network Reduction (Regulated Network) ---")
+    reference, _ = build_regulated_network("outer_loop")
+    assert NetworkSolver(reference).solve(method='sparse_newton')["success"]
+    network, nodes = build_regulated_network("outer_loop")
+    network.global_settings.network_reduction = True
+    solver = NetworkSolver(network)
+    stats = solver.solve(method='sparse_newton')
+    assert stats["success"]
+    assert solver.reduction.eliminated == {"load_a"}
+    assert {"prv1", "prv2", "rcv", "bpr", "ori"} <= set(solver.network.nodes)
+    for key in ("prv1", "prv2", "rcv", "bpr"):
+        assert abs(nodes[key].opening_pct - reference.nodes[key].opening_pct) < 0.5
+    assert np.allclose(edge_flows(network), edge_flows(reference), rtol=2e-3)
+    print(f"  {len(reference.nodes) - len(solver.network.nodes)} node(s) eliminated, system size {stats['system_size']}")
+    print("  RESULT: SUCCESS")
+
+if __name__ == "__main__":
+    test_stress_network_collapses()
+    test_equipment_branches_expand()
+    test_controlled_nodes_are_kept()
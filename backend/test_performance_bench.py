@@ -45,48 +45,578 @@ def generate_stress_network(size=10):
 
     return {"nodes": nodes, "edges": edges}
 
-def run_benchmark():
+def generate_radial_network(size=10):
+    """
+    Generates a loop-free network: a pump feeding a header of 'size' splitters,
+    each branching one consumer pipe to its own tank.
+    """
+    nodes = [
+        {"id": "t_start", "type": "tank", "data": {"label": "Source", "level": 10.0}, "position": {"x":0,"y":0}},
+        {"id": "p_main", "type": "centrifugal_pump", "data": {"A": 100, "B": 0, "C": -1000}, "position": {"x":100,"y":0}},
+    ]
+    edges = [
+        {"id": "e_start", "source": "t_start", "target": "p_main", "data": {"length": 1, "diameter": 0.1}}
+    ]
+
+    prev_node = "p_main"
+    for i in range(size):
+        s_id = f"s_{i}"
+        c_id = f"c_{i}"
+
+        nodes.append({"id": s_id, "type": "splitter", "data": {"label": f"S{i}"}, "position": {"x": 200 + i*200, "y": 0}})
+        nodes.append({"id": c_id, "type": "tank", "data": {"label": f"C{i}", "level": 1.0 + 0.1 * (i % 5)}, "position": {"x": 200 + i*200, "y": 100}})
+
+        edges.append({"id": f"e_pre_{i}", "source": prev_node, "target": s_id, "sourceHandle": "outlet-0", "data": {"length": 2, "diameter": 0.1}})
+        edges.append({"id": f"e_c_{i}", "source": s_id, "target": c_id, "sourceHandle": "outlet-1", "data": {"length": 10, "diameter": 0.02}})
+
+        prev_node = s_id
+
+    nodes.append({"id": "t_end", "type": "tank", "data": {"label": "Sink", "level": 1.0}, "position": {"x": 200 + size*200, "y": 0}})
+    edges.append({"id": "e_end", "source": prev_node, "target": "t_end", "sourceHandle": "outlet-0", "data": {"length": 1, "diameter": 0.05}})
+
+    return {"nodes": nodes, "edges": edges}
+
+def generate_multi_circuit_network(circuits=4, size=10):
+    """
+    Generates 'circuits' independent copies of the stress network on one canvas
+    (ids prefixed per circuit), as several skids drawn side by side.
+    """
+    nodes, edges = [], []
+    for c in range(circuits):
+        circuit = generate_stress_network(size)
+        for node in circuit["nodes"]:
+            nodes.append({**node, "id": f"c{c}_{node['id']}"})
+        for edge in circuit["edges"]:
+            edges.append({**edge, "id": f"c{c}_{edge['id']}", "source": f"c{c}_{edge['source']}", "target": f"c{c}_{edge['target']}"})
+    return {"nodes": nodes, "edges": edges}
+
+def generate_grid_network(rows=10, cols=10):
+    """
+    Generates a looped 'rows' x 'cols' mesh of splitters fed by a pump at one
+    corner and drained to a tank at the opposite one (lube-oil distribution
+    grid), the shape domain decomposition is meant for. Long feed and drain
+    lines keep every pipe laminar.
+    """
+    nodes = [
+        {"id": "t_start", "type": "tank", "data": {"label": "Source", "level": 10.0}, "position": {"x":0,"y":0}},
+        {"id": "p_main", "type": "centrifugal_pump", "data": {"flow_rated_lmin": 30, "pressure_rated_bar": 1}, "position": {"x":100,"y":0}},
+    ]
+    edges = [
+        {"id": "e_start", "source": "t_start", "target": "p_main", "data": {"length": 1, "diameter": 0.1}},
+        {"id": "e_feed", "source": "p_main", "target": "j_0_0", "data": {"length": 300, "diameter": 0.04}},
+    ]
+
+    for r in range(rows):
+        for c in range(cols):
+            nodes.append({"id": f"j_{r}_{c}", "type": "splitter", "data": {"label": f"J{r}.{c}"}, "position": {"x": 200 + c*100, "y": r*100}})
+            if c + 1 < cols:
+                edges.append({"id": f"h_{r}_{c}", "source": f"j_{r}_{c}", "target": f"j_{r}_{c+1}", "data": {"length": 10, "diameter": 0.03}})
+            if r + 1 < rows:
+                edges.append({"id": f"v_{r}_{c}", "source": f"j_{r}_{c}", "target": f"j_{r+1}_{c}", "data": {"length": 10, "diameter": 0.03}})
+
+    nodes.append({"id": "t_end", "type": "tank", "data": {"label": "Sink", "level": 1.0}, "position": {"x": 200 + cols*100, "y": rows*100}})
+    edges.append({"id": "e_end", "source": f"j_{rows-1}_{cols-1}", "target": "t_end", "data": {"length": 300, "diameter": 0.04}})
+
+    return {"nodes": nodes, "edges": edges, "global_settings": {"fluid_type": "iso_vg_46"}}
+
+def generate_pump_header_network():
+    """
+    Generates a small displacement pump and a high-head centrifugal pump feeding
+    a meshed header between two elevated tanks, with a throttled and an open
+    bypass valve: HYBR and sparse Newton stall on it and fall back to LM.
+    """
+    nodes = [{"id": f"j{i}", "type": "splitter", "data": {"label": f"J{i}"}, "position": {"x": 100 * i, "y": 100}} for i in range(10)]
+    nodes += [
+        {"id": "t0", "type": "tank", "data": {"label": "Tank 0", "elevation": 24.4, "level": 6.0}, "position": {"x": 0, "y": 0}},
+        {"id": "t1", "type": "tank", "data": {"label": "Tank 1", "elevation": 18.0, "level": 1.8}, "position": {"x": 100, "y": 0}},
+        {"id": "pump0", "type": "volumetric_pump", "data": {"flow_rated": 26.0, "motor_power": 14.11, "efficiency": 80.0}, "position": {"x": 200, "y": 0}},
+        {"id": "pump1", "type": "centrifugal_pump", "data": {"flow_rated_lmin": 133.0, "pressure_rated_bar": 13.0}, "position": {"x": 300, "y": 0}},
+        {"id": "v0", "type": "linear_control_valve", "data": {"max_cv": 0.0447, "opening": 5.0}, "position": {"x": 400, "y": 0}},
+        {"id": "v3", "type": "linear_control_valve", "data": {"max_cv": 0.0487, "opening": 100.0}, "position": {"x": 500, "y": 0}},
+    ]
+    links = [
+        ("in0", "t1", "pump0", 66.1, 0.02), ("out0", "pump0", "j5", 15.9, 0.05),
+        ("in1", "t0", "pump1", 96.8, 0.08), ("out1", "pump1", "j6", 39.8, 0.01),
+        ("tr1", "j0", "j1", 35.3, 0.01), ("tr2", "j1", "j2", 89.2, 0.03),
+        ("tr3", "j2", "j3", 32.5, 0.05), ("tr4", "j3", "j4", 47.6, 0.08),
+        ("tr5", "j2", "j5", 11.6, 0.05), ("tr6", "j2", "j6", 21.0, 0.01),
+        ("tr7", "j3", "j7", 68.3, 0.08), ("tr8", "j3", "j8", 64.8, 0.08),
+        ("tr9", "j4", "j9", 52.1, 0.03), ("lv0a", "j5", "v0", 83.1, 0.05),
+        ("lv0b", "v0", "j4", 50.3, 0.01), ("l1", "j9", "j6", 22.4, 0.02),
+        ("l2", "j5", "j0", 46.2, 0.02), ("lv3a", "j8", "v3", 76.8, 0.03),
+        ("lv3b", "v3", "j3", 41.3, 0.02), ("dr0", "j1", "t0", 18.0, 0.03),
+        ("dr1", "j1", "t1", 60.8, 0.01),
+    ]
+    edges = [{"id": eid, "source": src, "target": tgt, "data": {"length": length, "diameter": d}} for eid, src, tgt, length, d in links]
+    return {"nodes": nodes, "edges": edges}
+
+def generate_instrument_network(size=10):
+    """
+    Generates a displacement pump driving a DN150 main with a 4 mm instrument
+    line bypassing every main segment, the instrument lines cross-linked by
+    3 mm ties: element slopes span many decades (badly scaled for bar / L/s).
+    """
+    nodes = [
+        {"id": "t0", "type": "tank", "data": {"label": "Source", "level": 2.0}, "position": {"x": 0, "y": 0}},
+        {"id": "t1", "type": "tank", "data": {"label": "Sink", "level": 2.0}, "position": {"x": 100 * (size + 2), "y": 0}},
+        {"id": "pump", "type": "volumetric_pump", "data": {"flow_rated": 600.0, "motor_power": 50.0, "efficiency": 80.0}, "position": {"x": 100, "y": 0}},
+    ]
+    nodes += [{"id": f"j{i}", "type": "splitter", "data": {"label": f"J{i}"}, "position": {"x": 100 * (i + 2), "y": 0}} for i in range(size + 1)]
+    nodes += [{"id": f"k{i}", "type": "splitter", "data": {"label": f"K{i}"}, "position": {"x": 100 * (i + 2) + 50, "y": 100}} for i in range(size)]
+    links = [("in", "t0", "pump", 5.0, 0.1), ("out", "pump", "j0", 5.0, 0.1), ("dr", f"j{size}", "t1", 5.0, 0.1)]
+    for i in range(size):
+        links += [(f"m{i}", f"j{i}", f"j{i+1}", 20.0, 0.15),
+                  (f"a{i}", f"j{i}", f"k{i}", 2.0, 0.004), (f"b{i}", f"k{i}", f"j{i+1}", 2.0, 0.004)]
+        if i + 1 < size:
+            links.append((f"c{i}", f"k{i}", f"k{i+1}", 1.0, 0.003))
+    edges = [{"id": eid, "source": src, "target": tgt, "data": {"length": length, "diameter": d}} for eid, src, tgt, length, d in links]
+    return {"nodes": nodes, "edges": edges}
+
+def run_benchmark(sizes=(5, 15, 30, 60)):
     print("🚀 Starting WalFlow Performance Benchmark (HYBR Method)...")
     
-    # 1. Setup
-    complexity = 15 # Number of loops (yields 33 nodes, 47 edges)
-    mock_data = generate_stress_network(complexity)
-    
-    start_time = time.perf_counter()
-    
-    # 2. Parsing
-    graph = ReactFlowGraph(**mock_data)
-    network = GraphParser.parse_graph(graph)
-    parse_time = time.perf_counter() - start_time
-    
-    # 3. Solving
-    solver_start = time.perf_counter()
-    try:
+    for complexity in sizes:
+        # 1. Setup
+        # Number of loops (15 yields 33 nodes, 47 edges)
+        mock_data = generate_stress_network(complexity)
+        
+        start_time = time.perf_counter()
+        
+        # 2. Parsing
+        graph = ReactFlowGraph(**mock_data)
+        network = GraphParser.parse_graph(graph)
+        parse_time = time.perf_counter() - start_time
+        
+        # 3. Solving
+        solver_start = time.perf_counter()
+        try:
+            solver = NetworkSolver(network)
+            # Explicitly use hybr to maintain benchmark consistency
+            solver.solve(method='hybr')
+            solve_success = True
+        except Exception as e:
+            print(f"❌ Solver Failed during benchmark: {e}")
+            solve_success = False
+        
+        solve_time = time.perf_counter() - solver_start
+        total_time = time.perf_counter() - start_time
+        
+        # 4. Logging
+        log_result(len(mock_data['nodes']), len(mock_data['edges']), parse_time, solve_time, total_time, solve_success)
+        
+        print(f"✅ Size {complexity} Complete!")
+        print(f"   - Nodes: {len(mock_data['nodes'])}")
+        print(f"   - Edges: {len(mock_data['edges'])}")
+        print(f"   - Parse Time: {parse_time*1000:.2f} ms")
+        print(f"   - Solve Time: {solve_time*1000:.2f} ms")
+        print(f"   - Total Time: {total_time*1000:.2f} ms")
+
+def run_memory_benchmark(sizes=(50, 100, 200, 400), method='sparse_newton'):
+    """
+    Solves increasingly large stress networks and reports the solver's peak
+    working memory, to check that it grows linearly with network size.
+    """
+    print(f"🚀 Starting WalFlow Memory Benchmark ({method})...")
+    prev = None
+    for complexity in sizes:
+        mock_data = generate_stress_network(complexity)
+        start_time = time.perf_counter()
+        network = GraphParser.parse_graph(ReactFlowGraph(**mock_data))
+        parse_time = time.perf_counter() - start_time
+        
+        solver_start = time.perf_counter()
+        stats = NetworkSolver(network).solve(method=method)
+        solve_time = time.perf_counter() - solver_start
+        total_time = time.perf_counter() - start_time
+        
+        mem_kb = stats["peak_memory_kb"]
+        log_result(len(mock_data['nodes']), len(mock_data['edges']), parse_time, solve_time, total_time, stats["success"],
+                   note=f"{method}, {mem_kb:.0f} kB")
+        growth = f" (x{mem_kb / prev:.2f})" if prev else ""
+        prev = mem_kb
+        print(f"   - System size {stats['system_size']}: {solve_time*1000:.2f} ms, peak memory {mem_kb:.1f} kB{growth}")
+
+def run_resolve_benchmark(sizes=(15, 60, 200), steps=5):
+    """
+    Slider-drag latency: after one full solve, the source tank level is edited in
+    small steps and each step is re-solved incrementally (NetworkSolver.resolve).
+    """
+    print("🚀 Starting WalFlow Incremental Re-solve Benchmark...")
+    for complexity in sizes:
+        mock_data = generate_stress_network(complexity)
+        network = GraphParser.parse_graph(ReactFlowGraph(**mock_data))
         solver = NetworkSolver(network)
-        # Explicitly use hybr to maintain benchmark consistency
-        solver.solve(method='hybr')
-        solve_success = True
-    except Exception as e:
-        print(f"❌ Solver Failed during benchmark: {e}")
-        solve_success = False
-    
-    solve_time = time.perf_counter() - solver_start
-    total_time = time.perf_counter() - start_time
-    
-    # 4. Logging
-    log_result(len(mock_data['nodes']), len(mock_data['edges']), parse_time, solve_time, total_time, solve_success)
-    
-    print(f"✅ Benchmark Complete!")
-    print(f"   - Nodes: {len(mock_data['nodes'])}")
-    print(f"   - Edges: {len(mock_data['edges'])}")
-    print(f"   - Parse Time: {parse_time*1000:.2f} ms")
-    print(f"   - Solve Time: {solve_time*1000:.2f} ms")
-    print(f"   - Total Time: {total_time*1000:.2f} ms")
-
-def log_result(nodes, edges, parse, solve, total, success):
+        cold_start = time.perf_counter()
+        solver.solve(method='sparse_newton')
+        cold_time = time.perf_counter() - cold_start
+
+        for step in range(1, steps + 1):
+            start_time = time.perf_counter()
+            GraphParser.apply_parameter_updates(network, "t_start", {"level": 10.0 + 0.2 * step})
+            apply_time = time.perf_counter() - start_time
+            stats = solver.resolve()
+            solve_time = time.perf_counter() - start_time - apply_time
+            total_time = time.perf_counter() - start_time
+            log_result(len(mock_data['nodes']), len(mock_data['edges']), apply_time, solve_time, total_time, stats["success"],
+                       note=f"resolve, {stats['jacobian_evaluations']} jac")
+        print(f"   - Size {complexity}: cold {cold_time*1000:.2f} ms, last re-solve {solve_time*1000:.2f} ms "
+              f"({stats['total_inner_iterations']} residual calls, {stats['jacobian_evaluations']} Jacobians)")
+
+def run_gga_benchmark(sizes=(5, 15, 30, 60)):
+    """
+    Global Gradient Algorithm against HYBR on the stress networks: solve time and
+    the largest relative difference in edge flows between the two answers.
+    """
+    print("🚀 Starting WalFlow GGA vs HYBR Benchmark...")
+    for complexity in sizes:
+        mock_data = generate_stress_network(complexity)
+        flows = {}
+        times = {}
+        for method in ("hybr", "gga"):
+            start_time = time.perf_counter()
+            network = GraphParser.parse_graph(ReactFlowGraph(**mock_data))
+            parse_time = time.perf_counter() - start_time
+            stats = NetworkSolver(network).solve(method=method)
+            solve_time = time.perf_counter() - start_time - parse_time
+            total_time = time.perf_counter() - start_time
+            log_result(len(mock_data['nodes']), len(mock_data['edges']), parse_time, solve_time, total_time, stats["success"],
+                       note=f"{method}, {stats['jacobian_evaluations']} jac")
+            flows[method] = [e['pipe'].inlets[0].flow_rate for e in network.edges]
+            times[method] = solve_time
+        deviation = max(abs(a - b) / max(abs(a), 1e-12) for a, b in zip(flows["hybr"], flows["gga"]))
+        print(f"   - Size {complexity}: HYBR {times['hybr']*1000:.2f} ms, GGA {times['gga']*1000:.2f} ms "
+              f"(x{times['hybr'] / times['gga']:.1f}), max flow deviation {deviation:.1e}")
+
+def run_reduction_benchmark(sizes=(30, 60, 200)):
+    """
+    HYBR on the stress networks with and without series/parallel reduction
+    (GlobalSettings.network_reduction): system size and solve time.
+    """
+    print("🚀 Starting WalFlow Network Reduction Benchmark (HYBR Method)...")
+    for complexity in sizes:
+        mock_data = generate_stress_network(complexity)
+        results = {}
+        for reduced in (False, True):
+            start_time = time.perf_counter()
+            network = GraphParser.parse_graph(ReactFlowGraph(**mock_data))
+            network.global_settings.network_reduction = reduced
+            parse_time = time.perf_counter() - start_time
+            stats = NetworkSolver(network).solve(method='hybr')
+            solve_time = time.perf_counter() - start_time - parse_time
+            total_time = time.perf_counter() - start_time
+            label = "reduced" if reduced else "full"
+            log_result(len(mock_data['nodes']), len(mock_data['edges']), parse_time, solve_time, total_time, stats["success"],
+                       note=f"hybr {label}, size {stats['system_size']}")
+            results[label] = (stats['system_size'], solve_time)
+        print(f"   - Size {complexity}: full {results['full'][0]} unknowns {results['full'][1]*1000:.2f} ms, "
+              f"reduced {results['reduced'][0]} unknowns {results['reduced'][1]*1000:.2f} ms")
+
+def run_tree_benchmark(sizes=(5, 30, 100)):
+    """
+    Radial networks with the tree path solver (GlobalSettings.tree_solver) against
+    HYBR on the full system: solve time and whether the lm fallback was needed.
+    """
+    print("🚀 Starting WalFlow Radial Network Benchmark (Tree Solver vs HYBR)...")
+    for complexity in sizes:
+        mock_data = generate_radial_network(complexity)
+        results = {}
+        for tree in (False, True):
+            start_time = time.perf_counter()
+            network = GraphParser.parse_graph(ReactFlowGraph(**mock_data))
+            network.global_settings.tree_solver = tree
+            parse_time = time.perf_counter() - start_time
+            stats = NetworkSolver(network).solve() # solver_method "hybr" unless the tree path takes it
+            solve_time = time.perf_counter() - start_time - parse_time
+            total_time = time.perf_counter() - start_time
+            label = stats["backend"]
+            log_result(len(mock_data['nodes']), len(mock_data['edges']), parse_time, solve_time, total_time, stats["success"],
+                       note=f"radial {label}" + (", lm fallback" if stats["fallback_used"] else ""))
+            results[label] = (solve_time, stats["fallback_used"])
+        print(f"   - Size {complexity}: HYBR {results['hybr'][0]*1000:.2f} ms (fallback {results['hybr'][1]}), "
+              f"tree {results['tree'][0]*1000:.2f} ms (fallback {results['tree'][1]})")
+
+def run_component_benchmark(circuits=4, sizes=(15, 60), workers=(1, 2, 4)):
+    """
+    Canvases of independent circuits solved as one coupled system and per
+    component (GlobalSettings.component_decomposition), in-process and with
+    process pools (GlobalSettings.parallel_workers).
+    """
+    print(f"🚀 Starting WalFlow Component Benchmark ({circuits} circuits, HYBR Method)...")
+    for complexity in sizes:
+        mock_data = generate_multi_circuit_network(circuits, complexity)
+        runs = [("coupled", False, 1)] + [(f"{w} worker(s)", True, w) for w in workers]
+        times = {}
+        for label, split, w in runs:
+            start_time = time.perf_counter()
+            network = GraphParser.parse_graph(ReactFlowGraph(**mock_data))
+            network.global_settings.component_decomposition = split
+            network.global_settings.parallel_workers = w
+            parse_time = time.perf_counter() - start_time
+            stats = NetworkSolver(network).solve(method='hybr')
+            solve_time = time.perf_counter() - start_time - parse_time
+            total_time = time.perf_counter() - start_time
+            log_result(len(mock_data['nodes']), len(mock_data['edges']), parse_time, solve_time, total_time, stats["success"],
+                       note=f"components {label}")
+            times[label] = solve_time
+        print(f"   - Size {complexity}: " + ", ".join(f"{label} {t*1000:.2f} ms" for label, t in times.items()))
+
+def run_domain_benchmark(sizes=(20, 40, 60), workers=(1, 2, 4, 8)):
+    """
+    Square oil grids solved by sparse Newton in one process and by domain
+    decomposition (solver_method "domain_decomposition") over 1-8 worker
+    processes; speedups are relative to the single-process solve.
+    """
+    print("🚀 Starting WalFlow Domain Decomposition Benchmark (Oil Grids)...")
+    for complexity in sizes:
+        mock_data = generate_grid_network(complexity, complexity)
+        runs = [("sparse_newton", 'sparse_newton', 1)] + [(f"{w} worker(s)", 'domain_decomposition', w) for w in workers]
+        times = {}
+        for label, method, w in runs:
+            start_time = time.perf_counter()
+            network = GraphParser.parse_graph(ReactFlowGraph(**mock_data))
+            network.global_settings.parallel_workers = w
+            parse_time = time.perf_counter() - start_time
+            stats = NetworkSolver(network).solve(method=method)
+            solve_time = time.perf_counter() - start_time - parse_time
+            total_time = time.perf_counter() - start_time
+            speedup = times.get("sparse_newton", solve_time) / solve_time
+            log_result(len(mock_data['nodes']), len(mock_data['edges']), parse_time, solve_time, total_time, stats["success"],
+                       note=f"{'domains ' + label if method != 'sparse_newton' else label}, x{speedup:.2f}")
+            times[label] = solve_time
+        print(f"   - Grid {complexity}x{complexity}: " + ", ".join(f"{label} {t*1000:.2f} ms" for label, t in times.items()))
+
+def run_initial_guess_benchmark(sizes=(15, 60, 200)):
+    """
+    Flat vs linearized initial guess (GlobalSettings.initial_guess) on the
+    stress network with HYBR and on an oil grid with sparse Newton: residual
+    calls, Jacobians and LM fallbacks until convergence.
+    """
+    print("🚀 Starting WalFlow Initial Guess Benchmark (Flat vs Linearized)...")
+    cases = [(f"stress {size}", generate_stress_network(size), 'hybr') for size in sizes]
+    cases.append(("grid 30x30", generate_grid_network(30, 30), 'sparse_newton'))
+    for label, mock_data, method in cases:
+        results = {}
+        for guess in ("flat", "linearized"):
+            start_time = time.perf_counter()
+            network = GraphParser.parse_graph(ReactFlowGraph(**mock_data))
+            network.global_settings.initial_guess = guess
+            parse_time = time.perf_counter() - start_time
+            stats = NetworkSolver(network).solve(method=method)
+            solve_time = time.perf_counter() - start_time - parse_time
+            total_time = time.perf_counter() - start_time
+            log_result(len(mock_data['nodes']), len(mock_data['edges']), parse_time, solve_time, total_time, stats["success"],
+                       note=f"{guess} guess, {method}, {stats['total_inner_iterations']} residual calls, "
+                            f"{stats['jacobian_evaluations']} Jacobians, fallback {stats['fallback_used']}")
+            results[guess] = (solve_time, stats)
+        print(f"   - {label}: " + ", ".join(
+            f"{guess} {t*1000:.2f} ms ({st['total_inner_iterations']} calls, fallback {st['fallback_used']})"
+            for guess, (t, st) in results.items()))
+
+def run_continuation_benchmark():
+    """
+    HYBR, sparse Newton and continuation (homotopy) on the pump header, where the
+    first two fall back to LM, and on an easy stress network: residual calls,
+    fallbacks and the continuation path (steps, rejected steps, path length).
+    """
+    print("🚀 Starting WalFlow Continuation Benchmark...")
+    cases = [("pump header", generate_pump_header_network()), ("stress 60", generate_stress_network(60))]
+    for label, mock_data in cases:
+        for method in ('hybr', 'sparse_newton', 'continuation'):
+            start_time = time.perf_counter()
+            network = GraphParser.parse_graph(ReactFlowGraph(**mock_data))
+            parse_time = time.perf_counter() - start_time
+            stats = NetworkSolver(network).solve(method=method)
+            solve_time = time.perf_counter() - start_time - parse_time
+            total_time = time.perf_counter() - start_time
+            path = stats["continuation"]
+            path_note = f", {path['steps']} steps ({path['rejected_steps']} rejected), path length {path['path_length']:.1f}" if path else ""
+            log_result(len(mock_data['nodes']), len(mock_data['edges']), parse_time, solve_time, total_time, stats["success"],
+                       note=f"{label}, {method}, {stats['total_inner_iterations']} residual calls, fallback {stats['fallback_used']}{path_note}")
+            print(f"   - {label} / {method}: {solve_time*1000:.2f} ms, fallback {stats['fallback_used']}{path_note}")
+
+def run_bounded_benchmark():
+    """
+    Unbounded solves (HYBR, sparse Newton) vs the bounded trust region on the
+    pump header, a stress network and an oil grid: residual calls, Jacobians and
+    LM fallbacks.
+    """
+    print("🚀 Starting WalFlow Bounded Trust Region Benchmark...")
+    cases = [("pump header", generate_pump_header_network(), 'hybr'),
+             ("stress 60", generate_stress_network(60), 'hybr'),
+             ("grid 20x20", generate_grid_network(20, 20), 'sparse_newton')]
+    for label, mock_data, unbounded in cases:
+        for method in (unbounded, 'trf'):
+            start_time = time.perf_counter()
+            network = GraphParser.parse_graph(ReactFlowGraph(**mock_data))
+            parse_time = time.perf_counter() - start_time
+            stats = NetworkSolver(network).solve(method=method)
+            solve_time = time.perf_counter() - start_time - parse_time
+            total_time = time.perf_counter() - start_time
+            log_result(len(mock_data['nodes']), len(mock_data['edges']), parse_time, solve_time, total_time, stats["success"],
+                       note=f"{label}, {method}, {stats['total_inner_iterations']} residual calls, "
+                            f"{stats['jacobian_evaluations']} Jacobians, fallback {stats['fallback_used']}")
+            print(f"   - {label} / {method}: {solve_time*1000:.2f} ms, fallback {stats['fallback_used']}")
+
+def run_scaling_benchmark():
+    """
+    Fixed (bar, L/s) vs adaptive (equilibrated) scaling with HYBR and sparse
+    Newton: residual calls, LM fallbacks and the Jacobian condition estimate.
+    """
+    print("🚀 Starting WalFlow Scaling Benchmark...")
+    cases = [("instrument 10", generate_instrument_network(10)), ("instrument 50", generate_instrument_network(50)),
+             ("pump header", generate_pump_header_network()), ("stress 60", generate_stress_network(60))]
+    for label, mock_data in cases:
+        for method in ('hybr', 'sparse_newton'):
+            for scaling in ('fixed', 'adaptive'):
+                start_time = time.perf_counter()
+                network = GraphParser.parse_graph(ReactFlowGraph(**mock_data))
+                network.global_settings.scaling = scaling
+                network.global_settings.tree_solver = False
+                parse_time = time.perf_counter() - start_time
+                stats = NetworkSolver(network).solve(method=method)
+                solve_time = time.perf_counter() - start_time - parse_time
+                total_time = time.perf_counter() - start_time
+                log_result(len(mock_data['nodes']), len(mock_data['edges']), parse_time, solve_time, total_time, stats["success"],
+                           note=f"{label}, {method}, {scaling}, {stats['total_inner_iterations']} residual calls, "
+                                f"fallback {stats['fallback_used']}, condition {stats['jacobian_condition'] or float('nan'):.2g}")
+                print(f"   - {label} / {method} / {scaling}: {solve_time*1000:.2f} ms, condition {stats['jacobian_condition'] or float('nan'):.2g}")
+
+def run_state_arena_benchmark(sizes=(60, 200, 400)):
+    """
+    Solves stress networks and times copying the whole port state: one arena
+    snapshot vs reading every field of every port through its attributes.
+    """
+    print("🚀 Starting WalFlow State Arena Benchmark...")
+    from simulation.state_arena import network_ports, PORT_FIELDS
+    for complexity in sizes:
+        mock_data = generate_stress_network(complexity)
+        start_time = time.perf_counter()
+        network = GraphParser.parse_graph(ReactFlowGraph(**mock_data))
+        parse_time = time.perf_counter() - start_time
+        stats = NetworkSolver(network).solve(method='sparse_newton')
+        solve_time = time.perf_counter() - start_time - parse_time
+        total_time = time.perf_counter() - start_time
+        ports = network_ports(network)
+        t0 = time.perf_counter()
+        network.state.snapshot()
+        snapshot_time = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        [[getattr(p, field) for field in PORT_FIELDS] for p in ports]
+        loop_time = time.perf_counter() - t0
+        log_result(len(mock_data['nodes']), len(mock_data['edges']), parse_time, solve_time, total_time, stats["success"],
+                   note=f"state arena, {len(ports)} ports, {network.state.nbytes} bytes, "
+                        f"snapshot {snapshot_time*1e6:.0f} us vs per-port {loop_time*1e6:.0f} us")
+        print(f"   - Size {complexity}: {len(ports)} ports, solve {solve_time*1000:.2f} ms, "
+              f"snapshot {snapshot_time*1e6:.0f} us vs per-port {loop_time*1e6:.0f} us")
+
+def run_fluid_table_benchmark(sizes=(60, 200), samples=10000):
+    """
+    Times the fluid property tables against the scalar models over an array of
+    temperatures (with the measured interpolation error), then solves stress
+    networks whose tank boundaries come from the tables.
+    """
+    print("🚀 Starting WalFlow Fluid Table Benchmark...")
+    import numpy as np
+    from simulation.fluid_utils import FluidProperties, fluid_table, FluidTable
+    temperatures = np.linspace(273.15, 423.15, samples)
+    notes = []
+    for fluid_type in ("water", "iso_vg_46"):
+        t0 = time.perf_counter()
+        table = fluid_table(fluid_type)
+        build_time = time.perf_counter() - t0
+        for name in FluidTable.PROPERTIES:
+            model = getattr(FluidProperties, f"get_{name}")
+            t0 = time.perf_counter()
+            exact = np.array([model(fluid_type, t) for t in temperatures.tolist()])
+            model_time = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            approx = table.evaluate(name, temperatures)
+            table_time = time.perf_counter() - t0
+            error = np.max(np.abs(approx - exact) / np.abs(exact))
+            notes.append(f"{fluid_type} {name}: table {table_time*1e6:.0f} us vs model {model_time*1e6:.0f} us, error {error:.1e}")
+            print(f"   - {notes[-1]}")
+        print(f"   - {fluid_type} table built in {build_time*1000:.1f} ms")
+    log_result(0, 0, 0.0, 0.0, 0.0, True, note=f"fluid tables, {samples} temperatures; " + "; ".join(notes))
+    for complexity in sizes:
+        mock_data = generate_stress_network(complexity)
+        start_time = time.perf_counter()
+        network = GraphParser.parse_graph(ReactFlowGraph(**mock_data))
+        parse_time = time.perf_counter() - start_time
+        stats = NetworkSolver(network).solve(method='sparse_newton')
+        solve_time = time.perf_counter() - start_time - parse_time
+        total_time = time.perf_counter() - start_time
+        log_result(len(mock_data['nodes']), len(mock_data['edges']), parse_time, solve_time, total_time, stats["success"],
+                   note=f"stress {complexity}, tabulated tank boundaries, {stats['total_inner_iterations']} residual calls")
+        print(f"   - Size {complexity}: solve {solve_time*1000:.2f} ms")
+
+def run_equipment_benchmark(calls=20000):
+    """
+    Per equipment type: time of calculate_delta_p plus its slope (and the heat
+    exchanger's temperature update) on compiled coefficients, and the cost of
+    compiling them, which each of those calls used to pay.
+    """
+    print("🚀 Starting WalFlow Equipment Coefficient Benchmark...")
+    from simulation.schemas import GlobalSettings
+    from simulation.equipment.pipe import Pipe
+    from simulation.equipment.orifice import Orifice
+    from simulation.equipment.filter import Filter
+    from simulation.equipment.heat_exchanger import HeatExchanger
+    from simulation.equipment.linear_control_valve import LinearControlValve
+    from simulation.equipment.linear_regulator import LinearRegulator
+    from simulation.equipment.centrifugal_pump import CentrifugalPump
+    from simulation.equipment.volumetric_pump import VolumetricPump
+    gs = GlobalSettings()
+    equipment = [Pipe("Pipe", 10.0, 0.05), Orifice("Orifice", 0.1, 0.07), Filter("Filter", clogging_pct=30.0),
+                 HeatExchanger("Heat Exchanger"), LinearControlValve("Valve", 0.05, 60.0), LinearRegulator("Regulator", 0.05),
+                 CentrifugalPump("Centrifugal Pump", 0.002, 5e5), VolumetricPump("Volumetric Pump", 0.002, 5000.0, 0.85)]
+    for element in equipment:
+        element.global_settings = gs
+        element.inlets[0].flow_rate = 0.0015
+        element.inlets[0].temperature = 323.15
+        t0 = time.perf_counter()
+        for _ in range(calls):
+            element.calculate_delta_p(0.0015, 870.0, 0.03)
+            element.calculate_delta_p_derivative(0.0015, 870.0, 0.03)
+            if isinstance(element, HeatExchanger):
+                element.calculate_temperature()
+        eval_time = (time.perf_counter() - t0) / calls
+        t0 = time.perf_counter()
+        for _ in range(calls):
+            element.compile()
+            if isinstance(element, HeatExchanger):
+                element._design_point_ua(2000.0)
+        compile_time = (time.perf_counter() - t0) / calls
+        log_result(1, 0, 0.0, eval_time, eval_time, True,
+                   note=f"{element.name}, evaluation {eval_time*1e9:.0f} ns on compiled coefficients, compile {compile_time*1e9:.0f} ns")
+        print(f"   - {element.name}: evaluation {eval_time*1e9:.0f} ns, compile {compile_time*1e9:.0f} ns")
+
+def run_registry_benchmark(sizes=(60, 200, 400), repeats=5):
+    """
+    Parses stress networks through the equipment registry and times the solver
+    setup (index sets from the capability flags, incidence, Jacobian structure,
+    batch kernels), best of `repeats`.
+    """
+    print("🚀 Starting WalFlow Equipment Registry Benchmark...")
+    for complexity in sizes:
+        mock_data = generate_stress_network(complexity)
+        parse_time = setup_time = float('inf')
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            network = GraphParser.parse_graph(ReactFlowGraph(**mock_data))
+            t1 = time.perf_counter()
+            NetworkSolver(network)
+            t2 = time.perf_counter()
+            parse_time, setup_time = min(parse_time, t1 - t0), min(setup_time, t2 - t1)
+        log_result(len(mock_data['nodes']), len(mock_data['edges']), parse_time, setup_time, parse_time + setup_time, True,
+                   note="equipment registry, solve column is the solver setup")
+        print(f"   - Size {complexity}: parse {parse_time*1000:.2f} ms, solver setup {setup_time*1000:.2f} ms")
+
+def log_result(nodes, edges, parse, solve, total, success, note=None):
     log_file = os.path.join(os.path.dirname(__file__), "performance_log.md")
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     status = "PASS" if success else "FAIL"
+    if note:
+        status = f"{status} ({note})"
     
     # Create file with header if it doesn't exist
     if not os.path.exists(log_file):
@@ -101,3 +631,18 @@ def log_result(nodes, edges, parse, solve, total, success):
 
 if __name__ == "__main__":
     run_benchmark()
+    run_memory_benchmark()
+    run_resolve_benchmark()
+    run_gga_benchmark()
+    run_reduction_benchmark()
+    run_tree_benchmark()
+    run_component_benchmark()
+    run_domain_benchmark()
+    run_initial_guess_benchmark()
+    run_continuation_benchmark()
+    run_bounded_benchmark()
+    run_scaling_benchmark()
+    run_state_arena_benchmark()
+    run_fluid_table_benchmark()
+    run_equipment_benchmark()
+    run_registry_benchmark()
@@ -0,0 +1,109 @@
+import sys
+import os
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from simulation.equipment.base_node import HydraulicNode
+from simulation.equipment.centrifugal_pump import CentrifugalPump
+from simulation.equipment.volumetric_pump import VolumetricPump
+from simulation.equipment.linear_control_valve import LinearControlValve
+from simulation.equipment.linear_regulator import LinearRegulator
+from simulation.equipment.remote_control_valve import RemoteControlValve
+from simulation.equipment.orifice import Orifice
+from simulation.equipment.filter import Filter
+from simulation.equipment.heat_exchanger import HeatExchanger
+from simulation.batch_kernels import BATCH_KERNELS, BatchKernel, ScalarKernel, kernel_for, register_batch_kernel, dp_derivative
+
+def test_batch_kernels_match_scalar():
+    """
+    Each registered batch kernel must reproduce its equipment's scalar
+    calculate_delta_p and slope, node by node.
+    """
+    print("\n--- Batch Kernels vs Scalar Equipment ---")
+    q_rated = 100.0 / 60000.0
+    groups = [
+        [CentrifugalPump(f"Pump {k}", flow_rated=q_rated * (k + 1), pressure_rated=3e5 + 1e5 * k) for k in range(4)],
+        [VolumetricPump(f"PD {k}", flow_rated=q_rated * (k + 1), motor_power=2000.0 * (k + 1), efficiency=0.8) for k in range(4)],
+        [LinearControlValve(f"Valve {k}", max_cv=0.02 * (k + 1), opening_pct=[0.0, 25.0, 80.0, 100.0][k]) for k in range(4)],
+        [LinearRegulator(f"PRV {k}", max_cv=0.05) for k in range(4)],
+        [RemoteControlValve(f"RCV {k}", max_cv=0.05) for k in range(4)],
+        [Orifice(f"Orifice {k}", pipe_diameter=0.1, orifice_diameter=0.03 + 0.01 * k) for k in range(4)],
+        [Filter(f"Filter {k}", clogging_pct=30.0 * k) for k in range(4)],
+        [HeatExchanger(f"Cooler {k}") for k in range(4)],
+    ]
+    # Regulator openings as the control loop may leave them (including out of range)
+    for node, opening in zip(groups[3] + groups[4], [0.1, 50.0, 100.0, 120.0] * 2):
+        node.opening_pct = opening
+
+    rho = np.array([870.0, 998.0, 1000.0, 1050.0])
+    mu = np.array([0.04, 0.001, 0.001, 0.002])
+    for nodes in groups:
+        kernel = kernel_for(type(nodes[0]))(nodes)
+        assert not isinstance(kernel, ScalarKernel)
+        for q in ([1e-4, 5e-4, 0.8 * q_rated, 3e-3], [-1e-3, 0.0, 2e-2, -4e-5]):
+            q = np.array(q)
+            dp = kernel.delta_p(q, rho, mu)
+            slope = kernel.delta_p_derivative(q, rho, mu)
+            for k, node in enumerate(nodes):
+                assert np.isclose(dp[k], node.calculate_delta_p(q[k], rho[k], mu[k]), rtol=1e-12, atol=1e-9)
+                assert np.isclose(slope[k], node.calculate_delta_p_derivative(q[k], rho[k], mu[k]), rtol=1e-12, atol=1e-9)
+        print(f"  {type(kernel).__name__} ({type(nodes[0]).__name__}): OK")
+
+    # Parameter edits are picked up on refresh
+    valves = groups[2]
+    kernel = kernel_for(LinearControlValve)(valves)
+    valves[1].opening_pct = 60.0
+    kernel.refresh()
+    q = np.full(4, 1e-3)
+    assert np.isclose(kernel.delta_p(q, rho, mu)[1], valves[1].calculate_delta_p(1e-3, rho[1], mu[1]))
+
+def test_batch_kernel_registration():
+    """
+    Equipment without a kernel falls back to scalar calls; new equipment can register one.
+    """
+    print("\n--- Batch Kernel Registration ---")
+    class Nozzle(HydraulicNode):
+        def __init__(self, name, k):
+            super().__init__(name, node_type="nozzle")
+            self.k = k
+            self.add_inlet()
+            self.add_outlet()
+
+        def calculate_delta_p(self, flow_rate, density, viscosity=0.001):
+            return self.k * density * flow_rate * abs(flow_rate)
+
+    nozzles = [Nozzle("N1", 1e5), Nozzle("N2", 4e5)]
+    q = np.array([1e-3, -2e-3])
+    rho = np.array([1000.0, 900.0])
+    mu = np.array([0.001, 0.001])
+
+    fallback = kernel_for(Nozzle)(nozzles)
+    assert isinstance(fallback, ScalarKernel)
+    expected = [n.calculate_delta_p(q[k], rho[k], mu[k]) for k, n in enumerate(nozzles)]
+    assert np.allclose(fallback.delta_p(q, rho, mu), expected)
+    assert np.allclose(fallback.delta_p_derivative(q, rho, mu), [dp_derivative(n, q[k], rho[k], mu[k]) for k, n in enumerate(nozzles)])
+
+    @register_batch_kernel(Nozzle)
+    class NozzleKernel(BatchKernel):
+        def refresh(self):
+            self.k = np.array([n.k for n in self.nodes])
+
+        def delta_p(self, flow_rate, density, viscosity):
+            return self.k * density * flow_rate * np.abs(flow_rate)
+
+        def delta_p_derivative(self, flow_rate, density, viscosity):
+            return 2.0 * self.k * density * np.abs(flow_rate)
+
+    try:
+        kernel = kernel_for(Nozzle)(nozzles)
+        assert isinstance(kernel, NozzleKernel)
+        assert np.allclose(kernel.delta_p(q, rho, mu), expected)
+        print("  Registered kernel: OK")
+    finally:
+        del BATCH_KERNELS[Nozzle]
+
+if __name__ == "__main__":
+    test_batch_kernels_match_scalar()
+    test_batch_kernel_registration()
@@ -0,0 +1,67 @@
+import sys
+import os
+import time
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from simulation.equipment.pipe import Pipe
+from simulation.pipe_bank import PipeBank
+from simulation.schemas import GlobalSettings
+
+def test_pipe_bank_matches_scalar():
+    """
+    The vectorized pipe bank must reproduce Pipe.calculate_delta_p and its
+    derivative for every pipe, across laminar, turbulent, zero and reverse flow.
+    """
+    print("\n--- Pipe Bank vs Scalar Pipe ---")
+    rng = np.random.default_rng(42)
+    n = 2000
+    smooth = GlobalSettings(global_roughness=0.000001)
+    pipes = []
+    for k in range(n):
+        pipe = Pipe(f"Pipe {k}", length=rng.uniform(0.5, 200.0), diameter=rng.uniform(0.01, 0.3))
+        # Mix of pipes with, without and with non-default global settings
+        pipe.global_settings = [None, GlobalSettings(), smooth][k % 3]
+        pipes.append(pipe)
+    bank = PipeBank(pipes)
+
+    # Flows spanning 6 decades in both directions, plus exact zeros
+    q = rng.choice([-1.0, 1.0], n) * 10**rng.uniform(-8, -1, n)
+    q[::50] = 0.0
+    rho = rng.uniform(800.0, 1100.0, n)
+    mu = rng.uniform(0.0005, 0.2, n)
+    mu[::97] = 0.0
+
+    start = time.perf_counter()
+    dp_scalar = np.array([p.calculate_delta_p(q[j], rho[j], mu[j]) for j, p in enumerate(pipes)])
+    d_scalar = np.array([p.calculate_delta_p_derivative(q[j], rho[j], mu[j]) for j, p in enumerate(pipes)])
+    t_scalar = time.perf_counter() - start
+
+    start = time.perf_counter()
+    dp_bank = bank.delta_p(q, rho, mu)
+    d_bank = bank.delta_p_derivative(q, rho, mu)
+    t_bank = time.perf_counter() - start
+
+    print(f"  {n} pipes: scalar {t_scalar*1000:.2f} ms, vectorized {t_bank*1000:.2f} ms")
+    assert np.allclose(dp_bank, dp_scalar, rtol=1e-10, atol=1e-12)
+    assert np.allclose(d_bank, d_scalar, rtol=1e-10, atol=1e-12)
+
+    # Geometry edits are picked up on refresh
+    pipes[0].diameter *= 2
+    bank.refresh()
+    assert np.isclose(bank.delta_p(q, rho, mu)[0], pipes[0].calculate_delta_p(q[0], rho[0], mu[0]), rtol=1e-10, atol=1e-12)
+
+    # Same validation as the scalar model
+    pipes[1].diameter = 0.0
+    bank.refresh()
+    try:
+        bank.delta_p(q, rho, mu)
+        assert False, "Zero diameter must raise"
+    except ValueError:
+        pass
+    print("  RESULT: SUCCESS")
+
+if __name__ == "__main__":
+    test_pipe_bank_matches_scalar()
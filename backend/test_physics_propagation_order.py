@@ -0,0 +1,152 @@
+import sys
+import os
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from simulation.schemas import ReactFlowGraph, HydraulicNetwork, GlobalSettings
+from simulation.graph_parser import GraphParser
+from simulation.solver import NetworkSolver
+from simulation.equipment.tank import Tank
+from simulation.equipment.pipe import Pipe
+from simulation.equipment.centrifugal_pump import CentrifugalPump
+from simulation.equipment.splitter import Splitter
+from simulation.equipment.mixer import Mixer
+from simulation.equipment.linear_control_valve import LinearControlValve
+from simulation.equipment.heat_exchanger import HeatExchanger
+from test_performance_bench import generate_stress_network
+
+def solve_chain(property_iterations):
+    graph_data = generate_stress_network(25)
+    graph_data["nodes"][0]["data"]["temperature"] = 353.15
+    for edge in graph_data["edges"]:
+        if edge["id"].startswith("e_p2_"):
+            edge["targetHandle"] = "inlet-1"
+    graph_data["global_settings"] = {"fluid_type": "iso_vg_46", "property_iterations": property_iterations}
+    network = GraphParser.parse_graph(ReactFlowGraph(**graph_data))
+    stats = NetworkSolver(network).solve(method='hybr')
+    temps = np.array([edge['pipe'].outlets[0].temperature for edge in network.edges])
+    return stats, temps, network
+
+def test_acyclic_single_pass():
+    """
+    On an acyclic network one pass in flow order is exact: the result must not
+    depend on the property iteration cap, and only one pass is reported.
+    """
+    print("\n--- Flow-Ordered Propagation (Acyclic) ---")
+    stats_1, temps_1, network = solve_chain(1)
+    stats_50, temps_50, _ = solve_chain(50)
+    assert stats_1["success"] and stats_50["success"]
+    assert stats_1["property_iterations"] == 1
+    print(f"  Sink inflow: {temps_1[-1] - 273.15:.4f} C (cap 1) vs {temps_50[-1] - 273.15:.4f} C (cap 50)")
+    assert np.allclose(temps_1, temps_50, rtol=0.0, atol=1e-9)
+
+    # Hot oil reaches the sink: the viscosity seen by the last pipe is the source's
+    source_mu = network.nodes["t_start"].outlets[0].viscosity
+    assert np.isclose(network.edges[-1]['pipe'].inlets[0].viscosity, source_mu)
+    print("  RESULT: SUCCESS")
+
+def build_recirculation_network(with_cooler=False):
+    """Source -> suction header -> pump -> discharge header -> load -> sink, with a recirculation line back to suction."""
+    gs = GlobalSettings(fluid_type="iso_vg_46", property_iterations=200)
+    source = Tank("Source", fluid_level=2.0, temperature=313.15, fluid_type="iso_vg_46")
+    mixer = Mixer("Suction Header")
+    pump = CentrifugalPump("Pump", flow_rated=200.0/60000.0, pressure_rated=6e5, efficiency=0.5)
+    splitter = Splitter("Discharge Header")
+    recirc = LinearControlValve("Recirculation", max_cv=0.02, opening_pct=50.0)
+    load = LinearControlValve("Load", max_cv=0.05, opening_pct=60.0)
+    sink = Tank("Sink", fluid_level=1.0, temperature=313.15, fluid_type="iso_vg_46")
+
+    nodes = {"src": source, "mix": mixer, "pump": pump, "split": splitter, "recirc": recirc, "load": load, "sink": sink}
+    edges = [
+        {"id": "e1", "source": "src", "target": "mix", "target_port": "inlet-0", "pipe": Pipe("p1", 2.0, 0.08)},
+        {"id": "e2", "source": "mix", "target": "pump", "pipe": Pipe("p2", 1.0, 0.08)},
+        {"id": "e3", "source": "pump", "target": "split", "pipe": Pipe("p3", 1.0, 0.08)},
+        {"id": "e4", "source": "split", "target": "load", "source_port": "outlet-0", "pipe": Pipe("p4", 5.0, 0.05)},
+        {"id": "e5", "source": "load", "target": "sink", "pipe": Pipe("p5", 5.0, 0.05)},
+        {"id": "e6", "source": "split", "target": "recirc", "source_port": "outlet-1", "pipe": Pipe("p6", 5.0, 0.04)},
+        {"id": "e7", "source": "recirc", "target": "mix", "target_port": "inlet-1", "pipe": Pipe("p7", 5.0, 0.04)},
+    ]
+    if with_cooler:
+        # Route the recirculation line through a cooler (non-affine duty, linearized by the solver)
+        nodes["cooler"] = HeatExchanger("Recirc Cooler", rated_cooling_kw=5.0, rated_flow_lmin=1.0, pressure_drop_factor=1e9)
+        edges[6] = {"id": "e7", "source": "recirc", "target": "cooler", "pipe": Pipe("p7", 5.0, 0.04)}
+        edges.append({"id": "e8", "source": "cooler", "target": "mix", "target_port": "inlet-1", "pipe": Pipe("p8", 2.0, 0.04)})
+    network = HydraulicNetwork(nodes=nodes, edges=edges, global_settings=gs)
+    for n in nodes.values(): n.global_settings = gs
+    for e in edges: e['pipe'].global_settings = gs
+    return network, nodes, edges
+
+def test_recirculation_loop_is_solved_directly():
+    """
+    A pump with a recirculation line forms a strongly connected component.
+    Only that loop is treated specially, its energy balance must close, and
+    from a cold start it is solved in one linear step (no sweep cap involved).
+    """
+    print("\n--- Flow-Ordered Propagation (Recirculation Loop) ---")
+    network, nodes, edges = build_recirculation_network()
+    source, mixer = nodes["src"], nodes["mix"]
+    solver = NetworkSolver(network)
+    stats = solver.solve(method='hybr')
+    assert stats["success"]
+
+    q = np.array([edge['pipe'].inlets[0].flow_rate for edge in edges])
+    assert np.all(q > 0), "Loop must recirculate forward"
+    order = solver._propagation_order(q)
+    loops = [members for members, cyclic in order if cyclic]
+    assert len(loops) == 1
+    loop_nodes = {solver.node_ids[v] for v in loops[0] if v < len(solver.nodes_list)}
+    assert loop_nodes == {"mix", "pump", "split", "recirc"}
+
+    # The source and the load branch are visited once, before/after the loop
+    position = {v: k for k, (members, _) in enumerate(order) for v in members}
+    ids = solver.node_id_to_idx
+    assert position[ids["src"]] < position[ids["mix"]] < position[ids["load"]]
+
+    t_mix = mixer.outlets[0].temperature
+    m_src = q[0] * mixer.inlets[0].density
+    m_rec = q[6] * mixer.inlets[1].density
+    t_expected = (m_src * mixer.inlets[0].temperature + m_rec * mixer.inlets[1].temperature) / (m_src + m_rec)
+    assert abs(t_mix - t_expected) < 0.01
+    assert t_mix > source.temperature
+
+    # From a cold start: one sweep, then a single linear solve of the loop
+    for element in list(nodes.values()) + [e['pipe'] for e in edges]:
+        for port in element.inlets + element.outlets:
+            port.temperature = 293.15
+    solver._propagate_properties(q)
+    print(f"  Recirculation {q[6]*60000:.2f} L/min, suction {t_mix - 273.15:.3f} C, {solver.last_prop_iters} passes from cold")
+    assert solver.last_prop_iters == 2
+    assert abs(mixer.outlets[0].temperature - t_mix) < 0.01
+    print("  RESULT: SUCCESS")
+
+def test_loop_with_cooler_is_a_fixed_point():
+    """
+    With a heat exchanger inside the loop, the direct solve must land on the
+    fixed point that unlimited Gauss-Seidel sweeps would converge to.
+    """
+    print("\n--- Flow-Ordered Propagation (Loop With Cooler) ---")
+    network, nodes, edges = build_recirculation_network(with_cooler=True)
+    solver = NetworkSolver(network)
+    stats = solver.solve(method='hybr')
+    assert stats["success"]
+    q = np.array([edge['pipe'].inlets[0].flow_rate for edge in edges])
+    loops = [members for members, cyclic in solver._propagation_order(q) if cyclic]
+    assert len(loops) == 1 and solver.node_id_to_idx["cooler"] in loops[0]
+
+    ports = solver._component_ports(loops[0])
+    solved = np.array([p.temperature for p in ports])
+    for _ in range(500):
+        for v in loops[0]:
+            solver._propagate_element(v, q)
+    swept = np.array([p.temperature for p in ports])
+    cooler = nodes["cooler"]
+    print(f"  Cooler duty {cooler.actual_duty_kw:.3f} kW, max deviation from sweeps {np.max(np.abs(swept - solved)):.2e} K")
+    assert cooler.actual_duty_kw > 0
+    assert np.max(np.abs(swept - solved)) < 0.01
+
+if __name__ == "__main__":
+    test_acyclic_single_pass()
+    test_recirculation_loop_is_solved_directly()
+    test_loop_with_cooler_is_a_fixed_point()
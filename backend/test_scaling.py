@@ -0,0 +1,98 @@
+import sys
+import os
+import json
+import numpy as np
+from scipy.sparse import csc_matrix
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from simulation.schemas import ReactFlowGraph
+from simulation.graph_parser import GraphParser
+from simulation.solver import NetworkSolver
+from simulation.equilibration import Equilibration, condition_estimate
+from test_performance_bench import generate_instrument_network
+
+def build(mock_data, scaling):
+    network = GraphParser.parse_graph(ReactFlowGraph(**mock_data))
+    network.global_settings.scaling = scaling
+    network.global_settings.tree_solver = False
+    return network
+
+def edge_flows(network):
+    return np.array([e['pipe'].inlets[0].flow_rate for e in network.edges])
+
+def test_equilibration_improves_conditioning():
+    """
+    On the instrument-line network (DN150 main, 4 mm bypasses, displacement
+    pump) the equilibrated Jacobian R J C is far better conditioned than J in
+    bar and L/s; all factors are powers of two.
+    """
+    print("\n--- Scaling (Equilibration) ---")
+    solver = NetworkSolver(build(generate_instrument_network(10), 'fixed'))
+    assert solver.solve(method='sparse_newton')["success"]
+    jac = solver._jacobian(solver._final_x_scaled)
+    equilibration = Equilibration(jac)
+    for scale in (equilibration.row, equilibration.col):
+        assert np.allclose(np.exp2(np.round(np.log2(scale))), scale)
+    fixed, adaptive = condition_estimate(jac), condition_estimate(equilibration.scale_jacobian(jac))
+    assert adaptive < fixed / 100.0
+    print(f"  Condition estimate: fixed {fixed:.3g}, equilibrated {adaptive:.3g}")
+    print("  RESULT: SUCCESS")
+
+def test_adaptive_matches_fixed():
+    """
+    Both scalings land on the same operating point; the stats carry the
+    condition estimate of the Jacobian each backend worked with.
+    """
+    print("\n--- Scaling (Same Answer) ---")
+    mock_data = generate_instrument_network(10)
+    conditions = {}
+    results = {}
+    for scaling in ('fixed', 'adaptive'):
+        network = build(mock_data, scaling)
+        stats = NetworkSolver(network).solve(method='hybr')
+        assert stats["success"]
+        conditions[scaling] = stats["jacobian_condition"]
+        results[scaling] = edge_flows(network)
+    assert np.allclose(results['adaptive'], results['fixed'], rtol=1e-4, atol=1e-9)
+    assert conditions['adaptive'] < conditions['fixed'] / 100.0
+    print(f"  Condition estimates: {conditions}")
+    print("  RESULT: SUCCESS")
+
+def test_singular_jacobian_has_no_condition():
+    """
+    A singular Jacobian has no condition estimate (None, not inf), so stats
+    carrying it stay valid JSON for the frontend.
+    """
+    print("\n--- Scaling (Singular Jacobian) ---")
+    singular = csc_matrix(np.array([[1.0, 2.0, 0.0], [2.0, 4.0, 0.0], [0.0, 0.0, 1.0]]))
+    assert condition_estimate(singular) is None
+    assert condition_estimate(csc_matrix(np.diag([1.0, np.inf]))) is None
+    assert condition_estimate(csc_matrix(np.eye(3))) == 1.0
+    json.dumps({"jacobian_condition": condition_estimate(singular)}, allow_nan=False)
+    print("  RESULT: SUCCESS")
+
+def test_equilibrated_root_checked_in_fixed_scaling():
+    """
+    On the instrument-line network LM on the equilibrated system stops with a
+    residual of mbar that a row weighted down hides; the check in the fixed
+    scaling sends it to the fallback, which reaches the fixed-scaling answer.
+    """
+    print("\n--- Scaling (Fixed-Scaling Check) ---")
+    reference = build(generate_instrument_network(10), 'fixed')
+    assert NetworkSolver(reference).solve(method='lm')["success"]
+    network = build(generate_instrument_network(10), 'adaptive')
+    solver = NetworkSolver(network)
+    stats = solver.solve(method='lm')
+    assert stats["success"] and stats["fallback_used"]
+    assert np.max(np.abs(solver._objective(solver._final_x_scaled))) < 1e-4
+    assert np.allclose(edge_flows(network), edge_flows(reference), rtol=1e-5, atol=1e-8)
+    print(f"  {stats['total_inner_iterations']} residual calls, fallback {stats['fallback_used']}")
+    print("  RESULT: SUCCESS")
+
+if __name__ == "__main__":
+    test_equilibration_improves_conditioning()
+    test_adaptive_matches_fixed()
+    test_equilibrated_root_checked_in_fixed_scaling()
+    test_singular_jacobian_has_no_condition()
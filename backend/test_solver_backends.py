@@ -0,0 +1,121 @@
+import sys
+import os
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from simulation.schemas import ReactFlowGraph, GlobalSettings
+from simulation.graph_parser import GraphParser
+from simulation.solver import NetworkSolver
+from test_performance_bench import generate_stress_network
+from test_physics_tcv import build_tcv_network
+
+def solve_flows(graph_data, method):
+    network = GraphParser.parse_graph(ReactFlowGraph(**graph_data))
+    stats = NetworkSolver(network).solve(method=method)
+    flows = np.array([edge['pipe'].inlets[0].flow_rate for edge in network.edges])
+    pressures = np.array([node.inlets[0].pressure for node in network.nodes.values()])
+    return stats, flows, pressures
+
+def pump_valve_graph():
+    return {
+        "nodes": [
+            {"id": "t1", "type": "tank", "data": {"level": 2.0}, "position": {"x": 0, "y": 0}},
+            {"id": "p1", "type": "centrifugal_pump", "data": {"flow_rated_lmin": 300, "pressure_rated_bar": 4}, "position": {"x": 0, "y": 0}},
+            {"id": "s1", "type": "splitter", "data": {}, "position": {"x": 0, "y": 0}},
+            {"id": "v1", "type": "linear_control_valve", "data": {"max_cv": 0.05, "opening": 30}, "position": {"x": 0, "y": 0}},
+            {"id": "o1", "type": "orifice", "data": {"pipe_diameter": 0.05, "orifice_diameter": 0.03}, "position": {"x": 0, "y": 0}},
+            {"id": "m1", "type": "mixer", "data": {}, "position": {"x": 0, "y": 0}},
+            {"id": "f1", "type": "filter", "data": {"clogging": 40}, "position": {"x": 0, "y": 0}},
+            {"id": "t2", "type": "tank", "data": {"level": 1.0}, "position": {"x": 0, "y": 0}},
+        ],
+        "edges": [
+            {"id": "e1", "source": "t1", "target": "p1", "data": {"length": 2, "diameter": 0.08}},
+            {"id": "e2", "source": "p1", "target": "s1", "data": {"length": 10, "diameter": 0.08}},
+            {"id": "e3", "source": "s1", "target": "v1", "sourceHandle": "outlet-0", "data": {"length": 5, "diameter": 0.05}},
+            {"id": "e4", "source": "s1", "target": "o1", "sourceHandle": "outlet-1", "data": {"length": 5, "diameter": 0.05}},
+            {"id": "e5", "source": "v1", "target": "m1", "targetHandle": "inlet-0", "data": {"length": 5, "diameter": 0.05}},
+            {"id": "e6", "source": "o1", "target": "m1", "targetHandle": "inlet-1", "data": {"length": 5, "diameter": 0.05}},
+            {"id": "e7", "source": "m1", "target": "f1", "data": {"length": 5, "diameter": 0.08}},
+            {"id": "e8", "source": "f1", "target": "t2", "data": {"length": 5, "diameter": 0.08}},
+        ],
+    }
+
+def test_sparse_newton_matches_hybr():
+    """
+    The sparse Newton backend must converge to the same operating point as MINPACK hybr.
+    """
+    print("\n--- Sparse Newton vs HYBR ---")
+    for name, graph_data in [("Pump/valve loop", pump_valve_graph()), ("Stress network", generate_stress_network(10))]:
+        stats_h, q_h, p_h = solve_flows(graph_data, 'hybr')
+        stats_n, q_n, p_n = solve_flows(graph_data, 'sparse_newton')
+        assert stats_h["success"] and stats_n["success"]
+        assert not stats_n["fallback_used"]
+        print(f"  {name}: max dQ = {np.max(np.abs(q_h - q_n)):.2e} m3/s, max dP = {np.max(np.abs(p_h - p_n)):.2e} Pa")
+        assert np.allclose(q_h, q_n, rtol=1e-4, atol=1e-7)
+        assert np.allclose(p_h, p_n, rtol=1e-6, atol=5.0)
+
+def test_sparse_newton_memory_is_linear():
+    """
+    Peak solver memory is reported and grows roughly linearly with network size.
+    """
+    print("\n--- Sparse Newton Memory Scaling ---")
+    mem = []
+    for size in (20, 40, 80):
+        stats, _, _ = solve_flows(generate_stress_network(size), 'sparse_newton')
+        assert stats["success"]
+        mem.append(stats["peak_memory_kb"])
+        print(f"  {stats['system_size']} unknowns: {stats['peak_memory_kb']:.1f} kB")
+    # Doubling the network should roughly double memory (dense storage would quadruple it)
+    assert mem[2] / mem[1] < 3.0
+    assert mem[1] / mem[0] < 3.0
+
+def test_picard_property_coupling():
+    """
+    Freezing properties inside the hydraulic solve (Picard) must reach the same
+    operating point as re-propagating them in every residual call.
+    """
+    print("\n--- Coupled vs Picard Property Update ---")
+    results = {}
+    for coupling in ("coupled", "picard"):
+        network, tcv = build_tcv_network(hot_temp=353.15, cold_temp=293.15, set_temp=313.15)
+        network.global_settings = GlobalSettings(fluid_type="iso_vg_46", property_coupling=coupling)
+        stats = NetworkSolver(network).solve(method='hybr')
+        assert stats["success"]
+        results[coupling] = (tcv.inlets[0].flow_rate, tcv.inlets[1].flow_rate, tcv.outlets[0].temperature)
+        print(f"  {coupling}: hot={results[coupling][0]*60000:.2f} L/min, cold={results[coupling][1]*60000:.2f} L/min, "
+              f"T_out={results[coupling][2]-273.15:.2f} C, {stats['total_inner_iterations']} residual calls")
+    assert np.allclose(results["coupled"], results["picard"], rtol=1e-3)
+
+    # Long chain: the per-residual sweep cap no longer limits property convergence
+    graph_data = generate_stress_network(20)
+    graph_data["global_settings"] = {"fluid_type": "iso_vg_46", "property_coupling": "picard"}
+    network = GraphParser.parse_graph(ReactFlowGraph(**graph_data))
+    stats = NetworkSolver(network).solve(method='hybr')
+    assert stats["success"] and stats["property_outer_iterations"] >= 1
+    sink = network.nodes["t_end"]
+    viscosities = [edge['pipe'].inlets[0].viscosity for edge in network.edges]
+    assert np.allclose(viscosities, network.nodes["t_start"].outlets[0].viscosity)
+    print(f"  Chain of 20 loops: {stats['property_outer_iterations']} Picard steps, sink inflow T = {sink.inlets[0].temperature - 273.15:.3f} C")
+
+def test_isothermal_mode():
+    """
+    Isothermal mode skips the thermal pass but must give the same hydraulics
+    for a single-fluid network.
+    """
+    print("\n--- Isothermal Mode ---")
+    graph_data = generate_stress_network(10)
+    stats_full, q_full, p_full = solve_flows(graph_data, 'hybr')
+    graph_data["global_settings"] = {"isothermal": True}
+    stats_iso, q_iso, p_iso = solve_flows(graph_data, 'hybr')
+    assert stats_iso["success"] and stats_iso["property_iterations"] == 0
+    print(f"  Full thermal: {stats_full['time_ms']:.1f} ms, isothermal: {stats_iso['time_ms']:.1f} ms")
+    assert np.allclose(q_full, q_iso, rtol=1e-6, atol=1e-9)
+    assert np.allclose(p_full, p_iso, rtol=1e-6, atol=1.0)
+
+if __name__ == "__main__":
+    test_sparse_newton_matches_hybr()
+    test_sparse_newton_memory_is_linear()
+    test_picard_property_coupling()
+    test_isothermal_mode()
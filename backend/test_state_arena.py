@@ -0,0 +1,97 @@
+import sys
+import os
+import pickle
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from simulation.schemas import Port
+from simulation.solver import NetworkSolver
+from simulation.state_arena import StateArena, PortGroup, network_ports, PORT_FIELDS, PRESSURE, TEMPERATURE
+from test_components import build_skid_and_cooling, port_states
+
+def test_port_view():
+    """
+    A Port keeps the former model's fields, defaults and telemetry dict; it is
+    detached until attached, then its attributes are its arena row.
+    """
+    print("\n--- State Arena (Port View) ---")
+    port = Port(pressure=2e5)
+    assert port._arena is None
+    assert port.pressure == 2e5 and port.flow_rate == 0.0 and port.temperature == 293.15
+    assert port.density == 1000.0 and port.viscosity == 0.001
+    assert set(port.dict()) == {"id", *PORT_FIELDS, "connected_to_port_id"}
+    assert port.id == port.dict()["id"]
+    other = Port(temperature=350.0, density=870.0, viscosity=0.03)
+    port.take_fluid(other)
+    assert (port.temperature, port.density, port.viscosity) == (350.0, 870.0, 0.03) and port.pressure == 2e5
+    assert pickle.loads(pickle.dumps(port)).dict() == port.dict()
+
+    arena = StateArena.attach([port, other])
+    assert port._arena is arena and other._arena is arena and arena.data.shape[0] == 2
+    assert arena.data[port._row, TEMPERATURE] == 350.0
+    port.temperature = 310.0
+    assert arena.data[port._row, TEMPERATURE] == 310.0
+    other.take_fluid(port)
+    assert other.temperature == 310.0 and other.density == 870.0
+    print("  RESULT: SUCCESS")
+
+def test_network_shares_one_arena():
+    """
+    The solver gathers every port of the network into one arena, the split
+    components share it, and the solved state is its columns.
+    """
+    print("\n--- State Arena (Network) ---")
+    network = build_skid_and_cooling()
+    solver = NetworkSolver(network)
+    ports = network_ports(network)
+    assert all(p._arena is network.state for p in ports) and len(network.state) == len(ports)
+    assert len(solver.components) == 2 and all(part.network.state is network.state for part in solver.components)
+    assert solver.solve()["success"]
+    assert np.array_equal(network.state.column(PRESSURE), port_states(network, "pressure"))
+
+    # Snapshot / restore and a port appended later (the arena grows, views follow)
+    snapshot = network.state.snapshot()
+    ports[0].pressure = -1.0
+    extra = Port(pressure=7.0)
+    StateArena.attach(ports + [extra])
+    assert extra._arena is network.state and extra.pressure == 7.0
+    network.state.restore(snapshot)
+    assert np.array_equal(port_states(network, "pressure"), snapshot[:, PRESSURE])
+    print(f"  {len(network.state)} ports in {network.state.nbytes} bytes")
+    print("  RESULT: SUCCESS")
+
+def test_pickled_network_keeps_state():
+    """A pickled network (as shipped to a worker) carries its arena as one array, shared by its ports."""
+    print("\n--- State Arena (Pickle) ---")
+    network = build_skid_and_cooling()
+    assert NetworkSolver(network).solve()["success"]
+    copy = pickle.loads(pickle.dumps(network))
+    ports = network_ports(copy)
+    assert all(p._arena is copy.state for p in ports)
+    for field in ("pressure", "flow_rate", "temperature"):
+        assert np.array_equal(port_states(copy, field), port_states(network, field))
+    ports[0].pressure = 0.0
+    assert network_ports(network)[0].pressure != 0.0
+    print("  RESULT: SUCCESS")
+
+def test_group_across_arenas():
+    """A PortGroup over ports of different arenas still reads and writes, one port at a time."""
+    print("\n--- State Arena (Mixed Group) ---")
+    ports = [Port(pressure=float(k)) for k in range(4)]
+    group = PortGroup(ports)
+    assert np.array_equal(group.get(PRESSURE), [0.0, 1.0, 2.0, 3.0])
+    group.set(PRESSURE, 5.0)
+    assert all(p.pressure == 5.0 for p in ports)
+    StateArena.attach(ports)
+    assert group._resolve()[0] is ports[0]._arena
+    group.set_state(np.arange(20.0).reshape(4, 5))
+    assert ports[3].pressure == 15.0 and ports[3].viscosity == 19.0
+    print("  RESULT: SUCCESS")
+
+if __name__ == "__main__":
+    test_port_view()
+    test_network_shares_one_arena()
+    test_pickled_network_keeps_state()
+    test_group_across_arenas()
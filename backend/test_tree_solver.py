@@ -0,0 +1,158 @@
+import sys
+import os
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from simulation.schemas import ReactFlowGraph, HydraulicNetwork, GlobalSettings
+from simulation.graph_parser import GraphParser
+from simulation.solver import NetworkSolver
+from simulation.equipment.tank import Tank
+from simulation.equipment.pipe import Pipe
+from simulation.equipment.centrifugal_pump import CentrifugalPump
+from simulation.equipment.splitter import Splitter
+from simulation.equipment.linear_control_valve import LinearControlValve
+from simulation.equipment.orifice import Orifice
+from simulation.equipment.filter import Filter
+from test_performance_bench import generate_stress_network
+
+def edge_flows(network):
+    return np.array([e['pipe'].inlets[0].flow_rate for e in network.edges])
+
+def build_radial_network(tree_solver=True):
+    """Pump feeding a splitter tree to three consumer tanks at different levels."""
+    gs = GlobalSettings(fluid_type="iso_vg_46", tree_solver=tree_solver)
+    nodes = {
+        "t1": Tank("Source", fluid_level=2.0, fluid_type="iso_vg_46"),
+        "pump": CentrifugalPump("Pump", flow_rated=200.0/60000.0, pressure_rated=6e5),
+        "filt": Filter("Filter", clogging_pct=20.0),
+        "split": Splitter("Split"),
+        "valve": LinearControlValve("Valve", max_cv=0.05, opening_pct=40.0),
+        "sub": Splitter("Sub-split"),
+        "ori": Orifice("Orifice", pipe_diameter=0.04, orifice_diameter=0.02),
+        "ta": Tank("Consumer A", fluid_level=1.0, fluid_type="iso_vg_46"),
+        "tb": Tank("Consumer B", fluid_level=3.0, fluid_type="iso_vg_46"),
+        "tc": Tank("Consumer C", fluid_level=0.5, fluid_type="iso_vg_46"),
+    }
+    edges = [
+        {"source": "t1", "target": "pump", "pipe": Pipe("p1", 2.0, 0.08)},
+        {"source": "pump", "target": "filt", "pipe": Pipe("p2", 5.0, 0.05)},
+        {"source": "filt", "target": "split", "pipe": Pipe("p3", 5.0, 0.05)},
+        {"source": "split", "target": "valve", "source_port": "outlet-0", "pipe": Pipe("p4", 10.0, 0.04)},
+        {"source": "valve", "target": "ta", "pipe": Pipe("p5", 5.0, 0.04)},
+        {"source": "split", "target": "sub", "source_port": "outlet-1", "pipe": Pipe("p6", 15.0, 0.04)},
+        {"source": "sub", "target": "ori", "source_port": "outlet-0", "pipe": Pipe("p7", 5.0, 0.04)},
+        {"source": "ori", "target": "tb", "pipe": Pipe("p8", 5.0, 0.04)},
+        {"source": "sub", "target": "tc", "source_port": "outlet-1", "pipe": Pipe("p9", 20.0, 0.03)},
+    ]
+    network = HydraulicNetwork(nodes=nodes, edges=edges, global_settings=gs)
+    for n in nodes.values(): n.global_settings = gs
+    for e in edges: e['pipe'].global_settings = gs
+    return network
+
+def test_radial_network_matches_newton():
+    """
+    A branched tree with three consumers is solved on three path balances, without
+    the MINPACK fallback, and lands on the stacked Newton operating point.
+    """
+    print("\n--- Tree Solver (Radial Network) ---")
+    reference = build_radial_network(tree_solver=False)
+    newton = NetworkSolver(reference).solve(method='sparse_newton')
+    network = build_radial_network()
+    solver = NetworkSolver(network)
+    tree = solver.solve()
+    assert newton["success"] and tree["success"] and not tree["fallback_used"]
+    assert solver._tree.is_tree and solver._tree.num_paths == 3
+    print(f"  Newton: {newton['time_ms']:.2f} ms, tree: {tree['time_ms']:.2f} ms "
+          f"({tree['total_inner_iterations']} residual calls, {tree['jacobian_evaluations']} path Jacobians)")
+
+    assert np.allclose(edge_flows(network), edge_flows(reference), rtol=1e-6)
+    for node_id in ("pump", "filt", "valve", "ori"):
+        assert abs(network.nodes[node_id].outlets[0].pressure - reference.nodes[node_id].outlets[0].pressure) < 1.0
+    assert np.all(edge_flows(network) > 0)
+    print("  RESULT: SUCCESS")
+
+def test_pump_flow_stays_forward():
+    """
+    Pump curves balance at -Q as well as +Q: on a short line where the first
+    full Newton step overshoots past zero flow, the path Newton is held on the
+    forward branch instead of converging to the mirrored root.
+    """
+    print("\n--- Tree Solver (Pump Flow Direction) ---")
+    gs = GlobalSettings(fluid_type="iso_vg_46")
+    nodes = {
+        "t1": Tank("Source", fluid_level=1.0, fluid_type="iso_vg_46"),
+        "pump": CentrifugalPump("Pump", flow_rated=0.01, pressure_rated=1e6),
+        "t2": Tank("Sink", elevation=10.0, fluid_level=0.0, fluid_type="iso_vg_46"),
+    }
+    edges = [
+        {"source": "t1", "target": "pump", "pipe": Pipe("p1", 1.0, 0.1)},
+        {"source": "pump", "target": "t2", "pipe": Pipe("p2", 1.0, 0.1)},
+    ]
+    network = HydraulicNetwork(nodes=nodes, edges=edges, global_settings=gs)
+    for n in nodes.values(): n.global_settings = gs
+    for e in edges: e['pipe'].global_settings = gs
+    stats = NetworkSolver(network).solve()
+    assert stats["success"] and not stats["fallback_used"]
+    assert network.nodes["pump"].inlets[0].flow_rate > 0
+    print(f"  Pump flow {network.nodes['pump'].inlets[0].flow_rate*60000:.2f} L/min")
+    print("  RESULT: SUCCESS")
+
+def test_looped_network_not_radial():
+    """Splitter/mixer loops are not trees: the solver method of the settings is used as before."""
+    print("\n--- Tree Solver (Looped Network) ---")
+    network = GraphParser.parse_graph(ReactFlowGraph(**generate_stress_network(5)))
+    network.global_settings.solver_method = 'gga'
+    solver = NetworkSolver(network)
+    stats = solver.solve()
+    assert stats["success"] and stats["backend"] == "gga" and solver._tree is False and solver._gga is not None
+    print("  RESULT: SUCCESS")
+
+def test_explicit_method_is_used():
+    """A method passed to solve() is used on a radial network too; only the default takes the tree path."""
+    print("\n--- Tree Solver (Explicit Method) ---")
+    network = build_radial_network()
+    assert NetworkSolver(network).solve()["backend"] == "tree"
+    solver = NetworkSolver(network)
+    stats = solver.solve(method='hybr')
+    assert stats["success"] and stats["backend"] == "hybr" and solver._tree is None
+    assert solver.resolve()["backend"] == "chord"
+    print("  RESULT: SUCCESS")
+
+def test_resolve_failure_falls_back():
+    """
+    A warm resolve whose first path Newton fails (the sink raised above the
+    pump's shutoff head) returns a failed tree result, so the solver falls back
+    instead of raising, and lands where a cold solve of the edited line does.
+    """
+    print("\n--- Tree Solver (Failed Resolve) ---")
+    node = lambda node_id, node_type, data: {"id": node_id, "type": node_type, "data": data, "position": {"x": 0, "y": 0}}
+    graph = {
+        "nodes": [node("t1", "tank", {"level": 2.0}), node("p1", "centrifugal_pump", {"pressure_rated_bar": 3}),
+                  node("v1", "linear_control_valve", {}), node("t2", "tank", {"level": 1.0})],
+        "edges": [{"id": "e1", "source": "t1", "target": "p1"}, {"id": "e2", "source": "p1", "target": "v1"},
+                  {"id": "e3", "source": "v1", "target": "t2"}],
+        "global_settings": {"tree_solver": True},
+    }
+    network = GraphParser.parse_graph(ReactFlowGraph(**graph))
+    solver = NetworkSolver(network)
+    assert solver.solve()["success"] and solver._tree
+    assert solver.resolve()["backend"] == "tree"
+    assert GraphParser.apply_parameter_updates(network, "t2", {"level": 50})
+    stats = solver.resolve()
+    assert stats["success"] and stats["fallback_used"]
+
+    graph["nodes"][3]["data"]["level"] = 50
+    reference = GraphParser.parse_graph(ReactFlowGraph(**graph))
+    assert NetworkSolver(reference).solve()["success"]
+    assert np.allclose(edge_flows(network), edge_flows(reference), atol=1e-7)
+    print(f"  Flow after the edit: {edge_flows(network)[0]*60000:.3f} L/min")
+    print("  RESULT: SUCCESS")
+
+if __name__ == "__main__":
+    test_radial_network_matches_newton()
+    test_pump_flow_stays_forward()
+    test_looped_network_not_radial()
+    test_explicit_method_is_used()
+    test_resolve_failure_falls_back()
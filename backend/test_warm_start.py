@@ -0,0 +1,101 @@
+import sys
+import os
+import copy
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from simulation.schemas import ReactFlowGraph
+from simulation.graph_parser import GraphParser
+from simulation.solver import NetworkSolver
+from simulation.warm_start import WarmStartCache, topology_key
+
+def regulated_graph(opening=50.0):
+    return {
+        "nodes": [
+            {"id": "t1", "type": "tank", "data": {"level": 2.0}, "position": {"x": 0, "y": 0}},
+            {"id": "p1", "type": "centrifugal_pump", "data": {"flow_rated_lmin": 200, "pressure_rated_bar": 8}, "position": {"x": 0, "y": 0}},
+            {"id": "reg", "type": "linear_regulator", "data": {"max_cv": 0.05, "set_pressure": 400000.0}, "position": {"x": 0, "y": 0}},
+            {"id": "v1", "type": "linear_control_valve", "data": {"max_cv": 0.05, "opening": opening}, "position": {"x": 0, "y": 0}},
+            {"id": "t2", "type": "tank", "data": {"level": 1.0}, "position": {"x": 0, "y": 0}},
+        ],
+        "edges": [
+            {"id": "e1", "source": "t1", "target": "p1", "data": {"length": 2, "diameter": 0.08}},
+            {"id": "e2", "source": "p1", "target": "reg", "data": {"length": 10, "diameter": 0.05}},
+            {"id": "e3", "source": "reg", "target": "v1", "data": {"length": 10, "diameter": 0.05}},
+            {"id": "e4", "source": "v1", "target": "t2", "data": {"length": 5, "diameter": 0.05}},
+        ],
+    }
+
+def parse(graph_data):
+    return GraphParser.parse_graph(ReactFlowGraph(**graph_data))
+
+def test_topology_key():
+    """
+    The key ignores parameters and listing order but changes with the connections.
+    """
+    print("\n--- Topology Key ---")
+    base = regulated_graph()
+    key = topology_key(parse(base))
+
+    edited = regulated_graph(opening=80.0)
+    edited["edges"][1]["data"]["length"] = 25
+    assert topology_key(parse(edited)) == key
+
+    shuffled = copy.deepcopy(base)
+    shuffled["nodes"].reverse()
+    shuffled["edges"].reverse()
+    assert topology_key(parse(shuffled)) == key
+
+    rewired = copy.deepcopy(base)
+    rewired["edges"][3]["targetHandle"] = "inlet-1"
+    assert topology_key(parse(rewired)) != key
+    retyped = copy.deepcopy(base)
+    retyped["nodes"][3]["type"] = "orifice"
+    assert topology_key(parse(retyped)) != key
+    print("  RESULT: SUCCESS")
+
+def test_warm_start_after_parameter_edit():
+    """
+    After a parameter edit on an unchanged topology, a warm-started solve reaches
+    the cold-start answer in fewer iterations, restoring the regulator opening.
+    """
+    print("\n--- Warm Start After Parameter Edit ---")
+    cache = WarmStartCache()
+    network = parse(regulated_graph(opening=50.0))
+    solver = NetworkSolver(network)
+    stats = solver.solve()
+    assert stats["success"] and not stats["warm_start"]
+    cache.store(network, solver.export_state())
+
+    # Cold reference for the edited network
+    cold_net = parse(regulated_graph(opening=55.0))
+    cold = NetworkSolver(cold_net).solve()
+
+    # Fresh parse of the same topology, as main.py does on every run_simulation
+    warm_net = parse(regulated_graph(opening=55.0))
+    state = cache.lookup(warm_net)
+    assert state is not None and state["openings"]["reg"] == network.nodes["reg"].opening_pct
+    warm = NetworkSolver(warm_net).solve(warm_start=state)
+    assert cold["success"] and warm["success"] and warm["warm_start"]
+
+    q_cold = np.array([e['pipe'].inlets[0].flow_rate for e in cold_net.edges])
+    q_warm = np.array([e['pipe'].inlets[0].flow_rate for e in warm_net.edges])
+    print(f"  Cold: {cold['outer_iterations']} control / {cold['total_inner_iterations']} residual calls")
+    print(f"  Warm: {warm['outer_iterations']} control / {warm['total_inner_iterations']} residual calls")
+    assert np.allclose(q_cold, q_warm, rtol=1e-2)
+    assert abs(cold_net.nodes["reg"].outlets[0].pressure - warm_net.nodes["reg"].outlets[0].pressure) < 0.1e5
+    assert warm["outer_iterations"] < cold["outer_iterations"]
+    assert warm["total_inner_iterations"] < cold["total_inner_iterations"]
+
+    # A state from another topology is ignored
+    other = regulated_graph()
+    other["edges"][3]["id"] = "e4b"
+    other_stats = NetworkSolver(parse(other)).solve(warm_start=state)
+    assert other_stats["success"] and not other_stats["warm_start"]
+    print("  RESULT: SUCCESS")
+
+if __name__ == "__main__":
+    test_topology_key()
+    test_warm_start_after_parameter_edit()
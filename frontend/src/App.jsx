@@ -28,6 +28,7 @@ import Sidebar from './Sidebar';
 import PropertyEditor from './PropertyEditor';
 import DetailPanel from './DetailPanel';
 import DataList from './DataList';
+import { FLUID_OPTIONS } from './utils/standards_library';
 
 // Import Examples
 import examplePFD from './example_pfd/Example_Standard_PFD.json';
@@ -69,6 +70,7 @@ export default function App() {
   const [isSimulating, setIsSimulating] = useState(false);
   const [isConnected, setIsConnected] = useState(false);
   const [lastStats, setLastStats] = useState(null);
+  const [fluidOptions, setFluidOptions] = useState(FLUID_OPTIONS);
   const [globalSettings, setGlobalSettings] = useState({
     fluid_type: 'water',
     ambient_temperature: 293.15,
@@ -78,7 +80,16 @@ export default function App() {
     tolerance: 1e-6,
     inner_iterations: 1000,
     control_iterations: 100,
-    solver_method: 'hybr'
+    control_mode: 'outer_loop',
+    initial_guess: 'linearized',
+    solver_method: 'hybr',
+    scaling: 'adaptive',
+    property_coupling: 'coupled',
+    isothermal: false,
+    tree_solver: true,
+    component_decomposition: true,
+    parallel_workers: 1,
+    network_reduction: false
   });
 
   // Global UI Fix
@@ -395,7 +406,9 @@ export default function App() {
 
       socket.onmessage = (event) => {
         const data = JSON.parse(event.data);
-        if (data.status === 'success') {
+        if (data.status === 'init') {
+          if (data.fluids && data.fluids.length) setFluidOptions(data.fluids);
+        } else if (data.status === 'success') {
           setIsSimulating(false);
           if (data.stats) setLastStats(data.stats);
           if (data.telemetry && data.telemetry.nodes) {
@@ -466,6 +479,7 @@ export default function App() {
         globalSettings={globalSettings}
         onUpdateGlobalSettings={setGlobalSettings}
         lastStats={lastStats}
+        fluidOptions={fluidOptions}
         templates={{
           "Standard PFD": examplePFD,
           "Volumetric Pump Example": exampleVolumetric,
@@ -492,6 +506,7 @@ export default function App() {
             onUpdateEdge={updateEdgeData}
             onDelete={onDeleteNode} 
             onDeleteEdge={onDeleteEdge}
+            fluidOptions={fluidOptions}
           />
 
           <ReactFlow 
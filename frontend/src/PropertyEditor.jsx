@@ -1,6 +1,6 @@
 import React, { useMemo, useState } from 'react';
 import { mToMm, mmToM } from './utils/converters';
-import { ASME_PIPE_STANDARDS, calculatePipeId, findClosestPipeMatch } from './utils/standards_library';
+import { ASME_PIPE_STANDARDS, FLUID_OPTIONS, calculatePipeId, findClosestPipeMatch } from './utils/standards_library';
 
 /**
  * PipeSelector component.
@@ -70,7 +70,7 @@ const PipeSelector = ({ data, onChange }) => {
   );
 };
 
-export default function PropertyEditor({ node, edge, onUpdate, onUpdateEdge, onDelete, onDeleteEdge }) {
+export default function PropertyEditor({ node, edge, onUpdate, onUpdateEdge, onDelete, onDeleteEdge, fluidOptions = FLUID_OPTIONS }) {
   const [isCollapsed, setIsCollapsed] = useState(false);
 
   if (!node && !edge) return null;
@@ -256,6 +256,19 @@ export default function PropertyEditor({ node, edge, onUpdate, onUpdateEdge, onD
                   onBlur={(e) => validateAndCommit('temperature', parseFloat(e.target.value) + 273.15)}
                 />
               </div>
+              <div>
+                <label style={{ fontSize: '11px', color: '#64748b' }}>Fluid</label>
+                <select 
+                  style={{ width: '100%', fontSize: '12px', padding: '4px' }} 
+                  value={data.fluid_type || ''} 
+                  onChange={(e) => onUpdate(id, { fluid_type: e.target.value })}
+                >
+                  <option value="">System Fluid</option>
+                  {fluidOptions.map(fluid => (
+                    <option key={fluid.value} value={fluid.value}>{fluid.label}</option>
+                  ))}
+                </select>
+              </div>
             </>
           )}
 
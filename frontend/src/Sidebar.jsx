@@ -1,5 +1,6 @@
 import React, { useState } from 'react';
 import walflowLogo from './assets/Logo_WalFlow.svg';
+import { FLUID_OPTIONS } from './utils/standards_library';
 
 const categorizedEquipment = [
   {
@@ -115,6 +116,9 @@ function DiagnosticsContent({ stats }) {
         <StatCard label="Control Steps" value={outer_iterations} hint="Outer Loop" />
         <StatCard label="Math Steps" value={total_inner_iterations} hint="Total Inner" />
         <StatCard label="Prop Steps" value={stats.property_iterations || 0} hint="Property Loops" />
+        {stats.jacobian_condition != null && (
+          <StatCard label="Condition" value={stats.jacobian_condition.toExponential(1)} hint="Jacobian (1-norm est.)" />
+        )}
       </div>
 
       {fallback_used && (
@@ -246,7 +250,7 @@ function CollapsibleScenarios({ templates, onLoad }) {
   );
 }
 
-export default function Sidebar({ onSave, onLoad, onClear, onCalculate, isSimulating, globalSettings, onUpdateGlobalSettings, templates, lastStats }) {
+export default function Sidebar({ onSave, onLoad, onClear, onCalculate, isSimulating, globalSettings, onUpdateGlobalSettings, templates, lastStats, fluidOptions = FLUID_OPTIONS }) {
   const [activeTab, setActiveTab] = useState('library');
 
   const onDragStart = (event, nodeType) => {
@@ -359,9 +363,9 @@ export default function Sidebar({ onSave, onLoad, onClear, onCalculate, isSimula
                   onChange={(e) => onUpdateGlobalSettings({ ...globalSettings, fluid_type: e.target.value })}
                   style={inputStyle}
                 >
-                  <option value="water">Water (Standard)</option>
-                  <option value="iso_vg_32">ISO VG 32 Oil</option>
-                  <option value="iso_vg_46">ISO VG 46 Oil</option>
+                  {fluidOptions.map(fluid => (
+                    <option key={fluid.value} value={fluid.value}>{fluid.label}</option>
+                  ))}
                 </select>
               </div>
 
@@ -410,8 +414,39 @@ export default function Sidebar({ onSave, onLoad, onClear, onCalculate, isSimula
                 >
                   <option value="hybr">HYBR (Powell Hybrid)</option>
                   <option value="lm">LM (Least-Squares)</option>
+                  <option value="sparse_newton">Sparse Newton (Large Networks)</option>
+                  <option value="gga">GGA (Todini-Pilati, Looped Networks)</option>
+                  <option value="domain_decomposition">Domain Decomposition (Very Large Networks)</option>
+                  <option value="continuation">Continuation (Hard-to-Converge Networks)</option>
+                  <option value="trf">TRF (Bounded Trust Region)</option>
+                </select>
+                <p style={hintStyle}>HYBR is faster; LM is more robust; Sparse Newton scales to thousands of elements; GGA solves only for node pressures (no TCVs); Domain Decomposition splits the network across the parallel workers (no controls); Continuation ramps from the linearized network when the others stall; TRF keeps pressures and pump flows physical and reports when no physical solution exists.</p>
+              </div>
+
+              <div>
+                <label style={labelStyle}>Initial Guess</label>
+                <select 
+                  value={globalSettings.initial_guess || 'linearized'}
+                  onChange={(e) => onUpdateGlobalSettings({ ...globalSettings, initial_guess: e.target.value })}
+                  style={inputStyle}
+                >
+                  <option value="linearized">Linearized Network</option>
+                  <option value="flat">Flat</option>
+                </select>
+                <p style={hintStyle}>Start from a linear solve of the network; Flat uses uniform pressures and flows.</p>
+              </div>
+
+              <div>
+                <label style={labelStyle}>Scaling</label>
+                <select 
+                  value={globalSettings.scaling || 'adaptive'}
+                  onChange={(e) => onUpdateGlobalSettings({ ...globalSettings, scaling: e.target.value })}
+                  style={inputStyle}
+                >
+                  <option value="adaptive">Adaptive (Equilibrated)</option>
+                  <option value="fixed">Fixed (bar, L/s)</option>
                 </select>
-                <p style={hintStyle}>HYBR is faster; LM is more robust.</p>
+                <p style={hintStyle}>Adaptive balances rows and unknowns from the element slopes; the Condition stat shows how well-posed the model is.</p>
               </div>
 
               <div>
@@ -425,6 +460,83 @@ export default function Sidebar({ onSave, onLoad, onClear, onCalculate, isSimula
                 <p style={hintStyle}>Outer loop for Regulator setpoints.</p>
               </div>
 
+              <div>
+                <label style={labelStyle}>Control Loops</label>
+                <select 
+                  value={globalSettings.control_mode || 'outer_loop'}
+                  onChange={(e) => onUpdateGlobalSettings({ ...globalSettings, control_mode: e.target.value })}
+                  style={inputStyle}
+                >
+                  <option value="outer_loop">Outer Loop (Adjust Between Solves)</option>
+                  <option value="embedded">Embedded (Solve With Hydraulics)</option>
+                </select>
+                <p style={hintStyle}>Embedded solves regulator openings and TCV mix ratios as Newton unknowns.</p>
+              </div>
+
+              <div>
+                <label style={labelStyle}>Property Coupling</label>
+                <select 
+                  value={globalSettings.property_coupling || 'coupled'}
+                  onChange={(e) => onUpdateGlobalSettings({ ...globalSettings, property_coupling: e.target.value })}
+                  style={inputStyle}
+                >
+                  <option value="coupled">Coupled (Every Residual)</option>
+                  <option value="picard">Picard (Outer Loop)</option>
+                </select>
+                <p style={hintStyle}>Picard freezes fluid properties during each hydraulic solve.</p>
+              </div>
+
+              <div>
+                <label style={labelStyle}>Thermal Model</label>
+                <select 
+                  value={globalSettings.isothermal ? 'isothermal' : 'full'}
+                  onChange={(e) => onUpdateGlobalSettings({ ...globalSettings, isothermal: e.target.value === 'isothermal' })}
+                  style={inputStyle}
+                >
+                  <option value="full">Full Thermal</option>
+                  <option value="isothermal">Isothermal (Skip Thermal Pass)</option>
+                </select>
+                <p style={hintStyle}>Isothermal uses the first tank's fluid state everywhere.</p>
+              </div>
+
+              <div>
+                <label style={labelStyle}>Radial Networks</label>
+                <select 
+                  value={globalSettings.tree_solver === false ? 'method' : 'tree'}
+                  onChange={(e) => onUpdateGlobalSettings({ ...globalSettings, tree_solver: e.target.value === 'tree' })}
+                  style={inputStyle}
+                >
+                  <option value="tree">Tree Path Solver (Exact)</option>
+                  <option value="method">Use Solver Method</option>
+                </select>
+                <p style={hintStyle}>Loop-free networks are solved per path, without the MINPACK fallback.</p>
+              </div>
+
+              <div>
+                <label style={labelStyle}>Network Reduction</label>
+                <select 
+                  value={globalSettings.network_reduction ? 'reduced' : 'full'}
+                  onChange={(e) => onUpdateGlobalSettings({ ...globalSettings, network_reduction: e.target.value === 'reduced' })}
+                  style={inputStyle}
+                >
+                  <option value="full">Off (Solve Every Element)</option>
+                  <option value="reduced">Series/Parallel Reduction</option>
+                </select>
+                <p style={hintStyle}>Merges pipe chains and parallel branches before solving.</p>
+              </div>
+
+              <div>
+                <label style={labelStyle}>Parallel Workers</label>
+                <input 
+                  type="number"
+                  min="1"
+                  value={globalSettings.parallel_workers}
+                  onChange={(e) => onUpdateGlobalSettings({ ...globalSettings, parallel_workers: Math.max(1, parseInt(e.target.value) || 1) })}
+                  style={inputStyle}
+                />
+                <p style={hintStyle}>Processes for independent circuits (1 = solve in sequence).</p>
+              </div>
+
               <div>
                 <label style={labelStyle}>Property Iterations</label>
                 <input 
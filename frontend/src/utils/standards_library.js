@@ -57,3 +57,23 @@ export const findClosestPipeMatch = (idMeters) => {
   }
   return null;
 };
+
+/**
+ * Selectable fluids until the backend sends its own list on connect (the "init"
+ * message, which also holds fluids of extra library files): the built-in models,
+ * then the shipped fluid library (backend/simulation/fluids). Values are the
+ * backend fluid_type names.
+ */
+export const FLUID_OPTIONS = [
+  { value: 'water', label: 'Water (Standard)' },
+  { value: 'iso_vg_32', label: 'ISO VG 32 Oil' },
+  { value: 'iso_vg_46', label: 'ISO VG 46 Oil' },
+  { value: 'iso_vg_22', label: 'ISO VG 22 Oil' },
+  { value: 'iso_vg_68', label: 'ISO VG 68 Oil' },
+  { value: 'iso_vg_100', label: 'ISO VG 100 Oil' },
+  { value: 'hfc_46', label: 'HFC 46 Water-Glycol Hydraulic Fluid' },
+  { value: 'ethylene_glycol_30', label: 'Ethylene Glycol 30%' },
+  { value: 'ethylene_glycol_50', label: 'Ethylene Glycol 50%' },
+  { value: 'propylene_glycol_30', label: 'Propylene Glycol 30%' },
+  { value: 'propylene_glycol_50', label: 'Propylene Glycol 50%' },
+];